@@ -0,0 +1,135 @@
+// Production build of frontend/ into dist/, served by static.js.
+//
+//   node backend/assets/build.js [outDir]     (npm run build)
+//
+// - The scripts index.html loads are bundled, in order, into one js/app.js,
+//   and the worker's importScripts() dependencies are inlined into it, so
+//   the page and the worker each fetch a single script.
+// - JavaScript and CSS are minified (see minify.js).
+// - Every asset except index.html gets a content hash in its file name, and
+//   references to it are rewritten, so assets can be cached forever and a
+//   new build is picked up as soon as index.html is revalidated.
+// - Each file is written next to Brotli (.br) and gzip (.gz) variants,
+//   compressed once at the highest levels, so the server never compresses.
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+const zlib = require('zlib');
+const { minifyJs, minifyCss } = require('./minify');
+
+const FRONTEND_DIR = path.join(__dirname, '../../frontend');
+const DIST_DIR = path.join(__dirname, '../../dist');
+
+const APP_BUNDLE = 'js/app.js';
+const WORKER_SCRIPT = 'js/simulation-worker.js';
+const HASH_LENGTH = 12;
+
+function contentHash(content) {
+    return crypto.createHash('sha256').update(content).digest('hex').slice(0, HASH_LENGTH);
+}
+
+// js/app.js -> js/app.1a2b3c4d5e6f.js
+function hashedName(file, content) {
+    const ext = path.extname(file);
+    return `${file.slice(0, -ext.length)}.${contentHash(content)}${ext}`;
+}
+
+// Script paths index.html loads, in order
+function pageScripts(html) {
+    return [...html.matchAll(/<script src="([^"]+)"><\/script>/g)].map(match => match[1]);
+}
+
+// Replaces the worker's importScripts(...) call with the scripts themselves
+function inlineImportScripts(source, dir) {
+    return source.replace(/importScripts\(([^)]*)\);?/, (call, args) => {
+        const files = [...args.matchAll(/['"]([^'"]+)['"]/g)].map(match => match[1]);
+        return files.map(file => fs.readFileSync(path.join(dir, file), 'utf8')).join('\n;\n');
+    });
+}
+
+// Points quoted references to built files ('js/simulation-worker.js',
+// "css/style.css") at their hashed names
+function rewriteReferences(text, manifest) {
+    return text.replace(/(["'])([\w./-]+)\1/g, (match, quote, ref) =>
+        manifest[ref] ? `${quote}${manifest[ref]}${quote}` : match
+    );
+}
+
+function compressVariants(content) {
+    const br = zlib.brotliCompressSync(content, {
+        params: {
+            [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+            [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+            [zlib.constants.BROTLI_PARAM_SIZE_HINT]: content.length
+        }
+    });
+    const gz = zlib.gzipSync(content, { level: zlib.constants.Z_BEST_COMPRESSION });
+    return { br, gz };
+}
+
+function buildAssets({ srcDir = FRONTEND_DIR, outDir = DIST_DIR } = {}) {
+    const read = file => fs.readFileSync(path.join(srcDir, file), 'utf8');
+    const manifest = {};
+    const outputs = [];  // { file, content, sourceBytes }
+
+    function emit(logical, content, sourceBytes, hashed = true) {
+        const file = hashed ? hashedName(logical, content) : logical;
+        manifest[logical] = file;
+        outputs.push({ file, content: Buffer.from(content), sourceBytes });
+    }
+
+    const html = read('index.html');
+    const scripts = pageScripts(html);
+
+    // The worker first: the app bundle refers to it by name
+    const jsDir = path.join(srcDir, path.dirname(WORKER_SCRIPT));
+    const workerSource = inlineImportScripts(read(WORKER_SCRIPT), jsDir);
+    emit(WORKER_SCRIPT, minifyJs(workerSource), Buffer.byteLength(workerSource));
+
+    const appSource = scripts.map(read).join('\n;\n');
+    emit(APP_BUNDLE, rewriteReferences(minifyJs(appSource), manifest), Buffer.byteLength(appSource));
+
+    const stylesheets = [...html.matchAll(/<link rel="stylesheet" href="([^"]+)">/g)].map(match => match[1]);
+    for (const stylesheet of stylesheets) {
+        const css = read(stylesheet);
+        emit(stylesheet, minifyCss(css), Buffer.byteLength(css));
+    }
+
+    // One script tag where the first one was, pointing at the bundle
+    let first = true;
+    const page = rewriteReferences(html.replace(/[ \t]*<script src="[^"]+"><\/script>\n?/g, match => {
+        if (!first) return '';
+        first = false;
+        return match.replace(/src="[^"]+"/, `src="${APP_BUNDLE}"`);
+    }), manifest);
+    emit('index.html', page, Buffer.byteLength(html), false);
+
+    fs.rmSync(outDir, { recursive: true, force: true });
+    for (const output of outputs) {
+        const target = path.join(outDir, output.file);
+        fs.mkdirSync(path.dirname(target), { recursive: true });
+        fs.writeFileSync(target, output.content);
+
+        const { br, gz } = compressVariants(output.content);
+        output.br = br.length < output.content.length ? br.length : null;
+        output.gz = gz.length < output.content.length ? gz.length : null;
+        if (output.br !== null) fs.writeFileSync(`${target}.br`, br);
+        if (output.gz !== null) fs.writeFileSync(`${target}.gz`, gz);
+    }
+    fs.writeFileSync(path.join(outDir, 'manifest.json'), JSON.stringify(manifest, null, 2) + '\n');
+
+    return { manifest, outputs, scripts };
+}
+
+if (require.main === module) {
+    const outDir = process.argv[2] ? path.resolve(process.argv[2]) : DIST_DIR;
+    const { outputs, scripts } = buildAssets({ outDir });
+    console.log(`Built ${path.relative(process.cwd(), outDir) || '.'}: ${scripts.length} page scripts bundled`);
+    const kb = bytes => bytes === null ? '-' : `${(bytes / 1024).toFixed(1)} KB`;
+    for (const output of outputs) {
+        console.log(`  ${output.file.padEnd(40)} source ${kb(output.sourceBytes).padStart(9)}` +
+            `  minified ${kb(output.content.length).padStart(9)}  br ${kb(output.br).padStart(8)}  gz ${kb(output.gz).padStart(8)}`);
+    }
+}
+
+module.exports = { buildAssets };
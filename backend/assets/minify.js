@@ -0,0 +1,247 @@
+// Dependency-free minification for the asset build. It strips comments and
+// whitespace and leaves every token unchanged: no renaming, no rewriting. A
+// small tokenizer keeps strings, template literals and regular expressions
+// intact. Line breaks are kept wherever automatic semicolon insertion could
+// depend on them, so the output parses exactly like the input.
+// test/minify.test.js runs the page, the worker and the engine built from
+// the minified scripts against the originals.
+
+// After one of these, a '/' starts a regular expression instead of dividing.
+// After ')' and '}' it depends on what they closed (see regexAllowed).
+const REGEX_AFTER_PUNCTUATION = new Set('(,=:[!&|?{;+-*%<>~^'.split(''));
+const REGEX_AFTER_KEYWORDS = new Set([
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await'
+]);
+// Their parenthesised part is followed by a statement: `if (x) /re/.test(s)`
+const CONDITION_KEYWORDS = new Set(['if', 'while', 'for', 'with']);
+
+// A line break after these (or before the closers) can never end a statement
+const NO_BREAK_AFTER = new Set(';{,(['.split(''));
+const NO_BREAK_BEFORE = new Set('})],;.'.split(''));
+
+function isWordChar(ch) {
+    return (ch >= 'a' && ch <= 'z') || (ch >= 'A' && ch <= 'Z') || (ch >= '0' && ch <= '9') ||
+        ch === '_' || ch === '$' || ch === '\\' || ch > '\x7f';
+}
+
+function isSpace(ch) {
+    return ch === ' ' || ch === '\t' || ch === '\r' || ch === '\f' || ch === '\v' ||
+        ch === '\u00a0' || ch === '\ufeff';
+}
+
+// Whether two tokens would merge into one (or change meaning) without a space
+function needsSpace(before, after) {
+    return (isWordChar(before) && isWordChar(after)) ||
+        ((before === '+' || before === '-') && after === before) ||
+        (before === '/' && after === '/') ||
+        (before >= '0' && before <= '9' && after === '.');
+}
+
+function minifyJs(source) {
+    const n = source.length;
+    let out = '';
+    let i = 0;
+    let pendingSpace = false;
+    let pendingBreak = false;
+    // Last two significant tokens: a punctuation character, a word, '' for a
+    // literal (string, template, regex), or null at the start of input
+    let last = null;
+    let beforeLast = null;
+    // One entry per open '{': 'template' (a template substitution), 'object'
+    // (an object literal) or 'block'
+    const braces = [];
+    // One entry per open '(': 'condition' after if/while/for/with, else 'group'
+    const parens = [];
+    // The entry the last ')' or '}' closed
+    let closed = null;
+
+    function emit(token, kind) {
+        const first = token[0];
+        const prev = out[out.length - 1];
+        if (prev !== undefined) {
+            if (pendingBreak && !NO_BREAK_AFTER.has(prev) && !NO_BREAK_BEFORE.has(first)) {
+                out += '\n';
+            } else if ((pendingSpace || pendingBreak) && needsSpace(prev, first)) {
+                out += ' ';
+            }
+        }
+        pendingSpace = pendingBreak = false;
+        out += token;
+        beforeLast = last;
+        last = kind === 'literal' ? '' : token;
+    }
+
+    // Copies a template literal from i (just after '`' or a closing '}') up to
+    // and including its closing '`' or the next '${'
+    function readTemplate(start) {
+        let j = start;
+        while (j < n) {
+            const ch = source[j];
+            if (ch === '\\') {
+                j += 2;
+            } else if (ch === '`') {
+                return { end: j + 1, substitution: false };
+            } else if (ch === '$' && source[j + 1] === '{') {
+                return { end: j + 2, substitution: true };
+            } else {
+                j++;
+            }
+        }
+        throw new Error('Unterminated template literal');
+    }
+
+    function regexAllowed() {
+        if (last === null) return true;
+        if (last === '') return false;
+        if (last === ')') return closed === 'condition';
+        if (last === '}') return closed === 'block';
+        // Postfix: `i++ / 2` divides
+        if ((last === '+' || last === '-') && beforeLast === last) return false;
+        if (last.length === 1 && REGEX_AFTER_PUNCTUATION.has(last)) return true;
+        // A keyword used as a property name (`range.in / 2`) is a value
+        return REGEX_AFTER_KEYWORDS.has(last) && beforeLast !== '.';
+    }
+
+    // Where an expression is expected '{' opens an object literal, anywhere else a block
+    function braceOpensObject() {
+        if (last === null || last === '' || last === ')' || last === ';' || last === '{' || last === '}') {
+            return false;
+        }
+        if (last === '>' && beforeLast === '=') return false;  // Arrow function body
+        if (last === 'else' || last === 'do') return false;
+        return regexAllowed();
+    }
+
+    while (i < n) {
+        const ch = source[i];
+        const next = source[i + 1];
+
+        if (ch === '\n' || ch === '\u2028' || ch === '\u2029') {
+            pendingBreak = true;
+            i++;
+        } else if (isSpace(ch)) {
+            pendingSpace = true;
+            i++;
+        } else if (ch === '/' && next === '/') {
+            while (i < n && source[i] !== '\n') i++;
+        } else if (ch === '/' && next === '*') {
+            const end = source.indexOf('*/', i + 2);
+            if (end === -1) throw new Error('Unterminated comment');
+            if (source.slice(i, end).includes('\n')) pendingBreak = true;
+            else pendingSpace = true;
+            i = end + 2;
+        } else if (ch === '"' || ch === "'") {
+            let j = i + 1;
+            while (j < n && source[j] !== ch) {
+                if (source[j] === '\\') j++;
+                if (source[j] === '\n') throw new Error('Unterminated string literal');
+                j++;
+            }
+            emit(source.slice(i, j + 1), 'literal');
+            i = j + 1;
+        } else if (ch === '`') {
+            const { end, substitution } = readTemplate(i + 1);
+            emit(source.slice(i, end), 'literal');
+            if (substitution) {
+                braces.push('template');
+                last = '{';
+            }
+            i = end;
+        } else if (ch === '/' && regexAllowed()) {
+            let j = i + 1;
+            let inClass = false;
+            while (j < n && (inClass || source[j] !== '/')) {
+                if (source[j] === '\\') j++;
+                else if (source[j] === '[') inClass = true;
+                else if (source[j] === ']') inClass = false;
+                else if (source[j] === '\n') throw new Error('Unterminated regular expression');
+                j++;
+            }
+            j++;
+            while (j < n && isWordChar(source[j])) j++;  // Flags
+            emit(source.slice(i, j), 'literal');
+            i = j;
+        } else if (isWordChar(ch)) {
+            let j = i + 1;
+            while (j < n && isWordChar(source[j])) j++;
+            // Numbers like 1.5e-3 and .5 stay one token
+            if (ch >= '0' && ch <= '9') {
+                while (j < n && (isWordChar(source[j]) || source[j] === '.' ||
+                    ((source[j] === '+' || source[j] === '-') && /[eE]/.test(source[j - 1]) && !/^0[xX]/.test(source.slice(i, j))))) {
+                    j++;
+                }
+            }
+            emit(source.slice(i, j), 'word');
+            i = j;
+        } else if (ch === '{') {
+            braces.push(braceOpensObject() ? 'object' : 'block');
+            emit(ch, 'punctuation');
+            i++;
+        } else if (ch === '}' && braces[braces.length - 1] === 'template') {
+            // End of a template substitution: the template text continues
+            braces.pop();
+            const { end, substitution } = readTemplate(i + 1);
+            emit(source.slice(i, end), 'literal');
+            if (substitution) {
+                braces.push('template');
+                last = '{';
+            }
+            i = end;
+        } else if (ch === '(') {
+            parens.push(CONDITION_KEYWORDS.has(last) && beforeLast !== '.' ? 'condition' : 'group');
+            emit(ch, 'punctuation');
+            i++;
+        } else {
+            if (ch === '}') closed = braces.pop();
+            else if (ch === ')') closed = parens.pop();
+            emit(ch, 'punctuation');
+            i++;
+        }
+    }
+    return out + '\n';
+}
+
+function minifyCss(source) {
+    const n = source.length;
+    let out = '';
+    let i = 0;
+    let pendingSpace = false;
+    // Spaces around these are never significant in a stylesheet
+    const tight = new Set('{};,>'.split(''));
+
+    while (i < n) {
+        const ch = source[i];
+        if (ch === '/' && source[i + 1] === '*') {
+            const end = source.indexOf('*/', i + 2);
+            if (end === -1) throw new Error('Unterminated comment');
+            i = end + 2;
+            pendingSpace = true;
+        } else if (/\s/.test(ch)) {
+            pendingSpace = true;
+            i++;
+        } else {
+            let token = ch;
+            if (ch === '"' || ch === "'") {
+                let j = i + 1;
+                while (j < n && source[j] !== ch) {
+                    if (source[j] === '\\') j++;
+                    j++;
+                }
+                token = source.slice(i, j + 1);
+            }
+            const prev = out[out.length - 1];
+            if (pendingSpace && prev !== undefined && !tight.has(prev) && !tight.has(ch)) {
+                out += ' ';
+            }
+            pendingSpace = false;
+            // The last declaration in a block needs no semicolon
+            if (ch === '}' && prev === ';') out = out.slice(0, -1);
+            out += token;
+            i += token.length;
+        }
+    }
+    return out + '\n';
+}
+
+module.exports = { minifyJs, minifyCss };
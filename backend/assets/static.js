@@ -0,0 +1,144 @@
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+
+// Serves a build.js output directory from memory. Every file and its .br and
+// .gz variants are read once at startup; a request only negotiates the
+// encoding and writes the buffer, with no filesystem access or compression
+// on the request path.
+//
+// Hashed files (name.<hash>.ext) never change, so they are cached for a
+// year as immutable. Everything else, index.html above all, must be
+// revalidated on every use and answers 304 when its ETag still matches.
+
+const IMMUTABLE = 'public, max-age=31536000, immutable';
+const REVALIDATE = 'no-cache';
+const HASHED_FILE = /\.[0-9a-f]{12}\.[a-z0-9]+$/;
+
+const CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.json': 'application/json; charset=utf-8',
+    '.svg': 'image/svg+xml',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.ico': 'image/x-icon',
+    '.woff2': 'font/woff2'
+};
+
+// Encodings in order of preference, with the file suffix of their variant
+const ENCODINGS = [['br', '.br'], ['gzip', '.gz']];
+
+function listFiles(dir, prefix = '') {
+    const files = [];
+    for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+        const relative = `${prefix}/${entry.name}`;
+        if (entry.isDirectory()) {
+            files.push(...listFiles(path.join(dir, entry.name), relative));
+        } else {
+            files.push(relative);
+        }
+    }
+    return files;
+}
+
+function loadFiles(rootDir) {
+    const files = new Map();
+    const all = listFiles(rootDir);
+    const present = new Set(all);
+    for (const urlPath of all) {
+        if (urlPath.endsWith('.br') || urlPath.endsWith('.gz') || urlPath === '/manifest.json') continue;
+
+        const body = fs.readFileSync(path.join(rootDir, urlPath));
+        const tag = crypto.createHash('sha256').update(body).digest('base64url').slice(0, 16);
+        const variants = [];
+        for (const [encoding, suffix] of ENCODINGS) {
+            if (present.has(urlPath + suffix)) {
+                variants.push({
+                    encoding,
+                    body: fs.readFileSync(path.join(rootDir, urlPath + suffix)),
+                    etag: `"${tag}-${encoding}"`
+                });
+            }
+        }
+        files.set(urlPath, {
+            type: CONTENT_TYPES[path.extname(urlPath)] || 'application/octet-stream',
+            cacheControl: HASHED_FILE.test(urlPath) ? IMMUTABLE : REVALIDATE,
+            identity: { encoding: null, body, etag: `"${tag}"` },
+            variants
+        });
+    }
+    return files;
+}
+
+// q-values from an Accept-Encoding header, e.g. { br: 1, gzip: 0.8, '*': 0 }
+function parseAcceptEncoding(header) {
+    const accepted = {};
+    for (const part of (header || '').split(',')) {
+        const [name, ...params] = part.trim().toLowerCase().split(';');
+        if (!name) continue;
+        const q = params.map(p => p.trim()).find(p => p.startsWith('q='));
+        accepted[name] = q ? parseFloat(q.slice(2)) || 0 : 1;
+    }
+    return accepted;
+}
+
+function negotiate(entry, header) {
+    const accepted = parseAcceptEncoding(header);
+    let best = entry.identity;
+    let bestQ = 0;
+    for (const variant of entry.variants) {
+        const q = variant.encoding in accepted ? accepted[variant.encoding] : (accepted['*'] || 0);
+        if (q > bestQ) {
+            best = variant;
+            bestQ = q;
+        }
+    }
+    return best;
+}
+
+function matchesEtag(header, etag) {
+    if (!header) return false;
+    return header.split(',').some(tag => {
+        tag = tag.trim();
+        return tag === '*' || tag === etag || tag === `W/${etag}`;
+    });
+}
+
+// Connect-style middleware (works with Express and plain http servers)
+function createStaticHandler(rootDir) {
+    const files = loadFiles(rootDir);
+
+    return function serveStatic(req, res, next) {
+        if (req.method !== 'GET' && req.method !== 'HEAD') return next();
+
+        let urlPath;
+        try {
+            urlPath = decodeURIComponent(req.url.split('?')[0]);
+        } catch (error) {
+            return next();
+        }
+        if (urlPath.endsWith('/')) urlPath += 'index.html';
+        const entry = files.get(urlPath);
+        if (!entry) return next();
+
+        const representation = negotiate(entry, req.headers['accept-encoding']);
+        res.setHeader('Content-Type', entry.type);
+        res.setHeader('Cache-Control', entry.cacheControl);
+        res.setHeader('ETag', representation.etag);
+        if (entry.variants.length > 0) res.setHeader('Vary', 'Accept-Encoding');
+        if (representation.encoding) res.setHeader('Content-Encoding', representation.encoding);
+
+        if (matchesEtag(req.headers['if-none-match'], representation.etag)) {
+            res.statusCode = 304;
+            res.end();
+            return;
+        }
+        res.statusCode = 200;
+        res.setHeader('Content-Length', representation.body.length);
+        res.end(req.method === 'HEAD' ? undefined : representation.body);
+    };
+}
+
+module.exports = { createStaticHandler, parseAcceptEncoding };
@@ -1,79 +1,69 @@
-const fs = require('fs');
-const path = require('path');
+const { LeaderboardStore } = require('./storage/leaderboard-store');
+const { LeaderboardPageCache } = require('./storage/page-cache');
+const { registry, observeDbOperation, timeDbOperation } = require('./metrics');
 
-const dbPath = path.join(__dirname, 'leaderboard.json');
-
-function readDatabase() {
-    try {
-        if (fs.existsSync(dbPath)) {
-            const data = fs.readFileSync(dbPath, 'utf8');
-            return JSON.parse(data);
-        }
-    } catch (error) {
-        console.error('Error reading database:', error);
-    }
-    return { scores: [], nextId: 1 };
-}
-
-function writeDatabase(data) {
-    try {
-        fs.writeFileSync(dbPath, JSON.stringify(data, null, 2), 'utf8');
-    } catch (error) {
-        console.error('Error writing database:', error);
-    }
-}
+let store = null;
+let pageCache = null;
 
 function initDatabase() {
-    if (!fs.existsSync(dbPath)) {
-        writeDatabase({ scores: [], nextId: 1 });
-    }
-    console.log('Database initialized successfully');
+    store = new LeaderboardStore({
+        dir: process.env.LEADERBOARD_DIR || __dirname,
+        compactEvery: parseInt(process.env.LEADERBOARD_COMPACT_EVERY) || 10000,
+        commitWindowMs: parseInt(process.env.LEADERBOARD_COMMIT_WINDOW_MS) || 0,
+        maxBatch: parseInt(process.env.LEADERBOARD_COMMIT_MAX_BATCH) || 256,
+        observe: observeDbOperation
+    });
+    const recovery = store.open();
+    pageCache = new LeaderboardPageCache(store, {
+        maxEntries: parseInt(process.env.LEADERBOARD_CACHE_PAGES) || 1000
+    });
+    console.log(`Database initialized successfully (${recovery.scores} scores, ${recovery.replayed} replayed from log)`);
 }
 
-function addScore(playerName, score, wavesSurvived) {
-    const db = readDatabase();
-    const newScore = {
-        id: db.nextId,
-        player_name: playerName,
-        score: score,
-        waves_survived: wavesSurvived,
-        created_at: new Date().toISOString()
-    };
-
-    db.scores.push(newScore);
-    db.nextId++;
-    writeDatabase(db);
+// Read at scrape time from whichever store is open
+registry.gauge('leaderboard_scores', 'Scores on the leaderboard', [], () => (store ? store.byId.size : 0));
+registry.gauge('leaderboard_write_queue_depth', 'Scores waiting for the next group commit', [],
+    () => (store ? store.log.queue.length : 0));
+registry.counter('leaderboard_committed_scores_total', 'Scores made durable by group commits', [],
+    () => (store ? store.log.stats.records : 0));
+registry.counter('leaderboard_failed_commits_total', 'Group commits whose write or fsync failed', [],
+    () => (store ? store.log.stats.failedCommits : 0));
+registry.counter('leaderboard_page_cache_requests_total', 'Leaderboard page reads by cache result', ['result'],
+    () => (pageCache ? [[{ result: 'hit' }, pageCache.stats.hits], [{ result: 'miss' }, pageCache.stats.misses]] : []));
 
-    return newScore.id;
+// Resolves with the new score's id once its group commit is durable
+async function addScore(playerName, score, wavesSurvived, difficulty = null) {
+    const record = await timeDbOperation('write', () => store.add(playerName, score, wavesSurvived, difficulty));
+    return record.id;
 }
 
 function getTopScores(limit = 10) {
-    const db = readDatabase();
-    return db.scores
-        .sort((a, b) => {
-            if (b.score !== a.score) {
-                return b.score - a.score;
-            }
-            return b.waves_survived - a.waves_survived;
-        })
-        .slice(0, limit);
+    return store.top(limit);
 }
 
 function getPlayerRank(scoreId) {
-    const db = readDatabase();
-    const score = db.scores.find(s => s.id === scoreId);
-    if (!score) return { rank: 0 };
+    return { rank: store.rank(scoreId) };
+}
+
+// Serialized page of a leaderboard view with its validators: { body, etag, lastModified, nextCursor }
+function getLeaderboardPage({ difficulty = 'all', window = 'alltime', cursor = null, limit = 10 } = {}) {
+    return timeDbOperation('read', () => pageCache.get({ difficulty, window, cursor, limit }));
+}
 
-    const rank = db.scores.filter(s =>
-        s.score > score.score || (s.score === score.score && s.id < score.id)
-    ).length + 1;
+function getDatabaseStats() {
+    return { writes: store.getWriteStats(), readCache: pageCache.getStats() };
+}
 
-    return { rank };
+function closeDatabase() {
+    return store.close();
 }
 
 module.exports = {
     initDatabase,
     addScore,
     getTopScores,
-    getPlayerRank
+    getPlayerRank,
+    getLeaderboardPage,
+    getDatabaseStats,
+    closeDatabase
 };
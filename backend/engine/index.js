@@ -0,0 +1,79 @@
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+// The game rules are browser scripts sharing one global scope. They are
+// concatenated here, in index.html order, into a single factory function so
+// the server simulates with exactly the code players run. Each call of the
+// factory gets its own top-level bindings (pools, constants) while still using
+// this realm's builtins; a separate VM context would route every Math access
+// through the context's global interceptors and run several times slower.
+// The simulation itself still uses Enemy objects; enemy-store.js, which the
+// page does not load, is added for the benchmarks and tests. scheduler.js only
+// drives the browser loop and is here so the tests exercise the page's copy.
+const scriptDir = path.join(__dirname, '../../frontend/js');
+const ENGINE_SCRIPTS = [
+    'pool.js',
+    'spatial-grid.js',
+    'rng.js',
+    'path.js',
+    'definitions.js',
+    'enemy.js',
+    'enemy-store.js',
+    'tower.js',
+    'projectile.js',
+    'simulation.js',
+    'scheduler.js'
+];
+
+const ENGINE_EXPORTS = [
+    'Simulation',
+    'createSimulationState',
+    'FixedStepScheduler',
+    'createRng',
+    'Enemy',
+    'EnemyStore',
+    'ENEMY_TYPES',
+    'DAMAGE_TYPES',
+    'ENEMY_PROTOTYPES',
+    'TOWER_TYPES',
+    'TOWER_PROTOTYPES',
+    'isTowerType',
+    'getWavePlan',
+    'Tower',
+    'Projectile',
+    'SpatialGrid',
+    'projectilePool',
+    'gamePath',
+    'gamePathModel',
+    'PathModel',
+    'difficultySettings',
+    'CANVAS_WIDTH',
+    'CANVAS_HEIGHT',
+    'GRID_SIZE',
+    'COLS',
+    'ROWS',
+    'TICK_RATE',
+    'TICK_MS'
+];
+
+let engineFactory = null;
+
+// Returns a new engine factory. transform rewrites each script's source
+// first; the minifier tests build an engine from the minified scripts.
+function compileEngine(transform = source => source) {
+    const sources = ENGINE_SCRIPTS.map(file =>
+        `// ${file}\n${transform(fs.readFileSync(path.join(scriptDir, file), 'utf8'))}`
+    );
+    const wrapped = `(function () {\n${sources.join('\n')}\n` +
+        `return { ${ENGINE_EXPORTS.join(', ')} };\n})`;
+    return new vm.Script(wrapped, { filename: 'engine.js' }).runInThisContext();
+}
+
+// Each call returns an independent engine instance (its own pools and state)
+function loadEngine() {
+    if (!engineFactory) engineFactory = compileEngine();
+    return engineFactory();
+}
+
+module.exports = { loadEngine, compileEngine };
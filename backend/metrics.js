@@ -0,0 +1,294 @@
+// Request and database metrics, exposed in the Prometheus text format at
+// GET /metrics and, per request, as a Server-Timing header that browser
+// devtools show next to each response.
+//
+// A small registry instead of a client library: counters, gauges and
+// fixed-bucket histograms are all the server needs. Gauges that mirror
+// existing stats (write queue, read cache, replay pool) are read at scrape
+// time through collect callbacks, so nothing is sampled in between.
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+// Request latencies, from 1 ms to 10 s
+const LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+// Database operations are mostly sub-millisecond reads and a few fsyncs
+const DB_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1];
+
+const elapsedSeconds = since => Number(process.hrtime.bigint() - since) / 1e9;
+
+function escapeLabel(value) {
+    return String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
+
+function formatLabels(names, values, extra = '') {
+    const pairs = names.map((name, i) => `${name}="${escapeLabel(values[i])}"`);
+    if (extra) pairs.push(extra);
+    return pairs.length > 0 ? `{${pairs.join(',')}}` : '';
+}
+
+function formatValue(value) {
+    if (value === Infinity) return '+Inf';
+    if (value === -Infinity) return '-Inf';
+    return String(value);
+}
+
+class Metric {
+    constructor(name, help, labelNames = []) {
+        this.name = name;
+        this.help = help;
+        this.labelNames = labelNames;
+        this.series = new Map();  // label values joined -> { values, ... }
+    }
+
+    seriesFor(labels, create) {
+        const values = this.labelNames.map(name => (labels[name] === undefined ? '' : labels[name]));
+        const key = values.join('\u0000');
+        let series = this.series.get(key);
+        if (!series) {
+            series = create(values);
+            this.series.set(key, series);
+        }
+        return series;
+    }
+
+    header() {
+        return `# HELP ${this.name} ${this.help}\n# TYPE ${this.name} ${this.type}\n`;
+    }
+}
+
+// With collect(), the value is read at scrape time instead of counted here:
+// collect() returns it, or [[labels, value], ...] for labelled series
+class Counter extends Metric {
+    constructor(name, help, labelNames, collect = null) {
+        super(name, help, labelNames);
+        this.collect = collect;
+    }
+
+    get type() {
+        return 'counter';
+    }
+
+    inc(labels = {}, amount = 1) {
+        this.seriesFor(labels, values => ({ values, value: 0 })).value += amount;
+    }
+
+    samples() {
+        if (!this.collect) {
+            return [...this.series.values()].map(({ values, value }) => [values, value]);
+        }
+        const collected = this.collect();
+        return (Array.isArray(collected) ? collected : [[{}, collected]])
+            .map(([labels, value]) => [this.labelNames.map(name => labels[name]), value]);
+    }
+
+    render() {
+        let text = this.header();
+        for (const [values, value] of this.samples()) {
+            text += `${this.name}${formatLabels(this.labelNames, values)} ${formatValue(value)}\n`;
+        }
+        return text;
+    }
+}
+
+class Gauge extends Counter {
+    get type() {
+        return 'gauge';
+    }
+}
+
+class Histogram extends Metric {
+    constructor(name, help, labelNames, buckets) {
+        super(name, help, labelNames);
+        this.buckets = buckets;
+    }
+
+    get type() {
+        return 'histogram';
+    }
+
+    observe(labels, seconds) {
+        const series = this.seriesFor(labels, values => ({
+            values, counts: new Float64Array(this.buckets.length), sum: 0, count: 0
+        }));
+        // Counts are per bucket here and made cumulative when rendered
+        const bucket = this.buckets.findIndex(bound => seconds <= bound);
+        if (bucket !== -1) series.counts[bucket]++;
+        series.sum += seconds;
+        series.count++;
+    }
+
+    render() {
+        let text = this.header();
+        for (const { values, counts, sum, count } of this.series.values()) {
+            let cumulative = 0;
+            this.buckets.forEach((bound, i) => {
+                cumulative += counts[i];
+                text += `${this.name}_bucket${formatLabels(this.labelNames, values, `le="${bound}"`)} ${cumulative}\n`;
+            });
+            text += `${this.name}_bucket${formatLabels(this.labelNames, values, 'le="+Inf"')} ${count}\n`;
+            text += `${this.name}_sum${formatLabels(this.labelNames, values)} ${sum}\n`;
+            text += `${this.name}_count${formatLabels(this.labelNames, values)} ${count}\n`;
+        }
+        return text;
+    }
+}
+
+class Registry {
+    constructor() {
+        this.metrics = [];
+    }
+
+    counter(name, help, labelNames, collect) {
+        return this.add(new Counter(name, help, labelNames, collect));
+    }
+
+    gauge(name, help, labelNames, collect) {
+        return this.add(new Gauge(name, help, labelNames, collect));
+    }
+
+    histogram(name, help, labelNames, buckets) {
+        return this.add(new Histogram(name, help, labelNames, buckets));
+    }
+
+    add(metric) {
+        this.metrics.push(metric);
+        return metric;
+    }
+
+    render() {
+        return this.metrics.map(metric => metric.render()).join('');
+    }
+}
+
+const registry = new Registry();
+
+const httpDuration = registry.histogram(
+    'http_request_duration_seconds', 'Time from request to the end of the response',
+    ['method', 'route', 'status'], LATENCY_BUCKETS);
+const dbDuration = registry.histogram(
+    'leaderboard_db_duration_seconds',
+    'Leaderboard store operations: read (file or page), parse (JSON on load), write (until durable), commit (write and fsync of one batch), compact',
+    ['operation'], DB_BUCKETS);
+
+const loopDelay = monitorEventLoopDelay({ resolution: 10 });
+loopDelay.enable();
+registry.gauge('nodejs_eventloop_delay_p99_seconds', 'Event loop delay, 99th percentile since start', [],
+    () => loopDelay.percentile(99) / 1e9);
+registry.gauge('nodejs_heap_used_bytes', 'V8 heap in use', [], () => process.memoryUsage().heapUsed);
+registry.gauge('process_resident_memory_bytes', 'Resident set size', [], () => process.memoryUsage.rss());
+registry.gauge('process_uptime_seconds', 'Seconds since the process started', [], () => process.uptime());
+
+function observeDbOperation(operation, seconds) {
+    dbDuration.observe({ operation }, seconds);
+}
+
+// Times fn under `operation`; works for sync functions and promises
+function timeDbOperation(operation, fn) {
+    const start = process.hrtime.bigint();
+    const result = fn();
+    if (result && typeof result.then === 'function') {
+        return result.finally(() => observeDbOperation(operation, elapsedSeconds(start)));
+    }
+    observeDbOperation(operation, elapsedSeconds(start));
+    return result;
+}
+
+// Entries for one response's Server-Timing header
+class ServerTiming {
+    constructor() {
+        this.start = process.hrtime.bigint();
+        this.entries = [];
+    }
+
+    add(name, ms, description = null) {
+        this.entries.push({ name, ms, description });
+    }
+
+    // Times fn (sync or async) as one entry
+    time(name, fn) {
+        const start = process.hrtime.bigint();
+        const done = () => this.add(name, elapsedSeconds(start) * 1000);
+        const result = fn();
+        if (result && typeof result.then === 'function') {
+            return result.finally(done);
+        }
+        done();
+        return result;
+    }
+
+    header() {
+        const entries = [...this.entries, { name: 'total', ms: elapsedSeconds(this.start) * 1000 }];
+        return entries.map(({ name, ms, description }) =>
+            `${name};dur=${ms.toFixed(2)}${description ? `;desc=${quoteString(description)}` : ''}`).join(', ');
+    }
+}
+
+// HTTP quoted-string, as Server-Timing descriptions are sent
+function quoteString(value) {
+    return `"${String(value).replace(/["\\]/g, '\\$&')}"`;
+}
+
+// Route label for a finished request: the matched route's pattern, so ids and
+// query strings never become label values
+function routeLabel(req, res) {
+    if (req.route) {
+        const route = `${req.baseUrl || ''}${req.route.path}`;
+        return route.length > 1 ? route.replace(/\/$/, '') : route;
+    }
+    return res.statusCode === 404 ? 'unmatched' : 'static';
+}
+
+// Connect-style middleware: gives each response res.serverTiming, writes the
+// Server-Timing header as the headers go out and records the request's
+// duration once it finishes
+function requestMetrics() {
+    return function recordRequest(req, res, next) {
+        const timing = new ServerTiming();
+        res.serverTiming = timing;
+
+        const writeHead = res.writeHead;
+        res.writeHead = function(...args) {
+            if (!res.headersSent) {
+                res.setHeader('Server-Timing', timing.header());
+            }
+            return writeHead.apply(this, args);
+        };
+
+        res.on('finish', () => {
+            httpDuration.observe({
+                method: req.method,
+                route: routeLabel(req, res),
+                status: res.statusCode
+            }, elapsedSeconds(timing.start));
+        });
+        next();
+    };
+}
+
+function renderMetrics() {
+    return registry.render();
+}
+
+// Connect-style middleware for operational endpoints (/metrics, the
+// leaderboard's /stats): with METRICS_TOKEN set, only requests carrying
+// `Authorization: Bearer <token>` get through, the rest get a bare 401
+function requireMetricsToken() {
+    return function checkMetricsToken(req, res, next) {
+        const token = process.env.METRICS_TOKEN;
+        if (token && req.headers.authorization !== `Bearer ${token}`) {
+            res.statusCode = 401;
+            return res.end();
+        }
+        next();
+    };
+}
+
+module.exports = {
+    Registry,
+    ServerTiming,
+    registry,
+    requestMetrics,
+    requireMetricsToken,
+    renderMetrics,
+    observeDbOperation,
+    timeDbOperation
+};
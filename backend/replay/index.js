@@ -0,0 +1,31 @@
+const os = require('os');
+const { ReplayVerifierPool, QueueFullError } = require('./pool');
+const { registry } = require('../metrics');
+
+let pool = null;
+
+// One verifier pool per process, sized from the environment on first use
+function getReplayVerifier() {
+    if (!pool) {
+        pool = new ReplayVerifierPool({
+            size: parseInt(process.env.REPLAY_WORKERS) || Math.max(1, os.availableParallelism() - 1),
+            maxQueue: parseInt(process.env.REPLAY_QUEUE_LIMIT) || 100,
+            maxTicks: parseInt(process.env.REPLAY_MAX_TICKS) || 60 * 60 * 120,
+            maxMs: parseInt(process.env.REPLAY_MAX_MS) || 5000
+        });
+    }
+    return pool;
+}
+
+registry.gauge('replay_workers_busy', 'Replay verifier workers running a replay', [],
+    () => (pool ? pool.getStats().busy : 0));
+registry.gauge('replay_queue_depth', 'Replays waiting for a verifier worker', [],
+    () => (pool ? pool.getStats().queued : 0));
+registry.counter('replay_verifications_total', 'Replays verified, by outcome', ['result'], () => {
+    if (!pool) return [];
+    const { verified, rejected, timedOut, queueFull } = pool.stats;
+    return [[{ result: 'verified' }, verified], [{ result: 'rejected' }, rejected],
+        [{ result: 'timed_out' }, timedOut], [{ result: 'queue_full' }, queueFull]];
+});
+
+module.exports = { getReplayVerifier, QueueFullError };
@@ -0,0 +1,108 @@
+const path = require('path');
+const { Worker } = require('worker_threads');
+
+class QueueFullError extends Error {}
+
+// Fixed set of worker threads that re-simulate replays off the main event
+// loop. Jobs beyond the worker count wait in a bounded FIFO queue; a job that
+// overruns its hard timeout has its worker terminated and replaced.
+class ReplayVerifierPool {
+    constructor({ size, maxQueue, maxTicks, maxMs }) {
+        this.size = size;
+        this.maxQueue = maxQueue;
+        this.budget = { maxTicks, maxMs };
+        // Workers enforce maxMs themselves; the hard timeout only catches runaways
+        this.hardTimeoutMs = maxMs * 2 + 1000;
+        this.queue = [];
+        this.idle = [];
+        this.nextJobId = 1;
+        this.stats = { verified: 0, rejected: 0, timedOut: 0, queueFull: 0 };
+
+        for (let i = 0; i < size; i++) {
+            this.idle.push(this.spawnWorker());
+        }
+    }
+
+    spawnWorker() {
+        const worker = new Worker(path.join(__dirname, 'worker.js'), { workerData: this.budget });
+        worker.unref();
+        worker.on('message', ({ id, result }) => this.finish(worker, id, result));
+        worker.on('error', error => {
+            console.error('Replay worker crashed:', error);
+            this.replaceWorker(worker, { valid: false, reason: 'Replay could not be simulated' });
+        });
+        return worker;
+    }
+
+    verify(replay) {
+        if (this.queue.length >= this.maxQueue) {
+            this.stats.queueFull++;
+            return Promise.reject(new QueueFullError('Replay verification queue is full'));
+        }
+
+        return new Promise((resolve, reject) => {
+            this.queue.push({ id: this.nextJobId++, replay, resolve, reject });
+            this.dispatch();
+        });
+    }
+
+    dispatch() {
+        while (this.idle.length > 0 && this.queue.length > 0) {
+            const worker = this.idle.pop();
+            const job = this.queue.shift();
+            job.timer = setTimeout(() => {
+                this.stats.timedOut++;
+                this.replaceWorker(worker, { valid: false, reason: 'Replay exceeds time budget' });
+            }, this.hardTimeoutMs);
+            worker.job = job;
+            worker.postMessage({ id: job.id, replay: job.replay });
+        }
+    }
+
+    finish(worker, id, result) {
+        const job = worker.job;
+        if (!job || job.id !== id) return;
+
+        clearTimeout(job.timer);
+        worker.job = null;
+        this.stats[result.valid ? 'verified' : 'rejected']++;
+        job.resolve(result);
+
+        this.idle.push(worker);
+        this.dispatch();
+    }
+
+    replaceWorker(worker, result) {
+        const job = worker.job;
+        worker.job = null;
+        worker.removeAllListeners();
+        worker.terminate();
+
+        if (job) {
+            clearTimeout(job.timer);
+            this.stats.rejected++;
+            job.resolve(result);
+        }
+
+        this.idle = this.idle.filter(w => w !== worker);
+        this.idle.push(this.spawnWorker());
+        this.dispatch();
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            workers: this.size,
+            busy: this.size - this.idle.length,
+            queued: this.queue.length
+        };
+    }
+
+    close() {
+        for (const worker of this.idle) {
+            worker.terminate();
+        }
+    }
+}
+
+module.exports = { ReplayVerifierPool, QueueFullError };
@@ -0,0 +1,152 @@
+// Re-simulates a submitted game from its seed and command log and returns the
+// score the server should trust. Runs synchronously; callers that must not
+// block the event loop go through the worker pool in ./pool.js.
+
+const MAX_COMMANDS = 20000;
+const COMMAND_ARITY = {
+    place: 3,
+    upgrade: 2,
+    sell: 1,
+    airstrike: 2,
+    timeslow: 0,
+    towerboost: 0,
+    startwave: 0
+};
+
+const isId = value => Number.isInteger(value) && value >= 0;
+
+// A grid-cell centre on the board, where the game places towers
+function isCellCentre(engine, x, y) {
+    if (!Number.isFinite(x) || !Number.isFinite(y)) return false;
+    const col = (x - engine.GRID_SIZE / 2) / engine.GRID_SIZE;
+    const row = (y - engine.GRID_SIZE / 2) / engine.GRID_SIZE;
+    return Number.isInteger(col) && col >= 0 && col < engine.COLS &&
+        Number.isInteger(row) && row >= 0 && row < engine.ROWS;
+}
+
+const isOnBoard = (engine, x, y) => Number.isFinite(x) && Number.isFinite(y) &&
+    x >= 0 && x <= engine.CANVAS_WIDTH && y >= 0 && y <= engine.CANVAS_HEIGHT;
+
+// Argument checks per command. The simulation trusts its inputs, so anything
+// it would not have recorded itself (an inherited tower type, a NaN position)
+// is rejected here before it can reach the game state.
+const COMMAND_ARGS = {
+    place: (engine, [type, x, y]) => engine.isTowerType(type) && isCellCentre(engine, x, y),
+    upgrade: (engine, [id, pathId]) => isId(id) && (pathId === null || upgradePathIds(engine).has(pathId)),
+    sell: (engine, [id]) => isId(id),
+    airstrike: (engine, [x, y]) => isOnBoard(engine, x, y),
+    timeslow: () => true,
+    towerboost: () => true,
+    startwave: () => true
+};
+
+const pathIdsByEngine = new WeakMap();
+function upgradePathIds(engine) {
+    let ids = pathIdsByEngine.get(engine);
+    if (!ids) {
+        ids = new Set();
+        for (const type of engine.TOWER_TYPES) {
+            for (const path of engine.TOWER_PROTOTYPES[type].upgradePaths) {
+                ids.add(path.id);
+            }
+        }
+        pathIdsByEngine.set(engine, ids);
+    }
+    return ids;
+}
+
+function validateReplay(replay, engine) {
+    if (!replay || typeof replay !== 'object') {
+        return 'Replay is missing';
+    }
+    if (!Number.isInteger(replay.seed) || replay.seed < 0 || replay.seed > 0xFFFFFFFF) {
+        return 'Invalid seed';
+    }
+    if (!Object.prototype.hasOwnProperty.call(engine.difficultySettings, replay.difficulty)) {
+        return 'Invalid difficulty';
+    }
+    if (!Number.isInteger(replay.ticks) || replay.ticks < 0) {
+        return 'Invalid tick count';
+    }
+    if (!Array.isArray(replay.commands) || replay.commands.length > MAX_COMMANDS) {
+        return 'Invalid command log';
+    }
+
+    let lastTick = 0;
+    for (const command of replay.commands) {
+        if (!Array.isArray(command) || !Number.isInteger(command[0]) || command[0] < lastTick) {
+            return 'Commands must be [tick, op, ...args] in tick order';
+        }
+        const op = command[1];
+        const arity = Object.prototype.hasOwnProperty.call(COMMAND_ARITY, op) ? COMMAND_ARITY[op] : undefined;
+        if (arity === undefined || command.length !== arity + 2) {
+            return `Unknown command at tick ${command[0]}`;
+        }
+        if (!COMMAND_ARGS[op](engine, command.slice(2))) {
+            return `Invalid ${op} arguments at tick ${command[0]}`;
+        }
+        lastTick = command[0];
+    }
+    return null;
+}
+
+// Budgets: maxTicks caps the simulated game length, maxMs caps the time spent
+// simulating. Either one being exceeded rejects the replay.
+function verifyReplay(engine, replay, { maxTicks = 60 * 60 * 120, maxMs = 5000 } = {}) {
+    const error = validateReplay(replay, engine);
+    if (error) {
+        return { valid: false, reason: error };
+    }
+    if (replay.ticks > maxTicks) {
+        return { valid: false, reason: 'Replay exceeds tick budget' };
+    }
+
+    const state = engine.createSimulationState(replay.difficulty, replay.seed);
+    const simulation = new engine.Simulation(state);
+    const deadline = Date.now() + maxMs;
+    let result = null;
+
+    const stepTo = tick => {
+        while (state.tick < tick && !state.gameOver) {
+            simulation.step();
+            // Checking the clock every tick is measurable; every 256 ticks is plenty
+            if ((state.tick & 255) === 0 && Date.now() > deadline) {
+                return false;
+            }
+        }
+        return true;
+    };
+
+    try {
+        simulation.start();
+
+        for (const command of replay.commands) {
+            if (!stepTo(command[0])) {
+                result = { valid: false, reason: 'Replay exceeds time budget' };
+                break;
+            }
+            if (state.gameOver || !simulation.applyCommand(command)) {
+                result = { valid: false, reason: `Command rejected at tick ${command[0]}` };
+                break;
+            }
+        }
+
+        if (!result) {
+            if (!stepTo(replay.ticks)) {
+                result = { valid: false, reason: 'Replay exceeds time budget' };
+            } else if (!state.gameOver || state.tick !== replay.ticks) {
+                result = { valid: false, reason: 'Replay does not end where it claims to' };
+            } else {
+                result = { valid: true, score: state.score, wave: state.wave, ticks: state.tick };
+            }
+        }
+    } finally {
+        for (const projectile of state.projectiles) {
+            engine.projectilePool.release(projectile);
+        }
+    }
+
+    return result;
+}
+
+module.exports = { verifyReplay, validateReplay };
@@ -0,0 +1,15 @@
+const { parentPort, workerData } = require('worker_threads');
+const { loadEngine } = require('../engine');
+const { verifyReplay } = require('./verify');
+
+const engine = loadEngine();
+
+parentPort.on('message', ({ id, replay }) => {
+    let result;
+    try {
+        result = verifyReplay(engine, replay, workerData);
+    } catch (error) {
+        result = { valid: false, reason: 'Replay could not be simulated' };
+    }
+    parentPort.postMessage({ id, result });
+});
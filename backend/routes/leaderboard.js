@@ -1,36 +1,110 @@
 const express = require('express');
 const router = express.Router();
-const { addScore, getTopScores, getPlayerRank } = require('../database');
+const { addScore, getPlayerRank, getLeaderboardPage, getDatabaseStats } = require('../database');
+const { getReplayVerifier, QueueFullError } = require('../replay');
+const { loadEngine } = require('../engine');
+const { WINDOWS } = require('../storage/leaderboard-store');
+const { decodeCursor } = require('../storage/page-cache');
+const { requireMetricsToken } = require('../metrics');
 
+const DIFFICULTIES = ['all', ...Object.keys(loadEngine().difficultySettings)];
+const MAX_PAGE_SIZE = 100;
+// Seconds a shared cache (Cloud CDN in front of the primary region) may serve
+// a page without asking again; 0 leaves pages uncached at the edge
+const EDGE_CACHE_TTL = parseInt(process.env.LEADERBOARD_CACHE_TTL) || 0;
+
+// GET /api/leaderboard?difficulty=all|easy|...&window=alltime|weekly|daily&limit=10&cursor=...
+// The body stays a plain array of scores; the cursor for the next page comes
+// back in X-Next-Cursor (and a Link rel="next" header) when there is one.
 router.get('/', (req, res) => {
     try {
-        const limit = parseInt(req.query.limit) || 10;
-        const scores = getTopScores(limit);
-        res.json(scores);
+        const difficulty = req.query.difficulty || 'all';
+        const window = req.query.window || 'alltime';
+        const limit = Math.min(parseInt(req.query.limit) || 10, MAX_PAGE_SIZE);
+        const cursor = req.query.cursor || null;
+
+        if (!DIFFICULTIES.includes(difficulty)) {
+            return res.status(400).json({ error: `difficulty must be one of ${DIFFICULTIES.join(', ')}` });
+        }
+        if (!WINDOWS.includes(window)) {
+            return res.status(400).json({ error: `window must be one of ${WINDOWS.join(', ')}` });
+        }
+        if (limit < 1) {
+            return res.status(400).json({ error: 'limit must be a positive number' });
+        }
+        if (cursor !== null && (typeof cursor !== 'string' || !decodeCursor(cursor))) {
+            return res.status(400).json({ error: 'Invalid cursor' });
+        }
+
+        const page = res.serverTiming.time('db', () => getLeaderboardPage({ difficulty, window, cursor, limit }));
+
+        // Browsers may keep the page but must revalidate, and a matching ETag gets
+        // a 304; the edge may answer for EDGE_CACHE_TTL seconds on its own
+        res.set('Cache-Control', EDGE_CACHE_TTL > 0 ? `public, max-age=0, s-maxage=${EDGE_CACHE_TTL}` : 'no-cache');
+        res.set('ETag', page.etag);
+        if (page.lastModified) res.set('Last-Modified', page.lastModified);
+        if (page.nextCursor) {
+            const next = new URLSearchParams({ difficulty, window, limit, cursor: page.nextCursor });
+            res.set('X-Next-Cursor', page.nextCursor);
+            res.set('Link', `<${req.baseUrl}?${next}>; rel="next"`);
+        }
+        // send() answers 304 itself when the request's validators match
+        res.type('json').send(page.body);
     } catch (error) {
         console.error('Error fetching leaderboard:', error);
         res.status(500).json({ error: 'Failed to fetch leaderboard' });
     }
 });
 
-router.post('/', (req, res) => {
+// Write pipeline, read cache and replay pool counters; behind METRICS_TOKEN like /metrics
+router.get('/stats', requireMetricsToken(), (req, res) => {
+    res.set('Cache-Control', 'no-store');
+    res.json({ ...getDatabaseStats(), replay: getReplayVerifier().getStats() });
+});
+
+router.post('/', async (req, res) => {
     try {
-        const { playerName, score, wavesSurvived } = req.body;
+        const { replay } = req.body;
 
-        if (!playerName || score === undefined || wavesSurvived === undefined) {
+        if (!req.body.playerName || !replay) {
             return res.status(400).json({ error: 'Missing required fields' });
         }
 
+        // A number or object has no usable length, so it would slip past the range check
+        if (typeof req.body.playerName !== 'string') {
+            return res.status(400).json({ error: 'Player name must be a string' });
+        }
+        const playerName = req.body.playerName.trim();
         if (playerName.length > 20 || playerName.length < 1) {
             return res.status(400).json({ error: 'Player name must be 1-20 characters' });
         }
 
-        const scoreId = addScore(playerName, score, wavesSurvived);
+        // The score is never taken from the client: the game is re-simulated from its input log
+        let result;
+        try {
+            result = await res.serverTiming.time('verify', () => getReplayVerifier().verify(replay));
+        } catch (error) {
+            if (error instanceof QueueFullError) {
+                res.set('Retry-After', '5');
+                return res.status(503).json({ error: 'Score verification is busy, please retry' });
+            }
+            throw error;
+        }
+
+        if (!result.valid) {
+            return res.status(422).json({ error: `Replay rejected: ${result.reason}` });
+        }
+
+        // Returns once the score's batch is fsynced; concurrent submissions share one commit
+        const scoreId = await res.serverTiming.time('db', () =>
+            addScore(playerName, result.score, result.wave, replay.difficulty));
         const rankInfo = getPlayerRank(scoreId);
 
         res.json({
             id: scoreId,
             rank: rankInfo.rank,
+            score: result.score,
+            wavesSurvived: result.wave,
             message: 'Score submitted successfully'
         });
     } catch (error) {
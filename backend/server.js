@@ -1,26 +1,52 @@
 const express = require('express');
 const cors = require('cors');
+const fs = require('fs');
 const path = require('path');
+const { createStaticHandler } = require('./assets/static');
+const { requestMetrics, requireMetricsToken, renderMetrics } = require('./metrics');
 const leaderboardRoutes = require('./routes/leaderboard');
-const { initDatabase } = require('./database');
+const { initDatabase, closeDatabase } = require('./database');
 
 const app = express();
 const PORT = process.env.PORT || 3000;
 
-app.use(cors());
+// Every response gets a Server-Timing header and a latency observation
+app.use(requestMetrics());
+// Let cross-origin pages read the pagination and validator headers
+app.use(cors({ exposedHeaders: ['ETag', 'Last-Modified', 'X-Next-Cursor', 'Link'] }));
 app.use(express.json());
 
-app.use(express.static(path.join(__dirname, '../frontend')));
+// `npm run build` output when present: hashed, precompressed and cached as
+// immutable. Otherwise the unbuilt sources, for development.
+const DIST_DIR = path.join(__dirname, '../dist');
+const useDist = fs.existsSync(path.join(DIST_DIR, 'index.html'));
+const STATIC_DIR = useDist ? DIST_DIR : path.join(__dirname, '../frontend');
+
+app.use(useDist ? createStaticHandler(DIST_DIR) : express.static(STATIC_DIR));
 
 initDatabase();
 
 app.use('/api/leaderboard', leaderboardRoutes);
 
+// Prometheus scrape endpoint; set METRICS_TOKEN to require `Authorization: Bearer <token>`
+app.get('/metrics', requireMetricsToken(), (req, res) => {
+    res.set('Cache-Control', 'no-store');
+    res.type('text/plain; version=0.0.4').send(renderMetrics());
+});
+
 app.get('/', (req, res) => {
-    res.sendFile(path.join(__dirname, '../frontend/index.html'));
+    res.sendFile(path.join(STATIC_DIR, 'index.html'));
 });
 
-app.listen(PORT, () => {
+const server = app.listen(PORT, () => {
     console.log(`Server is running on http://localhost:${PORT}`);
     console.log(`Game available at http://localhost:${PORT}`);
 });
+
+// Cloud Run sends SIGTERM before stopping an instance; commit queued scores first
+process.on('SIGTERM', () => {
+    server.close();
+    closeDatabase()
+        .catch(error => console.error('Error flushing leaderboard:', error))
+        .finally(() => process.exit(0));
+});
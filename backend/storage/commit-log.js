@@ -0,0 +1,174 @@
+const fs = require('fs');
+const { promisify } = require('util');
+
+const write = promisify(fs.write);
+const fdatasync = promisify(fs.fdatasync);
+const ftruncate = promisify(fs.ftruncate);
+
+const SAMPLE_SIZE = 1024;
+
+// Fixed-size ring of recent samples for percentile reporting
+class Samples {
+    constructor(size = SAMPLE_SIZE) {
+        this.values = new Float64Array(size);
+        this.count = 0;
+    }
+
+    add(value) {
+        this.values[this.count % this.values.length] = value;
+        this.count++;
+    }
+
+    percentile(p) {
+        const n = Math.min(this.count, this.values.length);
+        if (n === 0) return 0;
+        const sorted = this.values.slice(0, n).sort();
+        return sorted[Math.min(n - 1, Math.floor(p / 100 * n))];
+    }
+}
+
+const elapsedMs = since => Number(process.hrtime.bigint() - since) / 1e6;
+
+// Single writer for an append-only NDJSON log. Appends queue up and are
+// written as one group commit (one write, one fdatasync) once windowMs has
+// passed since the first of them or maxBatch are waiting; appends that arrive
+// while a commit is in flight form the next batch. With windowMs 0 a commit
+// starts as soon as the current event loop turn is over, so a lone submission
+// pays no extra delay and batching comes from fsync time alone. Each append's
+// promise resolves only after its batch is durable.
+//
+// onCommit(records) runs synchronously once a batch is durable and before any
+// promise resolves. afterCommit() is awaited before the next batch starts, so
+// it can rewrite the log (compaction) with no commit in flight. observe('commit',
+// seconds) is told how long each successful write and fdatasync took.
+class GroupCommitLog {
+    constructor(fd, size, { windowMs = 0, maxBatch = 256, onCommit, afterCommit = null, observe = () => {} }) {
+        this.fd = fd;
+        this.size = size;
+        this.windowMs = windowMs;
+        this.maxBatch = maxBatch;
+        this.onCommit = onCommit;
+        this.afterCommit = afterCommit;
+        this.observe = observe;
+        this.queue = [];
+        this.timer = null;
+        this.writing = false;
+        this.idleWaiters = [];
+
+        this.stats = { commits: 0, records: 0, failedCommits: 0, maxQueueDepth: 0 };
+        this.batchSizes = new Samples();
+        this.commitMs = new Samples();
+        this.appendMs = new Samples();
+    }
+
+    append(record) {
+        return new Promise((resolve, reject) => {
+            this.queue.push({ record, resolve, reject, enqueuedAt: process.hrtime.bigint() });
+            this.stats.maxQueueDepth = Math.max(this.stats.maxQueueDepth, this.queue.length);
+            this.schedule();
+        });
+    }
+
+    schedule() {
+        // A running writer picks up whatever is queued when its commit finishes
+        if (this.writing) return;
+
+        if (this.queue.length >= this.maxBatch) {
+            this.cancelTimer();
+            this.run();
+        } else if (!this.timer) {
+            const start = () => {
+                this.timer = null;
+                this.run();
+            };
+            this.timer = this.windowMs > 0
+                ? { timeout: setTimeout(start, this.windowMs) }
+                : { immediate: setImmediate(start) };
+        }
+    }
+
+    cancelTimer() {
+        if (!this.timer) return;
+        clearTimeout(this.timer.timeout);
+        clearImmediate(this.timer.immediate);
+        this.timer = null;
+    }
+
+    async run() {
+        this.writing = true;
+        while (this.queue.length > 0) {
+            await this.commit(this.queue.splice(0, this.maxBatch));
+            if (this.afterCommit) {
+                try {
+                    await this.afterCommit();
+                } catch (error) {
+                    console.error('Leaderboard log maintenance failed:', error);
+                }
+            }
+        }
+        this.writing = false;
+
+        for (const resolve of this.idleWaiters.splice(0)) {
+            resolve();
+        }
+    }
+
+    async commit(batch) {
+        const buffer = Buffer.from(batch.map(entry => JSON.stringify(entry.record) + '\n').join(''));
+        const start = process.hrtime.bigint();
+
+        try {
+            for (let offset = 0; offset < buffer.length;) {
+                const { bytesWritten } = await write(this.fd, buffer, offset, buffer.length - offset);
+                offset += bytesWritten;
+            }
+            await fdatasync(this.fd);
+        } catch (error) {
+            // Cut off whatever part of the batch landed so later appends don't follow a torn line
+            await ftruncate(this.fd, this.size).catch(() => {});
+            this.stats.failedCommits++;
+            for (const entry of batch) {
+                entry.reject(error);
+            }
+            return;
+        }
+
+        this.size += buffer.length;
+        this.stats.commits++;
+        this.stats.records += batch.length;
+        const commitMs = elapsedMs(start);
+        this.batchSizes.add(batch.length);
+        this.commitMs.add(commitMs);
+        this.observe('commit', commitMs / 1000);
+
+        this.onCommit(batch.map(entry => entry.record));
+        for (const entry of batch) {
+            this.appendMs.add(elapsedMs(entry.enqueuedAt));
+            entry.resolve();
+        }
+    }
+
+    // Resolves once every queued append has been committed (or failed)
+    flush() {
+        if (!this.writing && this.queue.length === 0) return Promise.resolve();
+        return new Promise(resolve => {
+            this.idleWaiters.push(resolve);
+            if (!this.writing) {
+                this.cancelTimer();
+                this.run();
+            }
+        });
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            queueDepth: this.queue.length,
+            batchSize: { p50: this.batchSizes.percentile(50), max: this.batchSizes.percentile(100) },
+            commitMs: { p50: this.commitMs.percentile(50), p99: this.commitMs.percentile(99) },
+            appendMs: { p50: this.appendMs.percentile(50), p99: this.appendMs.percentile(99) }
+        };
+    }
+}
+
+module.exports = { GroupCommitLog };
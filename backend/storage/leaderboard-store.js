@@ -0,0 +1,301 @@
+const EventEmitter = require('events');
+const fs = require('fs');
+const path = require('path');
+const { IndexedSkipList } = require('./skiplist');
+const { GroupCommitLog } = require('./commit-log');
+
+const WINDOWS = ['alltime', 'weekly', 'daily'];
+
+// Highest score first; more waves breaks ties, then the earlier submission
+function compareScores(a, b) {
+    if (b.score !== a.score) return b.score - a.score;
+    if (b.waves_survived !== a.waves_survived) return b.waves_survived - a.waves_survived;
+    return a.id - b.id;
+}
+
+// Key of the UTC calendar period a time falls in; weeks start on Monday
+function periodOf(window, time) {
+    if (window === 'alltime') return '';
+    const date = new Date(time);
+    if (window === 'weekly') {
+        date.setUTCDate(date.getUTCDate() - (date.getUTCDay() + 6) % 7);
+    }
+    return date.toISOString().slice(0, 10);
+}
+
+// Scores from before difficulties were recorded only appear in the overall views
+function viewDifficulties(record) {
+    return record.difficulty ? ['all', record.difficulty] : ['all'];
+}
+
+// Leaderboard kept in memory in an indexed skiplist and made durable with an
+// append-only log. Accepted scores go through a single group-commit writer
+// (./commit-log.js) and only become visible once their batch is fsynced; once
+// the log holds compactEvery records it is folded into a snapshot (written to
+// a temp file and renamed over the old one) and truncated. The snapshot uses the same {scores, nextId} layout as the old
+// whole-file store, so an existing leaderboard.json is picked up as-is.
+//
+// Besides the overall ranking the store maintains one view per difficulty and
+// time window (all-time, this week, today), each its own skiplist that every
+// add inserts into. A daily or weekly view is swapped for an empty one when
+// its period rolls over. Emits 'insert' (view, record) for each view an added
+// score lands in, which is what read caches invalidate on.
+//
+// observe(operation, seconds) receives the duration of file reads and JSON
+// parsing on open ('read', 'parse'), of each group commit ('commit') and of
+// each compaction ('compact').
+class LeaderboardStore extends EventEmitter {
+    constructor({ dir, compactEvery = 10000, commitWindowMs = 0, maxBatch = 256, observe = () => {} }) {
+        super();
+        this.snapshotPath = path.join(dir, 'leaderboard.json');
+        this.logPath = path.join(dir, 'leaderboard.log');
+        this.compactEvery = compactEvery;
+        this.observe = observe;
+        this.commitOptions = { windowMs: commitWindowMs, maxBatch, observe };
+        this.views = new Map();
+        this.byId = new Map();
+        this.nextId = 1;
+        this.logFd = null;
+        this.log = null;
+        this.logRecords = 0;
+    }
+
+    // Loads the snapshot, replays the log on top of it and truncates a torn tail
+    // left by a crash mid-append. Returns what recovery found.
+    open() {
+        fs.mkdirSync(path.dirname(this.snapshotPath), { recursive: true });
+        fs.rmSync(`${this.snapshotPath}.tmp`, { force: true });
+
+        if (fs.existsSync(this.snapshotPath)) {
+            // A snapshot is only ever replaced by rename, so a parse failure is real corruption
+            const text = this.timed('read', () => fs.readFileSync(this.snapshotPath, 'utf8'));
+            const snapshot = this.timed('parse', () => JSON.parse(text));
+            for (const record of snapshot.scores) {
+                this.byId.set(record.id, record);
+                this.nextId = Math.max(this.nextId, record.id + 1);
+            }
+            this.nextId = Math.max(this.nextId, snapshot.nextId || 1);
+        }
+        const fromSnapshot = this.byId.size;
+
+        let replayed = 0;
+        let truncatedBytes = 0;
+        let logSize = 0;
+        if (fs.existsSync(this.logPath)) {
+            const log = this.timed('read', () => fs.readFileSync(this.logPath));
+            const parseStart = process.hrtime.bigint();
+            let offset = 0;
+            while (offset < log.length) {
+                const end = log.indexOf(0x0a, offset);
+                if (end === -1) break;
+                let record;
+                try {
+                    record = JSON.parse(log.toString('utf8', offset, end));
+                } catch (error) {
+                    break;
+                }
+                if (!Number.isInteger(record.id)) break;
+
+                // Records already folded into the snapshot survive a crash between rename and truncate
+                if (!this.byId.has(record.id)) {
+                    this.byId.set(record.id, record);
+                    this.nextId = Math.max(this.nextId, record.id + 1);
+                    replayed++;
+                }
+                this.logRecords++;
+                offset = end + 1;
+            }
+            this.observe('parse', Number(process.hrtime.bigint() - parseStart) / 1e9);
+            if (offset < log.length) {
+                truncatedBytes = log.length - offset;
+                console.warn(`Leaderboard log has a torn tail, dropping ${truncatedBytes} bytes`);
+                fs.truncateSync(this.logPath, offset);
+            }
+            logSize = offset;
+        }
+
+        this.buildViews();
+        this.logFd = fs.openSync(this.logPath, 'a');
+        // An oversized log left by a previous run is compacted after the next commit
+        this.log = new GroupCommitLog(this.logFd, logSize, {
+            ...this.commitOptions,
+            onCommit: records => this.apply(records),
+            afterCommit: () => (this.logRecords >= this.compactEvery ? this.compact() : null)
+        });
+
+        return { scores: this.byId.size, fromSnapshot, replayed, truncatedBytes };
+    }
+
+    timed(operation, fn) {
+        const start = process.hrtime.bigint();
+        const result = fn();
+        this.observe(operation, Number(process.hrtime.bigint() - start) / 1e9);
+        return result;
+    }
+
+    // Sorts every record once and bulk-loads each view from the sorted order
+    buildViews(now = Date.now()) {
+        // ISO timestamps sort as strings, so period membership is a string comparison
+        const periods = WINDOWS.map(window => periodOf(window, now));
+        const sorted = [...this.byId.values()].sort(compareScores);
+        const members = new Map();
+        for (const record of sorted) {
+            for (const difficulty of viewDifficulties(record)) {
+                for (let i = 0; i < WINDOWS.length; i++) {
+                    if (record.created_at < periods[i]) continue;
+                    const key = `${difficulty}:${WINDOWS[i]}`;
+                    if (!members.has(key)) members.set(key, []);
+                    members.get(key).push(record);
+                }
+            }
+        }
+
+        this.views.clear();
+        this.getView('all', 'alltime', now);
+        for (const [key, records] of members) {
+            const [difficulty, window] = key.split(':');
+            const view = this.getView(difficulty, window, now);
+            view.list.loadSorted(records);
+            // Ids grow with time, so the newest record has the highest id
+            const newest = records.reduce((a, b) => (b.id > a.id ? b : a));
+            view.modifiedAt = Date.parse(newest.created_at) || view.modifiedAt;
+        }
+    }
+
+    // The view for a difficulty ('all' for every difficulty) and window, started
+    // afresh when its daily or weekly period has rolled over
+    getView(difficulty, window, now = Date.now()) {
+        const key = `${difficulty}:${window}`;
+        const period = periodOf(window, now);
+        let view = this.views.get(key);
+        if (!view || view.period !== period) {
+            view = {
+                key,
+                period,
+                list: new IndexedSkipList(compareScores),
+                // An empty view last changed when its period began
+                modifiedAt: period ? Date.parse(period) : 0
+            };
+            this.views.set(key, view);
+        }
+        return view;
+    }
+
+    // Resolves with the stored record once it is durable and visible
+    async add(playerName, score, wavesSurvived, difficulty = null) {
+        const record = {
+            id: this.nextId++,
+            player_name: playerName,
+            score: score,
+            waves_survived: wavesSurvived,
+            created_at: new Date().toISOString()
+        };
+        if (difficulty) {
+            record.difficulty = difficulty;
+        }
+
+        await this.log.append(record);
+        return record;
+    }
+
+    // Makes a durable batch visible; called by the commit log in id order
+    apply(records) {
+        this.logRecords += records.length;
+        for (const record of records) {
+            this.byId.set(record.id, record);
+            const createdAt = Date.parse(record.created_at);
+            for (const viewDifficulty of viewDifficulties(record)) {
+                for (const window of WINDOWS) {
+                    // Views only ever roll forward with the clock; a score submitted
+                    // before the period turned over but committed after it stays out
+                    const view = this.getView(viewDifficulty, window);
+                    if (record.created_at < view.period) continue;
+                    view.list.insert(record);
+                    view.modifiedAt = createdAt;
+                    this.emit('insert', view, record);
+                }
+            }
+        }
+    }
+
+    top(limit) {
+        return this.getView('all', 'alltime').list.slice(0, limit);
+    }
+
+    rank(id) {
+        const record = this.byId.get(id);
+        return record ? this.getView('all', 'alltime').list.rank(record) : 0;
+    }
+
+    // Up to limit scores of a view that sort after the key {score, waves_survived, id}
+    // (from the start when after is null), plus whether more follow
+    page({ difficulty = 'all', window = 'alltime', after = null, limit = 10 }) {
+        const view = this.getView(difficulty, window);
+        const offset = after ? view.list.countBefore(after, true) : 0;
+        const scores = view.list.slice(offset, limit + 1);
+        const hasMore = scores.length > limit;
+        if (hasMore) scores.pop();
+        return { view, scores, hasMore };
+    }
+
+    // Only ever runs as the commit log's afterCommit, so no batch is applied
+    // (and byId cannot change) while the snapshot is being written
+    async compact() {
+        const start = process.hrtime.bigint();
+        const tmpPath = `${this.snapshotPath}.tmp`;
+        const handle = await fs.promises.open(tmpPath, 'w');
+        try {
+            // Written in chunks so a large board never becomes one giant string
+            await handle.write(`{"nextId":${this.nextId},"scores":[`);
+            let chunk = [];
+            let first = true;
+            for (const record of this.byId.values()) {
+                chunk.push(JSON.stringify(record));
+                if (chunk.length === 10000) {
+                    await handle.write((first ? '' : ',') + chunk.join(','));
+                    first = false;
+                    chunk = [];
+                }
+            }
+            await handle.write((first || chunk.length === 0 ? '' : ',') + chunk.join(',') + ']}');
+            await handle.sync();
+        } finally {
+            await handle.close();
+        }
+
+        await fs.promises.rename(tmpPath, this.snapshotPath);
+        await fsyncDirectory(path.dirname(this.snapshotPath));
+        fs.ftruncateSync(this.logFd, 0);
+        fs.fsyncSync(this.logFd);
+        this.log.size = 0;
+        this.logRecords = 0;
+        this.observe('compact', Number(process.hrtime.bigint() - start) / 1e9);
+    }
+
+    getWriteStats() {
+        return { ...this.log.getStats(), logRecords: this.logRecords };
+    }
+
+    // Waits for queued scores to be committed, then closes the log
+    async close() {
+        if (this.logFd === null) return;
+        await this.log.flush();
+        fs.closeSync(this.logFd);
+        this.logFd = null;
+    }
+}
+
+// Makes a rename durable; not every platform lets a directory be opened for fsync
+async function fsyncDirectory(dir) {
+    let handle;
+    try {
+        handle = await fs.promises.open(dir, 'r');
+        await handle.sync();
+    } catch (error) {
+        // Best effort
+    } finally {
+        if (handle) await handle.close();
+    }
+}
+
+module.exports = { LeaderboardStore, compareScores, WINDOWS };
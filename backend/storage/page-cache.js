@@ -0,0 +1,108 @@
+const crypto = require('crypto');
+const { compareScores } = require('./leaderboard-store');
+
+// Cursors are the sort key of the last score on a page, so a page boundary
+// stays put when new scores are inserted above it
+function encodeCursor(record) {
+    return Buffer.from(JSON.stringify([record.score, record.waves_survived, record.id])).toString('base64url');
+}
+
+// Returns the {score, waves_survived, id} key, or null if the cursor is malformed.
+// Every field of a stored score is an integer, so anything else is rejected.
+function decodeCursor(cursor) {
+    try {
+        const key = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+        if (Array.isArray(key) && key.length === 3 && key.every(Number.isSafeInteger)) {
+            return { score: key[0], waves_survived: key[1], id: key[2] };
+        }
+    } catch (error) {
+        // Falls through to null
+    }
+    return null;
+}
+
+// Serialized leaderboard pages, each with its ETag and Last-Modified, kept
+// until an insert actually changes them. A page only changes when a new score
+// lands between its cursor and its last entry (or anywhere after the cursor if
+// the page is the last one), so a flood of low scores leaves the top pages
+// cached. Least recently used pages are evicted past maxEntries.
+class LeaderboardPageCache {
+    constructor(store, { maxEntries = 1000 } = {}) {
+        this.store = store;
+        this.maxEntries = maxEntries;
+        this.entries = new Map();
+        this.byView = new Map();
+        this.stats = { hits: 0, misses: 0, invalidations: 0 };
+        store.on('insert', (view, record) => this.invalidate(view, record));
+    }
+
+    // query: { difficulty, window, cursor, limit } with cursor already validated
+    get(query) {
+        const view = this.store.getView(query.difficulty, query.window);
+        const key = `${view.key}|${view.period}|${query.cursor || ''}|${query.limit}`;
+
+        let entry = this.entries.get(key);
+        if (entry) {
+            this.stats.hits++;
+            // Re-insert to mark as most recently used
+            this.entries.delete(key);
+            this.entries.set(key, entry);
+            return entry;
+        }
+
+        this.stats.misses++;
+        const after = query.cursor ? decodeCursor(query.cursor) : null;
+        const { scores, hasMore } = this.store.page({ ...query, after });
+        const body = JSON.stringify(scores);
+        entry = {
+            key,
+            viewKey: view.key,
+            after,
+            last: scores[scores.length - 1] || null,
+            hasMore,
+            body,
+            etag: `"${crypto.createHash('sha1').update(body).digest('base64url')}"`,
+            lastModified: view.modifiedAt ? new Date(view.modifiedAt).toUTCString() : null,
+            nextCursor: hasMore ? encodeCursor(scores[scores.length - 1]) : null
+        };
+        this.add(entry);
+        return entry;
+    }
+
+    add(entry) {
+        this.entries.set(entry.key, entry);
+        if (!this.byView.has(entry.viewKey)) this.byView.set(entry.viewKey, new Set());
+        this.byView.get(entry.viewKey).add(entry.key);
+
+        if (this.entries.size > this.maxEntries) {
+            this.delete(this.entries.keys().next().value);
+        }
+    }
+
+    delete(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return;
+        this.entries.delete(key);
+        this.byView.get(entry.viewKey).delete(key);
+    }
+
+    invalidate(view, record) {
+        const keys = this.byView.get(view.key);
+        if (!keys) return;
+        for (const key of keys) {
+            const entry = this.entries.get(key);
+            const afterCursor = !entry.after || compareScores(record, entry.after) > 0;
+            const beforeEnd = !entry.hasMore || compareScores(record, entry.last) < 0;
+            if (afterCursor && beforeEnd) {
+                this.stats.invalidations++;
+                this.delete(key);
+            }
+        }
+    }
+
+    getStats() {
+        return { ...this.stats, entries: this.entries.size };
+    }
+}
+
+module.exports = { LeaderboardPageCache, encodeCursor, decodeCursor };
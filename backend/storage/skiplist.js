@@ -0,0 +1,178 @@
+// Indexable skiplist: items are kept sorted by compare, and every forward link
+// records how many items it skips, so insert, rank and offset lookups are all
+// O(log n) expected. compare must be a total order (no two items equal).
+const MAX_LEVEL = 32;
+const P = 0.25;
+
+function createNode(item, level) {
+    return { item, next: new Array(level).fill(null), width: new Array(level).fill(0) };
+}
+
+class IndexedSkipList {
+    constructor(compare) {
+        this.compare = compare;
+        this.head = createNode(null, MAX_LEVEL);
+        this.level = 1;
+        this.length = 0;
+        // Scratch arrays reused by insert and remove
+        this.update = new Array(MAX_LEVEL);
+        this.rankAt = new Array(MAX_LEVEL);
+    }
+
+    randomLevel() {
+        let level = 1;
+        while (level < MAX_LEVEL && Math.random() < P) level++;
+        return level;
+    }
+
+    // Inserts item and returns its 1-based rank
+    insert(item) {
+        const { update, rankAt } = this;
+        let node = this.head;
+        for (let i = this.level - 1; i >= 0; i--) {
+            rankAt[i] = i === this.level - 1 ? 0 : rankAt[i + 1];
+            while (node.next[i] && this.compare(node.next[i].item, item) < 0) {
+                rankAt[i] += node.width[i];
+                node = node.next[i];
+            }
+            update[i] = node;
+        }
+
+        const level = this.randomLevel();
+        if (level > this.level) {
+            for (let i = this.level; i < level; i++) {
+                rankAt[i] = 0;
+                update[i] = this.head;
+                this.head.width[i] = this.length;
+            }
+            this.level = level;
+        }
+
+        // A link's width counts the steps to its target; a null link counts to one past the end
+        const inserted = createNode(item, level);
+        for (let i = 0; i < level; i++) {
+            inserted.next[i] = update[i].next[i];
+            update[i].next[i] = inserted;
+            inserted.width[i] = update[i].width[i] - (rankAt[0] - rankAt[i]);
+            update[i].width[i] = rankAt[0] - rankAt[i] + 1;
+        }
+        for (let i = level; i < this.level; i++) {
+            update[i].width[i]++;
+        }
+
+        this.length++;
+        return rankAt[0] + 1;
+    }
+
+    // Builds an empty list from items already in sorted order in O(n). Much
+    // faster than n inserts, which chase pointers all over the heap.
+    loadSorted(items) {
+        const tails = new Array(MAX_LEVEL).fill(this.head);
+        const tailRank = new Array(MAX_LEVEL).fill(0);
+        let rank = 0;
+        for (const item of items) {
+            rank++;
+            const level = this.randomLevel();
+            const node = createNode(item, level);
+            for (let i = 0; i < level; i++) {
+                tails[i].next[i] = node;
+                tails[i].width[i] = rank - tailRank[i];
+                tails[i] = node;
+                tailRank[i] = rank;
+            }
+            if (level > this.level) this.level = level;
+        }
+        for (let i = 0; i < this.level; i++) {
+            tails[i].width[i] = rank - tailRank[i];
+        }
+        this.length = rank;
+    }
+
+    // Removes item if present; returns whether it was found
+    remove(item) {
+        const { update } = this;
+        let node = this.head;
+        for (let i = this.level - 1; i >= 0; i--) {
+            while (node.next[i] && this.compare(node.next[i].item, item) < 0) {
+                node = node.next[i];
+            }
+            update[i] = node;
+        }
+
+        const target = node.next[0];
+        if (!target || target.item !== item) return false;
+
+        for (let i = 0; i < this.level; i++) {
+            if (update[i].next[i] === target) {
+                update[i].width[i] += target.width[i] - 1;
+                update[i].next[i] = target.next[i];
+            } else {
+                update[i].width[i]--;
+            }
+        }
+        while (this.level > 1 && !this.head.next[this.level - 1]) {
+            this.head.width[this.level - 1] = 0;
+            this.level--;
+        }
+
+        this.length--;
+        return true;
+    }
+
+    // 1-based rank of item, or 0 if it is not in the list
+    rank(item) {
+        let node = this.head;
+        let rank = 0;
+        for (let i = this.level - 1; i >= 0; i--) {
+            while (node.next[i] && this.compare(node.next[i].item, item) <= 0) {
+                rank += node.width[i];
+                node = node.next[i];
+            }
+            if (node.item === item) return rank;
+        }
+        return 0;
+    }
+
+    // Number of items that sort before item (or equal to it, if inclusive),
+    // whether or not item itself is in the list
+    countBefore(item, inclusive = false) {
+        let node = this.head;
+        let count = 0;
+        for (let i = this.level - 1; i >= 0; i--) {
+            while (node.next[i]) {
+                const order = this.compare(node.next[i].item, item);
+                if (inclusive ? order > 0 : order >= 0) break;
+                count += node.width[i];
+                node = node.next[i];
+            }
+        }
+        return count;
+    }
+
+    // Up to limit items starting at the 0-based position offset
+    slice(offset, limit) {
+        const out = [];
+        if (offset < 0 || offset >= this.length || limit <= 0) return out;
+
+        let node = this.head;
+        let position = 0;
+        for (let i = this.level - 1; i >= 0; i--) {
+            while (node.next[i] && position + node.width[i] <= offset + 1) {
+                position += node.width[i];
+                node = node.next[i];
+            }
+        }
+        for (; node && out.length < limit; node = node.next[0]) {
+            out.push(node.item);
+        }
+        return out;
+    }
+
+    *[Symbol.iterator]() {
+        for (let node = this.head.next[0]; node; node = node.next[0]) {
+            yield node.item;
+        }
+    }
+}
+
+module.exports = { IndexedSkipList };
@@ -0,0 +1,71 @@
+// Scripted player for headless runs: builds up to maxTowers towers on the
+// spots that cover the most path, cycling through a fixed build order, and
+// upgrades them to maxLevel once it has spare money. Deterministic for a given engine and seed.
+const BUILD_ORDER = ['basic', 'rapid', 'splash', 'basic', 'sniper', 'freeze', 'electric', 'poison', 'antiair', 'laser'];
+
+function rankBuildSpots(engine, simulation) {
+    const { gamePath, GRID_SIZE, COLS, ROWS } = engine;
+
+    // Sample the path every few pixels and score cells by how many samples fall in basic range
+    const samples = [];
+    for (let i = 0; i < gamePath.length - 1; i++) {
+        const a = gamePath[i];
+        const b = gamePath[i + 1];
+        const length = Math.hypot(b.x - a.x, b.y - a.y);
+        for (let d = 0; d < length; d += 10) {
+            samples.push({ x: a.x + (b.x - a.x) * d / length, y: a.y + (b.y - a.y) * d / length });
+        }
+    }
+
+    const spots = [];
+    for (let col = 0; col < COLS; col++) {
+        for (let row = 0; row < ROWS; row++) {
+            const x = col * GRID_SIZE + GRID_SIZE / 2;
+            const y = row * GRID_SIZE + GRID_SIZE / 2;
+            if (simulation.isOnPath(x, y)) continue;
+            const coverage = samples.filter(p => Math.hypot(p.x - x, p.y - y) <= 110).length;
+            spots.push({ x, y, coverage });
+        }
+    }
+    return spots.sort((a, b) => b.coverage - a.coverage || a.x - b.x || a.y - b.y);
+}
+
+class Bot {
+    constructor(engine, simulation, { maxTowers = 8, maxLevel = 3 } = {}) {
+        this.engine = engine;
+        this.maxTowers = maxTowers;
+        this.maxLevel = maxLevel;
+        this.simulation = simulation;
+        this.spots = rankBuildSpots(engine, simulation);
+        this.buildIndex = 0;
+    }
+
+    // Called once per tick; issues at most one command and reports it through onCommand
+    act(onCommand = () => {}) {
+        const state = this.simulation.state;
+        if (state.tick % 30 !== 0) return;
+
+        const type = BUILD_ORDER[this.buildIndex % BUILD_ORDER.length];
+        const cost = new this.engine.Tower(0, 0, type).cost;
+        if (state.money >= cost && state.towers.length < this.maxTowers) {
+            const spot = this.spots.find(s => this.simulation.canPlaceTower(s.x, s.y));
+            if (spot && this.simulation.placeTower(type, spot.x, spot.y)) {
+                this.buildIndex++;
+                onCommand({ type: 'place', towerType: type, x: spot.x, y: spot.y });
+                return;
+            }
+        }
+
+        if (state.money >= 2 * cost) {
+            const tower = state.towers.find(t => t.level < this.maxLevel);
+            if (tower) {
+                const pathId = tower.level === 2 && !tower.upgradePath ? tower.getUpgradePaths()[0].id : null;
+                if (this.simulation.upgradeTower(tower, pathId)) {
+                    onCommand({ type: 'upgrade', towerId: tower.id, pathId });
+                }
+            }
+        }
+    }
+}
+
+module.exports = { Bot };
@@ -0,0 +1,145 @@
+// Logic-tick time for 2,000 live enemies: the class-based Enemy objects the
+// simulation uses against the structure-of-arrays EnemyStore. Each tick runs
+// the simulation's enemy phase (every enemy's update, then removal of leaked
+// and dead enemies, with splitting), runs linear tower target scans, lands a
+// batch of poisoned/frozen hits and tops the population back up. Both sides
+// see the same hits and spawns and follow the same rules, so they end in the
+// same state; the run checks that before reporting.
+//
+//   node bench/enemy-store.js [enemies] [ticks]
+const {
+    Enemy, EnemyStore, Tower, ENEMY_TYPES, DAMAGE_TYPES, createRng, gamePathModel, GRID_SIZE, COLS, ROWS
+} = require('../backend/engine').loadEngine();
+
+const enemyCount = parseInt(process.argv[2]) || 2000;
+const ticks = parseInt(process.argv[3]) || 300;
+const scansPerTick = 100;
+const hitsPerTick = 300;
+const rounds = 5;
+const wave = 20;
+
+const towerTypes = ['basic', 'rapid', 'sniper', 'splash', 'antiair'];
+const freezeType = DAMAGE_TYPES.indexOf('freeze');
+const poisonType = DAMAGE_TYPES.indexOf('poison');
+
+function createTowers(random) {
+    const towers = [];
+    for (let i = 0; i < scansPerTick; i++) {
+        const x = Math.floor(random() * COLS) * GRID_SIZE + GRID_SIZE / 2;
+        const y = Math.floor(random() * ROWS) * GRID_SIZE + GRID_SIZE / 2;
+        towers.push(new Tower(x, y, towerTypes[i % towerTypes.length]));
+    }
+    return towers;
+}
+
+// The enemy loop of Simulation.step(), without rewards and effects
+function updateEnemies(enemies, rng) {
+    for (let i = enemies.length - 1; i >= 0; i--) {
+        const enemy = enemies[i];
+        if (enemy.update(enemies, rng) === 'reached_end') {
+            swapRemove(enemies, i);
+        } else if (!enemy.alive) {
+            if (enemy.shouldSplit) {
+                for (let j = 0; j < 2; j++) {
+                    const splitEnemy = new Enemy(gamePathModel, 'splitter', wave, 0.5);
+                    gamePathModel.moveTo(splitEnemy, Math.max(0, enemy.distance + (rng() * 30 - 15)));
+                    splitEnemy.splitGeneration = enemy.splitGeneration + 1;
+                    enemies.push(splitEnemy);
+                }
+            }
+            swapRemove(enemies, i);
+        }
+    }
+}
+
+function swapRemove(array, index) {
+    const last = array.pop();
+    if (index < array.length) array[index] = last;
+}
+
+function runObjects() {
+    const random = createRng(42);
+    const rng = createRng(7);
+    const enemies = [];
+    const towers = createTowers(random);
+    let spawned = 0;
+
+    const start = process.hrtime.bigint();
+    for (let tick = 0; tick < ticks; tick++) {
+        while (enemies.length < enemyCount) {
+            const enemy = new Enemy(gamePathModel, ENEMY_TYPES[spawned++ % ENEMY_TYPES.length], wave, 1.0);
+            gamePathModel.moveTo(enemy, random() * gamePathModel.totalLength * 0.4);
+            enemies.push(enemy);
+        }
+        updateEnemies(enemies, rng);
+        for (const tower of towers) {
+            tower.findTarget(enemies);
+        }
+        for (let h = 0; h < hitsPerTick; h++) {
+            const enemy = enemies[Math.floor(random() * enemies.length)];
+            const d = h % DAMAGE_TYPES.length;
+            if (d === poisonType) {
+                enemy.poisoned = true;
+                enemy.poisonDamage = 2;
+                enemy.poisonTimer = 120;
+            } else if (d === freezeType) {
+                enemy.frozenTimer = 30;
+                enemy.originalSpeed = enemy.speed;
+                enemy.speed *= 0.3;
+            }
+            enemy.takeDamage(5, DAMAGE_TYPES[d]);
+        }
+    }
+    const ms = Number(process.hrtime.bigint() - start) / 1e6 / ticks;
+    return { ms, count: enemies.length, health: enemies.reduce((sum, enemy) => sum + enemy.health, 0) };
+}
+
+function runStore() {
+    const random = createRng(42);
+    const rng = createRng(7);
+    const store = new EnemyStore(gamePathModel, enemyCount);
+    const towers = createTowers(random);
+    let spawned = 0;
+
+    const start = process.hrtime.bigint();
+    for (let tick = 0; tick < ticks; tick++) {
+        while (store.count < enemyCount) {
+            store.spawn(ENEMY_TYPES[spawned++ % ENEMY_TYPES.length], wave, 1.0,
+                random() * gamePathModel.totalLength * 0.4);
+        }
+        store.update(rng, wave, 1.0);
+        for (const tower of towers) {
+            store.findFurthestInRange(tower.x, tower.y, tower.range, tower.special === 'antiair');
+        }
+        for (let h = 0; h < hitsPerTick; h++) {
+            const i = Math.floor(random() * store.count);
+            const d = h % DAMAGE_TYPES.length;
+            if (d === poisonType) {
+                store.poison(i, 2, 120);
+            } else if (d === freezeType) {
+                store.freeze(i, 30);
+            }
+            store.takeDamage(i, 5, d);
+        }
+    }
+    const ms = Number(process.hrtime.bigint() - start) / 1e6 / ticks;
+    let health = 0;
+    for (let i = 0; i < store.count; i++) health += store.health[i];
+    return { ms, count: store.count, health };
+}
+
+// Alternate the two so neither benefits from running second; report the best round
+let objects = Infinity;
+let columns = Infinity;
+for (let round = 0; round < rounds; round++) {
+    const a = runObjects();
+    const b = runStore();
+    if (a.count !== b.count || a.health !== b.health) {
+        throw new Error(`Runs diverged: ${a.count} enemies with ${a.health} health vs ${b.count} with ${b.health}`);
+    }
+    objects = Math.min(objects, a.ms);
+    columns = Math.min(columns, b.ms);
+}
+console.log(`${enemyCount} enemies, ${ticks} ticks, ${scansPerTick} tower scans and ${hitsPerTick} hits per tick`);
+console.log(`Enemy objects:  ${objects.toFixed(3)} ms/tick`);
+console.log(`EnemyStore:     ${columns.toFixed(3)} ms/tick (${(objects / columns).toFixed(2)}x)`);
@@ -0,0 +1,114 @@
+// Compares the old whole-file JSON leaderboard against the indexed,
+// log-backed store at several board sizes: a submission (add + rank),
+// a top-10 read and, for the new store, recovery time on startup.
+//
+//   node bench/leaderboard-store.js [sizes...]      e.g. 10000 100000 1000000
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { LeaderboardStore } = require('../backend/storage/leaderboard-store');
+
+const sizes = process.argv.slice(2).map(Number).filter(n => n > 0);
+if (sizes.length === 0) sizes.push(10000, 100000, 1000000);
+
+// Each measurement repeats until it has taken this long (or maxOps runs)
+const minMs = 1000;
+const maxOps = 2000;
+
+// The store as it was before the log-backed engine, kept here for comparison
+function legacyStore(dbPath) {
+    const readDatabase = () => JSON.parse(fs.readFileSync(dbPath, 'utf8'));
+    const writeDatabase = data => fs.writeFileSync(dbPath, JSON.stringify(data, null, 2), 'utf8');
+    return {
+        addScore(playerName, score, wavesSurvived) {
+            const db = readDatabase();
+            const newScore = {
+                id: db.nextId,
+                player_name: playerName,
+                score: score,
+                waves_survived: wavesSurvived,
+                created_at: new Date().toISOString()
+            };
+            db.scores.push(newScore);
+            db.nextId++;
+            writeDatabase(db);
+            return newScore.id;
+        },
+        getTopScores(limit = 10) {
+            const db = readDatabase();
+            return db.scores
+                .sort((a, b) => b.score !== a.score ? b.score - a.score : b.waves_survived - a.waves_survived)
+                .slice(0, limit);
+        },
+        getPlayerRank(scoreId) {
+            const db = readDatabase();
+            const score = db.scores.find(s => s.id === scoreId);
+            if (!score) return { rank: 0 };
+            return { rank: db.scores.filter(s => s.score > score.score || (s.score === score.score && s.id < score.id)).length + 1 };
+        }
+    };
+}
+
+function writeBoard(file, n, pretty) {
+    const scores = [];
+    for (let i = 1; i <= n; i++) {
+        scores.push({
+            id: i,
+            player_name: `player${i % 5000}`,
+            score: Math.floor(Math.random() * 100000),
+            waves_survived: 1 + Math.floor(Math.random() * 40),
+            created_at: new Date(1700000000000 + i * 1000).toISOString()
+        });
+    }
+    fs.writeFileSync(file, JSON.stringify({ scores, nextId: n + 1 }, null, pretty ? 2 : 0));
+}
+
+async function measure(fn) {
+    let ops = 0;
+    const start = process.hrtime.bigint();
+    let elapsed = 0;
+    while (ops < maxOps && (ops === 0 || elapsed < minMs)) {
+        await fn(ops);
+        ops++;
+        elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+    }
+    return elapsed / ops;
+}
+
+const format = ms => ms >= 1 ? `${ms.toFixed(1)} ms` : `${(ms * 1000).toFixed(1)} us`;
+const pad = (value, width) => String(value).padStart(width);
+
+async function main() {
+    console.log(`${pad('scores', 8)} ${pad('store', 8)} ${pad('open', 10)} ${pad('submit', 10)} ${pad('top 10', 10)}`);
+    for (const n of sizes) {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'leaderboard-bench-'));
+        try {
+            const legacyPath = path.join(dir, 'legacy.json');
+            writeBoard(legacyPath, n, true);
+            const legacy = legacyStore(legacyPath);
+            const legacySubmit = await measure(i => legacy.getPlayerRank(legacy.addScore(`bench${i}`, i * 7 % 100000, 10)));
+            const legacyTop = await measure(() => legacy.getTopScores(10));
+            console.log(`${pad(n, 8)} ${pad('legacy', 8)} ${pad('-', 10)} ${pad(format(legacySubmit), 10)} ${pad(format(legacyTop), 10)}`);
+
+            const storeDir = path.join(dir, 'store');
+            fs.mkdirSync(storeDir);
+            writeBoard(path.join(storeDir, 'leaderboard.json'), n, false);
+            const store = new LeaderboardStore({ dir: storeDir });
+            const openStart = process.hrtime.bigint();
+            store.open();
+            const openMs = Number(process.hrtime.bigint() - openStart) / 1e6;
+            // One submission at a time, so every add pays for its own commit
+            const submit = await measure(async i => store.rank((await store.add(`bench${i}`, i * 7 % 100000, 10)).id));
+            const top = await measure(() => store.top(10));
+            await store.close();
+            console.log(`${pad(n, 8)} ${pad('indexed', 8)} ${pad(format(openMs), 10)} ${pad(format(submit), 10)} ${pad(format(top), 10)}`);
+        } finally {
+            fs.rmSync(dir, { recursive: true, force: true });
+        }
+    }
+}
+
+main().catch(error => {
+    console.error(error);
+    process.exit(1);
+});
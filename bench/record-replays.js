@@ -0,0 +1,42 @@
+// Records finished bot games as replays, with the score and wave the server
+// should recompute for each. Used by bench/replay.js and, as a CLI, by the
+// Python load test (loadtest/) to get valid score submissions.
+//
+//   node bench/record-replays.js [count] [difficulty] > replays.json
+const { loadEngine } = require('../backend/engine');
+const { Bot } = require('./bot');
+
+const MAX_TICKS = 60 * 60 * 20;
+
+function recordReplays(engine, count, difficulty = 'normal') {
+    const games = [];
+    for (let seed = 1; games.length < count; seed++) {
+        const state = engine.createSimulationState(difficulty, seed);
+        const simulation = new engine.Simulation(state);
+        // A small, unupgraded defence so every game ends within a few waves
+        const bot = new Bot(engine, simulation, { maxTowers: 2 + seed % 3, maxLevel: 1 });
+
+        simulation.start();
+        while (!state.gameOver && state.tick < MAX_TICKS) {
+            bot.act();
+            simulation.step();
+        }
+        if (state.gameOver) {
+            games.push({ replay: simulation.getReplay(), score: state.score, wave: state.wave });
+        }
+    }
+    return games;
+}
+
+if (require.main === module) {
+    const count = parseInt(process.argv[2]) || 20;
+    const difficulty = process.argv[3] || 'normal';
+    const engine = loadEngine();
+    if (!engine.difficultySettings[difficulty]) {
+        console.error(`Unknown difficulty: ${difficulty}`);
+        process.exit(1);
+    }
+    process.stdout.write(JSON.stringify(recordReplays(engine, count, difficulty)) + '\n');
+}
+
+module.exports = { recordReplays };
@@ -0,0 +1,48 @@
+// Records finished bot games as replays, then measures how many replays per
+// second the verifier gets through on one thread and through the worker pool.
+//
+//   node bench/replay.js [replays] [workers]
+const os = require('os');
+const { loadEngine } = require('../backend/engine');
+const { verifyReplay } = require('../backend/replay/verify');
+const { ReplayVerifierPool } = require('../backend/replay/pool');
+const { recordReplays } = require('./record-replays');
+
+const count = parseInt(process.argv[2]) || 20;
+const workers = parseInt(process.argv[3]) || Math.max(1, os.availableParallelism() - 1);
+
+async function main() {
+    const engine = loadEngine();
+    const replays = recordReplays(engine, count).map(game => game.replay);
+    const totalTicks = replays.reduce((sum, r) => sum + r.ticks, 0);
+    const totalCommands = replays.reduce((sum, r) => sum + r.commands.length, 0);
+    console.log(`${replays.length} replays, ${(totalTicks / replays.length).toFixed(0)} ticks and ` +
+        `${(totalCommands / replays.length).toFixed(1)} commands on average`);
+
+    let start = process.hrtime.bigint();
+    for (const replay of replays) {
+        const result = verifyReplay(engine, replay);
+        if (!result.valid) throw new Error(`Replay seed ${replay.seed} failed: ${result.reason}`);
+    }
+    let seconds = Number(process.hrtime.bigint() - start) / 1e9;
+    console.log(`single thread: ${(replays.length / seconds).toFixed(1)} replays/sec`);
+
+    const pool = new ReplayVerifierPool({ size: workers, maxQueue: replays.length, maxTicks: 60 * 60 * 120, maxMs: 5000 });
+    // Warm every worker up so thread start-up and engine compilation stay out of the timing
+    await Promise.all(replays.slice(0, workers).map(r => pool.verify(r)));
+
+    start = process.hrtime.bigint();
+    const results = await Promise.all(replays.map(r => pool.verify(r)));
+    seconds = Number(process.hrtime.bigint() - start) / 1e9;
+    pool.close();
+
+    const invalid = results.filter(r => !r.valid).length;
+    if (invalid > 0) throw new Error(`${invalid} replays failed verification in the pool`);
+    const perSecond = replays.length / seconds;
+    console.log(`pool of ${workers}: ${perSecond.toFixed(1)} replays/sec (${(perSecond / workers).toFixed(1)} per worker)`);
+}
+
+main().catch(error => {
+    console.error(error);
+    process.exit(1);
+});
@@ -0,0 +1,37 @@
+// Plays whole games headlessly with the scripted bot and reports how much
+// faster than real time the simulation runs, plus the outcome spread.
+//
+//   node bench/simulate.js [games] [difficulty]
+const { loadEngine } = require('../backend/engine');
+const { Bot } = require('./bot');
+
+const games = parseInt(process.argv[2]) || 10;
+const difficulty = process.argv[3] || 'normal';
+const maxTicks = 60 * 60 * 20;  // 20 minutes of game time
+
+const engine = loadEngine();
+const results = [];
+let totalTicks = 0;
+
+const start = process.hrtime.bigint();
+for (let seed = 1; seed <= games; seed++) {
+    const state = engine.createSimulationState(difficulty, seed);
+    const simulation = new engine.Simulation(state);
+    const bot = new Bot(engine, simulation);
+
+    simulation.start();
+    while (!state.gameOver && state.tick < maxTicks) {
+        bot.act();
+        simulation.step();
+    }
+    totalTicks += state.tick;
+    results.push({ seed, wave: state.wave, score: state.score, towers: state.towers.length });
+}
+const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+
+const waves = results.map(r => r.wave).sort((a, b) => a - b);
+const scores = results.map(r => r.score).sort((a, b) => a - b);
+console.log(`${games} ${difficulty} games, ${totalTicks} ticks in ${seconds.toFixed(2)}s`);
+console.log(`ticks/sec: ${(totalTicks / seconds).toFixed(0)} (${(totalTicks / engine.TICK_RATE / seconds).toFixed(0)}x real time)`);
+console.log(`waves reached: min ${waves[0]}, median ${waves[Math.floor(waves.length / 2)]}, max ${waves[waves.length - 1]}`);
+console.log(`score: min ${scores[0]}, median ${scores[Math.floor(scores.length / 2)]}, max ${scores[scores.length - 1]}`);
@@ -0,0 +1,61 @@
+// Fires bursts of concurrent score submissions at the leaderboard store and
+// reports submit latency (queued to durable) with and without group commit.
+// "serial" runs the same burst through a store limited to one record per
+// commit, which is what a per-request fsync amounts to.
+//
+//   node bench/submit-load.js [concurrency] [rounds]
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { monitorEventLoopDelay } = require('perf_hooks');
+const { LeaderboardStore } = require('../backend/storage/leaderboard-store');
+
+const concurrency = parseInt(process.argv[2]) || 1000;
+const rounds = parseInt(process.argv[3]) || 5;
+
+const percentile = (sorted, p) => sorted[Math.min(sorted.length - 1, Math.floor(p / 100 * sorted.length))];
+
+async function run(label, options) {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'submit-load-'));
+    const store = new LeaderboardStore({ dir, ...options });
+    store.open();
+    const loopDelay = monitorEventLoopDelay({ resolution: 1 });
+
+    try {
+        const latencies = [];
+        let wallMs = 0;
+        loopDelay.enable();
+        for (let round = 0; round < rounds; round++) {
+            const start = process.hrtime.bigint();
+            await Promise.all(Array.from({ length: concurrency }, async (_, i) => {
+                const queued = process.hrtime.bigint();
+                await store.add(`load${i}`, Math.floor(Math.random() * 100000), 1 + i % 40, 'normal');
+                latencies.push(Number(process.hrtime.bigint() - queued) / 1e6);
+            }));
+            wallMs += Number(process.hrtime.bigint() - start) / 1e6;
+        }
+        loopDelay.disable();
+
+        latencies.sort((a, b) => a - b);
+        const stats = store.getWriteStats();
+        console.log(`${label.padEnd(8)} ${percentile(latencies, 50).toFixed(1).padStart(8)} ${percentile(latencies, 99).toFixed(1).padStart(8)} ` +
+            `${(latencies.length / wallMs * 1000).toFixed(0).padStart(10)} ${String(stats.commits).padStart(8)} ` +
+            `${String(stats.batchSize.p50).padStart(10)} ${(loopDelay.max / 1e6).toFixed(1).padStart(12)}`);
+    } finally {
+        await store.close();
+        fs.rmSync(dir, { recursive: true, force: true });
+    }
+}
+
+async function main() {
+    console.log(`${concurrency} concurrent submissions x ${rounds} rounds`);
+    console.log(`${'mode'.padEnd(8)} ${'p50 ms'.padStart(8)} ${'p99 ms'.padStart(8)} ${'submits/s'.padStart(10)} ` +
+        `${'commits'.padStart(8)} ${'batch p50'.padStart(10)} ${'max stall ms'.padStart(12)}`);
+    await run('serial', { maxBatch: 1 });
+    await run('group', {});
+}
+
+main().catch(error => {
+    console.error(error);
+    process.exit(1);
+});
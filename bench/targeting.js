@@ -0,0 +1,81 @@
+// Benchmarks tower targeting with and without the enemy spatial grid.
+//
+//   node bench/targeting.js [enemyCount] [ticks]
+//
+// Uses the headless engine so the same Enemy/Tower code the game runs is
+// measured, and reports logic ticks per second at 50, 100 and 200 towers. Each tick moves every enemy, rebuilds the grid and runs every
+// tower's update with targets cleared so each tower performs a full search.
+const { loadEngine } = require('../backend/engine');
+
+const {
+    SpatialGrid, Enemy, Tower, projectilePool, createRng,
+    gamePathModel, GRID_SIZE, CANVAS_WIDTH, CANVAS_HEIGHT
+} = loadEngine();
+
+const enemyTypes = ['basic', 'fast', 'tank', 'swarm', 'flying', 'armored'];
+const towerTypes = ['basic', 'rapid', 'sniper', 'splash', 'antiair', 'freeze', 'electric', 'laser', 'poison'];
+
+const enemyCount = parseInt(process.argv[2]) || 600;
+const ticks = parseInt(process.argv[3]) || 300;
+
+function createEnemies(random) {
+    const enemies = [];
+    for (let i = 0; i < enemyCount; i++) {
+        const enemy = new Enemy(gamePathModel, enemyTypes[i % enemyTypes.length], 30, 1.0);
+        enemy.maxHealth = enemy.health = Infinity;
+        gamePathModel.moveTo(enemy, random() * gamePathModel.totalLength);
+        enemies.push(enemy);
+    }
+    return enemies;
+}
+
+function createTowers(count, random) {
+    const towers = [];
+    for (let i = 0; i < count; i++) {
+        const x = Math.floor(random() * (CANVAS_WIDTH / GRID_SIZE)) * GRID_SIZE + GRID_SIZE / 2;
+        const y = Math.floor(random() * (CANVAS_HEIGHT / GRID_SIZE)) * GRID_SIZE + GRID_SIZE / 2;
+        towers.push(new Tower(x, y, towerTypes[i % towerTypes.length]));
+    }
+    return towers;
+}
+
+function run(towerCount, useGrid) {
+    const random = createRng(1234);  // identical layouts for both variants
+    const enemies = createEnemies(random);
+    const towers = createTowers(towerCount, random);
+    const grid = useGrid ? new SpatialGrid(CANVAS_WIDTH, CANVAS_HEIGHT, GRID_SIZE) : null;
+
+    const start = process.hrtime.bigint();
+    for (let tick = 0; tick < ticks; tick++) {
+        for (const enemy of enemies) {
+            if (enemy.update(null) === 'reached_end') {
+                gamePathModel.moveTo(enemy, 0);
+            }
+        }
+        if (grid) {
+            grid.rebuild(enemies);
+        }
+        for (const tower of towers) {
+            tower.target = null;
+            const projectile = tower.update(enemies, grid);
+            if (projectile) {
+                projectilePool.release(projectile);
+            }
+        }
+    }
+    const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+    return ticks / seconds;
+}
+
+console.log(`Targeting benchmark: ${enemyCount} enemies, ${ticks} ticks per run`);
+console.log('towers  linear ticks/s  grid ticks/s  speedup');
+for (const towerCount of [50, 100, 200]) {
+    run(towerCount, false);  // warm up the JIT for both paths
+    run(towerCount, true);
+    const linear = run(towerCount, false);
+    const grid = run(towerCount, true);
+    console.log(
+        `${String(towerCount).padStart(6)}  ${linear.toFixed(0).padStart(14)}  ` +
+        `${grid.toFixed(0).padStart(12)}  ${(grid / linear).toFixed(2).padStart(6)}x`
+    );
+}
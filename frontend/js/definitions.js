@@ -0,0 +1,282 @@
+// Game content as data. Enemy and tower stats, upgrade paths and wave
+// composition are declared in the tables below and compiled once, when the
+// script loads, into frozen per-type prototypes. Enemy and Tower constructors
+// copy a prototype's fields instead of branching on the type, and the
+// simulation turns the wave table into spawn plans (see getWavePlan).
+
+const DAMAGE_TYPES = ['normal', 'rapid', 'splash', 'pierce', 'freeze', 'poison', 'electric'];
+
+// Stats at wave 1 on normal difficulty; health and shield scale with wave and
+// difficulty. resistances lists only the damage types that differ from 1
+// (0 = immune, 0.5 = resistant, 1 = normal, 1.5 = weak). preview is how the
+// type appears in the next-wave panel.
+const ENEMY_DEFINITIONS = {
+    basic: {
+        health: 50, speed: 1, reward: 12, damage: 1, color: '#ff4444', size: 8,
+        preview: { label: '● Basic', color: '#ff4444' }
+    },
+    fast: {
+        health: 30, speed: 3, reward: 15, damage: 1, color: '#44ff44', size: 6,
+        // Resistant to slow-firing towers
+        resistances: { normal: 0.7, pierce: 0.7 },
+        preview: { label: '● Fast', color: '#44ff44' }
+    },
+    tank: {
+        health: 180, speed: 0.4, reward: 28, damage: 2, color: '#4444ff', size: 12,
+        resistances: { rapid: 0.5, splash: 1.5 },
+        preview: { label: '● Tank', color: '#4444ff' }
+    },
+    healer: {
+        health: 70, speed: 0.9, reward: 32, damage: 1, color: '#00ffff', size: 9,
+        healRange: 100, healAmount: 8,
+        resistances: { poison: 0.3 },
+        preview: { label: '● Healer', color: '#00ffff' }
+    },
+    flying: {
+        health: 45, speed: 2.2, reward: 25, damage: 1, color: '#ffaa00', size: 7,
+        flying: true,
+        // Only antiair and electric are fully effective
+        resistances: { normal: 0, rapid: 0, splash: 0.3 },
+        preview: { label: '● Flying', color: '#ffaa00', hint: 'Immune: ground towers' }
+    },
+    armored: {
+        health: 150, speed: 0.6, reward: 35, damage: 2, color: '#888888', size: 11,
+        resistances: { normal: 0.4, rapid: 0.3, pierce: 1.5, splash: 1.3, electric: 1.2 },
+        preview: { label: '● Armored', color: '#888888', hint: 'Weak: pierce/splash' }
+    },
+    shielded: {
+        health: 80, speed: 1.0, reward: 30, damage: 1, color: '#00ccff', size: 9,
+        shield: 40,
+        resistances: { normal: 0.6, rapid: 0.7, poison: 1.5 },
+        preview: { label: '● Shielded', color: '#aaaaff', hint: 'Weak: poison' }
+    },
+    boss: {
+        health: 600, speed: 0.5, reward: 120, damage: 8, color: '#ff00ff', size: 18,
+        resistances: { normal: 0.8, rapid: 0.6, freeze: 0.5 },
+        preview: { label: '◆ BOSS', color: '#ff00ff' }
+    },
+    swarm: {
+        health: 20, speed: 2.5, reward: 8, damage: 1, color: '#ff69b4', size: 5,
+        resistances: { splash: 2.0, pierce: 1.5 },
+        preview: { label: '● Swarm', color: '#ff69b4', hint: 'Weak: splash' }
+    },
+    teleporter: {
+        health: 60, speed: 0.8, reward: 40, damage: 1, color: '#00ffff', size: 9,
+        teleportCooldown: 180, teleportDistance: 5,  // Every 3 seconds, 5 path points ahead
+        resistances: { normal: 0.5 },
+        preview: { label: '● Teleporter', color: '#00ffff', hint: 'Jumps forward!' }
+    },
+    splitter: {
+        health: 90, speed: 1.2, reward: 35, damage: 2, color: '#9370db', size: 10,
+        canSplit: true,
+        resistances: { pierce: 1.5 },
+        preview: { label: '● Splitter', color: '#9370db', hint: 'Splits on death' }
+    },
+    spawner: {
+        health: 120, speed: 0.7, reward: 50, damage: 1, color: '#ff1493', size: 12,
+        spawnCooldown: 240,  // A swarm enemy every 4 seconds
+        resistances: { rapid: 0.4, splash: 1.3 },
+        preview: { label: '● Spawner', color: '#ff1493', hint: 'Spawns swarms' }
+    },
+    resistant: {
+        health: 200, speed: 0.5, reward: 60, damage: 3, color: '#696969', size: 13,
+        resistances: { normal: 0.3, rapid: 0.3, splash: 0.3, pierce: 0.4, freeze: 0.3, poison: 0.3, electric: 0.4 },
+        preview: { label: '● Resistant', color: '#696969', hint: 'Resists all damage' }
+    }
+};
+
+// Enemies per wave, in spawn order. A type appears from wave `from` on, with
+// floor(base + wave * perWave) of it, or floor(wave / wavesPer); a type with
+// `every` comes once, on waves that are a multiple of it.
+const WAVE_COMPOSITION = [
+    { type: 'basic', base: 5, perWave: 1.5 },
+    { type: 'fast', wavesPer: 2 },
+    { type: 'tank', wavesPer: 4 },
+    { type: 'healer', from: 3, wavesPer: 5 },
+    { type: 'flying', from: 5, wavesPer: 6 },
+    { type: 'armored', from: 4, wavesPer: 5 },
+    { type: 'shielded', from: 6, wavesPer: 7 },
+    { type: 'swarm', from: 2, perWave: 2 },
+    { type: 'teleporter', from: 7, wavesPer: 8 },
+    { type: 'splitter', from: 5, wavesPer: 6 },
+    { type: 'spawner', from: 8, wavesPer: 10 },
+    { type: 'resistant', from: 10, wavesPer: 12 },
+    { type: 'boss', every: 10 }
+];
+
+// Level 1 stats. The type-specific values (freeze, poison, chain) are 0 on
+// towers that don't use them.
+const TOWER_DEFINITIONS = {
+    basic: {
+        damage: 12, range: 110, fireRate: 50, cost: 50,
+        color: '#888888', projectileColor: '#ffff00', damageType: 'normal',
+        upgradePaths: [
+            { id: 'fortress', name: 'Fortress', description: '+50% damage, +30% range, splash damage' },
+            { id: 'rapid', name: 'Gatling', description: '3x fire rate, projectiles pierce' },
+            { id: 'support', name: 'Command', description: 'Boosts nearby towers +25% damage' }
+        ]
+    },
+    rapid: {
+        damage: 6, range: 100, fireRate: 15, cost: 100,
+        color: '#00ff00', projectileColor: '#00ffff', damageType: 'rapid',
+        upgradePaths: [
+            { id: 'minigun', name: 'Minigun', description: '2x fire rate, +50% damage' },
+            { id: 'shredder', name: 'Shredder', description: 'Armor shred (-50% enemy resistance)' },
+            { id: 'suppressor', name: 'Suppressor', description: 'Slows enemies 40%' }
+        ]
+    },
+    sniper: {
+        damage: 40, range: 220, fireRate: 100, cost: 120,
+        color: '#8b4513', projectileColor: '#ff6600', damageType: 'pierce',
+        upgradePaths: [
+            { id: 'marksman', name: 'Marksman', description: '+100% range, pierce 3 enemies' },
+            { id: 'assassin', name: 'Assassin', description: '30% crit (5x damage), reveal flying' },
+            { id: 'explosive', name: 'Explosive', description: 'Shots explode on impact' }
+        ]
+    },
+    poison: {
+        damage: 10, range: 110, fireRate: 60, cost: 140,
+        color: '#9b59b6', projectileColor: '#8e44ad', damageType: 'poison',
+        special: 'poison', poisonDamage: 2, poisonDuration: 120,
+        upgradePaths: [
+            { id: 'plague', name: 'Plague', description: 'Poison spreads to nearby enemies' },
+            { id: 'venom', name: 'Venom', description: '3x poison damage, instant damage' },
+            { id: 'corrosive', name: 'Corrosive', description: 'Melts shields and armor' }
+        ]
+    },
+    splash: {
+        damage: 18, range: 120, fireRate: 80, cost: 150,
+        color: '#ff6600', projectileColor: '#ff0000', damageType: 'splash',
+        splashRadius: 60,
+        upgradePaths: [
+            { id: 'nuke', name: 'Nuclear', description: '2x splash radius, +100% damage' },
+            { id: 'cluster', name: 'Cluster', description: 'Shoots 3 projectiles' },
+            { id: 'napalm', name: 'Napalm', description: 'Burning ground DoT' }
+        ]
+    },
+    antiair: {
+        damage: 20, range: 200, fireRate: 40, cost: 160,
+        color: '#16a085', projectileColor: '#1abc9c', damageType: 'pierce',
+        special: 'antiair',
+        upgradePaths: [
+            { id: 'flak', name: 'Flak Cannon', description: 'Splash damage, grounds flying' },
+            { id: 'homing', name: 'Homing', description: 'Missiles never miss, +range' },
+            { id: 'radar', name: 'Radar', description: 'Reveals all flying, boosts AA towers' }
+        ]
+    },
+    freeze: {
+        damage: 8, range: 130, fireRate: 70, cost: 180,
+        color: '#00d4ff', projectileColor: '#a8e6ff', damageType: 'freeze',
+        special: 'freeze', freezeDuration: 90,
+        upgradePaths: [
+            { id: 'blizzard', name: 'Blizzard', description: 'AoE freeze, permanent slow' },
+            { id: 'permafrost', name: 'Permafrost', description: '2x freeze duration, shatters frozen' },
+            { id: 'icewall', name: 'Ice Wall', description: 'Blocks enemy movement temporarily' }
+        ]
+    },
+    electric: {
+        damage: 15, range: 140, fireRate: 90, cost: 200,
+        color: '#3498db', projectileColor: '#2980b9', damageType: 'electric',
+        special: 'electric', chainCount: 3, chainRange: 80,
+        upgradePaths: [
+            { id: 'tesla', name: 'Tesla', description: '+3 chain targets, +100% chain damage' },
+            { id: 'overload', name: 'Overload', description: 'Stun enemies, EMP shields' },
+            { id: 'conductor', name: 'Conductor', description: 'Chains back to original target' }
+        ]
+    },
+    laser: {
+        damage: 25, range: 180, fireRate: 5, cost: 250,
+        color: '#e74c3c', projectileColor: '#c0392b', damageType: 'pierce',
+        special: 'laser',
+        upgradePaths: [
+            { id: 'beam', name: 'Beam', description: 'Constant beam, hits all in line' },
+            { id: 'focused', name: 'Focused', description: '+200% damage, melts armor' },
+            { id: 'prismatic', name: 'Prismatic', description: 'Splits into 5 beams' }
+        ]
+    }
+};
+
+function deepFreeze(value) {
+    if (value && typeof value === 'object') {
+        for (const key of Object.keys(value)) deepFreeze(value[key]);
+        Object.freeze(value);
+    }
+    return value;
+}
+
+// Every prototype has every field, so all enemies (and all towers) share one shape
+function compileEnemyPrototype(type, def) {
+    const resistances = {};
+    for (const damageType of DAMAGE_TYPES) {
+        resistances[damageType] = def.resistances && damageType in def.resistances ? def.resistances[damageType] : 1;
+    }
+    return deepFreeze({
+        type,
+        health: def.health,
+        shield: def.shield || 0,
+        speed: def.speed,
+        reward: def.reward,
+        damage: def.damage,
+        color: def.color,
+        size: def.size,
+        flying: def.flying || false,
+        healRange: def.healRange || 0,
+        healAmount: def.healAmount || 0,
+        teleportCooldown: def.teleportCooldown || 0,
+        teleportDistance: def.teleportDistance || 0,
+        spawnCooldown: def.spawnCooldown || 0,
+        canSplit: def.canSplit || false,
+        resistances,
+        preview: { label: def.preview.label, color: def.preview.color, hint: def.preview.hint || null }
+    });
+}
+
+function compileTowerPrototype(type, def) {
+    return deepFreeze({
+        type,
+        damage: def.damage,
+        range: def.range,
+        fireRate: def.fireRate,
+        cost: def.cost,
+        color: def.color,
+        projectileColor: def.projectileColor,
+        splashRadius: def.splashRadius || 0,
+        special: def.special || null,
+        damageType: def.damageType,
+        freezeDuration: def.freezeDuration || 0,
+        poisonDamage: def.poisonDamage || 0,
+        poisonDuration: def.poisonDuration || 0,
+        chainCount: def.chainCount || 0,
+        chainRange: def.chainRange || 0,
+        upgradePaths: def.upgradePaths.map(path => ({ ...path }))
+    });
+}
+
+// No inherited keys, so names like 'constructor' or '__proto__' never look up a type
+function compilePrototypes(definitions, compile) {
+    const prototypes = Object.create(null);
+    for (const type of Object.keys(definitions)) {
+        prototypes[type] = compile(type, definitions[type]);
+    }
+    return Object.freeze(prototypes);
+}
+
+const ENEMY_PROTOTYPES = compilePrototypes(ENEMY_DEFINITIONS, compileEnemyPrototype);
+const TOWER_PROTOTYPES = compilePrototypes(TOWER_DEFINITIONS, compileTowerPrototype);
+
+// Type names in a fixed order, for indexing type tables and snapshots
+const ENEMY_TYPES = Object.keys(ENEMY_PROTOTYPES);
+const TOWER_TYPES = Object.keys(TOWER_PROTOTYPES);
+
+// Tower types arrive from input and replays, so they are checked as own keys
+function isTowerType(type) {
+    return typeof type === 'string' && Object.prototype.hasOwnProperty.call(TOWER_PROTOTYPES, type);
+}
+
+// How many enemies of a WAVE_COMPOSITION entry come in the given wave
+function waveEnemyCount(rule, wave) {
+    if (wave < (rule.from || 1)) return 0;
+    if (rule.every) return wave % rule.every === 0 ? 1 : 0;
+    if (rule.wavesPer) return Math.floor(wave / rule.wavesPer);
+    return Math.floor((rule.base || 0) + wave * rule.perWave);
+}
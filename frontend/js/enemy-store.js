@@ -0,0 +1,354 @@
+// Structure-of-arrays enemy store: every enemy is an index into typed-array
+// columns, and everything that only depends on the enemy type (speed, size,
+// resistances, ability settings) lives in shared lookup tables.
+//
+// update() is the enemy phase of Simulation.step(): each enemy's
+// Enemy.update, then removal of the ones that leaked or died (splitters
+// splitting), in the same backwards order and with the same swap-removal, so
+// indices line up with the simulation's enemy array. takeDamage, freeze,
+// poison and the time-slow helpers apply the same rules as Enemy.takeDamage,
+// Projectile.applyEffects and the time-slow ability. Columns are 64-bit and
+// the arithmetic is the same, so a store fed the same hits ends up in exactly
+// the same state as Enemy objects (test/enemy-store.test.js checks this).
+// The simulation still uses Enemy objects; only the benchmarks use this.
+
+// Per-type constants from the compiled enemy prototypes (see definitions.js)
+function buildEnemyTypeTable() {
+    const count = ENEMY_TYPES.length;
+    const table = {
+        index: {},
+        baseHealth: new Float64Array(count),
+        baseShield: new Float64Array(count),
+        speed: new Float64Array(count),
+        size: new Float64Array(count),
+        damage: new Int32Array(count),
+        reward: new Int32Array(count),
+        flying: new Uint8Array(count),
+        healRange: new Float64Array(count),
+        healAmount: new Float64Array(count),
+        teleportCooldown: new Int32Array(count),
+        teleportDistance: new Int32Array(count),
+        spawnCooldown: new Int32Array(count),
+        canSplit: new Uint8Array(count),
+        resistance: new Float64Array(count * DAMAGE_TYPES.length),
+        color: []
+    };
+
+    ENEMY_TYPES.forEach((type, t) => {
+        const proto = ENEMY_PROTOTYPES[type];
+        table.index[type] = t;
+        table.baseHealth[t] = proto.health;
+        table.baseShield[t] = proto.shield;
+        table.speed[t] = proto.speed;
+        table.size[t] = proto.size;
+        table.damage[t] = proto.damage;
+        table.reward[t] = proto.reward;
+        table.flying[t] = proto.flying ? 1 : 0;
+        table.healRange[t] = proto.healRange;
+        table.healAmount[t] = proto.healAmount;
+        table.teleportCooldown[t] = proto.teleportCooldown;
+        table.teleportDistance[t] = proto.teleportDistance;
+        table.spawnCooldown[t] = proto.spawnCooldown;
+        table.canSplit[t] = proto.canSplit ? 1 : 0;
+        DAMAGE_TYPES.forEach((damageType, d) => {
+            // As in Enemy.takeDamage, a resistance of 0 counts as 1
+            table.resistance[t * DAMAGE_TYPES.length + d] = proto.resistances[damageType] || 1;
+        });
+        table.color.push(proto.color);
+    });
+    return table;
+}
+
+class EnemyStore {
+    constructor(pathModel, capacity = 256) {
+        this.path = pathModel;
+        this.types = buildEnemyTypeTable();
+        this.count = 0;
+        this.capacity = 0;
+        this.leaked = 0;  // Damage dealt by enemies that reached the end in the last update
+        this.killed = [];  // Type indices of the enemies removed as dead in the last update
+        this.grow(capacity);
+    }
+
+    grow(capacity) {
+        const resize = (Type, old) => {
+            const column = new Type(capacity);
+            if (old) column.set(old.subarray(0, this.count));
+            return column;
+        };
+        this.type = resize(Int32Array, this.type);
+        this.segment = resize(Int32Array, this.segment);
+        this.x = resize(Float64Array, this.x);
+        this.y = resize(Float64Array, this.y);
+        this.distance = resize(Float64Array, this.distance);
+        this.speed = resize(Float64Array, this.speed);
+        this.originalSpeed = resize(Float64Array, this.originalSpeed);  // Restored when freeze or time slow ends
+        this.timeSlowed = resize(Uint8Array, this.timeSlowed);
+        this.health = resize(Float64Array, this.health);
+        this.maxHealth = resize(Float64Array, this.maxHealth);
+        this.shield = resize(Float64Array, this.shield);
+        this.maxShield = resize(Float64Array, this.maxShield);
+        this.wave = resize(Int32Array, this.wave);
+        this.splitGeneration = resize(Int32Array, this.splitGeneration);
+        this.frozenTimer = resize(Int32Array, this.frozenTimer);
+        this.poisonTimer = resize(Int32Array, this.poisonTimer);
+        this.poisonDamage = resize(Float64Array, this.poisonDamage);
+        this.shieldRegenCooldown = resize(Int32Array, this.shieldRegenCooldown);
+        this.healCooldown = resize(Int32Array, this.healCooldown);
+        this.abilityTimer = resize(Int32Array, this.abilityTimer);  // Teleport or spawn countdown
+        this.capacity = capacity;
+    }
+
+    spawn(typeName, wave = 1, difficultyMultiplier = 1.0, distance = 0) {
+        if (this.count === this.capacity) {
+            this.grow(this.capacity * 2);
+        }
+        const types = this.types;
+        const t = types.index[typeName];
+        const i = this.count++;
+        const scale = (1 + (wave - 1) * 0.15) * difficultyMultiplier;
+
+        this.type[i] = t;
+        this.wave[i] = wave;
+        this.speed[i] = this.originalSpeed[i] = types.speed[t];
+        this.timeSlowed[i] = 0;
+        this.health[i] = this.maxHealth[i] = types.baseHealth[t] * scale;
+        this.shield[i] = this.maxShield[i] = types.baseShield[t] * scale;
+        this.splitGeneration[i] = 0;
+        this.frozenTimer[i] = 0;
+        this.poisonTimer[i] = 0;
+        this.poisonDamage[i] = 0;
+        this.shieldRegenCooldown[i] = 0;
+        this.healCooldown[i] = 0;
+        this.abilityTimer[i] = types.teleportCooldown[t] || types.spawnCooldown[t];
+        this.segment[i] = 0;
+        this.moveTo(i, distance);
+        return i;
+    }
+
+    // Same lookup as PathModel.moveTo, writing into the columns
+    moveTo(i, distance) {
+        const path = this.path;
+        let segment = this.segment[i];
+        if (segment >= path.segmentCount || path.startDistance[segment] > distance) segment = 0;
+        while (segment < path.segmentCount - 1 && path.startDistance[segment + 1] <= distance) {
+            segment++;
+        }
+        const along = distance - path.startDistance[segment];
+        this.distance[i] = distance;
+        this.segment[i] = segment;
+        this.x[i] = path.points[segment].x + path.dirX[segment] * along;
+        this.y[i] = path.points[segment].y + path.dirY[segment] * along;
+    }
+
+    // Copies the last enemy into slot i; indices are not stable across removals
+    remove(i) {
+        const last = --this.count;
+        if (i === last) return;
+        this.type[i] = this.type[last];
+        this.segment[i] = this.segment[last];
+        this.x[i] = this.x[last];
+        this.y[i] = this.y[last];
+        this.distance[i] = this.distance[last];
+        this.speed[i] = this.speed[last];
+        this.originalSpeed[i] = this.originalSpeed[last];
+        this.timeSlowed[i] = this.timeSlowed[last];
+        this.health[i] = this.health[last];
+        this.maxHealth[i] = this.maxHealth[last];
+        this.shield[i] = this.shield[last];
+        this.maxShield[i] = this.maxShield[last];
+        this.wave[i] = this.wave[last];
+        this.splitGeneration[i] = this.splitGeneration[last];
+        this.frozenTimer[i] = this.frozenTimer[last];
+        this.poisonTimer[i] = this.poisonTimer[last];
+        this.poisonDamage[i] = this.poisonDamage[last];
+        this.shieldRegenCooldown[i] = this.shieldRegenCooldown[last];
+        this.healCooldown[i] = this.healCooldown[last];
+        this.abilityTimer[i] = this.abilityTimer[last];
+    }
+
+    // Returns true if the enemy is dead after the hit. A dead enemy is one with
+    // health <= 0; it stays in the store until the next update removes it.
+    takeDamage(i, damage, damageTypeIndex = 0) {
+        const actualDamage = damage * this.types.resistance[this.type[i] * DAMAGE_TYPES.length + damageTypeIndex];
+        if (this.shield[i] > 0) {
+            this.shield[i] -= actualDamage;
+            if (this.shield[i] < 0) {
+                this.health[i] += this.shield[i];
+                this.shield[i] = 0;
+            }
+            this.shieldRegenCooldown[i] = 180;
+        } else {
+            this.health[i] -= actualDamage;
+        }
+        return this.health[i] <= 0;
+    }
+
+    // Projectile.applyEffects for freeze and poison hits
+    freeze(i, duration) {
+        this.frozenTimer[i] = duration;
+        this.originalSpeed[i] = this.speed[i];
+        this.speed[i] *= 0.3;
+    }
+
+    poison(i, damage, duration) {
+        this.poisonDamage[i] = damage;
+        this.poisonTimer[i] = duration;
+    }
+
+    // The time-slow ability: slowAll when it starts, slow for enemies spawned
+    // while it is active, restoreSlowed when it ends
+    slowAll(amount) {
+        for (let i = 0; i < this.count; i++) {
+            if (!this.originalSpeed[i]) this.originalSpeed[i] = this.speed[i];
+            this.speed[i] *= amount;
+            this.timeSlowed[i] = 1;
+        }
+    }
+
+    slow(i, amount) {
+        this.originalSpeed[i] = this.speed[i];
+        this.speed[i] *= amount;
+        this.timeSlowed[i] = 1;
+    }
+
+    restoreSlowed(amount) {
+        for (let i = 0; i < this.count; i++) {
+            if (this.timeSlowed[i]) {
+                this.speed[i] = this.originalSpeed[i] || this.speed[i] / amount;
+                this.timeSlowed[i] = 0;
+            }
+        }
+    }
+
+    // One enemy phase of a logic tick. Enemies that reach the end are removed
+    // and their damage added to this.leaked; dead ones are removed and their
+    // types listed in this.killed, splitters leaving two children. wave and
+    // difficultyMultiplier are the game's, which split children are built with.
+    update(rng = Math.random, wave = 1, difficultyMultiplier = 1.0) {
+        const types = this.types;
+        this.leaked = 0;
+        this.killed.length = 0;
+
+        for (let i = this.count - 1; i >= 0; i--) {
+            const t = this.type[i];
+            if (!this.updateEnemy(i, rng)) {
+                this.leaked += types.damage[t];
+                this.remove(i);
+            } else if (this.health[i] <= 0) {
+                this.killed.push(t);
+                if (types.canSplit[t] && this.splitGeneration[i] < 2) {
+                    for (let j = 0; j < 2; j++) {
+                        const child = this.spawn('splitter', wave, difficultyMultiplier * 0.5,
+                            Math.max(0, this.distance[i] + (rng() * 30 - 15)));
+                        this.splitGeneration[child] = this.splitGeneration[i] + 1;
+                    }
+                }
+                this.remove(i);
+            }
+        }
+    }
+
+    // Enemy.update for enemy i; false if it reached the end of the path
+    updateEnemy(i, rng) {
+        const types = this.types;
+        const t = this.type[i];
+
+        if (this.frozenTimer[i] > 0 && --this.frozenTimer[i] === 0) {
+            this.speed[i] = this.originalSpeed[i];
+        }
+        if (this.poisonTimer[i] > 0) {
+            // Poison ticks are 'normal' damage, as in Enemy.update
+            if (this.poisonTimer[i] % 30 === 0) {
+                this.takeDamage(i, this.poisonDamage[i], 0);
+            }
+            this.poisonTimer[i]--;
+        }
+
+        const distance = this.distance[i] + this.speed[i];
+        if (distance >= this.path.totalLength) {
+            return false;
+        }
+        this.moveTo(i, distance);
+
+        if (types.healAmount[t] > 0) {
+            if (this.healCooldown[i] <= 0) this.heal(i, types.healRange[t], types.healAmount[t]);
+            if (this.healCooldown[i] > 0) this.healCooldown[i]--;
+        }
+
+        if (types.baseShield[t] > 0) {
+            if (this.shieldRegenCooldown[i] > 0) {
+                this.shieldRegenCooldown[i]--;
+            } else if (this.shield[i] < this.maxShield[i]) {
+                this.shield[i] = Math.min(this.shield[i] + 0.5, this.maxShield[i]);
+            }
+        }
+
+        if (this.abilityTimer[i] > 0 && --this.abilityTimer[i] === 0) {
+            if (types.teleportCooldown[t] > 0) {
+                const target = Math.min(this.segment[i] + types.teleportDistance[t], this.path.segmentCount);
+                if (target !== this.segment[i]) {
+                    this.moveTo(i, this.path.startDistance[target]);
+                    this.abilityTimer[i] = types.teleportCooldown[t];
+                }
+            } else {
+                this.spawn('swarm', this.wave[i], 1.0, Math.max(0, this.distance[i] + (rng() * 40 - 20)));
+                this.abilityTimer[i] = types.spawnCooldown[t];
+            }
+        }
+        return true;
+    }
+
+    heal(healer, range, amount) {
+        const hx = this.x[healer];
+        const hy = this.y[healer];
+        for (let i = 0; i < this.count; i++) {
+            if (i === healer || this.health[i] <= 0 || this.health[i] >= this.maxHealth[i]) continue;
+            const dx = this.x[i] - hx;
+            const dy = this.y[i] - hy;
+            if (Math.sqrt(dx * dx + dy * dy) <= range) {
+                this.health[i] = Math.min(this.health[i] + amount, this.maxHealth[i]);
+                this.healCooldown[healer] = 60;
+                return;
+            }
+        }
+    }
+
+    // Index of the living enemy furthest along the path within range of (x, y),
+    // or -1; Tower.findTarget without a grid
+    findFurthestInRange(x, y, range, flyingOnly = false) {
+        const flying = this.types.flying;
+        let best = -1;
+        let bestDistance = -1;
+        for (let i = 0; i < this.count; i++) {
+            if (this.health[i] <= 0 || (flyingOnly && !flying[this.type[i]])) continue;
+            const dx = this.x[i] - x;
+            const dy = this.y[i] - y;
+            if (Math.sqrt(dx * dx + dy * dy) <= range && this.distance[i] > bestDistance) {
+                bestDistance = this.distance[i];
+                best = i;
+            }
+        }
+        return best;
+    }
+
+    // Batched draw straight from the columns: one path and one fill per enemy type
+    draw(ctx) {
+        const types = this.types;
+        for (let t = 0; t < ENEMY_TYPES.length; t++) {
+            ctx.beginPath();
+            let any = false;
+            for (let i = 0; i < this.count; i++) {
+                if (this.type[i] !== t) continue;
+                const size = types.size[t];
+                ctx.moveTo(this.x[i] + size, this.y[i]);
+                ctx.arc(this.x[i], this.y[i], size, 0, Math.PI * 2);
+                any = true;
+            }
+            if (any) {
+                ctx.fillStyle = types.color[t];
+                ctx.fill();
+            }
+        }
+    }
+}
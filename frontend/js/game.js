@@ -1,15 +1,9 @@
 const canvas = document.getElementById('gameCanvas');
 const ctx = canvas.getContext('2d');
 
-// Original canvas dimensions
-const CANVAS_WIDTH = 800;
-const CANVAS_HEIGHT = 600;
+// Canvas dimensions, grid and path come from simulation.js
 let canvasScale = 1;
 
-const GRID_SIZE = 40;
-const COLS = CANVAS_WIDTH / GRID_SIZE;
-const ROWS = CANVAS_HEIGHT / GRID_SIZE;
-
 // Responsive canvas sizing
 function resizeCanvas() {
     const container = canvas.parentElement;
@@ -39,104 +33,33 @@ function getCanvasCoordinates(clientX, clientY) {
 resizeCanvas();
 window.addEventListener('resize', resizeCanvas);
 
-const gamePath = [
-    { x: 0, y: 200 },
-    { x: 200, y: 200 },
-    { x: 200, y: 400 },
-    { x: 400, y: 400 },
-    { x: 400, y: 100 },
-    { x: 600, y: 100 },
-    { x: 600, y: 500 },
-    { x: 800, y: 500 }
-];
-
-const difficultySettings = {
-    easy: {
-        health: 50,  // Reduced from 150
-        money: 300,  // Reduced from 750 - forces strategic choices
-        enemyHealthMultiplier: 0.8,  // Slightly harder
-        rewardMultiplier: 1.2  // Reduced from 1.3
-    },
-    normal: {
-        health: 30,  // Reduced from 100 - much harder!
-        money: 200,  // Reduced from 500 - very limited starting resources
-        enemyHealthMultiplier: 1.0,
-        rewardMultiplier: 0.9  // Less reward
-    },
-    hard: {
-        health: 20,  // Reduced from 75 - brutal!
-        money: 150,  // Reduced from 350 - extreme resource management required
-        enemyHealthMultiplier: 1.3,  // Harder enemies
-        rewardMultiplier: 0.7  // Much less reward
-    }
-};
-
-const gameState = {
-    health: 100,
-    money: 500,
-    wave: 0,
-    score: 0,
-    gameOver: false,
+// Simulation state plus browser-only UI fields
+const gameState = Object.assign(createSimulationState('normal'), {
     paused: false,
-    enemies: [],
-    towers: [],
-    projectiles: [],
     selectedTowerType: null,
     selectedTower: null,
-    waveInProgress: false,
-    enemiesSpawned: 0,
-    enemiesToSpawn: 0,
-    spawnTimer: 0,
     gameSpeed: 1,
     explosions: [],
     damageNumbers: [],
-    difficulty: 'normal',
-    waveCountdown: 0,
-    waveCountdownActive: false,
     gameStarted: false,
-    // Active abilities system
-    abilities: {
-        airstrike: {
-            name: 'Air Strike',
-            cost: 100,
-            cooldown: 0,
-            maxCooldown: 600,  // 10 seconds at 60 FPS
-            damage: 100,
-            radius: 80
-        },
-        timeslow: {
-            name: 'Time Slow',
-            cost: 80,
-            cooldown: 0,
-            maxCooldown: 900,  // 15 seconds
-            duration: 300,  // 5 seconds
-            slowAmount: 0.5,
-            active: false,
-            timer: 0
-        },
-        towerboost: {
-            name: 'Tower Boost',
-            cost: 60,
-            cooldown: 0,
-            maxCooldown: 720,  // 12 seconds
-            duration: 360,  // 6 seconds
-            boostAmount: 2.0,  // 2x damage
-            active: false,
-            timer: 0
-        }
-    },
     particles: []
-};
+});
 
 // Particle class for enhanced visual effects
 class Particle {
     constructor(x, y, type = 'spark') {
+        this.reset(x, y, type);
+    }
+
+    reset(x, y, type = 'spark') {
         this.x = x;
         this.y = y;
         this.type = type;
         this.life = 60;
         this.maxLife = 60;
         this.alpha = 1;
+        this.spin = 0;
+        this.angle = 0;
 
         switch(type) {
             case 'spark':
@@ -176,9 +99,9 @@ class Particle {
                 this.color = ['#ff00ff', '#00ffff', '#ffff00'][Math.floor(Math.random() * 3)];
                 this.gravity = -0.05;
                 this.spin = Math.random() * 0.2;
-                this.angle = 0;
                 break;
         }
+        return this;
     }
 
     update() {
@@ -200,291 +123,209 @@ class Particle {
 
         return this.life > 0;
     }
+}
 
-    draw(ctx) {
-        ctx.save();
-        ctx.globalAlpha = this.alpha;
+// Particle budget: above degradeThreshold * maxParticles, bursts are scaled
+// down in proportion to the remaining headroom; at the cap they are dropped
+const particleSettings = {
+    maxParticles: 1500,
+    degradeThreshold: 0.6
+};
 
-        if (this.type === 'smoke') {
-            ctx.fillStyle = this.color;
-            ctx.beginPath();
-            ctx.arc(this.x, this.y, this.size, 0, Math.PI * 2);
-            ctx.fill();
-        } else if (this.type === 'magic') {
-            ctx.translate(this.x, this.y);
-            ctx.rotate(this.angle);
-            ctx.fillStyle = this.color;
-            ctx.fillRect(-this.size / 2, -this.size / 2, this.size, this.size);
-        } else {
-            ctx.fillStyle = this.color;
-            ctx.beginPath();
-            ctx.arc(this.x, this.y, this.size, 0, Math.PI * 2);
-            ctx.fill();
-        }
-
-        ctx.restore();
-    }
-}
+const particlePool = new ObjectPool(() => new Particle(0, 0), 500);
+const explosionPool = new ObjectPool(() => ({ x: 0, y: 0, radius: 0, life: 0, opacity: 0, color: null }), 50);
+const damageNumberPool = new ObjectPool(() => ({ x: 0, y: 0, damage: 0, life: 0, opacity: 0 }), 100);
 
 // Helper function to create particle bursts
 function createParticleBurst(x, y, count, type) {
-    for (let i = 0; i < count; i++) {
-        gameState.particles.push(new Particle(x, y, type));
-    }
-}
-
-// Make createParticleBurst available globally for projectiles
-window.createParticleBurst = createParticleBurst;
-window.gameState = gameState;
-
-function updateUI() {
-    document.getElementById('health').textContent = gameState.health;
-    document.getElementById('money').textContent = gameState.money;
-    document.getElementById('wave').textContent = gameState.wave;
-    document.getElementById('score').textContent = gameState.score;
-}
-
-function drawGrid() {
-    ctx.strokeStyle = 'rgba(255, 255, 255, 0.1)';
-    ctx.lineWidth = 1;
-
-    for (let x = 0; x <= canvas.width; x += GRID_SIZE) {
-        ctx.beginPath();
-        ctx.moveTo(x, 0);
-        ctx.lineTo(x, canvas.height);
-        ctx.stroke();
-    }
+    const { maxParticles, degradeThreshold } = particleSettings;
+    const live = gameState.particles.length;
+    const softLimit = maxParticles * degradeThreshold;
 
-    for (let y = 0; y <= canvas.height; y += GRID_SIZE) {
-        ctx.beginPath();
-        ctx.moveTo(0, y);
-        ctx.lineTo(canvas.width, y);
-        ctx.stroke();
+    if (live >= maxParticles) return;
+    if (live > softLimit) {
+        const headroom = (maxParticles - live) / (maxParticles - softLimit);
+        count = Math.ceil(count * headroom);
     }
-}
+    count = Math.min(count, maxParticles - live);
 
-function drawPath() {
-    ctx.strokeStyle = '#8B4513';
-    ctx.lineWidth = 30;
-    ctx.lineCap = 'round';
-    ctx.lineJoin = 'round';
-
-    ctx.beginPath();
-    ctx.moveTo(gamePath[0].x, gamePath[0].y);
-
-    for (let i = 1; i < gamePath.length; i++) {
-        ctx.lineTo(gamePath[i].x, gamePath[i].y);
-    }
-
-    ctx.stroke();
-
-    ctx.fillStyle = '#ff0000';
-    const endPoint = gamePath[gamePath.length - 1];
-    ctx.beginPath();
-    ctx.arc(endPoint.x, endPoint.y, 20, 0, Math.PI * 2);
-    ctx.fill();
+    for (let i = 0; i < count; i++) {
+        gameState.particles.push(particlePool.acquire().reset(x, y, type));
+    }
+}
+
+function spawnExplosion(x, y, radius, life, color) {
+    const explosion = explosionPool.acquire();
+    explosion.x = x;
+    explosion.y = y;
+    explosion.radius = radius;
+    explosion.life = life;
+    explosion.opacity = 1;
+    explosion.color = color;
+    gameState.explosions.push(explosion);
+}
+
+function spawnDamageNumber(x, y, damage) {
+    const dmgNum = damageNumberPool.acquire();
+    dmgNum.x = x;
+    dmgNum.y = y;
+    dmgNum.damage = damage;
+    dmgNum.life = 30;
+    dmgNum.opacity = 1;
+    gameState.damageNumbers.push(dmgNum);
+}
+
+// Pool occupancy and allocation counters, for watching GC pressure from the console
+function getEntityPoolStats() {
+    return {
+        particles: particlePool.getStats(),
+        projectiles: projectilePool.getStats(),
+        explosions: explosionPool.getStats(),
+        damageNumbers: damageNumberPool.getStats(),
+        liveEnemies: gameState.enemies.length
+    };
 }
 
-function isOnPath(x, y, buffer = 35) {
-    for (let i = 0; i < gamePath.length - 1; i++) {
-        const p1 = gamePath[i];
-        const p2 = gamePath[i + 1];
+// ?worker runs the simulation in a Web Worker and keeps this thread for rendering and input
+const pageParams = new URLSearchParams(location.search);
+const useSimulationWorker = pageParams.has('worker') && typeof Worker !== 'undefined';
 
-        const dx = p2.x - p1.x;
-        const dy = p2.y - p1.y;
-        const length = Math.sqrt(dx * dx + dy * dy);
-        const dot = ((x - p1.x) * dx + (y - p1.y) * dy) / (length * length);
-
-        if (dot >= 0 && dot <= 1) {
-            const closestX = p1.x + dot * dx;
-            const closestY = p1.y + dot * dy;
-            const distance = Math.sqrt((x - closestX) ** 2 + (y - closestY) ** 2);
-
-            if (distance < buffer) {
-                return true;
+const simulationOptions = {
+    effects: {
+        particleBurst: createParticleBurst,
+        explosion: spawnExplosion,
+        damageNumber: spawnDamageNumber,
+        waveStarted() {
+            updateWavePreview();
+            ui.waveCountdown.style.display = 'none';
+            ui.wavePreview.style.display = 'none';
+        },
+        waveCountdownStarted() {
+            ui.waveCountdown.style.display = 'block';
+            updateWavePreview();
+            ui.wavePreview.style.display = 'block';
+        },
+        gameOver() {
+            document.getElementById('finalScore').textContent = gameState.score;
+            document.getElementById('finalWave').textContent = gameState.wave;
+            document.getElementById('gameOverModal').style.display = 'flex';
+        },
+        // Worker mode only: a snapshot reflecting the commands sent since the last one arrived
+        commandsApplied() {
+            if (gameState.towers.includes(gameState.selectedTower)) {
+                showTowerInfo(gameState.selectedTower);
             }
         }
     }
+};
+const simulation = useSimulationWorker
+    ? new SimulationWorkerClient(gameState, simulationOptions)
+    : new Simulation(gameState, simulationOptions);
 
-    return false;
-}
-
-function isTooCloseToTower(x, y, minDistance = 40) {
-    for (const tower of gameState.towers) {
-        const dx = tower.x - x;
-        const dy = tower.y - y;
-        const distance = Math.sqrt(dx * dx + dy * dy);
+window.gameState = gameState;
+window.getEntityPoolStats = getEntityPoolStats;
+
+// Elements written during play, looked up once
+const ui = {
+    health: document.getElementById('health'),
+    money: document.getElementById('money'),
+    wave: document.getElementById('wave'),
+    score: document.getElementById('score'),
+    countdownTimer: document.getElementById('countdownTimer'),
+    waveCountdown: document.getElementById('waveCountdown'),
+    wavePreview: document.getElementById('wavePreview'),
+    wavePreviewContent: document.getElementById('wavePreviewContent'),
+    towerInfo: document.getElementById('towerInfo'),
+    towerInfoTitle: document.getElementById('towerInfoTitle'),
+    towerInfoStats: document.getElementById('towerInfoStats'),
+    upgradeTowerBtn: document.getElementById('upgradeTowerBtn'),
+    sellTowerBtn: document.getElementById('sellTowerBtn')
+};
 
-        if (distance < minDistance) {
-            return true;
+// Flushed once per animation frame from gameLoop; see hud.js
+const hud = new Hud()
+    .bind(ui.health, 'textContent', () => gameState.health)
+    .bind(ui.money, 'textContent', () => gameState.money)
+    .bind(ui.wave, 'textContent', () => gameState.wave)
+    .bind(ui.score, 'textContent', () => gameState.score)
+    .bind(ui.countdownTimer, 'textContent', () => Math.ceil(gameState.waveCountdown / TICK_RATE))
+    // Live kill and damage counts for the selected tower, without rebuilding the panel every frame
+    .throttle(250, () => {
+        if (gameState.selectedTower && ui.towerInfo.style.display === 'block') {
+            showTowerInfo(gameState.selectedTower);
         }
-    }
+    });
 
-    return false;
-}
+const scheduler = new FixedStepScheduler();
+let lastFrameTime = null;
 
-function spawnWave() {
-    if (gameState.waveInProgress) return;
-
-    gameState.wave++;
-    gameState.waveInProgress = true;
-    gameState.enemiesSpawned = 0;
-
-    const wave = gameState.wave;
-    let basicCount = Math.floor(5 + wave * 1.5);
-    let fastCount = Math.floor(wave / 2);
-    let tankCount = Math.floor(wave / 4);
-    let healerCount = wave >= 3 ? Math.floor(wave / 5) : 0;
-    let flyingCount = wave >= 5 ? Math.floor(wave / 6) : 0;
-    let armoredCount = wave >= 4 ? Math.floor(wave / 5) : 0;
-    let shieldedCount = wave >= 6 ? Math.floor(wave / 7) : 0;
-    let bossCount = wave % 10 === 0 ? 1 : 0;
-
-    // New enemy types
-    let swarmCount = wave >= 2 ? Math.floor(wave * 2) : 0;  // Lots of swarm enemies
-    let teleporterCount = wave >= 7 ? Math.floor(wave / 8) : 0;
-    let splitterCount = wave >= 5 ? Math.floor(wave / 6) : 0;
-    let spawnerCount = wave >= 8 ? Math.floor(wave / 10) : 0;
-    let resistantCount = wave >= 10 ? Math.floor(wave / 12) : 0;
-
-    gameState.enemiesToSpawn = basicCount + fastCount + tankCount + healerCount + flyingCount +
-                                armoredCount + shieldedCount + bossCount + swarmCount +
-                                teleporterCount + splitterCount + spawnerCount + resistantCount;
-    gameState.spawnQueue = [];
-
-    for (let i = 0; i < basicCount; i++) {
-        gameState.spawnQueue.push('basic');
-    }
-    for (let i = 0; i < fastCount; i++) {
-        gameState.spawnQueue.push('fast');
-    }
-    for (let i = 0; i < tankCount; i++) {
-        gameState.spawnQueue.push('tank');
-    }
-    for (let i = 0; i < healerCount; i++) {
-        gameState.spawnQueue.push('healer');
-    }
-    for (let i = 0; i < flyingCount; i++) {
-        gameState.spawnQueue.push('flying');
-    }
-    for (let i = 0; i < armoredCount; i++) {
-        gameState.spawnQueue.push('armored');
-    }
-    for (let i = 0; i < shieldedCount; i++) {
-        gameState.spawnQueue.push('shielded');
-    }
-    for (let i = 0; i < swarmCount; i++) {
-        gameState.spawnQueue.push('swarm');
-    }
-    for (let i = 0; i < teleporterCount; i++) {
-        gameState.spawnQueue.push('teleporter');
-    }
-    for (let i = 0; i < splitterCount; i++) {
-        gameState.spawnQueue.push('splitter');
-    }
-    for (let i = 0; i < spawnerCount; i++) {
-        gameState.spawnQueue.push('spawner');
-    }
-    for (let i = 0; i < resistantCount; i++) {
-        gameState.spawnQueue.push('resistant');
-    }
-    for (let i = 0; i < bossCount; i++) {
-        gameState.spawnQueue.push('boss');
+function updateGame(elapsedMs) {
+    if (!gameState.gameStarted || gameState.gameOver || gameState.paused) {
+        scheduler.reset();
+        return;
     }
 
-    gameState.spawnTimer = 0;
-
-    updateUI();
-    updateWavePreview();
-    document.getElementById('waveCountdown').style.display = 'none';
-    document.getElementById('wavePreview').style.display = 'none';
+    // Stop at the tick the game ends so the final score matches a server-side replay
+    scheduler.advance(elapsedMs, gameState.gameSpeed, updateGameLogic, () => !gameState.gameOver);
 }
 
-function startWaveCountdown() {
-    gameState.waveCountdown = 600;
-    gameState.waveCountdownActive = true;
-    document.getElementById('waveCountdown').style.display = 'block';
-    updateWavePreview();
-    document.getElementById('wavePreview').style.display = 'block';
-}
+// Enemies and projectiles are drawn between their positions at the last two
+// ticks, so motion stays smooth when frames and ticks don't line up. Moves
+// longer than this (teleports, splits) snap instead.
+const INTERPOLATION_SNAP_DISTANCE = 40;
+const interpolatedEntities = [];
 
-function updateCountdownDisplay() {
-    const seconds = Math.ceil(gameState.waveCountdown / 60);
-    document.getElementById('countdownTimer').textContent = seconds;
+function capturePreviousPositions() {
+    const nextTick = gameState.tick + 1;
+    for (const enemy of gameState.enemies) {
+        enemy.prevX = enemy.x;
+        enemy.prevY = enemy.y;
+        enemy.prevTick = nextTick;
+    }
+    for (const projectile of gameState.projectiles) {
+        projectile.prevX = projectile.x;
+        projectile.prevY = projectile.y;
+        projectile.prevTick = nextTick;
+    }
 }
 
-function spawnEnemy() {
-    if (gameState.spawnQueue.length === 0) return;
-
-    const enemyType = gameState.spawnQueue.shift();
-    const difficultyMod = difficultySettings[gameState.difficulty].enemyHealthMultiplier;
-    const enemy = new Enemy(gamePath, enemyType, gameState.wave, difficultyMod);
+function interpolateEntities(entities, alpha) {
+    const snapSq = INTERPOLATION_SNAP_DISTANCE * INTERPOLATION_SNAP_DISTANCE;
+    for (const entity of entities) {
+        // Spawned during the last tick (or a pooled object from an earlier life)
+        if (entity.prevTick !== gameState.tick) continue;
+        const dx = entity.x - entity.prevX;
+        const dy = entity.y - entity.prevY;
+        if (dx * dx + dy * dy > snapSq) continue;
 
-    // Apply time slow if active
-    const timeslow = gameState.abilities.timeslow;
-    if (timeslow.active) {
-        enemy.originalSpeed = enemy.speed;
-        enemy.speed *= timeslow.slowAmount;
-        enemy.timeSlowed = true;
+        entity.simX = entity.x;
+        entity.simY = entity.y;
+        entity.x = entity.prevX + dx * alpha;
+        entity.y = entity.prevY + dy * alpha;
+        interpolatedEntities.push(entity);
     }
-
-    gameState.enemies.push(enemy);
-    gameState.enemiesSpawned++;
 }
 
-function updateGame() {
-    if (!gameState.gameStarted || gameState.gameOver || gameState.paused) return;
+// Moves entities to their drawn positions for the duration of render()
+function applyInterpolation(alpha) {
+    interpolateEntities(gameState.enemies, alpha);
+    interpolateEntities(gameState.projectiles, alpha);
+}
 
-    for (let speed = 0; speed < gameState.gameSpeed; speed++) {
-        updateGameLogic();
+function restoreInterpolation() {
+    for (const entity of interpolatedEntities) {
+        entity.x = entity.simX;
+        entity.y = entity.simY;
     }
+    interpolatedEntities.length = 0;
 }
 
+// One tick: visual effects age here, the simulation steps here unless a worker runs it
 function updateGameLogic() {
     // Update particles
     for (let i = gameState.particles.length - 1; i >= 0; i--) {
         if (!gameState.particles[i].update()) {
-            gameState.particles.splice(i, 1);
-        }
-    }
-
-    // Update ability cooldowns
-    for (const abilityKey in gameState.abilities) {
-        const ability = gameState.abilities[abilityKey];
-        if (ability.cooldown > 0) {
-            ability.cooldown--;
-        }
-    }
-
-    // Update Time Slow ability
-    const timeslow = gameState.abilities.timeslow;
-    if (timeslow.active) {
-        timeslow.timer--;
-        if (timeslow.timer <= 0) {
-            timeslow.active = false;
-            // Restore enemy speeds
-            for (const enemy of gameState.enemies) {
-                if (enemy.timeSlowed) {
-                    enemy.speed = enemy.originalSpeed || enemy.speed / timeslow.slowAmount;
-                    enemy.timeSlowed = false;
-                }
-            }
-        }
-    }
-
-    // Update Tower Boost ability
-    const towerboost = gameState.abilities.towerboost;
-    if (towerboost.active) {
-        towerboost.timer--;
-        if (towerboost.timer <= 0) {
-            towerboost.active = false;
-            // Restore tower damage
-            for (const tower of gameState.towers) {
-                if (tower.boosted) {
-                    tower.damage = tower.originalDamage || tower.damage / towerboost.boostAmount;
-                    tower.boosted = false;
-                }
-            }
+            particlePool.release(swapRemove(gameState.particles, i));
         }
     }
 
@@ -494,7 +335,7 @@ function updateGameLogic() {
         explosion.radius += 2;
         explosion.opacity -= 0.05;
         if (explosion.life <= 0) {
-            gameState.explosions.splice(i, 1);
+            explosionPool.release(swapRemove(gameState.explosions, i));
         }
     }
 
@@ -504,221 +345,66 @@ function updateGameLogic() {
         dmgNum.y -= 1;  // Float upward
         dmgNum.opacity = dmgNum.life / 30;  // Fade out
         if (dmgNum.life <= 0) {
-            gameState.damageNumbers.splice(i, 1);
-        }
-    }
-
-    if (gameState.waveInProgress && gameState.spawnQueue.length > 0) {
-        gameState.spawnTimer++;
-        if (gameState.spawnTimer >= 40) {
-            spawnEnemy();
-            gameState.spawnTimer = 0;
-        }
-    }
-
-    for (let i = gameState.enemies.length - 1; i >= 0; i--) {
-        const enemy = gameState.enemies[i];
-        const status = enemy.update(gameState.enemies);
-
-        if (status === 'reached_end') {
-            gameState.health -= enemy.damage;
-            gameState.enemies.splice(i, 1);
-
-            if (gameState.health <= 0) {
-                gameOver();
-            }
-        } else if (!enemy.alive) {
-            const rewardMod = difficultySettings[gameState.difficulty].rewardMultiplier;
-            gameState.money += Math.floor(enemy.reward * rewardMod);
-            gameState.score += Math.floor(enemy.reward * gameState.wave * rewardMod);
-
-            // Create death particles based on enemy type
-            if (enemy.flying) {
-                createParticleBurst(enemy.x, enemy.y, 10, 'energy');
-            } else if (enemy.type === 'boss') {
-                createParticleBurst(enemy.x, enemy.y, 30, 'spark');
-                createParticleBurst(enemy.x, enemy.y, 15, 'smoke');
-            } else if (enemy.type === 'splitter') {
-                createParticleBurst(enemy.x, enemy.y, 15, 'magic');
-            } else if (enemy.type === 'spawner') {
-                createParticleBurst(enemy.x, enemy.y, 12, 'magic');
-            } else {
-                createParticleBurst(enemy.x, enemy.y, 8, 'blood');
-            }
-
-            // Handle splitter enemy splitting
-            if (enemy.shouldSplit) {
-                const difficultyMod = difficultySettings[gameState.difficulty].enemyHealthMultiplier;
-                for (let j = 0; j < 2; j++) {
-                    const splitEnemy = new Enemy(gamePath, 'splitter', gameState.wave, difficultyMod * 0.5);
-                    splitEnemy.pathIndex = enemy.pathIndex;
-                    splitEnemy.x = enemy.x + (Math.random() * 30 - 15);
-                    splitEnemy.y = enemy.y + (Math.random() * 30 - 15);
-                    splitEnemy.splitGeneration = enemy.splitGeneration + 1;
-                    gameState.enemies.push(splitEnemy);
-                }
-            }
-
-            gameState.enemies.splice(i, 1);
+            damageNumberPool.release(swapRemove(gameState.damageNumbers, i));
         }
     }
+    frameProfiler.lap('tick effects');
 
-    for (const tower of gameState.towers) {
-        const projectile = tower.update(gameState.enemies);
-        if (projectile) {
-            gameState.projectiles.push(projectile);
-        }
-    }
-
-    for (let i = gameState.projectiles.length - 1; i >= 0; i--) {
-        const projectile = gameState.projectiles[i];
-        const result = projectile.update(gameState.enemies);
-
-        if (result.hit) {
-            if (projectile.target) {
-                const actualDamage = projectile.damage * (projectile.target.resistances[projectile.damageType] || 1);
-                const killed = projectile.target.takeDamage(projectile.damage, projectile.damageType);
-
-                // Track tower stats
-                if (projectile.tower) {
-                    projectile.tower.totalDamageDealt += actualDamage;
-                    if (killed) {
-                        projectile.tower.kills++;
-                    }
-                }
-
-                // Add damage number
-                gameState.damageNumbers.push({
-                    x: result.x,
-                    y: result.y,
-                    damage: Math.floor(actualDamage),
-                    life: 30,
-                    opacity: 1
-                });
-
-                gameState.explosions.push({
-                    x: result.x,
-                    y: result.y,
-                    radius: projectile.splashRadius > 0 ? 10 : 5,
-                    life: 20,
-                    opacity: 1,
-                    color: projectile.color
-                });
-
-                // Create hit particles based on projectile type
-                if (projectile.splashRadius > 0) {
-                    createParticleBurst(result.x, result.y, 12, 'spark');
-                    createParticleBurst(result.x, result.y, 6, 'smoke');
-                } else if (projectile.special === 'poison') {
-                    createParticleBurst(result.x, result.y, 8, 'magic');
-                } else if (projectile.special === 'electric') {
-                    createParticleBurst(result.x, result.y, 10, 'energy');
-                } else if (projectile.special === 'freeze') {
-                    createParticleBurst(result.x, result.y, 8, 'energy');
-                } else {
-                    createParticleBurst(result.x, result.y, 5, 'spark');
-                }
-
-                if (projectile.splashRadius > 0) {
-                    for (const enemy of gameState.enemies) {
-                        if (enemy !== projectile.target && enemy.alive) {
-                            const dx = enemy.x - result.x;
-                            const dy = enemy.y - result.y;
-                            const distance = Math.sqrt(dx * dx + dy * dy);
-
-                            if (distance <= projectile.splashRadius) {
-                                const splashDamage = projectile.damage * 0.5;
-                                const splashActualDamage = splashDamage * (enemy.resistances[projectile.damageType] || 1);
-                                const splashKilled = enemy.takeDamage(splashDamage, projectile.damageType);
-
-                                // Track splash damage stats
-                                if (projectile.tower) {
-                                    projectile.tower.totalDamageDealt += splashActualDamage;
-                                    if (splashKilled) {
-                                        projectile.tower.kills++;
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            gameState.projectiles.splice(i, 1);
-        } else if (!projectile.alive) {
-            gameState.projectiles.splice(i, 1);
-        }
+    if (!useSimulationWorker) {
+        capturePreviousPositions();
+        frameProfiler.lap('tick capture');
+        simulation.step();
     }
+}
 
-    if (gameState.waveInProgress &&
-        gameState.spawnQueue.length === 0 &&
-        gameState.enemies.length === 0) {
-        gameState.waveInProgress = false;
-        gameState.money += 100 + gameState.wave * 20;
-        gameState.score += 100 * gameState.wave;
-        startWaveCountdown();
-    }
+const layeredRenderer = new LayeredRenderer(canvas);
+const frameHud = new FrameHud(ctx);
+if (pageParams.has('hud')) {
+    frameHud.toggle();
+}
 
-    if (gameState.waveCountdownActive && !gameState.paused) {
-        gameState.waveCountdown--;
-        updateCountdownDisplay();
+// Phase timings, entity counts and GC indicators ([F] or ?profile); [T] records a trace
+const frameProfiler = new FrameProfiler(ctx, () => ({
+    entities: {
+        enemies: gameState.enemies.length,
+        towers: gameState.towers.length,
+        projectiles: gameState.projectiles.length,
+        particles: gameState.particles.length,
+        explosions: gameState.explosions.length,
+        damageNumbers: gameState.damageNumbers.length
+    },
+    poolAllocations: particlePool.allocated + projectilePool.allocated +
+        explosionPool.allocated + damageNumberPool.allocated
+}));
+frameProfiler.onChange = profiler => {
+    const active = profiler.enabled ? profiler : null;
+    simulation.setProfiler(active);
+    layeredRenderer.profiler = active;
+};
+if (pageParams.has('profile')) {
+    frameProfiler.toggle();
+}
 
-        if (gameState.waveCountdown <= 0) {
-            gameState.waveCountdownActive = false;
-            spawnWave();
-        }
+function toggleTraceRecording() {
+    if (!frameProfiler.recording) {
+        frameProfiler.startTrace();
+        return;
     }
-
-    updateUI();
+    const blob = new Blob([JSON.stringify(frameProfiler.stopTrace())], { type: 'application/json' });
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(blob);
+    link.download = `tower-defense-trace-${new Date().toISOString().replace(/[:.]/g, '-')}.json`;
+    link.click();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
 }
 
 function render() {
-    ctx.clearRect(0, 0, canvas.width, canvas.height);
-
-    drawGrid();
-    drawPath();
-
-    for (const explosion of gameState.explosions) {
-        ctx.fillStyle = explosion.color.replace(')', `, ${explosion.opacity})`).replace('rgb', 'rgba');
-        ctx.beginPath();
-        ctx.arc(explosion.x, explosion.y, explosion.radius, 0, Math.PI * 2);
-        ctx.fill();
-    }
-
-    // Draw particles
-    for (const particle of gameState.particles) {
-        particle.draw(ctx);
-    }
-
-    for (const dmgNum of gameState.damageNumbers) {
-        ctx.save();
-        ctx.globalAlpha = dmgNum.opacity;
-        ctx.fillStyle = '#ffff00';
-        ctx.strokeStyle = '#000000';
-        ctx.font = 'bold 14px Arial';
-        ctx.textAlign = 'center';
-        ctx.lineWidth = 3;
-        ctx.strokeText(dmgNum.damage.toString(), dmgNum.x, dmgNum.y);
-        ctx.fillText(dmgNum.damage.toString(), dmgNum.x, dmgNum.y);
-        ctx.restore();
-    }
-
-    for (const enemy of gameState.enemies) {
-        enemy.draw(ctx);
-    }
-
-    for (const projectile of gameState.projectiles) {
-        projectile.draw(ctx);
-    }
-
-    for (const tower of gameState.towers) {
-        const isSelected = tower === gameState.selectedTower;
-        tower.draw(ctx, isSelected);
-    }
+    frameHud.begin();
+    layeredRenderer.render(gameState);
 
     if (gameState.selectedTowerType && gameState.previewPosition) {
         const pos = gameState.previewPosition;
-        const canPlace = !isOnPath(pos.x, pos.y) && !isTooCloseToTower(pos.x, pos.y);
-        const tempTower = new Tower(0, 0, gameState.selectedTowerType);
+        const canPlace = simulation.canPlaceTower(pos.x, pos.y);
 
         ctx.fillStyle = canPlace ? 'rgba(0, 255, 0, 0.3)' : 'rgba(255, 0, 0, 0.3)';
         ctx.fillRect(pos.x - 15, pos.y - 15, 30, 30);
@@ -730,7 +416,7 @@ function render() {
         ctx.strokeStyle = canPlace ? 'rgba(0, 255, 0, 0.3)' : 'rgba(255, 0, 0, 0.3)';
         ctx.lineWidth = 1;
         ctx.beginPath();
-        ctx.arc(pos.x, pos.y, tempTower.range, 0, Math.PI * 2);
+        ctx.arc(pos.x, pos.y, getTowerRange(gameState.selectedTowerType), 0, Math.PI * 2);
         ctx.stroke();
     }
 
@@ -749,74 +435,59 @@ function render() {
         ctx.textAlign = 'center';
         ctx.fillText('PAUSED', canvas.width / 2, canvas.height / 2);
     }
+
+    frameHud.end();
+    frameHud.draw(`  ${scheduler.lastSteps} ticks/frame at ${gameState.gameSpeed}x, ` +
+        `${Math.round(scheduler.droppedMs)} ms of game time dropped`);
+    frameProfiler.draw();
+    frameProfiler.lap('draw overlays');
 }
 
-function gameLoop() {
-    updateGame();
+function gameLoop(now = performance.now()) {
+    const elapsedMs = lastFrameTime === null ? 0 : now - lastFrameTime;
+    lastFrameTime = now;
+    frameProfiler.beginFrame();
+    if (useSimulationWorker) {
+        simulation.sync();
+        frameProfiler.lap('sync');
+    }
+    updateGame(elapsedMs);
+
+    const running = gameState.gameStarted && !gameState.paused && !gameState.gameOver;
+    const alpha = useSimulationWorker ? simulation.alphaAt(now) : scheduler.alpha;
+    applyInterpolation(running ? alpha : 1);
+    frameProfiler.lap('interpolate');
     render();
-    updateAbilityUI();
+    restoreInterpolation();
+    hud.flush(now);
+    frameProfiler.lap('dom');
+    frameProfiler.endFrame();
     requestAnimationFrame(gameLoop);
 }
 
-function gameOver() {
-    gameState.gameOver = true;
-    document.getElementById('finalScore').textContent = gameState.score;
-    document.getElementById('finalWave').textContent = gameState.wave;
-    document.getElementById('gameOverModal').style.display = 'flex';
-}
-
 function resetGame() {
-    const settings = difficultySettings[gameState.difficulty];
-    gameState.health = settings.health;
-    gameState.money = settings.money;
-    gameState.wave = 0;
-    gameState.score = 0;
-    gameState.gameOver = false;
+    simulation.reset(gameState.difficulty, randomSeed());
     gameState.paused = false;
-    gameState.enemies = [];
-    gameState.towers = [];
-    gameState.projectiles = [];
     gameState.selectedTowerType = null;
     gameState.selectedTower = null;
-    gameState.waveInProgress = false;
-    gameState.enemiesSpawned = 0;
-    gameState.enemiesToSpawn = 0;
-    gameState.spawnTimer = 0;
-    gameState.waveCountdown = 0;
-    gameState.waveCountdownActive = false;
-
-    // Reset abilities
-    for (const abilityKey in gameState.abilities) {
-        const ability = gameState.abilities[abilityKey];
-        ability.cooldown = 0;
-        if (ability.active !== undefined) {
-            ability.active = false;
-            ability.timer = 0;
-        }
-    }
 
     document.getElementById('gameOverModal').style.display = 'none';
-    document.getElementById('towerInfo').style.display = 'none';
-    document.getElementById('waveCountdown').style.display = 'none';
-    document.getElementById('wavePreview').style.display = 'none';
+    ui.towerInfo.style.display = 'none';
+    ui.waveCountdown.style.display = 'none';
+    ui.wavePreview.style.display = 'none';
 
-    updateUI();
-    startWaveCountdown();
+    simulation.start();
 }
 
 function initGame(difficulty) {
     console.log('Initializing game with difficulty:', difficulty);
-    gameState.difficulty = difficulty;
+    simulation.reset(difficulty, randomSeed());
     gameState.gameStarted = true;
-    const settings = difficultySettings[difficulty];
-    gameState.health = settings.health;
-    gameState.money = settings.money;
 
     document.getElementById('difficultyModal').style.display = 'none';
 
-    updateUI();
     updateWavePreview();
-    startWaveCountdown();
+    simulation.start();
     console.log('Game initialized successfully');
 }
 
@@ -853,10 +524,9 @@ function handleCanvasInteraction(clientX, clientY) {
 
     // Handle airstrike targeting
     if (airstrikeTargeting) {
-        if (activateAirStrike(x, y)) {
+        if (simulation.activateAirStrike(x, y)) {
             airstrikeTargeting = false;
             canvas.style.cursor = 'default';
-            updateAbilityUI();
         }
         return;
     }
@@ -865,17 +535,7 @@ function handleCanvasInteraction(clientX, clientY) {
     const gridY = Math.floor(y / GRID_SIZE) * GRID_SIZE + GRID_SIZE / 2;
 
     // Check if clicked on existing tower
-    let clickedTower = null;
-    for (const tower of gameState.towers) {
-        const dx = tower.x - x;
-        const dy = tower.y - y;
-        const distance = Math.sqrt(dx * dx + dy * dy);
-
-        if (distance < 20) {
-            clickedTower = tower;
-            break;
-        }
-    }
+    const clickedTower = simulation.findTowerAt(x, y);
 
     if (clickedTower) {
         // Clicked on existing tower - show tower info
@@ -888,7 +548,7 @@ function handleCanvasInteraction(clientX, clientY) {
         gameState.selectedTower = null;
 
         // Check if location is valid for tower placement
-        if (!isOnPath(gridX, gridY) && !isTooCloseToTower(gridX, gridY)) {
+        if (simulation.canPlaceTower(gridX, gridY)) {
             // Show tower selection popup
             showTowerSelectionPopup(gridX, gridY);
         }
@@ -929,23 +589,8 @@ function placeTowerFromPopup(towerType) {
     if (!pendingTowerPlacement) return;
 
     const { x, y } = pendingTowerPlacement;
-    const tower = new Tower(0, 0, towerType);
-
-    if (gameState.money >= tower.cost) {
-        const newTower = new Tower(x, y, towerType);
-
-        // Apply tower boost if active
-        const towerboost = gameState.abilities.towerboost;
-        if (towerboost.active) {
-            newTower.originalDamage = newTower.damage;
-            newTower.damage *= towerboost.boostAmount;
-            newTower.boosted = true;
-        }
-
-        gameState.towers.push(newTower);
-        gameState.money -= newTower.cost;
-        updateUI();
 
+    if (simulation.placeTower(towerType, x, y)) {
         closeTowerSelectionPopup();
     }
 }
@@ -976,12 +621,13 @@ canvas.addEventListener('touchmove', (e) => {
     }
 }, { passive: false });
 
+// Called on selection and after upgrades, and by the HUD every 250 ms while
+// the panel is open; only the parts whose text changed are written
 function showTowerInfo(tower) {
-    const towerInfo = document.getElementById('towerInfo');
     const upgradeCost = tower.getUpgradeCost();
 
-    // Calculate DPS (damage per second)
-    const dps = tower.fireRate > 0 ? (tower.damage * 60) / tower.fireRate : 0;
+    // Calculate DPS (damage per second); fireRate is in ticks
+    const dps = tower.fireRate > 0 ? (tower.damage * TICK_RATE) / tower.fireRate : 0;
 
     // Get upgrade path info if selected
     let upgradePathInfo = '';
@@ -998,8 +644,8 @@ function showTowerInfo(tower) {
         }
     }
 
-    document.getElementById('towerInfoTitle').textContent = `${tower.type.charAt(0).toUpperCase() + tower.type.slice(1)} Tower (Lvl ${tower.level})`;
-    document.getElementById('towerInfoStats').innerHTML = `
+    writeIfChanged(ui.towerInfoTitle, 'textContent', `${tower.type.charAt(0).toUpperCase() + tower.type.slice(1)} Tower (Lvl ${tower.level})`);
+    writeIfChanged(ui.towerInfoStats, 'innerHTML', `
         <strong>Stats:</strong><br>
         Damage: ${Math.floor(tower.damage)}<br>
         Range: ${Math.floor(tower.range)}<br>
@@ -1011,22 +657,18 @@ function showTowerInfo(tower) {
         Total Damage: ${Math.floor(tower.totalDamageDealt)}<br>
         Shots Fired: ${tower.shotsFired}
         ${upgradePathInfo}
-    `;
-
-    const upgradeBtn = document.getElementById('upgradeTowerBtn');
-    const sellBtn = document.getElementById('sellTowerBtn');
+    `);
 
     // Change button text if tower is level 2 and hasn't chosen a path
     if (tower.level === 2 && !tower.upgradePath) {
-        upgradeBtn.textContent = `Upgrade & Choose Path ($${upgradeCost})`;
+        writeIfChanged(ui.upgradeTowerBtn, 'textContent', `Upgrade & Choose Path ($${upgradeCost})`);
     } else {
-        upgradeBtn.textContent = `Upgrade ($${upgradeCost})`;
+        writeIfChanged(ui.upgradeTowerBtn, 'textContent', `Upgrade ($${upgradeCost})`);
     }
-    upgradeBtn.disabled = gameState.money < upgradeCost || tower.level >= 5;
+    writeIfChanged(ui.upgradeTowerBtn, 'disabled', gameState.money < upgradeCost || tower.level >= 5);
+    writeIfChanged(ui.sellTowerBtn, 'textContent', `Sell ($${tower.sellValue})`);
 
-    sellBtn.textContent = `Sell ($${tower.sellValue})`;
-
-    towerInfo.style.display = 'block';
+    ui.towerInfo.style.display = 'block';
 }
 
 try {
@@ -1048,20 +690,14 @@ try {
 }
 
 document.getElementById('startWaveNowBtn').addEventListener('click', () => {
-    if (gameState.waveCountdownActive) {
-        gameState.waveCountdown = 0;
-    }
+    simulation.startWaveNow();
 });
 
 document.getElementById('sellTowerBtn').addEventListener('click', () => {
     if (gameState.selectedTower) {
-        const index = gameState.towers.indexOf(gameState.selectedTower);
-        if (index > -1) {
-            gameState.money += gameState.selectedTower.sellValue;
-            gameState.towers.splice(index, 1);
+        if (simulation.sellTower(gameState.selectedTower)) {
             gameState.selectedTower = null;
-            document.getElementById('towerInfo').style.display = 'none';
-            updateUI();
+            ui.towerInfo.style.display = 'none';
         }
     }
 });
@@ -1073,14 +709,10 @@ document.getElementById('upgradeTowerBtn').addEventListener('click', () => {
             // Check if tower is level 2 and hasn't chosen a path yet
             if (gameState.selectedTower.level === 2 && !gameState.selectedTower.upgradePath) {
                 // Show upgrade path selection modal
-                showUpgradePathModal(gameState.selectedTower, upgradeCost);
-            } else {
+                showUpgradePathModal(gameState.selectedTower);
+            } else if (simulation.upgradeTower(gameState.selectedTower)) {
                 // Normal upgrade
-                gameState.money -= upgradeCost;
-                gameState.selectedTower.upgrade();
-                gameState.selectedTower.sellValue = Math.floor(gameState.selectedTower.sellValue * 1.5);
                 showTowerInfo(gameState.selectedTower);
-                updateUI();
             }
         }
     }
@@ -1092,151 +724,30 @@ document.getElementById('pauseBtn').addEventListener('click', () => {
 });
 
 document.getElementById('speedBtn').addEventListener('click', () => {
-    const speeds = [1, 2, 3];
+    const speeds = [1, 2, 4, 8];
     const currentIndex = speeds.indexOf(gameState.gameSpeed);
     const nextIndex = (currentIndex + 1) % speeds.length;
     gameState.gameSpeed = speeds[nextIndex];
     document.getElementById('speedBtn').textContent = `Speed: ${gameState.gameSpeed}x`;
 });
 
-// Active Ability Functions
-function activateAirStrike(x, y) {
-    const ability = gameState.abilities.airstrike;
-
-    if (ability.cooldown > 0 || gameState.money < ability.cost) {
-        return false;
-    }
-
-    // Deduct cost and start cooldown
-    gameState.money -= ability.cost;
-    ability.cooldown = ability.maxCooldown;
-
-    // Deal damage to all enemies in radius
-    for (const enemy of gameState.enemies) {
-        const dx = enemy.x - x;
-        const dy = enemy.y - y;
-        const distance = Math.sqrt(dx * dx + dy * dy);
-
-        if (distance <= ability.radius) {
-            enemy.takeDamage(ability.damage, 'splash');
-        }
-    }
-
-    // Create large explosion effect
-    gameState.explosions.push({
-        x: x,
-        y: y,
-        radius: 20,
-        life: 40,
-        opacity: 1,
-        color: '#ff4500'
-    });
-
-    // Create dramatic explosion particles
-    createParticleBurst(x, y, 30, 'spark');
-    createParticleBurst(x, y, 15, 'smoke');
-    createParticleBurst(x, y, 10, 'energy');
-
-    updateUI();
-    return true;
-}
-
-function activateTimeSlow() {
-    const ability = gameState.abilities.timeslow;
-
-    if (ability.cooldown > 0 || gameState.money < ability.cost || ability.active) {
-        return false;
-    }
-
-    // Deduct cost and start cooldown
-    gameState.money -= ability.cost;
-    ability.cooldown = ability.maxCooldown;
-    ability.active = true;
-    ability.timer = ability.duration;
-
-    // Slow all enemies
-    for (const enemy of gameState.enemies) {
-        if (!enemy.originalSpeed) {
-            enemy.originalSpeed = enemy.speed;
-        }
-        enemy.speed *= ability.slowAmount;
-        enemy.timeSlowed = true;
-    }
-
-    updateUI();
-    return true;
-}
-
-function activateTowerBoost() {
-    const ability = gameState.abilities.towerboost;
-
-    if (ability.cooldown > 0 || gameState.money < ability.cost || ability.active) {
-        return false;
-    }
-
-    // Deduct cost and start cooldown
-    gameState.money -= ability.cost;
-    ability.cooldown = ability.maxCooldown;
-    ability.active = true;
-    ability.timer = ability.duration;
-
-    // Boost all towers
-    for (const tower of gameState.towers) {
-        if (!tower.originalDamage) {
-            tower.originalDamage = tower.damage;
-        }
-        tower.damage *= ability.boostAmount;
-        tower.boosted = true;
-    }
-
-    updateUI();
-    return true;
-}
-
 // Ability UI State
 let airstrikeTargeting = false;
 
-// Update ability UI
-function updateAbilityUI() {
-    for (const abilityKey in gameState.abilities) {
-        const ability = gameState.abilities[abilityKey];
-        const btn = document.getElementById(`${abilityKey}Btn`);
-        if (!btn) continue;
-
-        const cooldownDiv = btn.querySelector('.ability-cooldown');
-        const cooldownBar = btn.querySelector('.cooldown-bar');
-        const cooldownText = btn.querySelector('.cooldown-text');
-
-        // Check if ability can be used
-        const canUse = ability.cooldown === 0 && gameState.money >= ability.cost && !gameState.gameOver;
-        btn.disabled = !canUse;
-
-        // Show cooldown if on cooldown
-        if (ability.cooldown > 0) {
-            cooldownDiv.style.display = 'block';
-            const percentage = (ability.cooldown / ability.maxCooldown) * 100;
-            cooldownBar.style.width = percentage + '%';
-            cooldownText.textContent = Math.ceil(ability.cooldown / 60) + 's';
-        } else {
-            cooldownDiv.style.display = 'none';
-        }
-
-        // Show active state for timed abilities
-        if (ability.active) {
-            btn.classList.add('active');
-        } else {
-            btn.classList.remove('active');
-        }
-    }
+// Ability buttons: availability, cooldown overlay and active/targeting state
+for (const abilityKey of Object.keys(gameState.abilities)) {
+    const btn = document.getElementById(`${abilityKey}Btn`);
+    if (!btn) continue;
 
-    // Handle airstrike targeting mode
-    const airstrikeBtn = document.getElementById('airstrikeBtn');
-    if (airstrikeTargeting) {
-        airstrikeBtn.classList.add('targeting');
-    } else {
-        airstrikeBtn.classList.remove('targeting');
-    }
+    // gameState.abilities is replaced on reset, so look the ability up on every read
+    const ability = () => gameState.abilities[abilityKey];
+    hud.bind(btn, 'disabled', () => !(ability().cooldown === 0 && gameState.money >= ability().cost && !gameState.gameOver))
+        .bind(btn.querySelector('.ability-cooldown'), 'style.display', () => ability().cooldown > 0 ? 'block' : 'none')
+        .bind(btn.querySelector('.cooldown-bar'), 'style.width', () => Math.ceil(ability().cooldown / ability().maxCooldown * 100) + '%')
+        .bind(btn.querySelector('.cooldown-text'), 'textContent', () => Math.ceil(ability().cooldown / TICK_RATE) + 's')
+        .bind(btn, 'class.active', () => Boolean(ability().active));
 }
+hud.bind(document.getElementById('airstrikeBtn'), 'class.targeting', () => airstrikeTargeting);
 
 // Setup ability button handlers
 document.getElementById('airstrikeBtn').addEventListener('click', () => {
@@ -1244,33 +755,26 @@ document.getElementById('airstrikeBtn').addEventListener('click', () => {
     if (ability.cooldown === 0 && gameState.money >= ability.cost && !airstrikeTargeting) {
         airstrikeTargeting = true;
         canvas.style.cursor = 'crosshair';
-        updateAbilityUI();
     }
 });
 
 document.getElementById('timeslowBtn').addEventListener('click', () => {
-    if (activateTimeSlow()) {
-        updateAbilityUI();
-    }
+    simulation.activateTimeSlow();
 });
 
 document.getElementById('towerboostBtn').addEventListener('click', () => {
-    if (activateTowerBoost()) {
-        updateAbilityUI();
-    }
+    simulation.activateTowerBoost();
 });
 
 // Upgrade Path Modal Functions
 let selectedUpgradePath = null;
 let pendingTowerUpgrade = null;
-let pendingUpgradeCost = 0;
 
-function showUpgradePathModal(tower, upgradeCost) {
+function showUpgradePathModal(tower) {
     const modal = document.getElementById('upgradePathModal');
     const optionsContainer = document.getElementById('upgradePathOptions');
 
     pendingTowerUpgrade = tower;
-    pendingUpgradeCost = upgradeCost;
     selectedUpgradePath = null;
 
     // Get upgrade paths for this tower type
@@ -1316,22 +820,17 @@ function showUpgradePathModal(tower, upgradeCost) {
 document.getElementById('confirmUpgradePath').addEventListener('click', () => {
     if (selectedUpgradePath && pendingTowerUpgrade) {
         // Apply the upgrade
-        gameState.money -= pendingUpgradeCost;
-        pendingTowerUpgrade.upgrade();
-        pendingTowerUpgrade.chooseUpgradePath(selectedUpgradePath);
-        pendingTowerUpgrade.sellValue = Math.floor(pendingTowerUpgrade.sellValue * 1.5);
+        simulation.upgradeTower(pendingTowerUpgrade, selectedUpgradePath);
 
         // Close modal
         document.getElementById('upgradePathModal').style.display = 'none';
 
         // Update UI
         showTowerInfo(pendingTowerUpgrade);
-        updateUI();
 
         // Clear pending data
         selectedUpgradePath = null;
         pendingTowerUpgrade = null;
-        pendingUpgradeCost = 0;
     }
 });
 
@@ -1342,55 +841,38 @@ document.getElementById('cancelUpgradePath').addEventListener('click', () => {
     // Clear pending data
     selectedUpgradePath = null;
     pendingTowerUpgrade = null;
-    pendingUpgradeCost = 0;
 });
 
 function updateWavePreview() {
     const nextWave = gameState.wave + 1;
     if (gameState.waveInProgress) {
-        document.getElementById('wavePreview').style.display = 'none';
+        ui.wavePreview.style.display = 'none';
         return;
     }
 
-    let basicCount = Math.floor(5 + nextWave * 1.5);
-    let fastCount = Math.floor(nextWave / 2);
-    let tankCount = Math.floor(nextWave / 4);
-    let healerCount = nextWave >= 3 ? Math.floor(nextWave / 5) : 0;
-    let flyingCount = nextWave >= 5 ? Math.floor(nextWave / 6) : 0;
-    let armoredCount = nextWave >= 4 ? Math.floor(nextWave / 5) : 0;
-    let shieldedCount = nextWave >= 6 ? Math.floor(nextWave / 7) : 0;
-    let bossCount = nextWave % 10 === 0 ? 1 : 0;
-
-    // New enemy types
-    let swarmCount = nextWave >= 2 ? Math.floor(nextWave * 2) : 0;
-    let teleporterCount = nextWave >= 7 ? Math.floor(nextWave / 8) : 0;
-    let splitterCount = nextWave >= 5 ? Math.floor(nextWave / 6) : 0;
-    let spawnerCount = nextWave >= 8 ? Math.floor(nextWave / 10) : 0;
-    let resistantCount = nextWave >= 10 ? Math.floor(nextWave / 12) : 0;
-
+    // Same cached plan the simulation will spawn from
+    const plan = getWavePlan(nextWave, gameState.difficulty);
     let preview = '';
-    if (basicCount > 0) preview += `<div class="enemy-preview"><span style="color:#ff4444">● Basic</span><span>${basicCount}</span></div>`;
-    if (fastCount > 0) preview += `<div class="enemy-preview"><span style="color:#44ff44">● Fast</span><span>${fastCount}</span></div>`;
-    if (tankCount > 0) preview += `<div class="enemy-preview"><span style="color:#4444ff">● Tank</span><span>${tankCount}</span></div>`;
-    if (healerCount > 0) preview += `<div class="enemy-preview"><span style="color:#00ffff">● Healer</span><span>${healerCount}</span></div>`;
-    if (flyingCount > 0) preview += `<div class="enemy-preview"><span style="color:#ffaa00">● Flying</span><span>${flyingCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Immune: ground towers</div></div>`;
-    if (armoredCount > 0) preview += `<div class="enemy-preview"><span style="color:#888888">● Armored</span><span>${armoredCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Weak: pierce/splash</div></div>`;
-    if (shieldedCount > 0) preview += `<div class="enemy-preview"><span style="color:#aaaaff">● Shielded</span><span>${shieldedCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Weak: poison</div></div>`;
-    if (swarmCount > 0) preview += `<div class="enemy-preview"><span style="color:#ff69b4">● Swarm</span><span>${swarmCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Weak: splash</div></div>`;
-    if (teleporterCount > 0) preview += `<div class="enemy-preview"><span style="color:#00ffff">● Teleporter</span><span>${teleporterCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Jumps forward!</div></div>`;
-    if (splitterCount > 0) preview += `<div class="enemy-preview"><span style="color:#9370db">● Splitter</span><span>${splitterCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Splits on death</div></div>`;
-    if (spawnerCount > 0) preview += `<div class="enemy-preview"><span style="color:#ff1493">● Spawner</span><span>${spawnerCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Spawns swarms</div></div>`;
-    if (resistantCount > 0) preview += `<div class="enemy-preview"><span style="color:#696969">● Resistant</span><span>${resistantCount}</span><div style="font-size:10px;color:#888;margin-top:2px">Resists all damage</div></div>`;
-    if (bossCount > 0) preview += `<div class="enemy-preview"><span style="color:#ff00ff">◆ BOSS</span><span>${bossCount}</span></div>`;
-
-    document.getElementById('wavePreviewContent').innerHTML = preview;
-    document.getElementById('wavePreview').style.display = 'block';
+    for (const { type, count } of plan.groups) {
+        const { label, color, hint } = ENEMY_PROTOTYPES[type].preview;
+        preview += `<div class="enemy-preview"><span style="color:${color}">${label}</span><span>${count}</span>` +
+            (hint ? `<div style="font-size:10px;color:#888;margin-top:2px">${hint}</div>` : '') + '</div>';
+    }
+
+    writeIfChanged(ui.wavePreviewContent, 'innerHTML', preview);
+    ui.wavePreview.style.display = 'block';
 }
 
 document.addEventListener('keydown', (e) => {
-    if (gameState.gameOver) return;
-
     const key = e.key.toLowerCase();
+
+    // Profiler keys also work after game over, just not while typing a name
+    if ((key === 'f' || key === 't') && e.target.tagName !== 'INPUT') {
+        if (key === 'f') frameProfiler.toggle();
+        else toggleTraceRecording();
+        return;
+    }
+    if (gameState.gameOver) return;
     const towerMap = {
         '1': 'basic',
         '2': 'rapid',
@@ -1424,9 +906,9 @@ document.addEventListener('keydown', (e) => {
         document.getElementById('towerInfo').style.display = 'none';
         closeTowerSelectionPopup();
     } else if (key === 'enter') {
-        if (gameState.waveCountdownActive) {
-            gameState.waveCountdown = 0;
-        }
+        simulation.startWaveNow();
+    } else if (key === 'h') {
+        frameHud.toggle();
     }
 });
 
@@ -1440,8 +922,8 @@ document.getElementById('submitScore').addEventListener('click', async () => {
 
     try {
         document.getElementById('submitScore').disabled = true;
-        await submitScore(playerName, gameState.score, gameState.wave);
-        alert(`Score submitted! You ranked #${await getPlayerRank()}`);
+        const result = await submitScore(playerName, simulation.getReplay());
+        alert(`Score submitted! You ranked #${result.rank}`);
         document.getElementById('submitScore').style.display = 'none';
     } catch (error) {
         alert('Failed to submit score. Please try again.');
@@ -1453,16 +935,6 @@ document.getElementById('playAgain').addEventListener('click', () => {
     resetGame();
 });
 
-async function getPlayerRank() {
-    try {
-        const response = await fetch(`${API_URL}/leaderboard?limit=100`);
-        const scores = await response.json();
-        return scores.findIndex(s => s.score <= gameState.score) + 1 || scores.length + 1;
-    } catch {
-        return '?';
-    }
-}
-
 // Tower selection popup event listeners
 document.querySelectorAll('.popup-tower-btn').forEach(btn => {
     btn.addEventListener('click', () => {
@@ -1486,5 +958,4 @@ console.log('Game script loaded');
 console.log('Difficulty modal element:', document.getElementById('difficultyModal'));
 console.log('Canvas element:', canvas);
 
-updateUI();
 gameLoop();
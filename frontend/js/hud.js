@@ -0,0 +1,59 @@
+// Change-tracked DOM writes for the HUD and side panels. Element references
+// are looked up once, when a binding is made. flush() runs once per animation
+// frame: each binding reads its value from the game state and the element is
+// only written when that value differs from the last one written to it, so
+// ticks in between and unchanged numbers cost no style or layout work.
+
+// element -> { prop: last value written by writeIfChanged }
+const hudWritten = new WeakMap();
+
+// prop is a DOM property ('textContent', 'disabled', 'innerHTML'),
+// 'style.<name>' for an inline style or 'class.<name>' to toggle a class
+function writeIfChanged(element, prop, value) {
+    let written = hudWritten.get(element);
+    if (!written) {
+        written = {};
+        hudWritten.set(element, written);
+    }
+    if (written[prop] === value) return false;
+    written[prop] = value;
+
+    if (prop.startsWith('style.')) {
+        element.style[prop.slice(6)] = value;
+    } else if (prop.startsWith('class.')) {
+        element.classList.toggle(prop.slice(6), Boolean(value));
+    } else {
+        element[prop] = value;
+    }
+    return true;
+}
+
+class Hud {
+    constructor() {
+        this.bindings = [];
+        this.tasks = [];
+    }
+
+    bind(element, prop, read) {
+        this.bindings.push({ element, prop, read });
+        return this;
+    }
+
+    // Runs fn from flush() at most once every intervalMs
+    throttle(intervalMs, fn) {
+        this.tasks.push({ intervalMs, fn, lastRun: -Infinity });
+        return this;
+    }
+
+    flush(now = performance.now()) {
+        for (const binding of this.bindings) {
+            writeIfChanged(binding.element, binding.prop, binding.read());
+        }
+        for (const task of this.tasks) {
+            if (now - task.lastRun >= task.intervalMs) {
+                task.lastRun = now;
+                task.fn();
+            }
+        }
+    }
+}
@@ -1,20 +1,78 @@
-const API_URL = 'http://localhost:3000/api';
+// Same origin: the page is served by the API server (and by the load balancer)
+const API_URL = '/api';
+const LEADERBOARD_PAGE_SIZE = 10;
+
+// Pages loaded so far for the selected view; "Show more" follows nextCursor.
+// request counts first-page loads: a response that comes back after another
+// load started (say, the filter changed while it was in flight) is dropped.
+const leaderboardView = {
+    difficulty: 'all',
+    window: 'alltime',
+    scores: [],
+    nextCursor: null,
+    request: 0
+};
+
+// Responses are sent with no-cache and an ETag, so the browser revalidates
+// and an unchanged page comes back as a body-less 304
+async function fetchLeaderboardPage(cursor) {
+    const params = new URLSearchParams({
+        difficulty: leaderboardView.difficulty,
+        window: leaderboardView.window,
+        limit: LEADERBOARD_PAGE_SIZE
+    });
+    if (cursor) params.set('cursor', cursor);
+
+    const response = await fetch(`${API_URL}/leaderboard?${params}`);
+    if (!response.ok) throw new Error('Failed to fetch leaderboard');
+
+    return {
+        scores: await response.json(),
+        nextCursor: response.headers.get('X-Next-Cursor')
+    };
+}
 
 async function fetchLeaderboard() {
+    const request = ++leaderboardView.request;
     try {
-        const response = await fetch(`${API_URL}/leaderboard?limit=10`);
-        if (!response.ok) throw new Error('Failed to fetch leaderboard');
-
-        const scores = await response.json();
-        displayLeaderboard(scores);
+        const page = await fetchLeaderboardPage(null);
+        if (request !== leaderboardView.request) return;
+        leaderboardView.scores = page.scores;
+        leaderboardView.nextCursor = page.nextCursor;
+        displayLeaderboard(leaderboardView.scores);
     } catch (error) {
+        if (request !== leaderboardView.request) return;
         console.error('Error fetching leaderboard:', error);
         document.getElementById('leaderboard').innerHTML = '<div class="loading">Failed to load leaderboard</div>';
     }
 }
 
+async function fetchMoreScores() {
+    const request = leaderboardView.request;
+    const cursor = leaderboardView.nextCursor;
+    if (!cursor) return;
+    try {
+        const page = await fetchLeaderboardPage(cursor);
+        // Belongs to a view that has since been reloaded, or a second click already appended it
+        if (request !== leaderboardView.request || cursor !== leaderboardView.nextCursor) return;
+        leaderboardView.scores = leaderboardView.scores.concat(page.scores);
+        leaderboardView.nextCursor = page.nextCursor;
+        displayLeaderboard(leaderboardView.scores);
+    } catch (error) {
+        console.error('Error fetching more scores:', error);
+    }
+}
+
+// A cursor only means something within its own view, so a new filter starts from the top
+function setLeaderboardFilter(filter) {
+    Object.assign(leaderboardView, filter, { scores: [], nextCursor: null });
+    document.getElementById('leaderboardMoreBtn').style.display = 'none';
+    fetchLeaderboard();
+}
+
 function displayLeaderboard(scores) {
     const leaderboardDiv = document.getElementById('leaderboard');
+    document.getElementById('leaderboardMoreBtn').style.display = leaderboardView.nextCursor ? 'block' : 'none';
 
     if (scores.length === 0) {
         leaderboardDiv.innerHTML = '<div class="loading">No scores yet. Be the first!</div>';
@@ -30,7 +88,8 @@ function displayLeaderboard(scores) {
     `).join('');
 }
 
-async function submitScore(playerName, score, wavesSurvived) {
+// The server re-simulates the replay (seed + input log) and records the score it computes
+async function submitScore(playerName, replay) {
     try {
         const response = await fetch(`${API_URL}/leaderboard`, {
             method: 'POST',
@@ -39,8 +98,7 @@ async function submitScore(playerName, score, wavesSurvived) {
             },
             body: JSON.stringify({
                 playerName,
-                score,
-                wavesSurvived
+                replay
             })
         });
 
@@ -61,4 +119,14 @@ function escapeHtml(text) {
     return div.innerHTML;
 }
 
+document.getElementById('leaderboardDifficulty').addEventListener('change', (e) => {
+    setLeaderboardFilter({ difficulty: e.target.value });
+});
+
+document.getElementById('leaderboardWindow').addEventListener('change', (e) => {
+    setLeaderboardFilter({ window: e.target.value });
+});
+
+document.getElementById('leaderboardMoreBtn').addEventListener('click', fetchMoreScores);
+
 fetchLeaderboard();
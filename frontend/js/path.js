@@ -0,0 +1,83 @@
+// Precomputed geometry for a polyline path. Segment lengths, unit vectors and
+// the arc length at each waypoint are computed once, so an enemy only stores
+// its distance along the path and the model turns that back into a position.
+// Cells of the build grid too close to the path are rasterized into a bitmap,
+// which makes placement checks a single lookup.
+class PathModel {
+    constructor(points, { cellSize, cols, rows, buffer = 35 }) {
+        this.points = points;
+        this.segmentCount = points.length - 1;
+        this.segmentLength = new Float64Array(this.segmentCount);
+        this.dirX = new Float64Array(this.segmentCount);
+        this.dirY = new Float64Array(this.segmentCount);
+        // Arc length from the start of the path to each waypoint
+        this.startDistance = new Float64Array(points.length);
+
+        for (let i = 0; i < this.segmentCount; i++) {
+            const dx = points[i + 1].x - points[i].x;
+            const dy = points[i + 1].y - points[i].y;
+            const length = Math.sqrt(dx * dx + dy * dy);
+            this.segmentLength[i] = length;
+            this.dirX[i] = dx / length;
+            this.dirY[i] = dy / length;
+            this.startDistance[i + 1] = this.startDistance[i] + length;
+        }
+        this.totalLength = this.startDistance[this.segmentCount];
+
+        this.cellSize = cellSize;
+        this.cols = cols;
+        this.rows = rows;
+        this.blocked = new Uint8Array(cols * rows);
+        for (let row = 0; row < rows; row++) {
+            for (let col = 0; col < cols; col++) {
+                const x = col * cellSize + cellSize / 2;
+                const y = row * cellSize + cellSize / 2;
+                this.blocked[row * cols + col] = this.isNear(x, y, buffer) ? 1 : 0;
+            }
+        }
+    }
+
+    // Whether (x, y) lies within buffer of a segment, measured perpendicular to it
+    isNear(x, y, buffer) {
+        for (let i = 0; i < this.segmentCount; i++) {
+            const p = this.points[i];
+            const along = (x - p.x) * this.dirX[i] + (y - p.y) * this.dirY[i];
+            if (along < 0 || along > this.segmentLength[i]) continue;
+
+            const across = (x - p.x) * this.dirY[i] - (y - p.y) * this.dirX[i];
+            if (Math.abs(across) < buffer) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    // Whether the grid cell containing (x, y) is off the board or too close to the path to build on
+    isBlocked(x, y) {
+        const col = Math.floor(x / this.cellSize);
+        const row = Math.floor(y / this.cellSize);
+        if (col < 0 || col >= this.cols || row < 0 || row >= this.rows) {
+            return true;
+        }
+        return this.blocked[row * this.cols + col] === 1;
+    }
+
+    // Moves an enemy to distance along the path, updating its segment and
+    // position. Enemies mostly move forward, so the segment search starts
+    // from the one they were on.
+    moveTo(enemy, distance) {
+        let segment = enemy.pathIndex;
+        if (segment >= this.segmentCount || this.startDistance[segment] > distance) {
+            segment = 0;
+        }
+        while (segment < this.segmentCount - 1 && this.startDistance[segment + 1] <= distance) {
+            segment++;
+        }
+
+        const along = distance - this.startDistance[segment];
+        enemy.distance = distance;
+        enemy.pathIndex = segment;
+        enemy.x = this.points[segment].x + this.dirX[segment] * along;
+        enemy.y = this.points[segment].y + this.dirY[segment] * along;
+    }
+}
@@ -0,0 +1,52 @@
+// Fixed-growth object pool. Objects are recycled on release instead of being
+// left for the garbage collector, and the counters show how often the pool
+// had to fall back to a real allocation.
+class ObjectPool {
+    constructor(create, preallocate = 0) {
+        this.create = create;
+        this.free = [];
+        this.inUse = 0;
+        this.allocated = 0;
+        this.reused = 0;
+
+        for (let i = 0; i < preallocate; i++) {
+            this.free.push(this.create());
+            this.allocated++;
+        }
+    }
+
+    acquire() {
+        this.inUse++;
+        if (this.free.length > 0) {
+            this.reused++;
+            return this.free.pop();
+        }
+        this.allocated++;
+        return this.create();
+    }
+
+    release(obj) {
+        this.inUse--;
+        this.free.push(obj);
+    }
+
+    getStats() {
+        return {
+            inUse: this.inUse,
+            free: this.free.length,
+            allocated: this.allocated,
+            reused: this.reused
+        };
+    }
+}
+
+// O(1) unordered removal: the last element takes the removed slot. Safe inside
+// loops that walk the array from the end towards the start.
+function swapRemove(array, index) {
+    const removed = array[index];
+    const last = array.pop();
+    if (index < array.length) {
+        array[index] = last;
+    }
+    return removed;
+}
@@ -0,0 +1,283 @@
+// Per-phase timing for the game loop. lap(name) charges the time since the
+// previous lap (or mark()) to a phase, so a run of laps splits a stretch of
+// code into consecutive phases with one performance.now() per boundary.
+// Simulation.step() laps its phases when given a profiler, and so does the
+// worker, which sends its totals to the page with each snapshot.
+//
+// The page's FrameProfiler adds frames on top: phase costs per frame, entity
+// counts, garbage-collection indicators, an overlay ([F] or ?profile) and a
+// recorder that exports Chrome trace-event JSON ([T] starts and stops it),
+// which chrome://tracing and ui.perfetto.dev open directly.
+
+const PROFILE_WINDOW_MS = 500;
+const PROFILE_LONG_FRAME_MS = 50;
+const TRACE_EVENT_LIMIT = 500000;
+// Trace threads: the page's frames, its phases and the worker's phases
+const TRACE_FRAME_TID = 1;
+const TRACE_PAGE_TID = 2;
+const TRACE_WORKER_TID = 3;
+// Overlay order: phases sorted by where they run in a frame (by name prefix)
+const PHASE_ORDER = ['sync', 'tick', 'worker', 'interpolate', 'draw', 'dom'];
+
+function phaseRank(name) {
+    const rank = PHASE_ORDER.findIndex(prefix => name.startsWith(prefix));
+    return rank === -1 ? PHASE_ORDER.length : rank;
+}
+
+class PhaseProfiler {
+    constructor() {
+        this.lastMark = 0;
+        this.phases = new Map();  // name -> { ms, calls, maxMs } since the last drain or window
+        this.trace = null;  // Trace events while recording
+        this.traceTid = TRACE_PAGE_TID;
+    }
+
+    mark() {
+        this.lastMark = performance.now();
+    }
+
+    lap(name) {
+        const now = performance.now();
+        this.charge(name, now - this.lastMark, this.lastMark);
+        this.lastMark = now;
+    }
+
+    charge(name, ms, start) {
+        let phase = this.phases.get(name);
+        if (!phase) {
+            phase = { ms: 0, calls: 0, maxMs: 0 };
+            this.phases.set(name, phase);
+        }
+        phase.ms += ms;
+        phase.calls++;
+        if (ms > phase.maxMs) phase.maxMs = ms;
+        if (this.trace && this.trace.length < TRACE_EVENT_LIMIT) {
+            this.trace.push({ name, ph: 'X', ts: start * 1000, dur: ms * 1000, pid: 1, tid: this.traceTid });
+        }
+    }
+
+    // Totals since the last drain, as sent from the worker
+    drain() {
+        const phases = {};
+        for (const [name, phase] of this.phases) {
+            phases[name] = [phase.ms, phase.calls, phase.maxMs];
+        }
+        this.phases.clear();
+        const events = this.trace;
+        if (this.trace) this.trace = [];
+        return { origin: performance.timeOrigin, phases, events };
+    }
+}
+
+class FrameProfiler extends PhaseProfiler {
+    // counters() returns { entities: {name: count}, poolAllocations }; called once per frame
+    constructor(ctx, counters) {
+        super();
+        this.ctx = ctx;
+        this.counters = counters;
+        this.visible = false;
+        this.enabled = false;
+        this.onChange = () => {};
+
+        this.frameStart = 0;
+        this.windowStart = 0;
+        this.frames = 0;
+        this.frameMs = 0;
+        this.maxFrameMs = 0;
+        this.longFrames = 0;
+        this.heapUsed = null;
+        this.heapGrowth = 0;
+        this.collections = 0;
+        this.poolAllocationsAtWindow = null;
+        this.report = null;  // What the overlay shows: the last complete window
+        this.traceStartedAt = 0;
+    }
+
+    toggle() {
+        this.visible = !this.visible;
+        this.setEnabled(this.visible || this.trace !== null);
+    }
+
+    setEnabled(enabled) {
+        if (enabled === this.enabled) return;
+        this.enabled = enabled;
+        this.phases.clear();
+        this.report = null;
+        this.windowStart = performance.now();
+        this.frames = this.frameMs = this.maxFrameMs = this.longFrames = 0;
+        this.heapGrowth = this.collections = 0;
+        this.poolAllocationsAtWindow = null;
+        this.onChange(this);
+    }
+
+    lap(name) {
+        if (this.enabled) super.lap(name);
+    }
+
+    // Adds the worker's phase totals (and trace events, moved onto this page's clock)
+    merge({ origin, phases, events }) {
+        if (!this.enabled) return;
+        for (const name in phases) {
+            const [ms, calls, maxMs] = phases[name];
+            let phase = this.phases.get(`worker ${name}`);
+            if (!phase) {
+                phase = { ms: 0, calls: 0, maxMs: 0 };
+                this.phases.set(`worker ${name}`, phase);
+            }
+            phase.ms += ms;
+            phase.calls += calls;
+            if (maxMs > phase.maxMs) phase.maxMs = maxMs;
+        }
+        if (events && this.trace) {
+            const shiftUs = (origin - performance.timeOrigin) * 1000;
+            for (const event of events) {
+                if (this.trace.length >= TRACE_EVENT_LIMIT) break;
+                event.ts += shiftUs;
+                event.tid = TRACE_WORKER_TID;
+                this.trace.push(event);
+            }
+        }
+    }
+
+    beginFrame() {
+        if (!this.enabled) return;
+        this.frameStart = performance.now();
+        this.lastMark = this.frameStart;
+    }
+
+    endFrame() {
+        if (!this.enabled) return;
+        const now = performance.now();
+        const frameMs = now - this.frameStart;
+        this.frames++;
+        this.frameMs += frameMs;
+        if (frameMs > this.maxFrameMs) this.maxFrameMs = frameMs;
+        if (frameMs > PROFILE_LONG_FRAME_MS) this.longFrames++;
+
+        // Chromium only: a shrinking heap means a collection ran since the last frame
+        const memory = performance.memory;
+        if (memory) {
+            const used = memory.usedJSHeapSize;
+            if (this.heapUsed !== null) {
+                if (used < this.heapUsed) this.collections++;
+                else this.heapGrowth += used - this.heapUsed;
+            }
+            this.heapUsed = used;
+        }
+
+        const counters = this.counters();
+        if (this.trace && this.trace.length < TRACE_EVENT_LIMIT) {
+            this.trace.push({ name: 'frame', ph: 'X', ts: this.frameStart * 1000, dur: frameMs * 1000, pid: 1, tid: TRACE_FRAME_TID });
+            this.trace.push({ name: 'entities', ph: 'C', ts: now * 1000, pid: 1, args: counters.entities });
+            if (memory) {
+                this.trace.push({ name: 'heap MB', ph: 'C', ts: now * 1000, pid: 1, args: { used: this.heapUsed / 1048576 } });
+            }
+        }
+
+        if (now - this.windowStart >= PROFILE_WINDOW_MS) {
+            this.closeWindow(now, counters);
+        }
+    }
+
+    closeWindow(now, counters) {
+        const seconds = (now - this.windowStart) / 1000;
+        const frames = Math.max(1, this.frames);
+        const phases = [];
+        for (const [name, phase] of this.phases) {
+            phases.push({ name, msPerFrame: phase.ms / frames, callsPerFrame: phase.calls / frames, maxMs: phase.maxMs });
+        }
+        phases.sort((a, b) => phaseRank(a.name) - phaseRank(b.name));
+        const poolAllocations = counters.poolAllocations;
+        this.report = {
+            fps: this.frames / seconds,
+            frameMs: this.frameMs / frames,
+            maxFrameMs: this.maxFrameMs,
+            longFrames: this.longFrames,
+            phases,
+            entities: counters.entities,
+            heapMB: this.heapUsed === null ? null : this.heapUsed / 1048576,
+            heapGrowthMBps: this.heapUsed === null ? null : this.heapGrowth / 1048576 / seconds,
+            collections: this.collections,
+            poolAllocationsPerSecond: this.poolAllocationsAtWindow === null
+                ? 0 : (poolAllocations - this.poolAllocationsAtWindow) / seconds
+        };
+
+        this.phases.clear();
+        this.windowStart = now;
+        this.frames = this.frameMs = this.maxFrameMs = this.longFrames = 0;
+        this.heapGrowth = this.collections = 0;
+        this.poolAllocationsAtWindow = poolAllocations;
+    }
+
+    get recording() {
+        return this.trace !== null;
+    }
+
+    startTrace() {
+        this.trace = [];
+        this.traceStartedAt = performance.now();
+        if (this.enabled) this.onChange(this);
+        else this.setEnabled(true);
+    }
+
+    // Stops recording and returns the trace as a Chrome trace-event object
+    stopTrace() {
+        const events = this.trace || [];
+        this.trace = null;
+        if (this.enabled === this.visible) this.onChange(this);
+        else this.setEnabled(this.visible);
+
+        const threadName = (tid, name) => ({ name: 'thread_name', ph: 'M', pid: 1, tid, args: { name } });
+        return {
+            traceEvents: [
+                { name: 'process_name', ph: 'M', pid: 1, args: { name: 'Tower Defense' } },
+                threadName(TRACE_FRAME_TID, 'frames'),
+                threadName(TRACE_PAGE_TID, 'page phases'),
+                threadName(TRACE_WORKER_TID, 'simulation worker'),
+                ...events
+            ],
+            displayTimeUnit: 'ms',
+            metadata: {
+                recordedMs: performance.now() - this.traceStartedAt,
+                truncated: events.length >= TRACE_EVENT_LIMIT
+            }
+        };
+    }
+
+    draw() {
+        if (!this.visible && !this.recording) return;
+        const report = this.report;
+        const lines = [];
+        if (!this.visible) {
+            // Recording with the overlay hidden: just the recording indicator
+        } else if (!report) {
+            lines.push('Profiling...');
+        } else {
+            lines.push(`${report.fps.toFixed(0)} fps  ${report.frameMs.toFixed(2)} ms/frame  ` +
+                `worst ${report.maxFrameMs.toFixed(1)} ms  ${report.longFrames} long`);
+            lines.push('phase                 ms/frame  calls    max ms');
+            for (const phase of report.phases) {
+                lines.push(`${phase.name.padEnd(20)} ${phase.msPerFrame.toFixed(3).padStart(9)} ` +
+                    `${phase.callsPerFrame.toFixed(1).padStart(6)} ${phase.maxMs.toFixed(2).padStart(9)}`);
+            }
+            lines.push(Object.entries(report.entities).map(([name, count]) => `${name} ${count}`).join('  '));
+            lines.push(report.heapMB === null
+                ? 'heap: n/a in this browser'
+                : `heap ${report.heapMB.toFixed(1)} MB  +${report.heapGrowthMBps.toFixed(2)} MB/s  ${report.collections} GCs`);
+            lines.push(`pool allocations ${report.poolAllocationsPerSecond.toFixed(0)}/s`);
+        }
+        lines.push(this.recording
+            ? `REC ${((performance.now() - this.traceStartedAt) / 1000).toFixed(0)}s  [T] stop and save trace`
+            : '[F] hide profiler  [T] record trace');
+
+        const ctx = this.ctx;
+        const width = 380;
+        const x = ctx.canvas.width - width - 4;
+        ctx.fillStyle = 'rgba(0, 0, 0, 0.7)';
+        ctx.fillRect(x, 4, width, 8 + lines.length * 14);
+        ctx.fillStyle = '#00ffff';
+        ctx.font = '12px monospace';
+        ctx.textAlign = 'left';
+        lines.forEach((line, i) => ctx.fillText(line, x + 6, 16 + i * 14));
+    }
+}
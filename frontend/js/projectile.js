@@ -1,5 +1,13 @@
+// Shared scratch buffer for chain lightning grid queries
+const chainQueryScratch = [];
+
 class Projectile {
     constructor(x, y, target, damage, color, splashRadius = 0) {
+        this.reset(x, y, target, damage, color, splashRadius);
+    }
+
+    // Reinitializes every field so pooled projectiles carry nothing over from their previous shot
+    reset(x, y, target, damage, color, splashRadius = 0) {
         this.x = x;
         this.y = y;
         this.target = target;
@@ -9,10 +17,19 @@ class Projectile {
         this.alive = true;
         this.splashRadius = splashRadius;
         this.special = null;
+        this.damageType = 'normal';
+        this.tower = null;
         this.trailCounter = 0;
+        this.freezeDuration = 0;
+        this.poisonDamage = 0;
+        this.poisonDuration = 0;
+        this.chainCount = 0;
+        this.chainRange = 0;
+        this.chainTargets = null;
+        return this;
     }
 
-    update(enemies) {
+    update(enemies, grid = null, effects = null) {
         if (!this.target || !this.target.alive) {
             this.alive = false;
             return { hit: false };
@@ -24,7 +41,7 @@ class Projectile {
 
         if (distance < this.speed) {
             this.alive = false;
-            this.applyEffects(this.target, enemies);
+            this.applyEffects(this.target, enemies, grid);
             return { hit: true, x: this.target.x, y: this.target.y, special: this.special, damageType: this.damageType };
         }
 
@@ -33,7 +50,7 @@ class Projectile {
 
         // Create trail particles (not for laser beams)
         this.trailCounter++;
-        if (this.special !== 'laser' && this.trailCounter % 2 === 0 && window.gameState) {
+        if (this.special !== 'laser' && this.trailCounter % 2 === 0 && effects) {
             let trailType = 'spark';
             let trailCount = 1;
 
@@ -51,15 +68,13 @@ class Projectile {
                 trailCount = 1;
             }
 
-            if (window.createParticleBurst) {
-                window.createParticleBurst(this.x, this.y, trailCount, trailType);
-            }
+            effects.particleBurst(this.x, this.y, trailCount, trailType);
         }
 
         return { hit: false };
     }
 
-    applyEffects(target, enemies) {
+    applyEffects(target, enemies, grid = null) {
         if (this.special === 'freeze') {
             target.frozenTimer = this.freezeDuration;
             target.originalSpeed = target.speed;
@@ -70,14 +85,19 @@ class Projectile {
             target.poisonTimer = this.poisonDuration;
         } else if (this.special === 'electric' && enemies) {
             const chainTargets = [target];
+            const chained = new Set(chainTargets);
             let currentTarget = target;
 
             for (let i = 0; i < this.chainCount - 1; i++) {
                 let nextTarget = null;
                 let minDist = this.chainRange;
 
-                for (const enemy of enemies) {
-                    if (enemy.alive && !chainTargets.includes(enemy)) {
+                const candidates = grid
+                    ? grid.queryRadius(currentTarget.x, currentTarget.y, this.chainRange, chainQueryScratch)
+                    : enemies;
+
+                for (const enemy of candidates) {
+                    if (enemy.alive && !chained.has(enemy)) {
                         const dx = enemy.x - currentTarget.x;
                         const dy = enemy.y - currentTarget.y;
                         const dist = Math.sqrt(dx * dx + dy * dy);
@@ -91,6 +111,7 @@ class Projectile {
 
                 if (nextTarget) {
                     chainTargets.push(nextTarget);
+                    chained.add(nextTarget);
                     nextTarget.takeDamage(this.damage * 0.5, this.damageType);
                     currentTarget = nextTarget;
                 } else {
@@ -101,30 +122,6 @@ class Projectile {
             this.chainTargets = chainTargets;
         }
     }
-
-    draw(ctx) {
-        if (this.special === 'laser') {
-            ctx.strokeStyle = this.color;
-            ctx.lineWidth = 3;
-            ctx.beginPath();
-            ctx.moveTo(this.x, this.y);
-            if (this.target) {
-                ctx.lineTo(this.target.x, this.target.y);
-            }
-            ctx.stroke();
-        } else {
-            ctx.fillStyle = this.color;
-            ctx.beginPath();
-            ctx.arc(this.x, this.y, 4, 0, Math.PI * 2);
-            ctx.fill();
-
-            if (this.special === 'electric') {
-                ctx.strokeStyle = this.color;
-                ctx.lineWidth = 2;
-                ctx.beginPath();
-                ctx.arc(this.x, this.y, 6, 0, Math.PI * 2);
-                ctx.stroke();
-            }
-        }
-    }
 }
+
+const projectilePool = new ObjectPool(() => new Projectile(0, 0, null, 0, null), 100);
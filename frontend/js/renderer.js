@@ -0,0 +1,563 @@
+// Layered canvas renderer. Everything that doesn't change from one frame to
+// the next is rasterized once: the grid and path into a background layer,
+// tower bases on top of it (redrawn only when towers are placed or sold), and
+// one sprite per enemy type and status and per tower type into an atlas.
+// Each frame blits the layer, stamps sprites with drawImage and batches the
+// remaining shapes into one path per fill or stroke style.
+
+const SPRITE_CELL = 48;       // Atlas cell size; fits the boss and a tower with its barrel
+const ATLAS_COLUMNS = 8;
+const ALPHA_LEVELS = 8;       // Opacity buckets for particles and shield rings, one fill/stroke each
+
+const ENEMY_STATUS_FILLS = [null, '#a8e6ff', '#8e44ad'];  // Normal (own color), frozen, poisoned
+
+function createLayer(width, height) {
+    const layer = document.createElement('canvas');
+    layer.width = width;
+    layer.height = height;
+    return layer;
+}
+
+function alphaLevel(alpha) {
+    return Math.max(0, Math.min(ALPHA_LEVELS - 1, Math.ceil(alpha * ALPHA_LEVELS) - 1));
+}
+
+// Ranges don't change until a tower is built, so the placement preview reads them from here
+const towerRangeCache = {};
+function getTowerRange(type) {
+    if (!(type in towerRangeCache)) {
+        towerRangeCache[type] = new Tower(0, 0, type).range;
+    }
+    return towerRangeCache[type];
+}
+
+class LayeredRenderer {
+    constructor(canvas) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext('2d');
+
+        this.background = createLayer(canvas.width, canvas.height);
+        this.drawBackground(this.background.getContext('2d'));
+        this.towerLayer = createLayer(canvas.width, canvas.height);
+        this.towerLayerTowers = null;
+
+        this.atlas = createLayer(SPRITE_CELL * ATLAS_COLUMNS, SPRITE_CELL * 4);
+        this.atlasCells = 0;
+        this.enemySprites = {};  // type -> [normal, frozen, poisoned]
+        this.towerSprites = {};  // type -> sprite
+
+        // Reused between frames so batching doesn't allocate
+        this.particleBuckets = new Map();  // color -> one list per alpha level
+        this.projectileBatches = new Map();  // color -> { shots, rings, beams }
+        this.shieldRings = Array.from({ length: ALPHA_LEVELS }, () => []);
+        this.healers = [];
+        this.teleporters = [];
+        this.spawners = [];
+        this.profiler = null;  // Set while the profiler overlay is open or recording
+    }
+
+    // Grid lines go into a single path, so the layer costs two strokes and a fill to build
+    drawBackground(c) {
+        const { width, height } = this.canvas;
+        c.strokeStyle = 'rgba(255, 255, 255, 0.1)';
+        c.lineWidth = 1;
+        c.beginPath();
+        for (let x = 0; x <= width; x += GRID_SIZE) {
+            c.moveTo(x, 0);
+            c.lineTo(x, height);
+        }
+        for (let y = 0; y <= height; y += GRID_SIZE) {
+            c.moveTo(0, y);
+            c.lineTo(width, y);
+        }
+        c.stroke();
+
+        c.strokeStyle = '#8B4513';
+        c.lineWidth = 30;
+        c.lineCap = 'round';
+        c.lineJoin = 'round';
+        c.beginPath();
+        c.moveTo(gamePath[0].x, gamePath[0].y);
+        for (let i = 1; i < gamePath.length; i++) {
+            c.lineTo(gamePath[i].x, gamePath[i].y);
+        }
+        c.stroke();
+
+        const endPoint = gamePath[gamePath.length - 1];
+        c.fillStyle = '#ff0000';
+        c.beginPath();
+        c.arc(endPoint.x, endPoint.y, 20, 0, Math.PI * 2);
+        c.fill();
+    }
+
+    // Background plus the non-rotating tower bases, rebuilt when the tower list changes
+    updateTowerLayer(towers) {
+        const previous = this.towerLayerTowers;
+        if (previous && previous.length === towers.length && previous.every((tower, i) => tower === towers[i])) {
+            return;
+        }
+        this.towerLayerTowers = towers.slice();
+
+        const c = this.towerLayer.getContext('2d');
+        c.clearRect(0, 0, this.towerLayer.width, this.towerLayer.height);
+        c.drawImage(this.background, 0, 0);
+        if (towers.length === 0) return;
+
+        c.beginPath();
+        for (const tower of towers) {
+            c.moveTo(tower.x + 12, tower.y);
+            c.arc(tower.x, tower.y, 12, 0, Math.PI * 2);
+        }
+        c.fillStyle = '#444444';
+        c.fill();
+        c.strokeStyle = '#000000';
+        c.lineWidth = 1;
+        c.stroke();
+    }
+
+    // Reserves the next atlas cell, doubling the atlas height when it runs out.
+    // Returns the cell's top-left corner and a context translated to its center.
+    allocateSprite() {
+        const index = this.atlasCells++;
+        const sx = (index % ATLAS_COLUMNS) * SPRITE_CELL;
+        const sy = Math.floor(index / ATLAS_COLUMNS) * SPRITE_CELL;
+        if (sy + SPRITE_CELL > this.atlas.height) {
+            const larger = createLayer(this.atlas.width, this.atlas.height * 2);
+            larger.getContext('2d').drawImage(this.atlas, 0, 0);
+            this.atlas = larger;
+        }
+        const c = this.atlas.getContext('2d');
+        c.setTransform(1, 0, 0, 1, sx + SPRITE_CELL / 2, sy + SPRITE_CELL / 2);
+        return { sx, sy, c };
+    }
+
+    // The parts of Enemy.draw that depend only on type and status
+    rasterizeEnemy(enemy, status) {
+        const sprite = this.allocateSprite();
+        const c = sprite.c;
+        const size = enemy.size;
+
+        c.fillStyle = ENEMY_STATUS_FILLS[status] || enemy.color;
+        c.beginPath();
+        c.arc(0, 0, size, 0, Math.PI * 2);
+        c.fill();
+
+        if (enemy.type === 'armored') {
+            c.strokeStyle = '#666666';
+            c.lineWidth = 3;
+            c.stroke();
+        } else if (enemy.type === 'boss') {
+            c.strokeStyle = '#ffff00';
+            c.lineWidth = 2;
+            c.stroke();
+        } else if (enemy.type === 'flying') {
+            c.strokeStyle = 'rgba(255, 255, 255, 0.5)';
+            c.lineWidth = 1;
+            c.beginPath();
+            c.arc(-3, -3, size * 0.6, 0, Math.PI * 2);
+            c.stroke();
+            c.beginPath();
+            c.arc(3, -3, size * 0.6, 0, Math.PI * 2);
+            c.stroke();
+        } else if (enemy.type === 'splitter') {
+            c.strokeStyle = 'rgba(147, 112, 219, 0.6)';
+            c.lineWidth = 1;
+            c.beginPath();
+            c.arc(0, 0, size - 2, 0, Math.PI * 2);
+            c.stroke();
+        } else if (enemy.type === 'resistant') {
+            c.lineWidth = 2;
+            for (let i = 0; i < 2; i++) {
+                c.strokeStyle = `rgba(105, 105, 105, ${0.4 - i * 0.1})`;
+                c.beginPath();
+                c.arc(0, 0, size + i * 2, 0, Math.PI * 2);
+                c.stroke();
+            }
+        } else if (enemy.type === 'swarm') {
+            c.fillStyle = 'rgba(255, 105, 180, 0.3)';
+            c.beginPath();
+            c.arc(0, 0, size + 2, 0, Math.PI * 2);
+            c.fill();
+        }
+        return sprite;
+    }
+
+    // Tower body and barrel, pointing along +x; the base lives in the tower layer
+    rasterizeTower(tower) {
+        const sprite = this.allocateSprite();
+        const c = sprite.c;
+
+        c.fillStyle = tower.color;
+        c.fillRect(-12, -10, 24, 20);
+        c.strokeStyle = '#000000';
+        c.lineWidth = 2;
+        c.strokeRect(-12, -10, 24, 20);
+
+        c.fillStyle = '#666666';
+        c.fillRect(8, -5, 12, 10);
+        c.lineWidth = 1;
+        c.strokeRect(8, -5, 12, 10);
+        return sprite;
+    }
+
+    enemySprite(enemy) {
+        let sprites = this.enemySprites[enemy.type];
+        if (!sprites) {
+            sprites = this.enemySprites[enemy.type] = [];
+        }
+        const status = enemy.frozenTimer > 0 ? 1 : enemy.poisoned ? 2 : 0;
+        return sprites[status] || (sprites[status] = this.rasterizeEnemy(enemy, status));
+    }
+
+    towerSprite(tower) {
+        return this.towerSprites[tower.type] || (this.towerSprites[tower.type] = this.rasterizeTower(tower));
+    }
+
+    render(state) {
+        const ctx = this.ctx;
+        const profiler = this.profiler;
+        this.updateTowerLayer(state.towers);
+        ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+        ctx.drawImage(this.towerLayer, 0, 0);
+        if (profiler) profiler.lap('draw layers');
+
+        this.drawExplosions(state.explosions);
+        this.drawParticles(state.particles);
+        this.drawDamageNumbers(state.damageNumbers);
+        if (profiler) profiler.lap('draw effects');
+        this.drawEnemies(state.enemies);
+        if (profiler) profiler.lap('draw enemies');
+        this.drawProjectiles(state.projectiles);
+        if (profiler) profiler.lap('draw projectiles');
+        this.drawTowers(state.towers, state.selectedTower);
+        if (profiler) profiler.lap('draw towers');
+    }
+
+    drawExplosions(explosions) {
+        const ctx = this.ctx;
+        for (const explosion of explosions) {
+            if (explosion.opacity <= 0) continue;
+            ctx.globalAlpha = explosion.opacity;
+            ctx.fillStyle = explosion.color;
+            ctx.beginPath();
+            ctx.arc(explosion.x, explosion.y, explosion.radius, 0, Math.PI * 2);
+            ctx.fill();
+        }
+        ctx.globalAlpha = 1;
+    }
+
+    // One path and one fill per particle color and opacity bucket
+    drawParticles(particles) {
+        const ctx = this.ctx;
+        const buckets = this.particleBuckets;
+        for (const particle of particles) {
+            let levels = buckets.get(particle.color);
+            if (!levels) {
+                levels = Array.from({ length: ALPHA_LEVELS }, () => []);
+                buckets.set(particle.color, levels);
+            }
+            levels[alphaLevel(particle.alpha)].push(particle);
+        }
+
+        for (const [color, levels] of buckets) {
+            ctx.fillStyle = color;
+            for (let level = 0; level < ALPHA_LEVELS; level++) {
+                const batch = levels[level];
+                if (batch.length === 0) continue;
+
+                ctx.globalAlpha = (level + 1) / ALPHA_LEVELS;
+                ctx.beginPath();
+                for (const p of batch) {
+                    if (p.type === 'magic') {
+                        // Rotated square, as corners rather than a per-particle transform
+                        const cos = Math.cos(p.angle) * p.size / 2;
+                        const sin = Math.sin(p.angle) * p.size / 2;
+                        ctx.moveTo(p.x - cos + sin, p.y - sin - cos);
+                        ctx.lineTo(p.x + cos + sin, p.y + sin - cos);
+                        ctx.lineTo(p.x + cos - sin, p.y + sin + cos);
+                        ctx.lineTo(p.x - cos - sin, p.y - sin + cos);
+                        ctx.closePath();
+                    } else {
+                        ctx.moveTo(p.x + p.size, p.y);
+                        ctx.arc(p.x, p.y, p.size, 0, Math.PI * 2);
+                    }
+                }
+                ctx.fill();
+                batch.length = 0;
+            }
+        }
+        ctx.globalAlpha = 1;
+    }
+
+    drawDamageNumbers(damageNumbers) {
+        if (damageNumbers.length === 0) return;
+        const ctx = this.ctx;
+        ctx.fillStyle = '#ffff00';
+        ctx.strokeStyle = '#000000';
+        ctx.font = 'bold 14px Arial';
+        ctx.textAlign = 'center';
+        ctx.lineWidth = 3;
+        for (const dmgNum of damageNumbers) {
+            const text = String(dmgNum.damage);
+            ctx.globalAlpha = dmgNum.opacity;
+            ctx.strokeText(text, dmgNum.x, dmgNum.y);
+            ctx.fillText(text, dmgNum.x, dmgNum.y);
+        }
+        ctx.globalAlpha = 1;
+    }
+
+    drawEnemies(enemies) {
+        if (enemies.length === 0) return;
+        const ctx = this.ctx;
+        const half = SPRITE_CELL / 2;
+
+        for (const enemy of enemies) {
+            const sprite = this.enemySprite(enemy);
+            ctx.drawImage(this.atlas, sprite.sx, sprite.sy, SPRITE_CELL, SPRITE_CELL,
+                enemy.x - half, enemy.y - half, SPRITE_CELL, SPRITE_CELL);
+
+            if (enemy.type === 'shielded' && enemy.shield > 0) {
+                this.shieldRings[alphaLevel(enemy.shield / enemy.maxShield)].push(enemy);
+            } else if (enemy.type === 'healer' && enemy.healCooldown === 0) {
+                this.healers.push(enemy);
+            } else if (enemy.type === 'teleporter') {
+                this.teleporters.push(enemy);
+            } else if (enemy.type === 'spawner') {
+                this.spawners.push(enemy);
+            }
+        }
+
+        // Animated rings: every enemy of a type shares the same phase, so one stroke each
+        ctx.lineWidth = 2;
+        ctx.strokeStyle = 'rgb(0, 200, 255)';
+        for (let level = 0; level < ALPHA_LEVELS; level++) {
+            const rings = this.shieldRings[level];
+            if (rings.length === 0) continue;
+            ctx.globalAlpha = (level + 1) / ALPHA_LEVELS;
+            this.strokeRings(rings, 2);
+            rings.length = 0;
+        }
+
+        if (this.teleporters.length > 0) {
+            ctx.globalAlpha = Math.sin(Date.now() / 200) * 0.3 + 0.5;
+            ctx.strokeStyle = '#00ffff';
+            this.strokeRings(this.teleporters, 3);
+            this.teleporters.length = 0;
+        }
+        ctx.globalAlpha = 1;
+
+        if (this.spawners.length > 0) {
+            ctx.strokeStyle = 'rgba(255, 20, 147, 0.5)';
+            this.strokeRings(this.spawners, Math.sin(Date.now() / 300) * 3);
+            this.spawners.length = 0;
+        }
+
+        if (this.healers.length > 0) {
+            ctx.strokeStyle = 'rgba(0, 255, 255, 0.3)';
+            ctx.lineWidth = 1;
+            ctx.beginPath();
+            for (const healer of this.healers) {
+                ctx.moveTo(healer.x + healer.healRange, healer.y);
+                ctx.arc(healer.x, healer.y, healer.healRange, 0, Math.PI * 2);
+            }
+            ctx.stroke();
+            this.healers.length = 0;
+        }
+
+        // Health and shield bars: one path per color
+        ctx.beginPath();
+        for (const enemy of enemies) {
+            if (enemy.shield && enemy.maxShield) {
+                ctx.rect(enemy.x - enemy.size, enemy.y - enemy.size - 12, enemy.size * 2 * enemy.shield / enemy.maxShield, 2);
+            }
+        }
+        ctx.fillStyle = '#0088ff';
+        ctx.fill();
+
+        ctx.beginPath();
+        for (const enemy of enemies) {
+            ctx.rect(enemy.x - enemy.size, enemy.y - enemy.size - 8, enemy.size * 2, 3);
+        }
+        ctx.fillStyle = '#ff0000';
+        ctx.fill();
+
+        ctx.beginPath();
+        for (const enemy of enemies) {
+            ctx.rect(enemy.x - enemy.size, enemy.y - enemy.size - 8, enemy.size * 2 * enemy.health / enemy.maxHealth, 3);
+        }
+        ctx.fillStyle = '#00ff00';
+        ctx.fill();
+    }
+
+    strokeRings(enemies, offset) {
+        const ctx = this.ctx;
+        ctx.beginPath();
+        for (const enemy of enemies) {
+            const radius = enemy.size + offset;
+            ctx.moveTo(enemy.x + radius, enemy.y);
+            ctx.arc(enemy.x, enemy.y, radius, 0, Math.PI * 2);
+        }
+        ctx.stroke();
+    }
+
+    drawProjectiles(projectiles) {
+        if (projectiles.length === 0) return;
+        const ctx = this.ctx;
+        const batches = this.projectileBatches;
+        for (const projectile of projectiles) {
+            let batch = batches.get(projectile.color);
+            if (!batch) {
+                batch = { shots: [], rings: [], beams: [] };
+                batches.set(projectile.color, batch);
+            }
+            if (projectile.special === 'laser') {
+                batch.beams.push(projectile);
+            } else {
+                batch.shots.push(projectile);
+                if (projectile.special === 'electric') batch.rings.push(projectile);
+            }
+        }
+
+        for (const [color, batch] of batches) {
+            if (batch.shots.length > 0) {
+                ctx.fillStyle = color;
+                ctx.beginPath();
+                for (const p of batch.shots) {
+                    ctx.moveTo(p.x + 4, p.y);
+                    ctx.arc(p.x, p.y, 4, 0, Math.PI * 2);
+                }
+                ctx.fill();
+                batch.shots.length = 0;
+            }
+            if (batch.rings.length > 0) {
+                ctx.strokeStyle = color;
+                ctx.lineWidth = 2;
+                ctx.beginPath();
+                for (const p of batch.rings) {
+                    ctx.moveTo(p.x + 6, p.y);
+                    ctx.arc(p.x, p.y, 6, 0, Math.PI * 2);
+                }
+                ctx.stroke();
+                batch.rings.length = 0;
+            }
+            if (batch.beams.length > 0) {
+                ctx.strokeStyle = color;
+                ctx.lineWidth = 3;
+                ctx.beginPath();
+                for (const p of batch.beams) {
+                    if (!p.target) continue;
+                    ctx.moveTo(p.x, p.y);
+                    ctx.lineTo(p.target.x, p.target.y);
+                }
+                ctx.stroke();
+                batch.beams.length = 0;
+            }
+        }
+    }
+
+    drawTowers(towers, selectedTower) {
+        if (towers.length === 0) return;
+        const ctx = this.ctx;
+        const half = SPRITE_CELL / 2;
+
+        for (const tower of towers) {
+            const sprite = this.towerSprite(tower);
+            const cos = Math.cos(tower.angle);
+            const sin = Math.sin(tower.angle);
+            ctx.setTransform(cos, sin, -sin, cos, tower.x, tower.y);
+            ctx.drawImage(this.atlas, sprite.sx, sprite.sy, SPRITE_CELL, SPRITE_CELL, -half, -half, SPRITE_CELL, SPRITE_CELL);
+        }
+        ctx.setTransform(1, 0, 0, 1, 0, 0);
+
+        if (selectedTower) {
+            ctx.strokeStyle = '#ffff00';
+            ctx.lineWidth = 3;
+            ctx.strokeRect(selectedTower.x - 18, selectedTower.y - 18, 36, 36);
+
+            ctx.strokeStyle = 'rgba(255, 255, 0, 0.3)';
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            ctx.arc(selectedTower.x, selectedTower.y, selectedTower.range, 0, Math.PI * 2);
+            ctx.stroke();
+        }
+
+        ctx.strokeStyle = 'rgba(255, 0, 0, 0.3)';
+        ctx.lineWidth = 1;
+        ctx.beginPath();
+        for (const tower of towers) {
+            if (!tower.target) continue;
+            ctx.moveTo(tower.x, tower.y);
+            ctx.lineTo(tower.target.x, tower.target.y);
+        }
+        ctx.stroke();
+    }
+}
+
+const HUD_METHODS = ['fill', 'stroke', 'fillRect', 'strokeRect', 'fillText', 'strokeText', 'drawImage', 'clearRect'];
+
+// Frame-time overlay. Counts draw calls by wrapping the context's drawing
+// methods, and shows running averages of frame time, render time and draws.
+class FrameHud {
+    constructor(ctx) {
+        this.ctx = ctx;
+        this.visible = false;
+        this.instrumented = false;
+        this.drawCalls = 0;
+        this.frameStart = 0;
+        this.lastFrameStart = 0;
+        this.stats = null;  // { frameMs, renderMs, drawCalls }, averaged
+    }
+
+    instrument() {
+        if (this.instrumented) return;
+        this.instrumented = true;
+        for (const name of HUD_METHODS) {
+            const method = this.ctx[name];
+            const hud = this;
+            this.ctx[name] = function(...args) {
+                hud.drawCalls++;
+                return method.apply(this, args);
+            };
+        }
+    }
+
+    toggle() {
+        this.visible = !this.visible;
+        if (this.visible) this.instrument();
+    }
+
+    begin() {
+        this.lastFrameStart = this.frameStart;
+        this.frameStart = performance.now();
+        this.drawCalls = 0;
+    }
+
+    end() {
+        if (!this.visible) return;
+        const renderMs = performance.now() - this.frameStart;
+        const frameMs = this.lastFrameStart ? this.frameStart - this.lastFrameStart : 0;
+        const stats = this.stats || (this.stats = { frameMs, renderMs, drawCalls: this.drawCalls });
+
+        // Exponential moving average, so the numbers settle instead of flickering
+        stats.frameMs += (frameMs - stats.frameMs) * 0.05;
+        stats.renderMs += (renderMs - stats.renderMs) * 0.05;
+        stats.drawCalls += (this.drawCalls - stats.drawCalls) * 0.05;
+    }
+
+    draw(status = null) {
+        if (!this.visible || !this.stats) return;
+        const ctx = this.ctx;
+        const stats = this.stats;
+        const lines = [`  ${stats.frameMs.toFixed(1).padStart(5)} ms/frame ` +
+            `${stats.renderMs.toFixed(2).padStart(6)} ms render ${Math.round(stats.drawCalls).toString().padStart(5)} draws`];
+        if (status) lines.push(status);
+        lines.push('  [H] hide HUD');
+
+        ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
+        ctx.fillRect(4, 4, 430, 8 + lines.length * 14);
+        ctx.fillStyle = '#00ff00';
+        ctx.font = '12px monospace';
+        ctx.textAlign = 'left';
+        lines.forEach((line, i) => ctx.fillText(line, 10, 16 + i * 14));
+    }
+}
@@ -0,0 +1,16 @@
+// Seeded PRNG (mulberry32). Game rules draw from this instead of Math.random
+// so a game is fully reproducible from its seed; cosmetic effects such as
+// particles keep using Math.random.
+function createRng(seed) {
+    let state = seed >>> 0;
+    return function () {
+        state = (state + 0x6D2B79F5) | 0;
+        let t = Math.imul(state ^ (state >>> 15), 1 | state);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+function randomSeed() {
+    return Math.floor(Math.random() * 4294967296);
+}
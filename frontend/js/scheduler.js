@@ -0,0 +1,55 @@
+// Fixed-timestep scheduler for the browser loop. Wall-clock time between
+// animation frames, scaled by the game speed, accumulates and is spent in
+// whole TICK_MS logic steps, so the game runs at the same rate on a 60 Hz and
+// a 144 Hz display and replays see exactly the ticks the player saw.
+//
+// Catching up is budgeted per frame: at most maxSteps steps and budgetMs of
+// wall-clock time. Whatever is left stays in the accumulator for the next
+// frame, up to maxSteps worth; anything beyond that is dropped, so one slow
+// frame makes the game fall behind briefly instead of stalling every frame
+// after it.
+class FixedStepScheduler {
+    constructor({ stepMs = TICK_MS, maxSteps = 48, budgetMs = 12, maxFrameMs = 250 } = {}) {
+        this.stepMs = stepMs;
+        this.maxSteps = maxSteps;
+        this.budgetMs = budgetMs;
+        this.maxFrameMs = maxFrameMs;  // Longer gaps (background tab, debugger) count as this long
+        this.accumulator = 0;
+        this.lastSteps = 0;
+        this.droppedMs = 0;
+    }
+
+    // Forgets time banked while the game wasn't running (paused, not started)
+    reset() {
+        this.accumulator = 0;
+        this.lastSteps = 0;
+    }
+
+    // Runs step() for every whole tick of elapsedMs * speed, while canStep()
+    // holds and the frame's budget lasts; returns the number of steps run
+    advance(elapsedMs, speed, step, canStep = () => true) {
+        this.accumulator += Math.min(elapsedMs, this.maxFrameMs) * speed;
+
+        const start = performance.now();
+        let steps = 0;
+        while (this.accumulator >= this.stepMs && steps < this.maxSteps && canStep()) {
+            step();
+            this.accumulator -= this.stepMs;
+            steps++;
+            if (performance.now() - start > this.budgetMs) break;
+        }
+
+        const maxBacklog = this.stepMs * this.maxSteps;
+        if (this.accumulator > maxBacklog) {
+            this.droppedMs += this.accumulator - maxBacklog;
+            this.accumulator = maxBacklog;
+        }
+        this.lastSteps = steps;
+        return steps;
+    }
+
+    // How far between the last tick and the next one the current frame is, 0..1
+    get alpha() {
+        return Math.min(1, this.accumulator / this.stepMs);
+    }
+}
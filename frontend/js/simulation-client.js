@@ -0,0 +1,159 @@
+// Page side of the worker simulation: same interface as Simulation for
+// everything game.js calls, backed by simulation-worker.js. Commands are
+// checked against the mirrored state so the UI can react at once and then
+// queued to the worker, which re-checks them and is authoritative. State
+// arrives as snapshots (see snapshot.js) and effects are replayed through
+// the same hooks the in-page Simulation calls.
+class SimulationWorkerClient {
+    constructor(state, { effects = {}, workerUrl = 'js/simulation-worker.js' } = {}) {
+        this.state = state;
+        this.effects = Object.assign({ commandsApplied() {} }, NO_EFFECTS, effects);
+        this.mirror = new SnapshotMirror(state);
+        // Placement and hit tests run locally over the mirrored towers
+        this.queries = new Simulation(state);
+        this.replay = null;
+        this.receivedAt = 0;
+        this.pendingCommands = 0;
+        this.session = 0;  // Bumped on reset; snapshots from an earlier game are dropped
+        this.sentControl = { paused: null, speed: null };
+        this.profiler = null;
+
+        this.worker = new Worker(workerUrl);
+        this.worker.onmessage = ({ data }) => this.receive(data);
+        this.worker.onerror = error => console.error('Simulation worker failed:', error.message);
+    }
+
+    reset(difficulty, seed) {
+        Object.assign(this.state, createSimulationState(difficulty, seed));
+        this.mirror.clear();
+        this.replay = null;
+        this.pendingCommands = 0;
+        this.session++;
+        this.worker.postMessage({ type: 'reset', session: this.session, difficulty, seed });
+    }
+
+    start() {
+        this.worker.postMessage({ type: 'start' });
+    }
+
+    // Forwards pause and speed changes; called once per frame
+    sync() {
+        const { paused, gameSpeed } = this.state;
+        if (paused !== this.sentControl.paused || gameSpeed !== this.sentControl.speed) {
+            this.sentControl = { paused, speed: gameSpeed };
+            this.worker.postMessage({ type: 'control', paused, speed: gameSpeed });
+        }
+    }
+
+    // Phase timings come from the worker, merged into the page's FrameProfiler
+    setProfiler(profiler) {
+        this.profiler = profiler;
+        this.worker.postMessage({
+            type: 'profile',
+            enabled: profiler !== null,
+            tracing: profiler !== null && profiler.recording
+        });
+    }
+
+    send(op, ...args) {
+        this.pendingCommands++;
+        this.worker.postMessage({ type: 'command', command: [op, ...args] });
+        return true;
+    }
+
+    receive(message) {
+        if (message.type !== 'snapshot') return;
+
+        this.mirror.addColors(message.colors);
+        const current = message.session === this.session;
+        if (current) {
+            this.mirror.read(new Float64Array(message.buffer));
+        }
+        this.worker.postMessage({ type: 'release', buffer: message.buffer }, [message.buffer]);
+        if (!current) return;
+        this.receivedAt = performance.now();
+        if (message.profile && this.profiler) {
+            this.profiler.merge(message.profile);
+        }
+        if (message.replay) {
+            this.replay = message.replay;
+        }
+
+        for (const [name, ...args] of message.events) {
+            this.effects[name](...args);
+        }
+        if (this.pendingCommands > 0) {
+            this.pendingCommands = 0;
+            this.effects.commandsApplied();
+        }
+    }
+
+    // Fraction of a tick since the last snapshot, for interpolating between its positions
+    alphaAt(now) {
+        return Math.min(1, (now - this.receivedAt) * this.state.gameSpeed / TICK_MS);
+    }
+
+    isOnPath(x, y) {
+        return this.queries.isOnPath(x, y);
+    }
+
+    canPlaceTower(x, y) {
+        return this.queries.canPlaceTower(x, y);
+    }
+
+    findTowerAt(x, y, radius) {
+        return this.queries.findTowerAt(x, y, radius);
+    }
+
+    findTowerById(id) {
+        return this.queries.findTowerById(id);
+    }
+
+    getReplay() {
+        return this.replay;
+    }
+
+    placeTower(type, x, y) {
+        if (!isTowerType(type)) return null;
+        const tower = new Tower(x, y, type);
+        if (this.state.gameOver || this.state.money < tower.cost || !this.canPlaceTower(x, y)) {
+            return null;
+        }
+        this.send('place', type, x, y);
+        return tower;
+    }
+
+    upgradeTower(tower, pathId = null) {
+        if (this.state.gameOver || this.state.money < tower.getUpgradeCost() || tower.level >= 5) {
+            return false;
+        }
+        return this.send('upgrade', tower.id, tower.level === 2 && !tower.upgradePath ? pathId : null);
+    }
+
+    sellTower(tower) {
+        if (this.state.gameOver || !this.state.towers.includes(tower)) {
+            return false;
+        }
+        return this.send('sell', tower.id);
+    }
+
+    canActivate(ability) {
+        return !this.state.gameOver && ability.cooldown === 0 && this.state.money >= ability.cost && !ability.active;
+    }
+
+    activateAirStrike(x, y) {
+        return this.canActivate(this.state.abilities.airstrike) && this.send('airstrike', x, y);
+    }
+
+    activateTimeSlow() {
+        return this.canActivate(this.state.abilities.timeslow) && this.send('timeslow');
+    }
+
+    activateTowerBoost() {
+        return this.canActivate(this.state.abilities.towerboost) && this.send('towerboost');
+    }
+
+    startWaveNow() {
+        return !this.state.gameOver && this.state.waveCountdownActive && this.send('startwave');
+    }
+}
@@ -0,0 +1,149 @@
+// Runs the simulation off the main thread (index.html?worker). The worker
+// owns the game state and steps it on its own fixed-timestep loop; the page
+// only renders and handles input.
+//
+// Messages in:  reset {session, difficulty, seed}, start, control {paused, speed},
+//               command {command: [op, ...args]}, release {buffer},
+//               profile {enabled, tracing}
+// Messages out: snapshot {session, buffer, colors, events, replay, profile}
+//
+// Commands queue up and are applied between ticks in arrival order, through
+// the same applyCommand the replay verifier uses, so they land in the
+// command log exactly as if the page had run them itself. Effects (particles,
+// wave start, game over...) are collected per batch and replayed on the page.
+importScripts(
+    'pool.js', 'spatial-grid.js', 'rng.js', 'path.js', 'definitions.js', 'enemy.js',
+    'tower.js', 'projectile.js', 'simulation.js', 'scheduler.js', 'snapshot.js', 'profiler.js'
+);
+
+const state = createSimulationState('normal');
+const events = [];
+const effects = {};
+for (const name of Object.keys(NO_EFFECTS)) {
+    effects[name] = (...args) => events.push([name, ...args]);
+}
+const simulation = new Simulation(state, { effects });
+const scheduler = new FixedStepScheduler();
+const commandQueue = [];
+// Phase timings for the page's profiler overlay, while it is open
+const profiler = new PhaseProfiler();
+
+let session = 0;
+let running = false;
+let paused = false;
+let speed = 1;
+let lastLoopTime = null;
+
+// Colors are sent once, as they first appear, and referenced by index after that
+const colorIds = new Map();
+let newColors = [];
+function colorIndex(color) {
+    let id = colorIds.get(color);
+    if (id === undefined) {
+        id = colorIds.size;
+        colorIds.set(color, id);
+        newColors.push(color);
+    }
+    return id;
+}
+
+// Snapshot buffers come back from the page once read, so steady state allocates none
+const freeBuffers = [];
+function takeBuffer(byteLength) {
+    for (let i = 0; i < freeBuffers.length; i++) {
+        if (freeBuffers[i].byteLength >= byteLength) {
+            return freeBuffers.splice(i, 1)[0];
+        }
+    }
+    return new ArrayBuffer(Math.max(64 * 1024, byteLength * 2));
+}
+
+function publish() {
+    const length = snapshotLength(state);
+    const buffer = takeBuffer(length * Float64Array.BYTES_PER_ELEMENT);
+    writeSnapshot(state, new Float64Array(buffer, 0, length), colorIndex);
+    postMessage({
+        type: 'snapshot',
+        session,
+        buffer,
+        colors: newColors,
+        events: events.splice(0),
+        replay: state.gameOver ? simulation.getReplay() : null,
+        profile: simulation.profiler ? profiler.drain() : null
+    }, [buffer]);
+    newColors = [];
+}
+
+// Remembers where enemies and projectiles were before the tick, for interpolation on the page
+function step() {
+    const nextTick = state.tick + 1;
+    for (const enemy of state.enemies) {
+        enemy.prevX = enemy.x;
+        enemy.prevY = enemy.y;
+        enemy.prevTick = nextTick;
+    }
+    for (const projectile of state.projectiles) {
+        projectile.prevX = projectile.x;
+        projectile.prevY = projectile.y;
+        projectile.prevTick = nextTick;
+    }
+    simulation.step();
+}
+
+function loop() {
+    const now = performance.now();
+    const elapsedMs = lastLoopTime === null ? 0 : now - lastLoopTime;
+    lastLoopTime = now;
+
+    const hadCommands = commandQueue.length > 0;
+    for (const command of commandQueue.splice(0)) {
+        simulation.applyCommand([state.tick, ...command]);
+    }
+
+    let steps = 0;
+    if (running && !paused && !state.gameOver) {
+        steps = scheduler.advance(elapsedMs, speed, step, () => !state.gameOver);
+    } else {
+        scheduler.reset();
+    }
+
+    if (steps > 0 || hadCommands || events.length > 0) {
+        publish();
+    }
+    setTimeout(loop, TICK_MS);
+}
+
+onmessage = ({ data }) => {
+    switch (data.type) {
+        case 'reset':
+            session = data.session;
+            simulation.reset(data.difficulty, data.seed);
+            running = false;
+            commandQueue.length = 0;
+            events.length = 0;
+            publish();
+            break;
+        case 'start':
+            simulation.start();
+            running = true;
+            publish();
+            break;
+        case 'control':
+            paused = data.paused;
+            speed = data.speed;
+            break;
+        case 'command':
+            commandQueue.push(data.command);
+            break;
+        case 'release':
+            freeBuffers.push(data.buffer);
+            break;
+        case 'profile':
+            profiler.drain();
+            profiler.trace = data.tracing ? [] : null;
+            simulation.setProfiler(data.enabled ? profiler : null);
+            break;
+    }
+};
+
+loop();
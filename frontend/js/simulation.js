@@ -0,0 +1,717 @@
+// Headless game rules. Everything here runs without a DOM: the browser wires
+// rendering and UI through the effects hooks, and Node loads the same scripts
+// (see backend/engine) to simulate games faster than real time.
+
+const CANVAS_WIDTH = 800;
+const CANVAS_HEIGHT = 600;
+
+const GRID_SIZE = 40;
+const COLS = CANVAS_WIDTH / GRID_SIZE;
+const ROWS = CANVAS_HEIGHT / GRID_SIZE;
+
+// Logic ticks per second of game time
+const TICK_RATE = 60;
+const TICK_MS = 1000 / TICK_RATE;
+
+// Durations are specified in seconds of game time and counted down in ticks
+function secondsToTicks(seconds) {
+    return Math.round(seconds * TICK_RATE);
+}
+
+const gamePath = [
+    { x: 0, y: 200 },
+    { x: 200, y: 200 },
+    { x: 200, y: 400 },
+    { x: 400, y: 400 },
+    { x: 400, y: 100 },
+    { x: 600, y: 100 },
+    { x: 600, y: 500 },
+    { x: 800, y: 500 }
+];
+
+// Cells within this distance of the path centreline can't be built on
+const PATH_BUFFER = 35;
+const gamePathModel = new PathModel(gamePath, { cellSize: GRID_SIZE, cols: COLS, rows: ROWS, buffer: PATH_BUFFER });
+
+const difficultySettings = {
+    easy: {
+        health: 50,  // Reduced from 150
+        money: 300,  // Reduced from 750 - forces strategic choices
+        enemyHealthMultiplier: 0.8,  // Slightly harder
+        rewardMultiplier: 1.2  // Reduced from 1.3
+    },
+    normal: {
+        health: 30,  // Reduced from 100 - much harder!
+        money: 200,  // Reduced from 500 - very limited starting resources
+        enemyHealthMultiplier: 1.0,
+        rewardMultiplier: 0.9  // Less reward
+    },
+    hard: {
+        health: 20,  // Reduced from 75 - brutal!
+        money: 150,  // Reduced from 350 - extreme resource management required
+        enemyHealthMultiplier: 1.3,  // Harder enemies
+        rewardMultiplier: 0.7  // Much less reward
+    }
+};
+
+// Spawn plans compiled from WAVE_COMPOSITION, keyed by difficulty and wave.
+// A plan is built once, frozen and shared: the simulation walks plan.spawns
+// with a cursor (state.enemiesSpawned) and the next-wave preview reads
+// plan.groups, so both always agree.
+const wavePlanCache = new Map();
+
+function getWavePlan(wave, difficulty) {
+    const key = `${difficulty}:${wave}`;
+    let plan = wavePlanCache.get(key);
+    if (!plan) {
+        const groups = [];
+        const spawns = [];
+        for (const rule of WAVE_COMPOSITION) {
+            const count = waveEnemyCount(rule, wave);
+            if (count === 0) continue;
+            groups.push({ type: rule.type, count });
+            for (let i = 0; i < count; i++) {
+                spawns.push(rule.type);
+            }
+        }
+        plan = deepFreeze({
+            wave,
+            difficulty,
+            healthMultiplier: difficultySettings[difficulty].enemyHealthMultiplier,
+            groups,
+            spawns
+        });
+        wavePlanCache.set(key, plan);
+    }
+    return plan;
+}
+
+function createAbilities() {
+    return {
+        airstrike: {
+            name: 'Air Strike',
+            cost: 100,
+            cooldown: 0,
+            maxCooldown: secondsToTicks(10),
+            damage: 100,
+            radius: 80
+        },
+        timeslow: {
+            name: 'Time Slow',
+            cost: 80,
+            cooldown: 0,
+            maxCooldown: secondsToTicks(15),
+            duration: secondsToTicks(5),
+            slowAmount: 0.5,
+            active: false,
+            timer: 0
+        },
+        towerboost: {
+            name: 'Tower Boost',
+            cost: 60,
+            cooldown: 0,
+            maxCooldown: secondsToTicks(12),
+            duration: secondsToTicks(6),
+            boostAmount: 2.0,  // 2x damage
+            active: false,
+            timer: 0
+        }
+    };
+}
+
+// Fresh simulation state for a new game. The browser extends this object with
+// its own UI fields (selection, particles, ...) and uses it as gameState.
+function createSimulationState(difficulty = 'normal', seed = 0) {
+    const settings = difficultySettings[difficulty];
+    return {
+        seed,
+        difficulty,
+        tick: 0,
+        health: settings.health,
+        money: settings.money,
+        wave: 0,
+        score: 0,
+        gameOver: false,
+        enemies: [],
+        towers: [],
+        projectiles: [],
+        waveInProgress: false,
+        enemiesSpawned: 0,
+        enemiesToSpawn: 0,
+        spawnTimer: 0,
+        spawnPlan: null,  // The current wave's plan; enemiesSpawned is the cursor into it
+        waveCountdown: 0,
+        waveCountdownActive: false,
+        nextTowerId: 1,
+        // Input log of [tick, op, ...args] entries; with the seed it reproduces the game
+        commands: [],
+        abilities: createAbilities()
+    };
+}
+
+// Hooks the simulation calls for anything that is not a game rule. Headless
+// runs keep these no-ops; the browser fills them in with particles and DOM updates.
+const NO_EFFECTS = {
+    particleBurst() {},
+    explosion() {},
+    damageNumber() {},
+    waveStarted() {},
+    waveCountdownStarted() {},
+    gameOver() {}
+};
+
+class Simulation {
+    constructor(state, { effects = {} } = {}) {
+        this.state = state;
+        this.effects = Object.assign({}, NO_EFFECTS, effects);
+        this.rng = createRng(state.seed);
+        this.enemyGrid = new SpatialGrid(CANVAS_WIDTH, CANVAS_HEIGHT, GRID_SIZE);
+        this.splashQueryScratch = [];
+        this.accumulator = 0;
+        this.profiler = null;
+    }
+
+    // A PhaseProfiler (profiler.js) to time each phase of step() with, or null
+    setProfiler(profiler) {
+        this.profiler = profiler;
+    }
+
+    // Starts a new game on the same state object, keeping any extra fields the caller added
+    reset(difficulty, seed) {
+        for (const projectile of this.state.projectiles) {
+            projectilePool.release(projectile);
+        }
+        Object.assign(this.state, createSimulationState(difficulty, seed));
+        this.rng = createRng(seed);
+        this.accumulator = 0;
+    }
+
+    start() {
+        this.startWaveCountdown();
+    }
+
+    // Advances by a wall-clock duration in fixed TICK_MS steps; returns the number of ticks run
+    advance(ms, maxSteps = Infinity) {
+        this.accumulator += ms;
+        let steps = 0;
+        while (this.accumulator >= TICK_MS && steps < maxSteps && !this.state.gameOver) {
+            this.step();
+            this.accumulator -= TICK_MS;
+            steps++;
+        }
+        return steps;
+    }
+
+    // Runs ticks until the game ends or maxTicks is reached; returns the number of ticks run
+    runUntilGameOver(maxTicks = Infinity) {
+        let ticks = 0;
+        while (!this.state.gameOver && ticks < maxTicks) {
+            this.step();
+            ticks++;
+        }
+        return ticks;
+    }
+
+    // O(1): looks up the precomputed blocked-cells bitmap for the cell containing (x, y)
+    isOnPath(x, y) {
+        return gamePathModel.isBlocked(x, y);
+    }
+
+    isTooCloseToTower(x, y, minDistance = 40) {
+        for (const tower of this.state.towers) {
+            const dx = tower.x - x;
+            const dy = tower.y - y;
+            const distance = Math.sqrt(dx * dx + dy * dy);
+
+            if (distance < minDistance) {
+                return true;
+            }
+        }
+
+        return false;
+    }
+
+    canPlaceTower(x, y) {
+        return !this.isOnPath(x, y) && !this.isTooCloseToTower(x, y);
+    }
+
+    findTowerById(id) {
+        return this.state.towers.find(tower => tower.id === id) || null;
+    }
+
+    findTowerAt(x, y, radius = 20) {
+        for (const tower of this.state.towers) {
+            const dx = tower.x - x;
+            const dy = tower.y - y;
+            if (Math.sqrt(dx * dx + dy * dy) < radius) {
+                return tower;
+            }
+        }
+        return null;
+    }
+
+    // ------------------------------------------------------------------
+    // Player commands. Each returns the result (or false) without touching the
+    // DOM, and successful commands are appended to state.commands.
+    // ------------------------------------------------------------------
+
+    record(op, ...args) {
+        this.state.commands.push([this.state.tick, op, ...args]);
+    }
+
+    // Everything needed to re-simulate this game from scratch
+    getReplay() {
+        const state = this.state;
+        return {
+            version: 1,
+            seed: state.seed,
+            difficulty: state.difficulty,
+            ticks: state.tick,
+            commands: state.commands
+        };
+    }
+
+    // Re-issues one entry from a command log; returns whether it succeeded
+    applyCommand([, op, ...args]) {
+        switch (op) {
+            case 'place':
+                return Boolean(this.placeTower(args[0], args[1], args[2]));
+            case 'upgrade': {
+                const tower = this.findTowerById(args[0]);
+                return Boolean(tower) && this.upgradeTower(tower, args[1]);
+            }
+            case 'sell': {
+                const tower = this.findTowerById(args[0]);
+                return Boolean(tower) && this.sellTower(tower);
+            }
+            case 'airstrike':
+                return this.activateAirStrike(args[0], args[1]);
+            case 'timeslow':
+                return this.activateTimeSlow();
+            case 'towerboost':
+                return this.activateTowerBoost();
+            case 'startwave':
+                return this.startWaveNow();
+            default:
+                return false;
+        }
+    }
+
+    placeTower(type, x, y) {
+        const state = this.state;
+        if (state.gameOver || !isTowerType(type)) {
+            return null;
+        }
+
+        const tower = new Tower(x, y, type);
+
+        if (state.money < tower.cost || !this.canPlaceTower(x, y)) {
+            return null;
+        }
+
+        tower.id = state.nextTowerId++;
+
+        // Apply tower boost if active
+        const towerboost = state.abilities.towerboost;
+        if (towerboost.active) {
+            tower.originalDamage = tower.damage;
+            tower.damage *= towerboost.boostAmount;
+            tower.boosted = true;
+        }
+
+        state.towers.push(tower);
+        state.money -= tower.cost;
+        this.record('place', type, x, y);
+        return tower;
+    }
+
+    // Level 2 towers must pick an upgrade path as part of their next upgrade
+    upgradeTower(tower, pathId = null) {
+        const upgradeCost = tower.getUpgradeCost();
+        if (this.state.gameOver || this.state.money < upgradeCost || tower.level >= 5) {
+            return false;
+        }
+
+        const needsPath = tower.level === 2 && !tower.upgradePath;
+        if (needsPath && !tower.getUpgradePaths().some(p => p.id === pathId)) {
+            return false;
+        }
+
+        this.state.money -= upgradeCost;
+        tower.upgrade();
+        if (needsPath) {
+            tower.chooseUpgradePath(pathId);
+        }
+        tower.sellValue = Math.floor(tower.sellValue * 1.5);
+        this.record('upgrade', tower.id, needsPath ? pathId : null);
+        return true;
+    }
+
+    sellTower(tower) {
+        const index = this.state.towers.indexOf(tower);
+        if (this.state.gameOver || index === -1) {
+            return false;
+        }
+        this.state.money += tower.sellValue;
+        this.state.towers.splice(index, 1);
+        this.record('sell', tower.id);
+        return true;
+    }
+
+    startWaveNow() {
+        if (this.state.gameOver || !this.state.waveCountdownActive) {
+            return false;
+        }
+        this.state.waveCountdown = 0;
+        this.record('startwave');
+        return true;
+    }
+
+    activateAirStrike(x, y) {
+        const state = this.state;
+        const ability = state.abilities.airstrike;
+
+        if (state.gameOver || ability.cooldown > 0 || state.money < ability.cost) {
+            return false;
+        }
+
+        // Deduct cost and start cooldown
+        state.money -= ability.cost;
+        ability.cooldown = ability.maxCooldown;
+
+        // Deal damage to all enemies in radius
+        for (const enemy of state.enemies) {
+            const dx = enemy.x - x;
+            const dy = enemy.y - y;
+            const distance = Math.sqrt(dx * dx + dy * dy);
+
+            if (distance <= ability.radius) {
+                enemy.takeDamage(ability.damage, 'splash');
+            }
+        }
+
+        // Create large explosion effect
+        this.effects.explosion(x, y, 20, 40, '#ff4500');
+
+        // Create dramatic explosion particles
+        this.effects.particleBurst(x, y, 30, 'spark');
+        this.effects.particleBurst(x, y, 15, 'smoke');
+        this.effects.particleBurst(x, y, 10, 'energy');
+
+        this.record('airstrike', x, y);
+        return true;
+    }
+
+    activateTimeSlow() {
+        const state = this.state;
+        const ability = state.abilities.timeslow;
+
+        if (state.gameOver || ability.cooldown > 0 || state.money < ability.cost || ability.active) {
+            return false;
+        }
+
+        // Deduct cost and start cooldown
+        state.money -= ability.cost;
+        ability.cooldown = ability.maxCooldown;
+        ability.active = true;
+        ability.timer = ability.duration;
+
+        // Slow all enemies
+        for (const enemy of state.enemies) {
+            if (!enemy.originalSpeed) {
+                enemy.originalSpeed = enemy.speed;
+            }
+            enemy.speed *= ability.slowAmount;
+            enemy.timeSlowed = true;
+        }
+
+        this.record('timeslow');
+        return true;
+    }
+
+    activateTowerBoost() {
+        const state = this.state;
+        const ability = state.abilities.towerboost;
+
+        if (state.gameOver || ability.cooldown > 0 || state.money < ability.cost || ability.active) {
+            return false;
+        }
+
+        // Deduct cost and start cooldown
+        state.money -= ability.cost;
+        ability.cooldown = ability.maxCooldown;
+        ability.active = true;
+        ability.timer = ability.duration;
+
+        // Boost all towers
+        for (const tower of state.towers) {
+            if (!tower.originalDamage) {
+                tower.originalDamage = tower.damage;
+            }
+            tower.damage *= ability.boostAmount;
+            tower.boosted = true;
+        }
+
+        this.record('towerboost');
+        return true;
+    }
+
+    // ------------------------------------------------------------------
+    // Waves
+    // ------------------------------------------------------------------
+
+    spawnWave() {
+        const state = this.state;
+        if (state.waveInProgress) return;
+
+        state.wave++;
+        state.waveInProgress = true;
+        state.enemiesSpawned = 0;
+
+        const plan = getWavePlan(state.wave, state.difficulty);
+        state.spawnPlan = plan;
+        state.enemiesToSpawn = plan.spawns.length;
+        state.spawnTimer = 0;
+
+        this.effects.waveStarted();
+    }
+
+    startWaveCountdown() {
+        // Compile the next wave's plan now, while nothing is spawning
+        getWavePlan(this.state.wave + 1, this.state.difficulty);
+        this.state.waveCountdown = secondsToTicks(10);
+        this.state.waveCountdownActive = true;
+        this.effects.waveCountdownStarted();
+    }
+
+    spawnEnemy() {
+        const state = this.state;
+        if (state.enemiesSpawned >= state.enemiesToSpawn) return;
+
+        const plan = state.spawnPlan;
+        const enemyType = plan.spawns[state.enemiesSpawned];
+        const enemy = new Enemy(gamePathModel, enemyType, state.wave, plan.healthMultiplier);
+
+        // Apply time slow if active
+        const timeslow = state.abilities.timeslow;
+        if (timeslow.active) {
+            enemy.originalSpeed = enemy.speed;
+            enemy.speed *= timeslow.slowAmount;
+            enemy.timeSlowed = true;
+        }
+
+        state.enemies.push(enemy);
+        state.enemiesSpawned++;
+    }
+
+    endGame() {
+        this.state.gameOver = true;
+        this.effects.gameOver();
+    }
+
+    // ------------------------------------------------------------------
+    // One fixed logic tick
+    // ------------------------------------------------------------------
+
+    step() {
+        const state = this.state;
+        const effects = this.effects;
+        const enemyGrid = this.enemyGrid;
+        const profiler = this.profiler;
+        if (profiler) profiler.mark();
+
+        state.tick++;
+
+        // Update ability cooldowns
+        for (const abilityKey in state.abilities) {
+            const ability = state.abilities[abilityKey];
+            if (ability.cooldown > 0) {
+                ability.cooldown--;
+            }
+        }
+
+        // Update Time Slow ability
+        const timeslow = state.abilities.timeslow;
+        if (timeslow.active) {
+            timeslow.timer--;
+            if (timeslow.timer <= 0) {
+                timeslow.active = false;
+                // Restore enemy speeds
+                for (const enemy of state.enemies) {
+                    if (enemy.timeSlowed) {
+                        enemy.speed = enemy.originalSpeed || enemy.speed / timeslow.slowAmount;
+                        enemy.timeSlowed = false;
+                    }
+                }
+            }
+        }
+
+        // Update Tower Boost ability
+        const towerboost = state.abilities.towerboost;
+        if (towerboost.active) {
+            towerboost.timer--;
+            if (towerboost.timer <= 0) {
+                towerboost.active = false;
+                // Restore tower damage
+                for (const tower of state.towers) {
+                    if (tower.boosted) {
+                        tower.damage = tower.originalDamage || tower.damage / towerboost.boostAmount;
+                        tower.boosted = false;
+                    }
+                }
+            }
+        }
+
+        if (state.waveInProgress && state.enemiesSpawned < state.enemiesToSpawn) {
+            state.spawnTimer++;
+            if (state.spawnTimer >= 40) {
+                this.spawnEnemy();
+                state.spawnTimer = 0;
+            }
+        }
+        if (profiler) profiler.lap('tick abilities');
+
+        for (let i = state.enemies.length - 1; i >= 0; i--) {
+            const enemy = state.enemies[i];
+            const status = enemy.update(state.enemies, this.rng);
+
+            if (status === 'reached_end') {
+                state.health -= enemy.damage;
+                swapRemove(state.enemies, i);
+
+                if (state.health <= 0 && !state.gameOver) {
+                    this.endGame();
+                }
+            } else if (!enemy.alive) {
+                const rewardMod = difficultySettings[state.difficulty].rewardMultiplier;
+                state.money += Math.floor(enemy.reward * rewardMod);
+                state.score += Math.floor(enemy.reward * state.wave * rewardMod);
+
+                // Create death particles based on enemy type
+                if (enemy.flying) {
+                    effects.particleBurst(enemy.x, enemy.y, 10, 'energy');
+                } else if (enemy.type === 'boss') {
+                    effects.particleBurst(enemy.x, enemy.y, 30, 'spark');
+                    effects.particleBurst(enemy.x, enemy.y, 15, 'smoke');
+                } else if (enemy.type === 'splitter') {
+                    effects.particleBurst(enemy.x, enemy.y, 15, 'magic');
+                } else if (enemy.type === 'spawner') {
+                    effects.particleBurst(enemy.x, enemy.y, 12, 'magic');
+                } else {
+                    effects.particleBurst(enemy.x, enemy.y, 8, 'blood');
+                }
+
+                // Handle splitter enemy splitting
+                if (enemy.shouldSplit) {
+                    const difficultyMod = difficultySettings[state.difficulty].enemyHealthMultiplier;
+                    for (let j = 0; j < 2; j++) {
+                        const splitEnemy = new Enemy(gamePathModel, 'splitter', state.wave, difficultyMod * 0.5);
+                        gamePathModel.moveTo(splitEnemy, Math.max(0, enemy.distance + (this.rng() * 30 - 15)));
+                        splitEnemy.splitGeneration = enemy.splitGeneration + 1;
+                        state.enemies.push(splitEnemy);
+                    }
+                }
+
+                swapRemove(state.enemies, i);
+            }
+        }
+
+        if (profiler) profiler.lap('tick enemies');
+
+        enemyGrid.rebuild(state.enemies);
+        if (profiler) profiler.lap('tick grid');
+
+        for (const tower of state.towers) {
+            const projectile = tower.update(state.enemies, enemyGrid, effects);
+            if (projectile) {
+                state.projectiles.push(projectile);
+            }
+        }
+        if (profiler) profiler.lap('tick towers');
+
+        for (let i = state.projectiles.length - 1; i >= 0; i--) {
+            const projectile = state.projectiles[i];
+            const result = projectile.update(state.enemies, enemyGrid, effects);
+
+            if (result.hit) {
+                if (projectile.target) {
+                    this.applyProjectileHit(projectile, result);
+                }
+                projectilePool.release(swapRemove(state.projectiles, i));
+            } else if (!projectile.alive) {
+                projectilePool.release(swapRemove(state.projectiles, i));
+            }
+        }
+        if (profiler) profiler.lap('tick projectiles');
+
+        if (state.waveInProgress &&
+            state.enemiesSpawned >= state.enemiesToSpawn &&
+            state.enemies.length === 0) {
+            state.waveInProgress = false;
+            state.money += 100 + state.wave * 20;
+            state.score += 100 * state.wave;
+            this.startWaveCountdown();
+        }
+
+        if (state.waveCountdownActive) {
+            state.waveCountdown--;
+
+            if (state.waveCountdown <= 0) {
+                state.waveCountdownActive = false;
+                this.spawnWave();
+            }
+        }
+        if (profiler) profiler.lap('tick waves');
+    }
+
+    applyProjectileHit(projectile, result) {
+        const effects = this.effects;
+        const actualDamage = projectile.damage * (projectile.target.resistances[projectile.damageType] || 1);
+        const killed = projectile.target.takeDamage(projectile.damage, projectile.damageType);
+
+        // Track tower stats
+        if (projectile.tower) {
+            projectile.tower.totalDamageDealt += actualDamage;
+            if (killed) {
+                projectile.tower.kills++;
+            }
+        }
+
+        // Add damage number
+        effects.damageNumber(result.x, result.y, Math.floor(actualDamage));
+        effects.explosion(result.x, result.y, projectile.splashRadius > 0 ? 10 : 5, 20, projectile.color);
+
+        // Create hit particles based on projectile type
+        if (projectile.splashRadius > 0) {
+            effects.particleBurst(result.x, result.y, 12, 'spark');
+            effects.particleBurst(result.x, result.y, 6, 'smoke');
+        } else if (projectile.special === 'poison') {
+            effects.particleBurst(result.x, result.y, 8, 'magic');
+        } else if (projectile.special === 'electric') {
+            effects.particleBurst(result.x, result.y, 10, 'energy');
+        } else if (projectile.special === 'freeze') {
+            effects.particleBurst(result.x, result.y, 8, 'energy');
+        } else {
+            effects.particleBurst(result.x, result.y, 5, 'spark');
+        }
+
+        if (projectile.splashRadius > 0) {
+            const splashTargets = this.enemyGrid.queryRadius(result.x, result.y, projectile.splashRadius, this.splashQueryScratch);
+            for (const enemy of splashTargets) {
+                if (enemy !== projectile.target && enemy.alive) {
+                    const splashDamage = projectile.damage * 0.5;
+                    const splashActualDamage = splashDamage * (enemy.resistances[projectile.damageType] || 1);
+                    const splashKilled = enemy.takeDamage(splashDamage, projectile.damageType);
+
+                    // Track splash damage stats
+                    if (projectile.tower) {
+                        projectile.tower.totalDamageDealt += splashActualDamage;
+                        if (splashKilled) {
+                            projectile.tower.kills++;
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
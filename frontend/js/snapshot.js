@@ -0,0 +1,261 @@
+// Binary snapshot of the simulation state, for running the simulation in a
+// Web Worker (see simulation-worker.js). The worker writes everything the
+// main thread draws or shows in the UI into one Float64Array after each batch
+// of ticks and transfers the buffer; the main thread copies it into its
+// mirror of the state and hands the buffer back to be reused.
+//
+// Layout: a fixed header, then one fixed-size record per enemy, tower and
+// projectile. Strings travel as indices into the type lists below, or into a
+// color table the worker extends as new colors appear.
+
+const SNAPSHOT_HEADER = 19;
+const ENEMY_RECORD = 12;
+const TOWER_RECORD = 17;
+const PROJECTILE_RECORD = 8;
+
+const SNAPSHOT_ABILITIES = ['airstrike', 'timeslow', 'towerboost'];
+const PROJECTILE_SPECIALS = [null, 'freeze', 'poison', 'electric', 'laser', 'antiair'];
+
+const FLAG_GAME_OVER = 1;
+const FLAG_WAVE_IN_PROGRESS = 2;
+const FLAG_WAVE_COUNTDOWN = 4;
+
+function snapshotLength(state) {
+    return SNAPSHOT_HEADER +
+        state.enemies.length * ENEMY_RECORD +
+        state.towers.length * TOWER_RECORD +
+        state.projectiles.length * PROJECTILE_RECORD;
+}
+
+// Position before the entity's last tick, or its current one if it is newer than that
+function previousX(entity, tick) {
+    return entity.prevTick === tick ? entity.prevX : entity.x;
+}
+
+function previousY(entity, tick) {
+    return entity.prevTick === tick ? entity.prevY : entity.y;
+}
+
+// Writes state into out (a Float64Array of at least snapshotLength(state)).
+// colorIndex(color) maps a color string to its index in the shared color table.
+function writeSnapshot(state, out, colorIndex) {
+    const tick = state.tick;
+    out[0] = tick;
+    out[1] = state.health;
+    out[2] = state.money;
+    out[3] = state.wave;
+    out[4] = state.score;
+    out[5] = (state.gameOver ? FLAG_GAME_OVER : 0) |
+        (state.waveInProgress ? FLAG_WAVE_IN_PROGRESS : 0) |
+        (state.waveCountdownActive ? FLAG_WAVE_COUNTDOWN : 0);
+    out[6] = state.waveCountdown;
+    out[7] = state.enemies.length;
+    out[8] = state.towers.length;
+    out[9] = state.projectiles.length;
+    SNAPSHOT_ABILITIES.forEach((key, i) => {
+        const ability = state.abilities[key];
+        out[10 + i * 3] = ability.cooldown;
+        out[11 + i * 3] = ability.active ? 1 : 0;
+        out[12 + i * 3] = ability.timer || 0;
+    });
+
+    let o = SNAPSHOT_HEADER;
+    for (const enemy of state.enemies) {
+        out[o] = ENEMY_TYPES.indexOf(enemy.type);
+        out[o + 1] = enemy.x;
+        out[o + 2] = enemy.y;
+        out[o + 3] = previousX(enemy, tick);
+        out[o + 4] = previousY(enemy, tick);
+        out[o + 5] = enemy.health;
+        out[o + 6] = enemy.maxHealth;
+        out[o + 7] = enemy.shield || 0;
+        out[o + 8] = enemy.maxShield || 0;
+        out[o + 9] = enemy.frozenTimer;
+        out[o + 10] = enemy.poisoned ? 1 : 0;
+        out[o + 11] = enemy.healCooldown || 0;
+        o += ENEMY_RECORD;
+    }
+
+    for (const tower of state.towers) {
+        out[o] = tower.id;
+        out[o + 1] = TOWER_TYPES.indexOf(tower.type);
+        out[o + 2] = tower.x;
+        out[o + 3] = tower.y;
+        out[o + 4] = tower.angle;
+        out[o + 5] = tower.level;
+        out[o + 6] = tower.target ? tower.target.x : NaN;
+        out[o + 7] = tower.target ? tower.target.y : NaN;
+        out[o + 8] = tower.damage;
+        out[o + 9] = tower.range;
+        out[o + 10] = tower.fireRate;
+        out[o + 11] = tower.kills;
+        out[o + 12] = tower.totalDamageDealt;
+        out[o + 13] = tower.shotsFired;
+        out[o + 14] = tower.sellValue;
+        out[o + 15] = tower.upgradePath ? tower.getUpgradePaths().findIndex(p => p.id === tower.upgradePath) : -1;
+        out[o + 16] = tower.boosted ? 1 : 0;
+        o += TOWER_RECORD;
+    }
+
+    for (const projectile of state.projectiles) {
+        out[o] = colorIndex(projectile.color);
+        out[o + 1] = PROJECTILE_SPECIALS.indexOf(projectile.special);
+        out[o + 2] = projectile.x;
+        out[o + 3] = projectile.y;
+        out[o + 4] = previousX(projectile, tick);
+        out[o + 5] = previousY(projectile, tick);
+        out[o + 6] = projectile.target ? projectile.target.x : NaN;
+        out[o + 7] = projectile.target ? projectile.target.y : NaN;
+        o += PROJECTILE_RECORD;
+    }
+}
+
+// Main-thread side: copies snapshots into a state object shaped like the
+// simulation's, so the renderer and UI read it the same way. Enemies and
+// projectiles are plain view objects reused between snapshots; towers are
+// real Tower instances kept per id, so selection and the tower panel (which
+// call Tower methods) keep working and keep their identity.
+class SnapshotMirror {
+    constructor(state) {
+        this.state = state;
+        this.colors = [];
+        this.enemyViews = [];
+        this.projectileViews = [];
+        this.towersById = new Map();
+        this.generation = 0;  // Stamped on every tower a snapshot mentions, to find the sold ones
+    }
+
+    clear() {
+        this.towersById.clear();
+    }
+
+    addColors(colors) {
+        this.colors.push(...colors);
+    }
+
+    read(data) {
+        const state = this.state;
+        const tick = data[0];
+        state.tick = tick;
+        state.health = data[1];
+        state.money = data[2];
+        state.wave = data[3];
+        state.score = data[4];
+        state.gameOver = (data[5] & FLAG_GAME_OVER) !== 0;
+        state.waveInProgress = (data[5] & FLAG_WAVE_IN_PROGRESS) !== 0;
+        state.waveCountdownActive = (data[5] & FLAG_WAVE_COUNTDOWN) !== 0;
+        state.waveCountdown = data[6];
+        SNAPSHOT_ABILITIES.forEach((key, i) => {
+            const ability = state.abilities[key];
+            ability.cooldown = data[10 + i * 3];
+            ability.active = data[11 + i * 3] === 1;
+            ability.timer = data[12 + i * 3];
+        });
+
+        let o = SNAPSHOT_HEADER;
+        o = this.readEnemies(data, o, data[7], tick);
+        o = this.readTowers(data, o, data[8]);
+        this.readProjectiles(data, o, data[9], tick);
+    }
+
+    readEnemies(data, o, count, tick) {
+        const views = this.enemyViews;
+        const enemies = this.state.enemies;
+        enemies.length = 0;
+        for (let i = 0; i < count; i++, o += ENEMY_RECORD) {
+            const view = views[i] || (views[i] = {
+                type: null, x: 0, y: 0, prevX: 0, prevY: 0, prevTick: 0, size: 0, color: null,
+                healRange: 0, health: 0, maxHealth: 0, shield: 0, maxShield: 0,
+                frozenTimer: 0, poisoned: false, healCooldown: 0
+            });
+            const proto = ENEMY_PROTOTYPES[ENEMY_TYPES[data[o]]];
+            view.type = proto.type;
+            view.size = proto.size;
+            view.color = proto.color;
+            view.healRange = proto.healRange;
+            view.x = data[o + 1];
+            view.y = data[o + 2];
+            view.prevX = data[o + 3];
+            view.prevY = data[o + 4];
+            view.prevTick = tick;
+            view.health = data[o + 5];
+            view.maxHealth = data[o + 6];
+            view.shield = data[o + 7];
+            view.maxShield = data[o + 8];
+            view.frozenTimer = data[o + 9];
+            view.poisoned = data[o + 10] === 1;
+            view.healCooldown = data[o + 11];
+            enemies.push(view);
+        }
+        return o;
+    }
+
+    readTowers(data, o, count) {
+        const towers = this.state.towers;
+        const generation = ++this.generation;
+        towers.length = 0;
+        for (let i = 0; i < count; i++, o += TOWER_RECORD) {
+            const id = data[o];
+            let tower = this.towersById.get(id);
+            if (!tower) {
+                tower = new Tower(data[o + 2], data[o + 3], TOWER_TYPES[data[o + 1]]);
+                tower.id = id;
+                tower.mirrorTarget = { x: 0, y: 0 };
+                this.towersById.set(id, tower);
+            }
+            tower.angle = data[o + 4];
+            tower.level = data[o + 5];
+            if (Number.isNaN(data[o + 6])) {
+                tower.target = null;
+            } else {
+                tower.mirrorTarget.x = data[o + 6];
+                tower.mirrorTarget.y = data[o + 7];
+                tower.target = tower.mirrorTarget;
+            }
+            tower.damage = data[o + 8];
+            tower.range = data[o + 9];
+            tower.fireRate = data[o + 10];
+            tower.kills = data[o + 11];
+            tower.totalDamageDealt = data[o + 12];
+            tower.shotsFired = data[o + 13];
+            tower.sellValue = data[o + 14];
+            tower.upgradePath = data[o + 15] >= 0 ? tower.getUpgradePaths()[data[o + 15]].id : null;
+            tower.boosted = data[o + 16] === 1;
+            tower.mirrorGeneration = generation;
+            towers.push(tower);
+        }
+        if (this.towersById.size > count) {
+            for (const [id, tower] of this.towersById) {
+                if (tower.mirrorGeneration !== generation) this.towersById.delete(id);
+            }
+        }
+        return o;
+    }
+
+    readProjectiles(data, o, count, tick) {
+        const views = this.projectileViews;
+        const projectiles = this.state.projectiles;
+        projectiles.length = 0;
+        for (let i = 0; i < count; i++, o += PROJECTILE_RECORD) {
+            const view = views[i] || (views[i] = {
+                color: null, special: null, x: 0, y: 0, prevX: 0, prevY: 0, prevTick: 0,
+                target: null, targetPoint: { x: 0, y: 0 }
+            });
+            view.color = this.colors[data[o]];
+            view.special = PROJECTILE_SPECIALS[data[o + 1]];
+            view.x = data[o + 2];
+            view.y = data[o + 3];
+            view.prevX = data[o + 4];
+            view.prevY = data[o + 5];
+            view.prevTick = tick;
+            if (Number.isNaN(data[o + 6])) {
+                view.target = null;
+            } else {
+                view.targetPoint.x = data[o + 6];
+                view.targetPoint.y = data[o + 7];
+                view.target = view.targetPoint;
+            }
+            projectiles.push(view);
+        }
+    }
+}
@@ -0,0 +1,96 @@
+// Uniform grid over enemy positions so range queries only visit nearby cells
+// instead of every live enemy. Rebuilt with a counting sort into one flat
+// array per tick, so a rebuild allocates nothing once the buffers have grown.
+class SpatialGrid {
+    constructor(width, height, cellSize) {
+        this.cellSize = cellSize;
+        this.cols = Math.ceil(width / cellSize);
+        this.rows = Math.ceil(height / cellSize);
+        const cellCount = this.cols * this.rows;
+
+        // Entities of cell c live in items[cellStart[c] .. cellStart[c + 1])
+        this.cellStart = new Int32Array(cellCount + 1);
+        this.cursor = new Int32Array(cellCount);
+        this.cellOf = new Int32Array(64);
+        this.items = [];
+        this.count = 0;
+    }
+
+    clampCol(col) {
+        return Math.min(this.cols - 1, Math.max(0, col));
+    }
+
+    clampRow(row) {
+        return Math.min(this.rows - 1, Math.max(0, row));
+    }
+
+    cellIndex(x, y) {
+        // Enemies can sit slightly off the canvas (spawn offsets), so clamp to the edge cells
+        const col = this.clampCol(Math.floor(x / this.cellSize));
+        const row = this.clampRow(Math.floor(y / this.cellSize));
+        return row * this.cols + col;
+    }
+
+    rebuild(entities) {
+        const n = entities.length;
+        const cellStart = this.cellStart;
+        const cellCount = this.cursor.length;
+
+        if (this.cellOf.length < n) {
+            this.cellOf = new Int32Array(n * 2);
+        }
+        const cellOf = this.cellOf;
+
+        cellStart.fill(0);
+        for (let i = 0; i < n; i++) {
+            const cell = this.cellIndex(entities[i].x, entities[i].y);
+            cellOf[i] = cell;
+            cellStart[cell + 1]++;
+        }
+        for (let c = 1; c <= cellCount; c++) {
+            cellStart[c] += cellStart[c - 1];
+        }
+
+        const cursor = this.cursor;
+        cursor.set(cellStart.subarray(0, cellCount));
+        const items = this.items;
+        for (let i = 0; i < n; i++) {
+            items[cursor[cellOf[i]]++] = entities[i];
+        }
+
+        // Drop references left over from a larger previous tick
+        for (let i = n; i < this.count; i++) {
+            items[i] = null;
+        }
+        this.count = n;
+    }
+
+    // Collects every entity within radius of (x, y) into out (cleared first) and returns it
+    queryRadius(x, y, radius, out = []) {
+        out.length = 0;
+
+        const minCol = this.clampCol(Math.floor((x - radius) / this.cellSize));
+        const maxCol = this.clampCol(Math.floor((x + radius) / this.cellSize));
+        const minRow = this.clampRow(Math.floor((y - radius) / this.cellSize));
+        const maxRow = this.clampRow(Math.floor((y + radius) / this.cellSize));
+        const radiusSq = radius * radius;
+        const cellStart = this.cellStart;
+        const items = this.items;
+
+        for (let row = minRow; row <= maxRow; row++) {
+            for (let col = minCol; col <= maxCol; col++) {
+                const cell = row * this.cols + col;
+                for (let i = cellStart[cell], end = cellStart[cell + 1]; i < end; i++) {
+                    const entity = items[i];
+                    const dx = entity.x - x;
+                    const dy = entity.y - y;
+                    if (dx * dx + dy * dy <= radiusSq) {
+                        out.push(entity);
+                    }
+                }
+            }
+        }
+
+        return out;
+    }
+}
@@ -1,3 +1,6 @@
+// Shared scratch buffer for grid queries so targeting does not allocate per tick
+const towerQueryScratch = [];
+
 class Tower {
     constructor(x, y, type) {
         this.x = x;
@@ -7,112 +10,22 @@ class Tower {
         this.target = null;
         this.shootCooldown = 0;
 
-        switch(type) {
-            case 'basic':
-                this.damage = 12;
-                this.range = 110;
-                this.fireRate = 50;
-                this.cost = 50;
-                this.color = '#888888';
-                this.projectileColor = '#ffff00';
-                this.splashRadius = 0;
-                this.special = null;
-                this.damageType = 'normal';
-                break;
-            case 'sniper':
-                this.damage = 40;
-                this.range = 220;
-                this.fireRate = 100;
-                this.cost = 120;
-                this.color = '#8b4513';
-                this.projectileColor = '#ff6600';
-                this.splashRadius = 0;
-                this.special = null;
-                this.damageType = 'pierce';
-                break;
-            case 'splash':
-                this.damage = 18;
-                this.range = 120;
-                this.fireRate = 80;
-                this.cost = 150;
-                this.color = '#ff6600';
-                this.projectileColor = '#ff0000';
-                this.splashRadius = 60;
-                this.special = null;
-                this.damageType = 'splash';
-                break;
-            case 'rapid':
-                this.damage = 6;
-                this.range = 100;
-                this.fireRate = 15;
-                this.cost = 100;
-                this.color = '#00ff00';
-                this.projectileColor = '#00ffff';
-                this.splashRadius = 0;
-                this.special = null;
-                this.damageType = 'rapid';
-                break;
-            case 'freeze':
-                this.damage = 8;
-                this.range = 130;
-                this.fireRate = 70;
-                this.cost = 180;
-                this.color = '#00d4ff';
-                this.projectileColor = '#a8e6ff';
-                this.splashRadius = 0;
-                this.special = 'freeze';
-                this.freezeDuration = 90;
-                this.damageType = 'freeze';
-                break;
-            case 'poison':
-                this.damage = 10;
-                this.range = 110;
-                this.fireRate = 60;
-                this.cost = 140;
-                this.color = '#9b59b6';
-                this.projectileColor = '#8e44ad';
-                this.splashRadius = 0;
-                this.special = 'poison';
-                this.poisonDamage = 2;
-                this.poisonDuration = 120;
-                this.damageType = 'poison';
-                break;
-            case 'electric':
-                this.damage = 15;
-                this.range = 140;
-                this.fireRate = 90;
-                this.cost = 200;
-                this.color = '#3498db';
-                this.projectileColor = '#2980b9';
-                this.splashRadius = 0;
-                this.special = 'electric';
-                this.chainCount = 3;
-                this.chainRange = 80;
-                this.damageType = 'electric';
-                break;
-            case 'laser':
-                this.damage = 25;
-                this.range = 180;
-                this.fireRate = 5;
-                this.cost = 250;
-                this.color = '#e74c3c';
-                this.projectileColor = '#c0392b';
-                this.splashRadius = 0;
-                this.special = 'laser';
-                this.damageType = 'pierce';
-                break;
-            case 'antiair':
-                this.damage = 20;
-                this.range = 200;
-                this.fireRate = 40;
-                this.cost = 160;
-                this.color = '#16a085';
-                this.projectileColor = '#1abc9c';
-                this.splashRadius = 0;
-                this.special = 'antiair';
-                this.damageType = 'pierce';
-                break;
-        }
+        // Level 1 stats come from the compiled definitions (see definitions.js)
+        const proto = TOWER_PROTOTYPES[type];
+        this.damage = proto.damage;
+        this.range = proto.range;
+        this.fireRate = proto.fireRate;
+        this.cost = proto.cost;
+        this.color = proto.color;
+        this.projectileColor = proto.projectileColor;
+        this.splashRadius = proto.splashRadius;
+        this.special = proto.special;
+        this.damageType = proto.damageType;
+        this.freezeDuration = proto.freezeDuration;
+        this.poisonDamage = proto.poisonDamage;
+        this.poisonDuration = proto.poisonDuration;
+        this.chainCount = proto.chainCount;
+        this.chainRange = proto.chainRange;
 
         this.kills = 0;
         this.totalDamageDealt = 0;
@@ -124,56 +37,7 @@ class Tower {
     }
 
     getUpgradePaths() {
-        // Define upgrade paths for each tower type
-        const paths = {
-            basic: [
-                { id: 'fortress', name: 'Fortress', description: '+50% damage, +30% range, splash damage' },
-                { id: 'rapid', name: 'Gatling', description: '3x fire rate, projectiles pierce' },
-                { id: 'support', name: 'Command', description: 'Boosts nearby towers +25% damage' }
-            ],
-            sniper: [
-                { id: 'marksman', name: 'Marksman', description: '+100% range, pierce 3 enemies' },
-                { id: 'assassin', name: 'Assassin', description: '30% crit (5x damage), reveal flying' },
-                { id: 'explosive', name: 'Explosive', description: 'Shots explode on impact' }
-            ],
-            rapid: [
-                { id: 'minigun', name: 'Minigun', description: '2x fire rate, +50% damage' },
-                { id: 'shredder', name: 'Shredder', description: 'Armor shred (-50% enemy resistance)' },
-                { id: 'suppressor', name: 'Suppressor', description: 'Slows enemies 40%' }
-            ],
-            splash: [
-                { id: 'nuke', name: 'Nuclear', description: '2x splash radius, +100% damage' },
-                { id: 'cluster', name: 'Cluster', description: 'Shoots 3 projectiles' },
-                { id: 'napalm', name: 'Napalm', description: 'Burning ground DoT' }
-            ],
-            poison: [
-                { id: 'plague', name: 'Plague', description: 'Poison spreads to nearby enemies' },
-                { id: 'venom', name: 'Venom', description: '3x poison damage, instant damage' },
-                { id: 'corrosive', name: 'Corrosive', description: 'Melts shields and armor' }
-            ],
-            freeze: [
-                { id: 'blizzard', name: 'Blizzard', description: 'AoE freeze, permanent slow' },
-                { id: 'permafrost', name: 'Permafrost', description: '2x freeze duration, shatters frozen' },
-                { id: 'icewall', name: 'Ice Wall', description: 'Blocks enemy movement temporarily' }
-            ],
-            electric: [
-                { id: 'tesla', name: 'Tesla', description: '+3 chain targets, +100% chain damage' },
-                { id: 'overload', name: 'Overload', description: 'Stun enemies, EMP shields' },
-                { id: 'conductor', name: 'Conductor', description: 'Chains back to original target' }
-            ],
-            laser: [
-                { id: 'beam', name: 'Beam', description: 'Constant beam, hits all in line' },
-                { id: 'focused', name: 'Focused', description: '+200% damage, melts armor' },
-                { id: 'prismatic', name: 'Prismatic', description: 'Splits into 5 beams' }
-            ],
-            antiair: [
-                { id: 'flak', name: 'Flak Cannon', description: 'Splash damage, grounds flying' },
-                { id: 'homing', name: 'Homing', description: 'Missiles never miss, +range' },
-                { id: 'radar', name: 'Radar', description: 'Reveals all flying, boosts AA towers' }
-            ]
-        };
-
-        return paths[this.type] || [];
+        return isTowerType(this.type) ? TOWER_PROTOTYPES[this.type].upgradePaths : [];
     }
 
     chooseUpgradePath(pathId) {
@@ -323,13 +187,13 @@ class Tower {
         }
     }
 
-    update(enemies) {
+    update(enemies, grid = null, effects = null) {
         if (this.shootCooldown > 0) {
             this.shootCooldown--;
         }
 
         if (!this.target || !this.target.alive || !this.isInRange(this.target)) {
-            this.target = this.findTarget(enemies);
+            this.target = this.findTarget(enemies, grid);
         }
 
         // Update rotation to face target
@@ -350,24 +214,28 @@ class Tower {
 
         if (this.target && this.shootCooldown === 0) {
             this.shootCooldown = this.fireRate;
-            return this.shoot();
+            return this.shoot(effects);
         }
 
         return null;
     }
 
-    findTarget(enemies) {
+    findTarget(enemies, grid = null) {
         let closestEnemy = null;
         let maxProgress = -1;
 
-        for (const enemy of enemies) {
-            if (enemy.alive && this.isInRange(enemy)) {
+        // With a spatial grid only enemies already known to be in range are visited
+        const candidates = grid ? grid.queryRadius(this.x, this.y, this.range, towerQueryScratch) : enemies;
+
+        for (const enemy of candidates) {
+            if (enemy.alive && (grid || this.isInRange(enemy))) {
                 if (this.special === 'antiair' && !enemy.flying) {
                     continue;
                 }
 
-                if (enemy.pathIndex > maxProgress) {
-                    maxProgress = enemy.pathIndex;
+                // Exact distance travelled, so the enemy furthest along wins even on the same segment
+                if (enemy.distance > maxProgress) {
+                    maxProgress = enemy.distance;
                     closestEnemy = enemy;
                 }
             }
@@ -383,30 +251,29 @@ class Tower {
         return distance <= this.range;
     }
 
-    shoot() {
+    shoot(effects = null) {
         if (!this.target) return null;
 
         this.shotsFired++;
 
-        // Calculate barrel tip position for muzzle flash
-        const barrelLength = 20;
-        const barrelX = this.x + Math.cos(this.angle) * barrelLength;
-        const barrelY = this.y + Math.sin(this.angle) * barrelLength;
+        // Create muzzle flash particles at the barrel tip
+        if (effects) {
+            const barrelLength = 20;
+            const barrelX = this.x + Math.cos(this.angle) * barrelLength;
+            const barrelY = this.y + Math.sin(this.angle) * barrelLength;
 
-        // Create muzzle flash particles
-        if (window.createParticleBurst) {
             if (this.special === 'laser') {
-                window.createParticleBurst(barrelX, barrelY, 3, 'energy');
+                effects.particleBurst(barrelX, barrelY, 3, 'energy');
             } else if (this.special === 'electric') {
-                window.createParticleBurst(barrelX, barrelY, 4, 'energy');
+                effects.particleBurst(barrelX, barrelY, 4, 'energy');
             } else if (this.special === 'poison') {
-                window.createParticleBurst(barrelX, barrelY, 3, 'magic');
+                effects.particleBurst(barrelX, barrelY, 3, 'magic');
             } else {
-                window.createParticleBurst(barrelX, barrelY, 3, 'spark');
+                effects.particleBurst(barrelX, barrelY, 3, 'spark');
             }
         }
 
-        const projectile = new Projectile(
+        const projectile = projectilePool.acquire().reset(
             this.x,
             this.y,
             this.target,
@@ -431,59 +298,6 @@ class Tower {
         return projectile;
     }
 
-    draw(ctx, isSelected = false) {
-        // Draw base (non-rotating part)
-        ctx.fillStyle = '#444444';
-        ctx.beginPath();
-        ctx.arc(this.x, this.y, 12, 0, Math.PI * 2);
-        ctx.fill();
-        ctx.strokeStyle = '#000000';
-        ctx.lineWidth = 1;
-        ctx.stroke();
-
-        // Draw rotating tower body
-        ctx.save();
-        ctx.translate(this.x, this.y);
-        ctx.rotate(this.angle);
-
-        // Tower body (rotates)
-        ctx.fillStyle = this.color;
-        ctx.fillRect(-12, -10, 24, 20);
-        ctx.strokeStyle = '#000000';
-        ctx.lineWidth = 2;
-        ctx.strokeRect(-12, -10, 24, 20);
-
-        // Tower barrel (points forward)
-        ctx.fillStyle = '#666666';
-        ctx.fillRect(8, -5, 12, 10);
-        ctx.strokeStyle = '#000000';
-        ctx.lineWidth = 1;
-        ctx.strokeRect(8, -5, 12, 10);
-
-        ctx.restore();
-
-        if (isSelected) {
-            ctx.strokeStyle = '#ffff00';
-            ctx.lineWidth = 3;
-            ctx.strokeRect(this.x - 18, this.y - 18, 36, 36);
-
-            ctx.strokeStyle = 'rgba(255, 255, 0, 0.3)';
-            ctx.lineWidth = 2;
-            ctx.beginPath();
-            ctx.arc(this.x, this.y, this.range, 0, Math.PI * 2);
-            ctx.stroke();
-        }
-
-        if (this.target) {
-            ctx.strokeStyle = 'rgba(255, 0, 0, 0.3)';
-            ctx.lineWidth = 1;
-            ctx.beginPath();
-            ctx.moveTo(this.x, this.y);
-            ctx.lineTo(this.target.x, this.target.y);
-            ctx.stroke();
-        }
-    }
-
     upgrade() {
         this.level++;
         this.damage = Math.floor(this.damage * 1.5);
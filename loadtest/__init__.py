@@ -0,0 +1,13 @@
+"""
+Load test for the leaderboard API.
+
+Starts the backend on a free port with its own data directory, drives
+GET and POST /api/leaderboard with an open-loop asyncio load generator and
+reports throughput, latency percentiles and error rates per stage. After the
+run the server is stopped and every acknowledged score is looked up in the
+files it wrote, so lost writes show up as failures rather than going unseen.
+
+Only the standard library is used. Run it from the repository root:
+    python -m loadtest run --rate 20,50,100 --duration 30
+See python -m loadtest --help for everything else.
+"""
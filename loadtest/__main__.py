@@ -0,0 +1,287 @@
+"""
+Command line for the leaderboard load test.
+
+    python -m loadtest run [--rate 20,50,100] [--duration 30] [--mix read=9,submit=1]
+                           [--out results.json] [--baseline old.json --threshold 10]
+    python -m loadtest compare old.json new.json [--threshold 10]
+
+`run` exits with status 1 when a score was lost or, given --baseline, when a
+metric regressed beyond the threshold, so it can gate CI or a release.
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from . import results
+from .client import HttpClient
+from .generator import Workload, parse_mix, run_stage
+from .reconcile import reconcile, write_failures
+from .server import REPO_ROOT, ServerProcess, record_games
+from .stats import StageRecorder
+
+DEFAULT_RESULTS_DIR = REPO_ROOT / "loadtest" / "results"
+
+
+def parse_rates(text):
+    rates = [float(rate) for rate in text.split(",")]
+    if any(rate <= 0 for rate in rates):
+        raise argparse.ArgumentTypeError("rates must be positive")
+    return rates
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def url_argument(text):
+    """An http:// or https:// server URL, as urlsplit parts."""
+    url = urlsplit(text)
+    if url.scheme not in DEFAULT_PORTS:
+        raise argparse.ArgumentTypeError(f"{text!r} must start with http:// or https://")
+    if not url.hostname:
+        raise argparse.ArgumentTypeError(f"{text!r} has no host")
+    try:
+        url.port
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"{text!r}: {error}") from None
+    return url
+
+
+def mix_argument(text):
+    try:
+        return parse_mix(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="start the server, load it and write a result file")
+    load = run.add_argument_group("load")
+    load.add_argument("--rate", type=parse_rates, default=[20.0, 50.0, 100.0],
+                      help="requests per second; a comma-separated list runs one stage per rate (default 20,50,100)")
+    load.add_argument("--duration", type=float, default=30.0, help="seconds per stage (default 30)")
+    load.add_argument("--warmup", type=float, default=5.0,
+                      help="seconds at the first rate before measuring (default 5)")
+    load.add_argument("--mix", type=mix_argument, default=parse_mix("read=9,submit=1"),
+                      help="operation weights (default read=9,submit=1)")
+    load.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson",
+                      help="spacing of request start times (default poisson)")
+    load.add_argument("--connections", type=int, default=256, help="keep-alive connection limit (default 256)")
+    load.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds (default 10)")
+    load.add_argument("--seed", type=int, help="seed for the request mix and arrivals")
+    load.add_argument("--games", type=int, default=20, help="bot games recorded for submissions (default 20)")
+    load.add_argument("--difficulty", default="normal", help="difficulty of the recorded games")
+
+    target = run.add_argument_group("server")
+    target.add_argument("--url", type=url_argument,
+                        help="test an already running server (http:// or https://) instead of starting one")
+    target.add_argument("--data-dir", type=Path,
+                        help="leaderboard directory; with --url, where that server writes (enables the "
+                             "lost-write check), otherwise kept after the run instead of a temp dir")
+    target.add_argument("--replay-workers", type=int, help="REPLAY_WORKERS for the started server")
+    target.add_argument("--compact-every", type=int,
+                        help="LEADERBOARD_COMPACT_EVERY for the started server; small values exercise compaction")
+    target.add_argument("--node", default="node", help="node executable (default node)")
+
+    output = run.add_argument_group("results")
+    output.add_argument("--out", type=Path, help=f"result file (default {DEFAULT_RESULTS_DIR.relative_to(REPO_ROOT)}/"
+                                                 "<time>-<commit>.json)")
+    output.add_argument("--baseline", type=Path, help="earlier result file to check this run against")
+    add_threshold_arguments(output)
+
+    compare = commands.add_parser("compare", help="compare two result files")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    add_threshold_arguments(compare)
+    return parser
+
+
+def add_threshold_arguments(parser):
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent change in latency or throughput that counts as a regression (default 10)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="latency changes smaller than this are never regressions (default 1)")
+    parser.add_argument("--max-error-rate-increase", type=float, default=0.01,
+                        help="error rate increase that counts as a regression (default 0.01)")
+
+
+def format_stage(stage):
+    lines = [f"{stage['rate']:g} req/s for {stage['duration']:g}s: sent {stage['sent']} "
+             f"({stage['achieved_rate']:g}/s), worst dispatch lag {stage['max_dispatch_lag_ms']:g} ms"]
+    for operation, summary in {**stage["operations"], "total": stage["total"]}.items():
+        latency = summary["latency_ms"]
+        ms = lambda value: "-" if value is None else f"{value:.1f}"
+        lines.append(f"  {operation:<7} {summary['throughput_rps']:>8.1f} ok/s {summary['error_rate'] * 100:>6.2f}% errors"
+                     f"   p50 {ms(latency['p50']):>8}  p95 {ms(latency['p95']):>8}  p99 {ms(latency['p99']):>8}"
+                     f"  max {ms(latency['max']):>8} ms   {summary['statuses']}")
+    return "\n".join(lines)
+
+
+def format_writes(report):
+    return (f"writes: {report['submitted']} submitted, {report['acknowledged']} acknowledged, "
+            f"{report['stored']} stored; lost {report['lost']}, mismatched {report['mismatched']}, "
+            f"duplicated {report['duplicated']}, wrong score {report['wrong_score']}, "
+            f"stored without acknowledgement {report['unacknowledged_stored']}")
+
+
+async def drive(args, host, port, tls=False):
+    """Runs the warm-up and every stage; returns (stages, workload, server stats)."""
+    rng = random.Random(args.seed)
+    games = []
+    if args.mix.get("submit"):
+        print(f"Recording {args.games} {args.difficulty} bot games for submissions...")
+        games = record_games(args.games, args.difficulty, args.node)
+    workload = Workload(args.mix, games, rng)
+    poisson = args.arrival == "poisson"
+    client = HttpClient(host, port, max_connections=args.connections, timeout=args.timeout, tls=tls)
+
+    try:
+        if args.warmup > 0:
+            print(f"Warming up at {args.rate[0]:g} req/s for {args.warmup:g}s")
+            await run_stage(client, workload, args.rate[0], args.warmup, poisson=poisson)
+
+        stages = []
+        for rate in args.rate:
+            recorder = StageRecorder()
+            info = await run_stage(client, workload, rate, args.duration, recorder, poisson)
+            operations, total = recorder.summary(args.duration)
+            stage = {
+                "rate": rate,
+                "duration": args.duration,
+                "sent": info["sent"],
+                "achieved_rate": round(info["sent"] / args.duration, 3),
+                "max_dispatch_lag_ms": info["max_dispatch_lag_ms"],
+                "operations": operations,
+                "total": total,
+            }
+            stages.append(stage)
+            print(format_stage(stage))
+
+        try:
+            server_stats = (await client.get("/api/leaderboard/stats")).json()
+        except Exception as error:  # Diagnostics only; never fail a run over them
+            server_stats = {"error": repr(error)}
+        return stages, workload, server_stats
+    finally:
+        await client.close()
+
+
+def run(args):
+    started_at = datetime.now(timezone.utc)
+    commit, dirty = results.git_revision()
+    server = None
+    temp_dir = None
+    tls = False
+
+    if args.url:
+        host, port = args.url.hostname, args.url.port or DEFAULT_PORTS[args.url.scheme]
+        tls = args.url.scheme == "https"
+        data_dir = args.data_dir
+    else:
+        data_dir = args.data_dir
+        if data_dir is None:
+            temp_dir = tempfile.mkdtemp(prefix="loadtest-")
+            data_dir = Path(temp_dir)
+        env = {}
+        if args.replay_workers:
+            env["REPLAY_WORKERS"] = str(args.replay_workers)
+        if args.compact_every:
+            env["LEADERBOARD_COMPACT_EVERY"] = str(args.compact_every)
+        server = ServerProcess(data_dir, node=args.node, env=env)
+        host, port = "127.0.0.1", server.port
+        server.start()
+        print(f"Started server on port {port} (data in {data_dir})")
+
+    try:
+        if server:
+            asyncio.run(server.wait_until_ready())
+        stages, workload, server_stats = asyncio.run(drive(args, host, port, tls))
+        exit_code = server.stop() if server else None
+
+        writes = None
+        if workload.submissions and data_dir:
+            writes = reconcile(workload.submissions, data_dir)
+            print(format_writes(writes))
+        elif workload.submissions:
+            print("writes: not checked (pass --data-dir with --url to check for lost writes)")
+
+        result = {
+            "version": results.RESULT_VERSION,
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "git_commit": commit,
+            "git_dirty": dirty,
+            "target": args.url.geturl() if args.url else f"http://{host}:{port} (started by the load test)",
+            "config": {
+                "rates": args.rate,
+                "duration": args.duration,
+                "warmup": args.warmup,
+                "mix": args.mix,
+                "arrival": args.arrival,
+                "connections": args.connections,
+                "timeout": args.timeout,
+                "seed": args.seed,
+                "games": args.games,
+                "difficulty": args.difficulty,
+                "replay_workers": args.replay_workers,
+                "compact_every": args.compact_every,
+            },
+            "stages": stages,
+            "writes": writes,
+            "server_stats": server_stats,
+            "server_exit_code": exit_code,
+        }
+    finally:
+        if server:
+            server.stop()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    out = args.out or DEFAULT_RESULTS_DIR / (
+        f"{started_at.strftime('%Y%m%dT%H%M%SZ')}-{(commit or 'nogit')[:7]}{'-dirty' if dirty else ''}.json")
+    results.save(result, out)
+    print(f"Wrote {out}")
+
+    failed = bool(writes and write_failures(writes))
+    if args.baseline:
+        failed |= report_comparison(results.load(args.baseline), result, args)
+    elif failed:
+        print("FAILED: acknowledged scores were lost or stored wrong")
+    return 1 if failed else 0
+
+
+def report_comparison(baseline, current, args):
+    rows, regressions = results.compare(
+        baseline, current, args.threshold, args.min_delta_ms, args.max_error_rate_increase)
+    if not rows:
+        print("No stages in common with the baseline (stages are matched by rate)")
+        return False
+    print(f"Against {baseline.get('git_commit') or 'baseline'} ({baseline.get('started_at')}):")
+    print(results.format_comparison(rows))
+    if regressions:
+        print(f"FAILED: {len(regressions)} regression(s) beyond the thresholds")
+    return bool(regressions)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "compare":
+        failed = report_comparison(results.load(args.baseline), results.load(args.current), args)
+        return 1 if failed else 0
+    start = time.monotonic()
+    status = run(args)
+    print(f"Done in {time.monotonic() - start:.0f}s")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Minimal asyncio HTTP/1.1 client with keep-alive connections.
+
+Just enough HTTP for the leaderboard API: JSON bodies, Content-Length or
+chunked responses, optional TLS, and a bounded pool of reused connections so
+the load generator is not measuring TCP (and TLS) handshakes.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+
+
+class HttpError(Exception):
+    """The server closed the connection or sent something that is not HTTP."""
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class HttpClient:
+    """
+    Sends requests over at most max_connections keep-alive connections.
+    A request that finds every connection busy waits for one, and that wait
+    counts towards its latency, as it would for a real client. With tls the
+    connections use HTTPS, verified against the system's CA certificates.
+    """
+
+    def __init__(self, host, port, max_connections=256, timeout=10.0, tls=False):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.tls = tls
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def request(self, method, path, body=None):
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = _Connection(*await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port, ssl=self.tls or None), self.timeout))
+                response = await asyncio.wait_for(
+                    self._exchange(connection, method, path, body), self.timeout)
+            except BaseException:
+                # Half-read responses leave the stream unusable; never reuse it
+                if connection is not None:
+                    connection.close()
+                raise
+            if response.headers.get("connection", "").lower() == "close":
+                connection.close()
+            else:
+                self._idle.append(connection)
+            return response
+
+    async def get(self, path):
+        return await self.request("GET", path)
+
+    async def post_json(self, path, payload):
+        return await self.request("POST", path, json.dumps(payload).encode())
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+    async def _exchange(self, connection, method, path, body):
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        if body is not None:
+            head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        connection.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + (body or b""))
+        await connection.writer.drain()
+
+        reader = connection.reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise HttpError("connection closed before the response")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise HttpError(f"bad status line: {status_line!r}") from None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked(reader)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+        return Response(status, headers, body)
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailers, then the blank line that ends the message
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
@@ -0,0 +1,143 @@
+"""
+Open-loop load generation.
+
+Requests are started on a fixed schedule (evenly spaced or Poisson arrivals)
+whether or not earlier ones have finished, the way independent players
+arrive. A closed loop, where each virtual user waits for its previous
+response, slows down along with the server and understates its latency
+exactly when it is overloaded.
+"""
+
+import asyncio
+import secrets
+from urllib.parse import urlencode
+
+from .client import HttpError
+
+LEADERBOARD_PATH = "/api/leaderboard"
+READ_DIFFICULTIES = ["all", "easy", "normal", "hard"]
+READ_WINDOWS = ["alltime", "weekly", "daily"]
+OPERATIONS = ["read", "submit"]
+
+# Failures a request can end in besides an HTTP status
+TRANSPORT_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, HttpError)
+
+
+def parse_mix(text):
+    """'read=9,submit=1' -> {'read': 9.0, 'submit': 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r} in mix; expected {', '.join(OPERATIONS)}")
+        mix[name] = float(weight) if weight else 1.0
+        if mix[name] < 0:
+            raise ValueError(f"weight of {name} must not be negative")
+    if not any(mix.values()):
+        raise ValueError("mix needs at least one operation with a positive weight")
+    return mix
+
+
+class Workload:
+    """
+    Picks and sends requests according to the mix. Score submissions replay
+    recorded bot games (see bench/record-replays.js) under unique player
+    names, and every one is remembered so the run can check afterwards that
+    each acknowledged score was actually stored.
+    """
+
+    def __init__(self, mix, games, rng):
+        if mix.get("submit") and not games:
+            raise ValueError("submissions need at least one recorded game")
+        self.operations = [name for name in mix if mix[name] > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.games = games
+        self.rng = rng
+        # Keeps this run's names apart from earlier runs against the same server
+        self.run_tag = secrets.token_hex(2)
+        self.submissions = []
+
+    def next_operation(self):
+        return self.rng.choices(self.operations, self.weights)[0]
+
+    def _read_path(self):
+        query = urlencode({
+            "difficulty": self.rng.choice(READ_DIFFICULTIES),
+            "window": self.rng.choice(READ_WINDOWS),
+            "limit": 10,
+        })
+        return f"{LEADERBOARD_PATH}?{query}"
+
+    def _new_submission(self):
+        game = self.games[len(self.submissions) % len(self.games)]
+        submission = {
+            "name": f"lt{self.run_tag}-{len(self.submissions)}",
+            "expected_score": game["score"],
+            "expected_wave": game["wave"],
+            "status": None,
+            "id": None,
+            "score": None,
+        }
+        self.submissions.append(submission)
+        return submission, game["replay"]
+
+    async def send(self, client, operation, scheduled, recorder):
+        """Sends one request; its latency counts from `scheduled` (loop time)."""
+        loop = asyncio.get_running_loop()
+        submission = None
+        try:
+            if operation == "read":
+                response = await client.get(self._read_path())
+            else:
+                submission, replay = self._new_submission()
+                response = await client.post_json(
+                    LEADERBOARD_PATH, {"playerName": submission["name"], "replay": replay})
+            status = response.status
+        except TRANSPORT_ERRORS as error:
+            response = None
+            status = type(error).__name__
+
+        latency_ms = (loop.time() - scheduled) * 1000
+        if submission is not None:
+            submission["status"] = status
+            if status == 200:
+                body = response.json()
+                submission["id"] = body.get("id")
+                submission["score"] = body.get("score")
+        if recorder is not None:
+            recorder.record(operation, latency_ms, status)
+
+
+async def run_stage(client, workload, rate, duration_s, recorder=None, poisson=True):
+    """
+    Starts requests at `rate` per second for `duration_s` seconds, then waits
+    for the ones still in flight. Returns how many were started and how far
+    behind schedule the generator itself fell at worst; a large lag means the
+    load generator, not the server, was the bottleneck.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    end = start + duration_s
+    scheduled = start
+    in_flight = set()
+    sent = 0
+    max_lag_s = 0.0
+
+    while scheduled < end:
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        max_lag_s = max(max_lag_s, loop.time() - scheduled)
+
+        operation = workload.next_operation()
+        task = asyncio.create_task(workload.send(client, operation, scheduled, recorder))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        sent += 1
+        scheduled += workload.rng.expovariate(rate) if poisson else 1 / rate
+
+    # Every request has its own timeout, so this always finishes
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return {"sent": sent, "max_dispatch_lag_ms": round(max_lag_s * 1000, 3)}
@@ -0,0 +1,95 @@
+"""
+Lost-write detection: checks every score the server acknowledged against
+what it actually stored.
+
+The leaderboard store keeps a leaderboard.json snapshot plus a
+leaderboard.log of scores appended since (backend/storage/leaderboard-store.js).
+Both are read the way the store reads them at startup, so a score counts as
+stored exactly when a restarted server would still have it.
+"""
+
+import json
+from pathlib import Path
+
+
+def read_stored_scores(data_dir):
+    """Every stored record by id, from the log and the snapshot."""
+    data_dir = Path(data_dir)
+    records = {}
+
+    # The log first: a compaction in between folds its records into the
+    # snapshot read next, so none can slip through while a server is running
+    log_path = data_dir / "leaderboard.log"
+    if log_path.exists():
+        for line in log_path.read_bytes().split(b"\n")[:-1]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn tail; the store drops it on startup too
+                break
+            if not isinstance(record.get("id"), int):
+                break
+            records[record["id"]] = record
+
+    snapshot_path = data_dir / "leaderboard.json"
+    if snapshot_path.exists():
+        for record in json.loads(snapshot_path.read_text())["scores"]:
+            records.setdefault(record["id"], record)
+    return records
+
+
+def reconcile(submissions, data_dir):
+    """
+    Compares the run's submissions with the stored scores:
+      lost:        acknowledged (200 with an id) but not stored
+      mismatched:  stored under the acknowledged id with another name or score
+      duplicated:  one submission stored more than once
+      unacknowledged_stored: failed or timed out, yet stored anyway; not an
+                   error (the server may finish after the client gives up)
+    """
+    stored = read_stored_scores(data_dir)
+    by_name = {}
+    for record in stored.values():
+        by_name.setdefault(record.get("player_name"), []).append(record)
+
+    acknowledged = [s for s in submissions if s["status"] == 200 and s["id"] is not None]
+    lost, mismatched, duplicated = [], [], []
+    for submission in acknowledged:
+        record = stored.get(submission["id"])
+        if record is None:
+            lost.append(submission)
+        elif record.get("player_name") != submission["name"] or record.get("score") != submission["expected_score"]:
+            mismatched.append({"submission": submission, "stored": record})
+        if len(by_name.get(submission["name"], [])) > 1:
+            duplicated.append(submission)
+
+    acknowledged_names = {s["name"] for s in acknowledged}
+    unacknowledged_stored = sum(
+        1 for s in submissions
+        if s["name"] not in acknowledged_names and s["name"] in by_name
+    )
+    # Scores the server computed differently from the recorded game
+    wrong_score = [s for s in acknowledged if s["score"] != s["expected_score"]]
+
+    return {
+        "submitted": len(submissions),
+        "acknowledged": len(acknowledged),
+        "stored": sum(1 for s in acknowledged if s["id"] in stored),
+        "lost": len(lost),
+        "mismatched": len(mismatched),
+        "duplicated": len(duplicated),
+        "wrong_score": len(wrong_score),
+        "unacknowledged_stored": unacknowledged_stored,
+        # The first few of each, to start debugging from
+        "examples": {
+            "lost": lost[:5],
+            "mismatched": mismatched[:5],
+            "duplicated": duplicated[:5],
+            "wrong_score": wrong_score[:5],
+        },
+    }
+
+
+def write_failures(report):
+    """Number of submissions that were acknowledged but not stored intact."""
+    return report["lost"] + report["mismatched"] + report["duplicated"] + report["wrong_score"]
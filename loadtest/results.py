@@ -0,0 +1,116 @@
+"""
+Result files and comparing two runs.
+
+A result file is plain JSON: the run's configuration, the git commit it ran
+against, one entry per stage and the lost-write report. Comparing a run with
+an earlier one (for example from the previous release) flags every metric
+that got worse by more than a threshold.
+"""
+
+import json
+import subprocess
+from pathlib import Path
+
+from .reconcile import write_failures
+from .server import REPO_ROOT
+
+RESULT_VERSION = 1
+LATENCY_METRICS = ["p50", "p95", "p99"]
+
+
+def git_revision():
+    """(commit, dirty) of the working tree, or (None, None) outside git."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                    check=True, capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def save(result, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2) + "\n")
+
+
+def load(path):
+    result = json.loads(Path(path).read_text())
+    if result.get("version") != RESULT_VERSION:
+        raise ValueError(f"{path}: unsupported result version {result.get('version')}")
+    return result
+
+
+def _change_pct(baseline, current):
+    if not baseline:
+        return None
+    return round((current - baseline) / baseline * 100, 1)
+
+
+def compare(baseline, current, threshold_pct=10.0, min_delta_ms=1.0, max_error_rate_increase=0.01):
+    """
+    Compares the stages the two runs share (matched by rate). A metric
+    regresses when:
+      - a p50/p95/p99 latency grows by more than threshold_pct percent and
+        by more than min_delta_ms (sub-millisecond noise is not a regression)
+      - throughput drops by more than threshold_pct percent
+      - the error rate rises by more than max_error_rate_increase
+    Any lost or corrupted write in the current run is always a regression.
+    Returns (rows, regressions), both lists of dicts.
+    """
+    baseline_stages = {stage["rate"]: stage for stage in baseline["stages"]}
+    rows = []
+
+    def check(stage, operation, metric, before, after, worse):
+        if before is None or after is None:
+            return
+        rows.append({
+            "rate": stage, "operation": operation, "metric": metric,
+            "baseline": before, "current": after,
+            "change_pct": _change_pct(before, after), "regression": worse(before, after),
+        })
+
+    for stage in current["stages"]:
+        previous = baseline_stages.get(stage["rate"])
+        if previous is None:
+            continue
+        operations = {**stage["operations"], "total": stage["total"]}
+        previous_operations = {**previous["operations"], "total": previous["total"]}
+        for operation, summary in operations.items():
+            before_summary = previous_operations.get(operation)
+            if before_summary is None:
+                continue
+            for metric in LATENCY_METRICS:
+                check(stage["rate"], operation, f"{metric}_ms",
+                      before_summary["latency_ms"][metric], summary["latency_ms"][metric],
+                      lambda b, a: a > b * (1 + threshold_pct / 100) and a - b > min_delta_ms)
+            check(stage["rate"], operation, "throughput_rps",
+                  before_summary["throughput_rps"], summary["throughput_rps"],
+                  lambda b, a: a < b * (1 - threshold_pct / 100))
+            check(stage["rate"], operation, "error_rate",
+                  before_summary["error_rate"], summary["error_rate"],
+                  lambda b, a: a - b > max_error_rate_increase)
+
+    if current.get("writes"):
+        failures = write_failures(current["writes"])
+        rows.append({
+            "rate": None, "operation": "submit", "metric": "write_failures",
+            "baseline": write_failures(baseline["writes"]) if baseline.get("writes") else None,
+            "current": failures, "change_pct": None, "regression": failures > 0,
+        })
+
+    return rows, [row for row in rows if row["regression"]]
+
+
+def format_comparison(rows):
+    lines = [f"{'rate':>8} {'operation':<10} {'metric':<16} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in rows:
+        change = "" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        rate = "" if row["rate"] is None else f"{row['rate']:g}/s"
+        flag = "  REGRESSION" if row["regression"] else ""
+        baseline = "-" if row["baseline"] is None else f"{row['baseline']:g}"
+        lines.append(f"{rate:>8} {row['operation']:<10} {row['metric']:<16} {baseline:>12} "
+                     f"{row['current']:>12g} {change:>9}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,91 @@
+"""
+Starting and stopping the backend for a run, and recording the bot games
+that score submissions replay.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import time
+from pathlib import Path
+
+from .client import HttpClient
+from .generator import TRANSPORT_ERRORS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def record_games(count, difficulty="normal", node="node"):
+    """Bot games recorded by bench/record-replays.js: [{replay, score, wave}]"""
+    output = subprocess.run(
+        [node, str(REPO_ROOT / "bench" / "record-replays.js"), str(count), difficulty],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+class ServerProcess:
+    """
+    `node backend/server.js` on its own port, writing the leaderboard to
+    data_dir. The server's output goes to data_dir/server.log.
+    """
+
+    def __init__(self, data_dir, port=None, node="node", env=None):
+        self.data_dir = Path(data_dir)
+        self.port = port or free_port()
+        self.node = node
+        self.env = env or {}
+        self.process = None
+        self.log_path = self.data_dir / "server.log"
+
+    def start(self):
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        env = {**os.environ, **self.env, "PORT": str(self.port), "LEADERBOARD_DIR": str(self.data_dir)}
+        with open(self.log_path, "ab") as log:
+            self.process = subprocess.Popen(
+                [self.node, str(REPO_ROOT / "backend" / "server.js")],
+                cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+
+    async def wait_until_ready(self, timeout_s=30.0):
+        client = HttpClient("127.0.0.1", self.port, max_connections=1, timeout=2.0)
+        deadline = time.monotonic() + timeout_s
+        try:
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    raise RuntimeError(
+                        f"server exited with code {self.process.returncode}; see {self.log_path}")
+                try:
+                    if (await client.get("/api/leaderboard?limit=1")).status == 200:
+                        return
+                except TRANSPORT_ERRORS:
+                    pass
+                await asyncio.sleep(0.1)
+        finally:
+            await client.close()
+        raise RuntimeError(f"server did not answer within {timeout_s:.0f}s; see {self.log_path}")
+
+    def stop(self, timeout_s=30.0):
+        """
+        SIGTERM, which makes the server flush queued scores before exiting
+        (see backend/server.js). Returns the exit code, or None if it had
+        to be killed.
+        """
+        if self.process is None or self.process.poll() is not None:
+            return self.process.returncode if self.process else None
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            return self.process.wait(timeout_s)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+            return None
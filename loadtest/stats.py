@@ -0,0 +1,65 @@
+"""
+Latency and outcome bookkeeping for one stage of a load test.
+"""
+
+from collections import Counter, defaultdict
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (None when empty)."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+class StageRecorder:
+    """
+    Collects the outcome of every request sent during a stage, per operation.
+    Latencies are measured from when a request was scheduled to be sent, not
+    from when it actually went out, so a backed-up server or client cannot
+    hide its queueing delay (coordinated omission).
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, operation, latency_ms, status):
+        """status is the HTTP status, or an exception class name for transport failures."""
+        self.latencies[operation].append(latency_ms)
+        self.statuses[operation][str(status)] += 1
+
+    def summary(self, duration_s):
+        operations = {
+            operation: _summarize(self.latencies[operation], self.statuses[operation], duration_s)
+            for operation in sorted(self.latencies)
+        }
+        every_latency = [latency for values in self.latencies.values() for latency in values]
+        every_status = sum(self.statuses.values(), Counter())
+        return operations, _summarize(every_latency, every_status, duration_s)
+
+
+def _is_success(status):
+    return status.isdigit() and int(status) < 400
+
+
+def _summarize(latencies, statuses, duration_s):
+    ordered = sorted(latencies)
+    count = len(ordered)
+    errors = sum(n for status, n in statuses.items() if not _is_success(status))
+    ms = lambda value: None if value is None else round(value, 3)
+    return {
+        "count": count,
+        "ok": count - errors,
+        "errors": errors,
+        "error_rate": round(errors / count, 6) if count else 0.0,
+        "throughput_rps": round((count - errors) / duration_s, 3) if duration_s else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            "mean": ms(sum(ordered) / count) if count else None,
+            "p50": ms(percentile(ordered, 50)),
+            "p95": ms(percentile(ordered, 95)),
+            "p99": ms(percentile(ordered, 99)),
+            "max": ms(ordered[-1]) if count else None,
+        },
+    }
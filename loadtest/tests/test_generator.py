@@ -0,0 +1,33 @@
+"""
+Parsing the --mix operation weights.
+"""
+
+import pytest
+
+from loadtest.generator import parse_mix
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("read=9,submit=1", {"read": 9.0, "submit": 1.0}),
+    ("read", {"read": 1.0}),
+    (" read = 2.5 , submit=0", {"read": 2.5, "submit": 0.0}),
+    ("submit=1,submit=3", {"submit": 3.0}),
+])
+def test_parse_mix(text, expected):
+    assert parse_mix(text) == expected
+
+
+@pytest.mark.parametrize("text, message", [
+    ("read=9,write=1", "unknown operation 'write'"),
+    ("", "unknown operation ''"),
+    ("read=-1", "must not be negative"),
+    ("read=0,submit=0", "at least one operation"),
+])
+def test_parse_mix_rejects(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_mix(text)
+
+
+def test_parse_mix_rejects_a_weight_that_is_not_a_number():
+    with pytest.raises(ValueError):
+        parse_mix("read=lots")
@@ -0,0 +1,30 @@
+"""
+Command-line parsing of the server URL to test.
+"""
+
+import pytest
+
+from loadtest.__main__ import build_parser
+
+
+def parse_url(text):
+    return build_parser().parse_args(["run", "--url", text]).url
+
+
+@pytest.mark.parametrize("text, port", [
+    ("http://localhost:3000", 3000),
+    ("http://play.example.com", None),
+    ("https://play.example.com", None),
+    ("https://play.example.com:8443/", 8443),
+])
+def test_http_and_https_urls_are_accepted(text, port):
+    url = parse_url(text)
+    assert url.geturl() == text
+    assert url.port == port
+
+
+@pytest.mark.parametrize("text", ["ftp://play.example.com", "play.example.com:3000", "http://", "http://host:port"])
+def test_other_urls_are_rejected(text, capsys):
+    with pytest.raises(SystemExit):
+        parse_url(text)
+    assert "argument --url" in capsys.readouterr().err
@@ -0,0 +1,88 @@
+"""
+Lost-write detection against a leaderboard directory written the way the
+store writes it: a leaderboard.json snapshot plus a leaderboard.log tail.
+"""
+
+import json
+
+from loadtest.reconcile import read_stored_scores, reconcile, write_failures
+
+
+def record(id, name, score):
+    return {"id": id, "player_name": name, "score": score, "waves_survived": 3,
+            "created_at": "2026-01-01T00:00:00.000Z"}
+
+
+def submission(name, id, score=100, status=200, expected_score=None):
+    return {"name": name, "id": id, "score": score, "status": status,
+            "expected_score": score if expected_score is None else expected_score, "expected_wave": 3}
+
+
+def write_store(data_dir, snapshot, log, tail=""):
+    (data_dir / "leaderboard.json").write_text(json.dumps({"nextId": 100, "scores": snapshot}))
+    (data_dir / "leaderboard.log").write_text("".join(json.dumps(r) + "\n" for r in log) + tail)
+
+
+def test_every_acknowledged_score_stored_once_passes(tmp_path):
+    write_store(tmp_path, [record(1, "a", 100)], [record(2, "b", 200)])
+    report = reconcile([submission("a", 1), submission("b", 2, score=200)], tmp_path)
+
+    assert (report["acknowledged"], report["stored"]) == (2, 2)
+    assert write_failures(report) == 0
+
+
+def test_a_missing_score_is_lost(tmp_path):
+    # Record 3 only made it into a torn last line, which the store drops on startup
+    write_store(tmp_path, [record(1, "a", 100)], [], tail='{"id": 3, "player_name": "c"')
+    report = reconcile([submission("a", 1), submission("c", 3)], tmp_path)
+
+    assert (report["lost"], report["stored"]) == (1, 1)
+    assert report["examples"]["lost"][0]["name"] == "c"
+    assert write_failures(report) == 1
+
+
+def test_an_extra_score_from_a_failed_request_is_not_a_failure(tmp_path):
+    # The client timed out, but the server stored the score anyway
+    write_store(tmp_path, [], [record(1, "a", 100), record(2, "late", 100)])
+    report = reconcile([submission("a", 1), submission("late", None, score=None, status="TimeoutError",
+                                                       expected_score=100)], tmp_path)
+
+    assert (report["submitted"], report["acknowledged"], report["unacknowledged_stored"]) == (2, 1, 1)
+    assert write_failures(report) == 0
+
+
+def test_a_score_stored_twice_is_duplicated(tmp_path):
+    write_store(tmp_path, [record(1, "a", 100)], [record(2, "a", 100)])
+    report = reconcile([submission("a", 1)], tmp_path)
+
+    assert (report["duplicated"], report["lost"]) == (1, 0)
+    assert write_failures(report) == 1
+
+
+def test_the_same_record_in_the_snapshot_and_the_log_is_not_a_duplicate(tmp_path):
+    # A crash between compaction's rename and its log truncation leaves both copies
+    write_store(tmp_path, [record(1, "a", 100)], [record(1, "a", 100)])
+    report = reconcile([submission("a", 1)], tmp_path)
+
+    assert report["duplicated"] == 0
+    assert write_failures(report) == 0
+
+
+def test_a_score_stored_under_another_name_or_score_is_mismatched(tmp_path):
+    write_store(tmp_path, [record(1, "someone else", 100), record(2, "b", 5)], [])
+    report = reconcile([submission("a", 1), submission("b", 2)], tmp_path)
+
+    assert report["mismatched"] == 2
+    assert write_failures(report) == 2
+
+
+def test_a_score_the_server_computed_differently_is_wrong(tmp_path):
+    write_store(tmp_path, [record(1, "a", 90)], [])
+    report = reconcile([submission("a", 1, score=90, expected_score=100)], tmp_path)
+
+    # Stored as acknowledged, but not what the recorded game scored
+    assert (report["wrong_score"], report["mismatched"]) == (1, 1)
+
+
+def test_reading_a_directory_without_files_finds_nothing(tmp_path):
+    assert read_stored_scores(tmp_path) == {}
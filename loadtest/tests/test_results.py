@@ -0,0 +1,73 @@
+"""
+Comparing a run with a baseline: which changes count as regressions, right
+at the thresholds and just past them.
+"""
+
+import pytest
+
+from loadtest.results import compare
+
+
+def summary(p50=100.0, p95=200.0, p99=300.0, throughput=100.0, error_rate=0.0):
+    return {
+        "latency_ms": {"p50": p50, "p95": p95, "p99": p99},
+        "throughput_rps": throughput,
+        "error_rate": error_rate,
+    }
+
+
+def run(rate=50, writes=None, **metrics):
+    return {"stages": [{"rate": rate, "operations": {}, "total": summary(**metrics)}], "writes": writes}
+
+
+def regressions(baseline, current, **thresholds):
+    return [row["metric"] for row in compare(baseline, current, **thresholds)[1]]
+
+
+def test_identical_runs_have_no_regressions():
+    rows, found = compare(run(), run())
+    assert [row["metric"] for row in rows] == ["p50_ms", "p95_ms", "p99_ms", "throughput_rps", "error_rate"]
+    assert found == []
+
+
+@pytest.mark.parametrize("p99, regressed", [(330.0, False), (330.1, True), (250.0, False)])
+def test_latency_regresses_only_past_the_threshold(p99, regressed):
+    assert regressions(run(), run(p99=p99), threshold_pct=10) == (["p99_ms"] if regressed else [])
+
+
+@pytest.mark.parametrize("p50, regressed", [(1.5, False), (1.6, True)])
+def test_small_latency_changes_are_noise_however_large_in_percent(p50, regressed):
+    # 1.0 -> 1.5 ms is +50%, but only half a millisecond
+    assert regressions(run(p50=1.0), run(p50=p50), threshold_pct=10, min_delta_ms=0.5) == (
+        ["p50_ms"] if regressed else [])
+
+
+@pytest.mark.parametrize("throughput, regressed", [(90.0, False), (89.9, True), (150.0, False)])
+def test_throughput_regresses_only_when_it_drops_past_the_threshold(throughput, regressed):
+    assert regressions(run(), run(throughput=throughput), threshold_pct=10) == (
+        ["throughput_rps"] if regressed else [])
+
+
+@pytest.mark.parametrize("error_rate, regressed", [(0.01, False), (0.0101, True)])
+def test_error_rate_regresses_past_the_allowed_increase(error_rate, regressed):
+    assert regressions(run(), run(error_rate=error_rate), max_error_rate_increase=0.01) == (
+        ["error_rate"] if regressed else [])
+
+
+def test_stages_are_matched_by_rate():
+    rows, found = compare(run(rate=50), run(rate=100, p99=10000.0))
+    assert rows == [] and found == []
+
+
+def test_a_metric_missing_from_either_run_is_skipped():
+    rows, _ = compare(run(p99=None), run())
+    assert "p99_ms" not in [row["metric"] for row in rows]
+
+
+def test_any_failed_write_is_a_regression():
+    clean = {"lost": 0, "mismatched": 0, "duplicated": 0, "wrong_score": 0}
+    assert regressions(run(writes=clean), run(writes=clean)) == []
+    assert regressions(run(writes=clean), run(writes={**clean, "duplicated": 1})) == ["write_failures"]
+    # Even against a baseline that lost writes too, or has no write report
+    assert regressions(run(writes={**clean, "lost": 3}), run(writes={**clean, "lost": 1})) == ["write_failures"]
+    assert regressions(run(), run(writes={**clean, "lost": 1})) == ["write_failures"]
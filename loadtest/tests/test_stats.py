@@ -0,0 +1,45 @@
+"""
+Nearest-rank percentiles and the per-stage summaries built from them.
+"""
+
+import pytest
+
+from loadtest.stats import StageRecorder, percentile
+
+VALUES = list(range(1, 11))
+
+
+@pytest.mark.parametrize("p, expected", [(0, 1), (9.9, 1), (10, 2), (50, 6), (95, 10), (99, 10), (100, 10)])
+def test_percentile_is_nearest_rank(p, expected):
+    assert percentile(VALUES, p) == expected
+
+
+def test_percentile_of_nothing_is_none():
+    assert percentile([], 50) is None
+
+
+def test_percentile_of_one_value_is_that_value():
+    assert [percentile([7.5], p) for p in (0, 50, 100)] == [7.5, 7.5, 7.5]
+
+
+def test_summary_counts_transport_failures_and_http_errors_as_errors():
+    recorder = StageRecorder()
+    for latency in (30.0, 10.0, 20.0):
+        recorder.record("read", latency, 200)
+    recorder.record("read", 50.0, 304)
+    recorder.record("submit", 100.0, 503)
+    recorder.record("submit", 5000.0, "TimeoutError")
+
+    operations, total = recorder.summary(2.0)
+
+    read = operations["read"]
+    assert (read["count"], read["ok"], read["errors"]) == (4, 4, 0)
+    assert read["throughput_rps"] == 2.0
+    assert read["latency_ms"] == {"mean": 27.5, "p50": 30.0, "p95": 50.0, "p99": 50.0, "max": 50.0}
+
+    submit = operations["submit"]
+    assert (submit["errors"], submit["error_rate"]) == (2, 1.0)
+    assert submit["statuses"] == {"503": 1, "TimeoutError": 1}
+
+    assert (total["count"], total["errors"], total["error_rate"]) == (6, 2, round(2 / 6, 6))
+    assert total["statuses"] == {"200": 3, "304": 1, "503": 1, "TimeoutError": 1}
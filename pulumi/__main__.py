@@ -10,6 +10,10 @@ WHAT THIS DOES:
 3. Grants necessary IAM permissions (access control for the service account)
 4. Creates an Artifact Registry repository (storage for Docker container images)
 5. Generates service account credentials (keys for GitHub Actions to authenticate)
+6. Creates the Cloud Run service that runs the game in each configured region,
+   with its scaling and performance settings taken from per-stack config
+7. Puts the regions behind a global HTTPS load balancer with Cloud CDN, when
+   more than one region is configured
 
 WHY PULUMI:
 - Infrastructure as Code (IaC): Define cloud resources in Python instead of clicking in console
@@ -19,6 +23,9 @@ WHY PULUMI:
 
 DEPLOYMENT FLOW:
 GitHub Actions (CI/CD) → Uses Service Account → Pushes Docker Image → Artifact Registry → Cloud Run
+
+Pulumi owns the Cloud Run service's configuration. GitHub Actions only swaps
+the container image on each push (gcloud run services update --image).
 """
 
 import pulumi
@@ -40,6 +47,18 @@ project_id = config.get("project") or "game-zone-479009"
 # us-central1 is located in Iowa, USA - choose regions close to your users
 region = config.get("region") or "us-central1"
 
+# Settings of this program itself (namespace = project name in Pulumi.yaml).
+# Set per stack with, e.g.: pulumi config set minInstances 1
+app_config = pulumi.Config()
+
+# Regions: Where the game's Cloud Run service runs. The first one is the
+# primary region. With more than one, a global load balancer sends each
+# player to the nearest region (see GLOBAL LOAD BALANCER below).
+# Example: pulumi config set --path 'regions[1]' europe-west1
+regions = app_config.get_object("regions") or [region]
+if len(set(regions)) != len(regions):
+    raise ValueError(f"regions must not repeat a region: {regions}")
+
 # ============================================================================
 # API ENABLEMENT SECTION
 # ============================================================================
@@ -57,6 +76,10 @@ apis = [
     # Still needed for backwards compatibility with some GCP tooling
     "containerregistry.googleapis.com",
 
+    # Compute Engine API: Hosts the global load balancer, its serverless
+    # network endpoint groups and Cloud CDN
+    "compute.googleapis.com",
+
     # Cloud Build API: GCP's CI/CD service for building Docker images
     # Can build images from source code and push to registries
     "cloudbuild.googleapis.com",
@@ -274,6 +297,376 @@ gcr_repository = gcp.artifactregistry.Repository(
     opts=pulumi.ResourceOptions(depends_on=enabled_services),
 )
 
+# ============================================================================
+# CLOUD RUN SERVICE
+# ============================================================================
+# CLOUD RUN SCALING EXPLAINED:
+# Cloud Run starts container instances as requests arrive and stops them when
+# traffic goes away. Every knob that trades money for latency or throughput is
+# read from stack config here, so each stack (dev, prod, ...) states its own
+# trade-offs and "pulumi preview" shows any change before it goes live:
+#
+#   minInstances        Instances kept warm even with no traffic. 0 means the
+#                       first request after an idle period waits for a cold
+#                       start (container boot + Node startup); 1 or more
+#                       removes that wait but is billed while idle.
+#   maxInstances        Upper bound on scale-out, which also caps the bill.
+#                       Both apply to the regions after the primary one only
+#                       (see LEADERBOARD HOST below).
+#   concurrency         Requests one instance serves at the same time before
+#                       Cloud Run starts another. Node handles many concurrent
+#                       I/O-bound requests on its single thread; lower it if
+#                       replay verification keeps instances CPU-bound.
+#   startupCpuBoost     Extra CPU while an instance starts, so cold starts
+#                       finish sooner. Billed only during startup.
+#   cpuAlwaysAllocated  Keep CPU allocated between requests (billed for the
+#                       instance's whole lifetime). On by default: the
+#                       leaderboard's group commits and log compaction run
+#                       after the response is sent, and with CPU only during
+#                       requests they stall until the next request arrives.
+#                       Only turn it off for a stack that takes no scores.
+#   cpu / memory        Resources per instance.
+#   env                 Extra environment variables for the server, as a map
+#                       (e.g. REPLAY_WORKERS, LEADERBOARD_COMMIT_WINDOW_MS):
+#                       pulumi config set --path 'env.REPLAY_WORKERS' 2
+#   leaderboardCacheTtl Seconds Cloud CDN may serve a leaderboard page before
+#                       asking the primary region again (default 5, 0 turns
+#                       edge caching off). Passed to the server, which sends
+#                       it as s-maxage (see LEADERBOARD ROUTING below).
+#
+# LEADERBOARD HOST:
+# The leaderboard store is a file pair on the instance's own filesystem (see
+# backend/storage), which on Cloud Run is in memory. Two instances would keep
+# two different boards, and an instance that scales to zero takes its board
+# with it. The primary region's service therefore always runs exactly one
+# instance (min = max = 1), and every leaderboard request is sent to it (see
+# LEADERBOARD ROUTING below). It takes up to `concurrency` requests at once;
+# beyond that Cloud Run queues them briefly, then answers 429. A new revision
+# starts on an empty filesystem, so each deploy still starts a new board:
+# keeping scores across deploys needs LEADERBOARD_DIR on a persistent volume,
+# which this program does not set up. minInstances and maxInstances only
+# scale the other regions, so setting them on a stack with a single region is
+# rejected rather than silently ignored.
+#
+# IMAGE OWNERSHIP:
+# The image is set here only when the service is first created. After that,
+# GitHub Actions deploys new images, and Pulumi ignores the image field so a
+# later "pulumi up" does not roll the service back to an old image.
+
+service_name = app_config.get("serviceName") or "tower-defence"
+initial_image = app_config.get("image") or f"gcr.io/{project_id}/{service_name}:latest"
+min_instances = app_config.get_int("minInstances") or 0
+max_instances = app_config.get_int("maxInstances") or 10
+concurrency = app_config.get_int("concurrency") or 80
+startup_cpu_boost = app_config.get_bool("startupCpuBoost")
+if startup_cpu_boost is None:
+    startup_cpu_boost = True
+cpu_always_allocated = app_config.get_bool("cpuAlwaysAllocated")
+if cpu_always_allocated is None:
+    cpu_always_allocated = True
+cpu = app_config.get("cpu") or "1"
+memory = app_config.get("memory") or "512Mi"
+env = app_config.get_object("env") or {}
+leaderboard_cache_ttl = app_config.get_int("leaderboardCacheTtl")
+if leaderboard_cache_ttl is None:
+    leaderboard_cache_ttl = 5
+if leaderboard_cache_ttl < 0:
+    raise ValueError(f"leaderboardCacheTtl ({leaderboard_cache_ttl}) cannot be negative")
+# Set by this program, so a stack's env cannot contradict the CDN policy
+server_env = {**env, "LEADERBOARD_CACHE_TTL": leaderboard_cache_ttl}
+
+LEADERBOARD_HOST_INSTANCES = 1
+
+if min_instances > max_instances:
+    raise ValueError(
+        f"minInstances ({min_instances}) cannot be greater than maxInstances ({max_instances})"
+    )
+if len(regions) == 1 and (
+    app_config.get_int("minInstances") is not None or app_config.get_int("maxInstances") is not None
+):
+    raise ValueError(
+        f"minInstances and maxInstances only scale the regions after the primary one; "
+        f"{regions[0]} holds the leaderboard and always runs exactly "
+        f"{LEADERBOARD_HOST_INSTANCES} instance (see LEADERBOARD HOST)"
+    )
+
+# One service per region, all with the same name and settings apart from
+# scaling. Every region serves the game, but only the primary region's
+# leaderboard store is used: the load balancer sends all leaderboard requests
+# there (see LEADERBOARD ROUTING below). The other regions' direct endpoints
+# still answer leaderboard requests from their own, unused store.
+cloud_run_services = {}
+for service_region in regions:
+    # The primary region keeps the resource names from before regions were
+    # configurable, so existing stacks don't replace their service
+    is_primary = service_region == regions[0]
+
+    cloud_run_services[service_region] = gcp.cloudrunv2.Service(
+        # Pulumi resource name
+        f"tower-defence-{service_region}",
+
+        # The Cloud Run service name (part of its URL and of gcloud commands)
+        name=service_name,
+        location=service_region,
+        project=project_id,
+
+        # INGRESS_TRAFFIC_ALL: Reachable from the internet, both directly
+        # (the per-region endpoints exported below) and through the load balancer
+        ingress="INGRESS_TRAFFIC_ALL",
+
+        template=gcp.cloudrunv2.ServiceTemplateArgs(
+            scaling=gcp.cloudrunv2.ServiceTemplateScalingArgs(
+                min_instance_count=LEADERBOARD_HOST_INSTANCES if is_primary else min_instances,
+                max_instance_count=LEADERBOARD_HOST_INSTANCES if is_primary else max_instances,
+            ),
+            max_instance_request_concurrency=concurrency,
+            containers=[
+                gcp.cloudrunv2.ServiceTemplateContainerArgs(
+                    image=initial_image,
+                    # The Express server listens on PORT (3000, see Dockerfile)
+                    ports=gcp.cloudrunv2.ServiceTemplateContainerPortsArgs(
+                        container_port=3000,
+                    ),
+                    envs=[
+                        gcp.cloudrunv2.ServiceTemplateContainerEnvArgs(name=name, value=str(value))
+                        for name, value in sorted(server_env.items())
+                    ],
+                    resources=gcp.cloudrunv2.ServiceTemplateContainerResourcesArgs(
+                        limits={"cpu": cpu, "memory": memory},
+                        # cpu_idle=True: CPU is only allocated while requests are in flight
+                        cpu_idle=not cpu_always_allocated,
+                        startup_cpu_boost=startup_cpu_boost,
+                    ),
+                )
+            ],
+        ),
+
+        opts=pulumi.ResourceOptions(
+            # Cloud Run API must be enabled before the service can be created
+            depends_on=enabled_services,
+            # Deployed by GitHub Actions, not Pulumi (see IMAGE OWNERSHIP above).
+            # gcloud also stamps its client name and version on the service.
+            ignore_changes=["template.containers[0].image", "client", "clientVersion"],
+            aliases=[pulumi.Alias(name="tower-defence")] if is_primary else [],
+        ),
+    )
+
+    # PUBLIC ACCESS:
+    # Anyone may call the service (the game is a public website). This replaces
+    # the --allow-unauthenticated flag of "gcloud run deploy".
+    gcp.cloudrunv2.ServiceIamMember(
+        # Pulumi resource name
+        f"tower-defence-public-{service_region}",
+        name=cloud_run_services[service_region].name,
+        location=service_region,
+        project=project_id,
+        # roles/run.invoker: Permission to send requests to the service
+        role="roles/run.invoker",
+        # allUsers: Everyone on the internet, no authentication required
+        member="allUsers",
+        opts=pulumi.ResourceOptions(
+            aliases=[pulumi.Alias(name="tower-defence-public")] if is_primary else [],
+        ),
+    )
+
+cloud_run_service = cloud_run_services[regions[0]]
+
+# ============================================================================
+# GLOBAL LOAD BALANCER AND CLOUD CDN
+# ============================================================================
+# GLOBAL LOAD BALANCING EXPLAINED:
+# A global external HTTPS load balancer has one anycast IP address announced
+# from Google's edge locations worldwide. A player's request enters Google's
+# network at the nearest edge, and the load balancer forwards it to the
+# closest healthy region. Cloud Run services are attached to it through
+# serverless network endpoint groups (NEGs), one per region.
+#
+# CLOUD CDN EXPLAINED:
+# With Cloud CDN enabled on a backend service, responses are cached at the
+# edge, so repeat requests never travel to a region at all. The web backend
+# serves the static game files (HTML, JS, CSS) from every region's NEG with
+# CDN on. The server's own Cache-Control is followed when it sends one:
+# hashed build assets are immutable for a year, index.html is revalidated
+# (no-cache). Files without a header are cached for staticCacheTtl seconds
+# (default 3600).
+#
+# LEADERBOARD ROUTING:
+# Each region's leaderboard store is separate, and only the primary region's
+# single instance holds the real board (see LEADERBOARD HOST above). All of
+# /api/leaderboard (reads, score submissions and /stats) therefore goes to a
+# backend service with only the primary region's NEG, so every submission
+# lands on that one board. Reads are cached at the edge for a few seconds:
+# the backend uses the server's own Cache-Control (USE_ORIGIN_HEADERS), and
+# the server marks GET /api/leaderboard pages with s-maxage set to
+# leaderboardCacheTtl, while browsers still revalidate every time (max-age=0
+# plus an ETag). A new score can therefore take up to leaderboardCacheTtl
+# seconds to show up on the board. Each query string (difficulty, window,
+# limit, cursor) is cached separately. Score submissions are POSTs and /stats
+# is no-store, so neither is ever cached. Players far from the primary region
+# pay the extra round trip on uncached leaderboard calls only.
+#
+# HTTPS:
+# Set the domains that point at the load balancer IP to get a Google-managed
+# certificate, and plain HTTP then redirects to HTTPS:
+#   pulumi config set --path 'domains[0]' play.example.com
+# Without domains the load balancer serves plain HTTP only.
+#
+# The load balancer is created by default when more than one region is
+# configured. Force it on or off with: pulumi config set loadBalancer true
+
+load_balancer_enabled = app_config.get_bool("loadBalancer")
+if load_balancer_enabled is None:
+    load_balancer_enabled = len(regions) > 1
+domains = app_config.get_object("domains") or []
+static_cache_ttl = app_config.get_int("staticCacheTtl") or 3600
+
+load_balancer_ip = None
+if load_balancer_enabled:
+    # SERVERLESS NEGs: One per region, each pointing at that region's service
+    network_endpoint_groups = [
+        gcp.compute.RegionNetworkEndpointGroup(
+            # Pulumi resource name
+            f"tower-defence-neg-{neg_region}",
+            region=neg_region,
+            network_endpoint_type="SERVERLESS",
+            cloud_run=gcp.compute.RegionNetworkEndpointGroupCloudRunArgs(
+                service=service.name,
+            ),
+            project=project_id,
+            opts=pulumi.ResourceOptions(depends_on=enabled_services),
+        )
+        for neg_region, service in cloud_run_services.items()
+    ]
+
+    # BACKEND SERVICES: The web backend spans every region behind Cloud CDN;
+    # the leaderboard backend is the primary region alone, behind a short
+    # edge cache (see CLOUD CDN and LEADERBOARD ROUTING above).
+    # EXTERNAL_MANAGED = the global external Application Load Balancer
+    web_backend = gcp.compute.BackendService(
+        "tower-defence-web",
+        project=project_id,
+        load_balancing_scheme="EXTERNAL_MANAGED",
+        protocol="HTTPS",
+        backends=[
+            gcp.compute.BackendServiceBackendArgs(group=neg.id)
+            for neg in network_endpoint_groups
+        ],
+        enable_cdn=True,
+        cdn_policy=gcp.compute.BackendServiceCdnPolicyArgs(
+            # CACHE_ALL_STATIC: Cache static content types (JS, CSS, images,
+            # fonts); anything marked private or no-store is left alone
+            cache_mode="CACHE_ALL_STATIC",
+            # default_ttl only applies without a Cache-Control header; the
+            # caps let a year-long immutable max-age through unchanged
+            default_ttl=static_cache_ttl,
+            client_ttl=max(static_cache_ttl, 31536000),
+            max_ttl=max(static_cache_ttl, 31536000),
+            # Keep serving a stale copy while the region is slow or down
+            serve_while_stale=86400,
+        ),
+    )
+
+    leaderboard_backend = gcp.compute.BackendService(
+        "tower-defence-leaderboard",
+        project=project_id,
+        load_balancing_scheme="EXTERNAL_MANAGED",
+        protocol="HTTPS",
+        # The first NEG is the primary region's
+        backends=[gcp.compute.BackendServiceBackendArgs(group=network_endpoint_groups[0].id)],
+        enable_cdn=True,
+        cdn_policy=gcp.compute.BackendServiceCdnPolicyArgs(
+            # USE_ORIGIN_HEADERS: Cache only what the server marks cacheable,
+            # for as long as its s-maxage says; the TTL settings do not apply
+            cache_mode="USE_ORIGIN_HEADERS",
+            cache_key_policy=gcp.compute.BackendServiceCdnPolicyCacheKeyPolicyArgs(
+                include_host=True,
+                include_protocol=True,
+                include_query_string=True,
+            ),
+        ),
+    )
+
+    # URL MAP: Routes everything under /api/leaderboard to the primary
+    # region's leaderboard backend, and everything else (the game files,
+    # other API calls) to the web backend
+    url_map = gcp.compute.URLMap(
+        "tower-defence-url-map",
+        project=project_id,
+        default_service=web_backend.id,
+        host_rules=[
+            gcp.compute.URLMapHostRuleArgs(hosts=["*"], path_matcher="game"),
+        ],
+        path_matchers=[
+            gcp.compute.URLMapPathMatcherArgs(
+                name="game",
+                default_service=web_backend.id,
+                path_rules=[
+                    gcp.compute.URLMapPathMatcherPathRuleArgs(
+                        paths=["/api/leaderboard", "/api/leaderboard/*"],
+                        service=leaderboard_backend.id,
+                    ),
+                ],
+            ),
+        ],
+    )
+
+    # GLOBAL IP ADDRESS: The single anycast address players connect to.
+    # Point the DNS records of the configured domains at it.
+    global_address = gcp.compute.GlobalAddress(
+        "tower-defence-ip",
+        project=project_id,
+        opts=pulumi.ResourceOptions(depends_on=enabled_services),
+    )
+    load_balancer_ip = global_address.address
+
+    if domains:
+        certificate = gcp.compute.ManagedSslCertificate(
+            "tower-defence-cert",
+            project=project_id,
+            managed=gcp.compute.ManagedSslCertificateManagedArgs(domains=domains),
+        )
+        https_proxy = gcp.compute.TargetHttpsProxy(
+            "tower-defence-https-proxy",
+            project=project_id,
+            url_map=url_map.id,
+            ssl_certificates=[certificate.id],
+        )
+        gcp.compute.GlobalForwardingRule(
+            "tower-defence-https",
+            project=project_id,
+            target=https_proxy.id,
+            ip_address=global_address.address,
+            port_range="443",
+            load_balancing_scheme="EXTERNAL_MANAGED",
+        )
+
+        # Plain HTTP on the same IP only redirects to HTTPS
+        http_target_map = gcp.compute.URLMap(
+            "tower-defence-http-redirect",
+            project=project_id,
+            default_url_redirect=gcp.compute.URLMapDefaultUrlRedirectArgs(
+                https_redirect=True,
+                strip_query=False,
+                redirect_response_code="MOVED_PERMANENTLY_DEFAULT",
+            ),
+        )
+    else:
+        http_target_map = url_map
+
+    http_proxy = gcp.compute.TargetHttpProxy(
+        "tower-defence-http-proxy",
+        project=project_id,
+        url_map=http_target_map.id,
+    )
+    gcp.compute.GlobalForwardingRule(
+        "tower-defence-http",
+        project=project_id,
+        target=http_proxy.id,
+        ip_address=global_address.address,
+        port_range="80",
+        load_balancing_scheme="EXTERNAL_MANAGED",
+    )
+
 # ============================================================================
 # SERVICE ACCOUNT KEY GENERATION
 # ============================================================================
@@ -360,6 +753,41 @@ pulumi.export("service_account_email", github_actions_sa.email)
 # Useful for: Docker push commands, Cloud Run deployment configs
 pulumi.export("artifact_registry_repository", gcr_repository.name)
 
+# Export the Cloud Run service name and its public URL
+# Useful for: gcloud commands in CI/CD, smoke tests after a deploy
+pulumi.export("cloud_run_service_name", cloud_run_service.name)
+pulumi.export("cloud_run_service_url", cloud_run_service.uri)
+
+# Export every region and its direct Cloud Run URL
+# Useful for: Per-region smoke and latency tests, bypassing the load balancer
+pulumi.export("regions", regions)
+pulumi.export("leaderboard_region", regions[0])
+pulumi.export("cloud_run_endpoints", {
+    service_region: service.uri for service_region, service in cloud_run_services.items()
+})
+
+# Export the load balancer address and the URL players should use
+# Useful for: DNS records for the configured domains
+if load_balancer_ip is not None:
+    pulumi.export("load_balancer_ip", load_balancer_ip)
+    pulumi.export(
+        "load_balancer_url",
+        f"https://{domains[0]}" if domains else load_balancer_ip.apply(lambda ip: f"http://{ip}"),
+    )
+
+# Export the scaling settings this stack deployed with
+# Useful for: Comparing stacks, checking what a load test ran against
+pulumi.export("cloud_run_scaling", {
+    "leaderboard_host_instances": LEADERBOARD_HOST_INSTANCES,
+    "min_instances": min_instances,
+    "max_instances": max_instances,
+    "concurrency": concurrency,
+    "startup_cpu_boost": startup_cpu_boost,
+    "cpu_always_allocated": cpu_always_allocated,
+    "cpu": cpu,
+    "memory": memory,
+})
+
 # ============================================================================
 # SERVICE ACCOUNT KEY EXPORTS (SENSITIVE CREDENTIALS)
 # ============================================================================
@@ -463,6 +891,10 @@ pulumi stack output service_account_key_base64 --show-secrets | base64 -d | gh s
 # 3. Grant IAM roles to service account
 # 4. Create Artifact Registry repository (depends on APIs)
 # 5. Generate service account key
+# 6. Create a Cloud Run service per region (depends on APIs) and make it public
+# 7. With a load balancer: NEGs per region, the CDN web backend and the
+#    primary region's leaderboard backend, URL map, global IP, certificate,
+#    proxies and forwarding rules
 #
 # PULUMI STATE:
 # Pulumi tracks created resources in a state file. This allows it to:
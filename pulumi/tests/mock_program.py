@@ -0,0 +1,72 @@
+"""
+Runs the Pulumi program against Pulumi's mock engine.
+
+With pulumi.runtime.set_mocks nothing reaches GCP: every resource the program
+declares is recorded with its inputs, so tests can check them against the
+stack config the program ran with.
+"""
+
+import importlib.util
+import itertools
+import json
+import re
+from pathlib import Path
+
+import pulumi
+
+PROGRAM = Path(__file__).resolve().parent.parent / "__main__.py"
+PROJECT = "tower-defence-gcp"
+
+_module_ids = itertools.count()
+
+
+def _snake_case(value):
+    """Inputs arrive under their engine (camelCase) names; use the Python SDK's names instead."""
+    if isinstance(value, dict):
+        return {
+            re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower(): _snake_case(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_snake_case(item) for item in value]
+    return value
+
+
+class RecordingMocks(pulumi.runtime.Mocks):
+    """Records every resource the program declares and echoes its inputs back as its outputs."""
+
+    def __init__(self):
+        self.resources = []
+
+    def new_resource(self, args):
+        self.resources.append((args.typ, args.name, _snake_case(args.inputs)))
+        return [f"{args.name}-id", args.inputs]
+
+    def call(self, args):
+        return {}
+
+    def of_type(self, typ):
+        """Inputs of every resource of one type token, by Pulumi resource name."""
+        return {name: inputs for resource_type, name, inputs in self.resources if resource_type == typ}
+
+
+def run_program(monkeypatch, **config):
+    """
+    Runs the program once with the given stack config (keys of this project,
+    values as Python objects) and returns the mocks it ran against.
+    """
+    monkeypatch.setenv("PULUMI_CONFIG", json.dumps({
+        f"{PROJECT}:{key}": value if isinstance(value, str) else json.dumps(value)
+        for key, value in config.items()
+    }))
+    mocks = RecordingMocks()
+    pulumi.runtime.set_mocks(mocks, project=PROJECT, stack="test", preview=False)
+
+    @pulumi.runtime.test
+    def load():
+        # A fresh module every run: the program reads its config at import time
+        spec = importlib.util.spec_from_file_location(f"tower_defence_infra_{next(_module_ids)}", PROGRAM)
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+
+    load()
+    return mocks
@@ -0,0 +1,98 @@
+"""
+The Cloud Run service takes its scaling and performance settings from stack config,
+except that the primary region, which holds the leaderboard, runs exactly one instance.
+"""
+
+import pytest
+
+pytest.importorskip(
+    "pulumi_gcp", reason="pulumi_gcp is not installed: run pip install -r requirements.txt pytest in pulumi/"
+)
+
+from mock_program import run_program  # noqa: E402
+
+CLOUD_RUN_SERVICE = "gcp:cloudrunv2/service:Service"
+REGIONS = ["us-central1", "europe-west1"]
+
+
+def only_service(mocks):
+    services = mocks.of_type(CLOUD_RUN_SERVICE)
+    assert list(services) == ["tower-defence-us-central1"]
+    return services["tower-defence-us-central1"]
+
+
+@pytest.mark.parametrize("boost, always_allocated", [(False, True), (True, False)])
+def test_scaling_settings_come_from_stack_config(monkeypatch, boost, always_allocated):
+    mocks = run_program(
+        monkeypatch,
+        regions=REGIONS,
+        minInstances=2,
+        maxInstances=30,
+        concurrency=40,
+        startupCpuBoost=boost,
+        cpuAlwaysAllocated=always_allocated,
+    )
+    services = mocks.of_type(CLOUD_RUN_SERVICE)
+    primary = services["tower-defence-us-central1"]["template"]
+    template = services["tower-defence-europe-west1"]["template"]
+
+    assert template["scaling"]["min_instance_count"] == 2
+    assert template["scaling"]["max_instance_count"] == 30
+    assert primary["scaling"]["min_instance_count"] == 1
+    assert primary["scaling"]["max_instance_count"] == 1
+    for settings in (primary, template):
+        assert settings["max_instance_request_concurrency"] == 40
+        resources = settings["containers"][0]["resources"]
+        assert resources["startup_cpu_boost"] is boost
+        assert resources["cpu_idle"] is (not always_allocated)
+
+
+def test_cpu_memory_and_env_come_from_stack_config(monkeypatch):
+    mocks = run_program(monkeypatch, cpu="2", memory="1Gi", env={"REPLAY_WORKERS": 2})
+    container = only_service(mocks)["template"]["containers"][0]
+
+    assert container["resources"]["limits"] == {"cpu": "2", "memory": "1Gi"}
+    assert container["envs"] == [
+        {"name": "LEADERBOARD_CACHE_TTL", "value": "5"},
+        {"name": "REPLAY_WORKERS", "value": "2"},
+    ]
+
+
+def test_leaderboard_cache_ttl_reaches_the_server_and_wins_over_env(monkeypatch):
+    mocks = run_program(monkeypatch, leaderboardCacheTtl=0, env={"LEADERBOARD_CACHE_TTL": 60})
+    container = only_service(mocks)["template"]["containers"][0]
+
+    assert container["envs"] == [{"name": "LEADERBOARD_CACHE_TTL", "value": "0"}]
+
+
+def test_defaults_without_stack_config(monkeypatch):
+    template = only_service(run_program(monkeypatch))["template"]
+
+    # The only region holds the leaderboard: one instance, never scaled to zero
+    assert template["scaling"]["min_instance_count"] == 1
+    assert template["scaling"]["max_instance_count"] == 1
+    assert template["max_instance_request_concurrency"] == 80
+    resources = template["containers"][0]["resources"]
+    assert resources["startup_cpu_boost"] is True
+    # CPU stays allocated between requests, for the leaderboard's background commits
+    assert resources["cpu_idle"] is False
+
+
+def test_other_regions_scale_from_zero_to_ten_by_default(monkeypatch):
+    services = run_program(monkeypatch, regions=REGIONS).of_type(CLOUD_RUN_SERVICE)
+    scaling = services["tower-defence-europe-west1"]["template"]["scaling"]
+
+    assert scaling["min_instance_count"] == 0
+    assert scaling["max_instance_count"] == 10
+
+
+def test_min_instances_above_max_instances_is_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="minInstances"):
+        run_program(monkeypatch, regions=REGIONS, minInstances=5, maxInstances=2)
+
+
+@pytest.mark.parametrize("setting", [{"minInstances": 2}, {"maxInstances": 20}])
+def test_scaling_a_single_region_stack_is_rejected(monkeypatch, setting):
+    # More than one instance would split the leaderboard between them
+    with pytest.raises(ValueError, match="exactly 1 instance"):
+        run_program(monkeypatch, **setting)
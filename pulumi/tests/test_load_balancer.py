@@ -0,0 +1,82 @@
+"""
+Several regions sit behind one global load balancer: the game files come from
+every region through Cloud CDN, the leaderboard from the primary region only,
+behind an edge cache that follows the server's Cache-Control.
+"""
+
+import pytest
+
+pytest.importorskip(
+    "pulumi_gcp", reason="pulumi_gcp is not installed: run pip install -r requirements.txt pytest in pulumi/"
+)
+
+from mock_program import run_program  # noqa: E402
+
+REGIONS = ["us-central1", "europe-west1", "asia-northeast1"]
+CLOUD_RUN_SERVICE = "gcp:cloudrunv2/service:Service"
+NETWORK_ENDPOINT_GROUP = "gcp:compute/regionNetworkEndpointGroup:RegionNetworkEndpointGroup"
+BACKEND_SERVICE = "gcp:compute/backendService:BackendService"
+URL_MAP = "gcp:compute/uRLMap:URLMap"
+
+
+def test_one_serverless_neg_per_region(monkeypatch):
+    mocks = run_program(monkeypatch, regions=REGIONS)
+
+    assert sorted(mocks.of_type(CLOUD_RUN_SERVICE)) == sorted(f"tower-defence-{region}" for region in REGIONS)
+    groups = mocks.of_type(NETWORK_ENDPOINT_GROUP)
+    assert sorted(groups) == sorted(f"tower-defence-neg-{region}" for region in REGIONS)
+    for region in REGIONS:
+        group = groups[f"tower-defence-neg-{region}"]
+        assert group["region"] == region
+        assert group["network_endpoint_type"] == "SERVERLESS"
+        assert group["cloud_run"]["service"] == "tower-defence"
+
+
+def test_game_files_are_served_from_every_region_through_cdn(monkeypatch):
+    web = run_program(monkeypatch, regions=REGIONS).of_type(BACKEND_SERVICE)["tower-defence-web"]
+
+    assert web["enable_cdn"] is True
+    assert web["cdn_policy"]["cache_mode"] == "CACHE_ALL_STATIC"
+    assert sorted(backend["group"] for backend in web["backends"]) == sorted(
+        f"tower-defence-neg-{region}-id" for region in REGIONS
+    )
+
+
+def test_leaderboard_goes_to_the_primary_region_through_a_short_edge_cache(monkeypatch):
+    mocks = run_program(monkeypatch, regions=REGIONS)
+
+    leaderboard = mocks.of_type(BACKEND_SERVICE)["tower-defence-leaderboard"]
+    assert leaderboard["backends"] == [{"group": "tower-defence-neg-us-central1-id"}]
+    assert leaderboard["enable_cdn"] is True
+    # The server's s-maxage sets the TTL, so the policy sets none of its own
+    policy = leaderboard["cdn_policy"]
+    assert policy["cache_mode"] == "USE_ORIGIN_HEADERS"
+    assert "default_ttl" not in policy and "max_ttl" not in policy
+    # Each difficulty, window and cursor is a separate page
+    assert policy["cache_key_policy"]["include_query_string"] is True
+
+    url_map = mocks.of_type(URL_MAP)["tower-defence-url-map"]
+    assert url_map["default_service"] == "tower-defence-web-id"
+    assert url_map["path_matchers"][0]["path_rules"] == [
+        {"paths": ["/api/leaderboard", "/api/leaderboard/*"], "service": "tower-defence-leaderboard-id"}
+    ]
+
+
+def test_the_leaderboard_host_sends_its_pages_with_the_cache_ttl(monkeypatch):
+    services = run_program(monkeypatch, regions=REGIONS, leaderboardCacheTtl=3).of_type(CLOUD_RUN_SERVICE)
+
+    envs = services["tower-defence-us-central1"]["template"]["containers"][0]["envs"]
+    assert {"name": "LEADERBOARD_CACHE_TTL", "value": "3"} in envs
+
+
+def test_a_negative_leaderboard_cache_ttl_is_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="leaderboardCacheTtl"):
+        run_program(monkeypatch, regions=REGIONS, leaderboardCacheTtl=-1)
+
+
+def test_a_single_region_has_no_load_balancer(monkeypatch):
+    mocks = run_program(monkeypatch)
+
+    assert list(mocks.of_type(CLOUD_RUN_SERVICE)) == ["tower-defence-us-central1"]
+    assert mocks.of_type(NETWORK_ENDPOINT_GROUP) == {}
+    assert mocks.of_type(BACKEND_SERVICE) == {}
@@ -0,0 +1,155 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+
+const COMMIT_LOG = require.resolve('../backend/storage/commit-log');
+
+// An in-memory log file behind fs.write, fs.fdatasync and fs.ftruncate. The
+// commit log binds these when it is loaded, so it is loaded afresh on top of
+// the stubs. Each call is recorded in calls; failNextSync makes the next
+// fdatasync fail after its write has landed, and holdSync keeps every
+// fdatasync pending until release() is called.
+function stubFs(t) {
+    const file = { contents: Buffer.alloc(0), calls: [], failNextSync: null, holdSync: false, held: [] };
+    file.text = () => file.contents.toString();
+    file.release = () => {
+        for (const callback of file.held.splice(0)) callback(null);
+    };
+
+    t.mock.method(fs, 'write', (fd, buffer, offset, length, callback) => {
+        file.calls.push(['write', length]);
+        file.contents = Buffer.concat([file.contents, buffer.subarray(offset, offset + length)]);
+        setImmediate(callback, null, length, buffer);
+    });
+    t.mock.method(fs, 'fdatasync', (fd, callback) => {
+        file.calls.push(['fdatasync']);
+        const error = file.failNextSync;
+        file.failNextSync = null;
+        if (error) return setImmediate(callback, error);
+        if (file.holdSync) return file.held.push(callback);
+        setImmediate(callback, null);
+    });
+    t.mock.method(fs, 'ftruncate', (fd, length, callback) => {
+        file.calls.push(['ftruncate', length]);
+        file.contents = file.contents.subarray(0, length);
+        setImmediate(callback, null);
+    });
+
+    delete require.cache[COMMIT_LOG];
+    const { GroupCommitLog } = require(COMMIT_LOG);
+    delete require.cache[COMMIT_LOG];
+    return { file, GroupCommitLog };
+}
+
+const line = id => JSON.stringify({ id }) + '\n';
+
+test('appends queued together go out in one write and one fdatasync', async t => {
+    const { file, GroupCommitLog } = stubFs(t);
+    const committed = [];
+    const log = new GroupCommitLog(3, 0, { onCommit: records => committed.push(records.map(r => r.id)) });
+
+    await Promise.all([1, 2, 3, 4, 5].map(id => log.append({ id })));
+
+    assert.deepStrictEqual(file.calls, [['write', 5 * line(1).length], ['fdatasync']]);
+    assert.strictEqual(file.text(), [1, 2, 3, 4, 5].map(line).join(''));
+    assert.deepStrictEqual(committed, [[1, 2, 3, 4, 5]]);
+    assert.strictEqual(log.size, file.contents.length);
+    assert.strictEqual(log.getStats().commits, 1);
+});
+
+test('appends arriving during a commit form the next batch, split at maxBatch', async t => {
+    const { file, GroupCommitLog } = stubFs(t);
+    const committed = [];
+    const log = new GroupCommitLog(3, 0, { maxBatch: 2, onCommit: records => committed.push(records.map(r => r.id)) });
+
+    file.holdSync = true;
+    const first = log.append({ id: 1 });
+    // One turn to start the commit, one for its write to complete
+    for (let i = 0; i < 2; i++) await new Promise(resolve => setImmediate(resolve));
+    assert.deepStrictEqual(file.calls, [['write', line(1).length], ['fdatasync']]);
+
+    // Queued behind the commit in flight; reaching maxBatch does not start a second writer
+    const rest = [2, 3, 4].map(id => log.append({ id }));
+    assert.strictEqual(file.calls.length, 2);
+    file.holdSync = false;
+    file.release();
+    await Promise.all([first, ...rest]);
+
+    assert.deepStrictEqual(committed, [[1], [2, 3], [4]]);
+    assert.strictEqual(file.calls.filter(([call]) => call === 'fdatasync').length, 3);
+    assert.strictEqual(file.text(), [1, 2, 3, 4].map(line).join(''));
+});
+
+test('a failed batch rejects every waiter and cuts the log back to the last good commit', async t => {
+    const { file, GroupCommitLog } = stubFs(t);
+    const committed = [];
+    const log = new GroupCommitLog(3, 0, { onCommit: records => committed.push(records.map(r => r.id)) });
+
+    await log.append({ id: 1 });
+    const good = file.text();
+
+    const failure = new Error('EIO: i/o error, fdatasync');
+    file.failNextSync = failure;
+    file.calls.length = 0;
+    const results = await Promise.allSettled([2, 3, 4].map(id => log.append({ id })));
+
+    assert.deepStrictEqual(results.map(result => result.status), ['rejected', 'rejected', 'rejected']);
+    assert.ok(results.every(result => result.reason === failure));
+    assert.deepStrictEqual(file.calls, [['write', 3 * line(2).length], ['fdatasync'], ['ftruncate', good.length]]);
+    assert.strictEqual(file.text(), good);
+    assert.strictEqual(log.size, good.length);
+    assert.deepStrictEqual(committed, [[1]]);
+    assert.strictEqual(log.getStats().failedCommits, 1);
+
+    // The next batch follows the last good line, not the torn one
+    await log.append({ id: 5 });
+    assert.strictEqual(file.text(), line(1) + line(5));
+    assert.deepStrictEqual(committed, [[1], [5]]);
+});
+
+test('flush commits at once, then waits for afterCommit before resolving', async t => {
+    const { file, GroupCommitLog } = stubFs(t);
+    const order = [];
+    const log = new GroupCommitLog(3, 0, {
+        // Long enough that only flush can have started the commit
+        windowMs: 60000,
+        onCommit: records => order.push(`commit ${records.map(r => r.id)}`),
+        afterCommit: async () => {
+            await new Promise(resolve => setImmediate(resolve));
+            order.push('afterCommit');
+        }
+    });
+
+    await log.flush();
+    assert.deepStrictEqual(file.calls, []);
+
+    const appends = [1, 2].map(id => log.append({ id }).then(() => order.push(`resolved ${id}`)));
+    await log.flush();
+    order.push('flushed');
+    await Promise.all(appends);
+
+    assert.deepStrictEqual(order, ['commit 1,2', 'resolved 1', 'resolved 2', 'afterCommit', 'flushed']);
+    assert.strictEqual(log.timer, null);
+    assert.strictEqual(file.text(), line(1) + line(2));
+});
+
+test('closing the store waits for queued appends before closing the log', async t => {
+    const { file, GroupCommitLog } = stubFs(t);
+    const { LeaderboardStore } = require('../backend/storage/leaderboard-store');
+    const order = [];
+    t.mock.method(fs, 'closeSync', () => order.push('closeSync'));
+
+    // Stands in for a store that has been opened on the stubbed log
+    const store = new LeaderboardStore({ dir: 'unused' });
+    store.logFd = 3;
+    store.log = new GroupCommitLog(3, 0, { windowMs: 60000, onCommit: records => store.apply(records) });
+
+    const added = store.add('last', 100, 2).then(record => order.push(`added ${record.id}`));
+    await store.close();
+    await added;
+
+    assert.deepStrictEqual(order, ['added 1', 'closeSync']);
+    assert.strictEqual(store.logFd, null);
+    assert.strictEqual(store.top(1)[0].player_name, 'last');
+    assert.strictEqual(file.text().split('\n').length - 1, 1);
+});
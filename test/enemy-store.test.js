@@ -0,0 +1,115 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const {
+    Simulation, createSimulationState, createRng, Enemy, EnemyStore, ENEMY_TYPES, DAMAGE_TYPES,
+    gamePathModel, difficultySettings
+} = require('../backend/engine').loadEngine();
+
+const COLUMNS = [
+    ['type', enemy => ENEMY_TYPES.indexOf(enemy.type)],
+    ['segment', enemy => enemy.pathIndex],
+    ['x', enemy => enemy.x],
+    ['y', enemy => enemy.y],
+    ['distance', enemy => enemy.distance],
+    ['speed', enemy => enemy.speed],
+    ['health', enemy => enemy.health],
+    ['maxHealth', enemy => enemy.maxHealth],
+    ['shield', enemy => enemy.shield],
+    ['frozenTimer', enemy => enemy.frozenTimer],
+    ['poisonTimer', enemy => enemy.poisonTimer],
+    ['healCooldown', enemy => enemy.healCooldown],
+    ['splitGeneration', enemy => enemy.splitGeneration]
+];
+
+function assertSameEnemies(enemies, store, tick) {
+    assert.strictEqual(store.count, enemies.length, `enemy count at tick ${tick}`);
+    enemies.forEach((enemy, i) => {
+        for (const [column, read] of COLUMNS) {
+            assert.strictEqual(store[column][i], read(enemy), `${column} of enemy ${i} at tick ${tick}`);
+        }
+    });
+}
+
+// Runs Simulation.step() (no towers, no waves: only its enemy phase does
+// anything) next to EnemyStore.update(), landing the same random hits,
+// freezes, poisons, spawns and time slows on both, and compares every enemy
+// after every tick.
+test('EnemyStore matches the simulation enemy for enemy, tick for tick', () => {
+    const state = createSimulationState('hard', 11);
+    state.wave = 12;
+    state.health = 1e9;
+    state.money = 1e9;
+    const simulation = new Simulation(state);
+    const store = new EnemyStore(gamePathModel, 16);
+    const storeRng = createRng(11);  // The simulation's enemy phase draws from its own stream of the same seed
+    const random = createRng(99);
+    const timeslow = state.abilities.timeslow;
+    const healthMultiplier = difficultySettings.hard.enemyHealthMultiplier;
+    const poisonType = DAMAGE_TYPES.indexOf('poison');
+
+    const spawn = type => {
+        const enemy = new Enemy(gamePathModel, type, state.wave, healthMultiplier);
+        const distance = random() * gamePathModel.totalLength * 0.8;
+        gamePathModel.moveTo(enemy, distance);
+        state.enemies.push(enemy);
+        const i = store.spawn(type, state.wave, healthMultiplier, distance);
+        if (timeslow.active) {
+            enemy.originalSpeed = enemy.speed;
+            enemy.speed *= timeslow.slowAmount;
+            enemy.timeSlowed = true;
+            store.slow(i, timeslow.slowAmount);
+        }
+    };
+
+    let kills = 0;
+    let leaked = 0;
+    let splits = 0;
+    for (let tick = 1; tick <= 3000; tick++) {
+        while (state.enemies.length < 60) {
+            spawn(ENEMY_TYPES[Math.floor(random() * ENEMY_TYPES.length)]);
+        }
+
+        for (let h = 0; h < 6; h++) {
+            const i = Math.floor(random() * state.enemies.length);
+            const enemy = state.enemies[i];
+            const d = Math.floor(random() * DAMAGE_TYPES.length);
+            const damage = random() * 12;
+            if (d === poisonType) {
+                enemy.poisoned = true;
+                enemy.poisonDamage = damage;
+                enemy.poisonTimer = 120;
+                store.poison(i, damage, 120);
+            } else if (d === DAMAGE_TYPES.indexOf('freeze')) {
+                enemy.frozenTimer = 60;
+                enemy.originalSpeed = enemy.speed;
+                enemy.speed *= 0.3;
+                store.freeze(i, 60);
+            }
+            assert.strictEqual(store.takeDamage(i, damage, d), enemy.takeDamage(damage, DAMAGE_TYPES[d]));
+        }
+
+        if (tick % 400 === 0) {
+            timeslow.cooldown = 0;
+            assert.ok(simulation.activateTimeSlow());
+            store.slowAll(timeslow.slowAmount);
+        }
+        // Time slow ends at the start of the step, before the enemies move
+        if (timeslow.active && timeslow.timer === 1) {
+            store.restoreSlowed(timeslow.slowAmount);
+        }
+
+        const healthBefore = state.health;
+        simulation.step();
+        store.update(storeRng, state.wave, healthMultiplier);
+
+        assert.strictEqual(store.leaked, healthBefore - state.health, `leaked damage at tick ${tick}`);
+        kills += store.killed.length;
+        leaked += store.leaked;
+        for (let i = 0; i < store.count; i++) {
+            if (store.splitGeneration[i] === 2) splits++;
+        }
+        assertSameEnemies(state.enemies, store, tick);
+    }
+    // The run has to have exercised deaths, second-generation splits and leaks to mean anything
+    assert.ok(kills > 200 && leaked > 10 && splits > 0, `${kills} kills, ${leaked} leaked, ${splits} splits`);
+});
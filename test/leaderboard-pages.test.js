@@ -0,0 +1,36 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { IndexedSkipList } = require('../backend/storage/skiplist');
+const { encodeCursor, decodeCursor } = require('../backend/storage/page-cache');
+const { createRng } = require('../backend/engine').loadEngine();
+
+test('countBefore matches a linear count, with fractional comparator results', () => {
+    const rng = createRng(7);
+    // Values are multiples of 0.25 so ties are common and differences fractional
+    const compare = (a, b) => a - b;
+    for (let round = 0; round < 50; round++) {
+        const list = new IndexedSkipList(compare);
+        const items = [];
+        for (let i = 0; i < 200; i++) {
+            const value = Math.floor(rng() * 40) / 4;
+            items.push(value);
+            list.insert(value);
+        }
+        for (let i = 0; i < 50; i++) {
+            const probe = Math.floor(rng() * 44) / 4 - 0.5;
+            assert.strictEqual(list.countBefore(probe), items.filter(v => v < probe).length);
+            assert.strictEqual(list.countBefore(probe, true), items.filter(v => v <= probe).length);
+        }
+    }
+});
+
+test('decodeCursor round-trips stored keys and rejects anything but integers', () => {
+    const record = { score: 1200, waves_survived: 7, id: 42 };
+    assert.deepStrictEqual(decodeCursor(encodeCursor(record)), record);
+
+    const encode = key => Buffer.from(JSON.stringify(key)).toString('base64url');
+    for (const key of [[1200.5, 7, 42], [1200, 7.25, 42], [1200, 7, 42.1], [1200, 7], ['1200', 7, 42], [1e300, 7, 42]]) {
+        assert.strictEqual(decodeCursor(encode(key)), null, JSON.stringify(key));
+    }
+    assert.strictEqual(decodeCursor('not a cursor'), null);
+});
@@ -0,0 +1,163 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { LeaderboardStore, compareScores } = require('../backend/storage/leaderboard-store');
+
+function tempDir(t) {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'leaderboard-store-test-'));
+    t.after(() => fs.rmSync(dir, { recursive: true, force: true }));
+    return dir;
+}
+
+function score(id, points, waves = 5) {
+    return { id, player_name: `p${id}`, score: points, waves_survived: waves, created_at: new Date().toISOString() };
+}
+
+const ndjson = records => records.map(record => JSON.stringify(record) + '\n').join('');
+
+function reopen(dir, options = {}) {
+    const store = new LeaderboardStore({ dir, ...options });
+    const recovery = store.open();
+    return { store, recovery };
+}
+
+test('recovers from the snapshot plus the log, counting records found in both once', async t => {
+    const dir = tempDir(t);
+    const records = [score(1, 100), score(2, 300), score(3, 200), score(4, 300, 7), score(5, 50)];
+    fs.writeFileSync(path.join(dir, 'leaderboard.json'), JSON.stringify({ nextId: 4, scores: records.slice(0, 3) }));
+    // A crash between the snapshot rename and the log truncation leaves record 3 in both
+    fs.writeFileSync(path.join(dir, 'leaderboard.log'), ndjson(records.slice(2)));
+
+    const { store, recovery } = reopen(dir);
+    t.after(() => store.close());
+    assert.deepStrictEqual(recovery, { scores: 5, fromSnapshot: 3, replayed: 2, truncatedBytes: 0 });
+    assert.deepStrictEqual(store.top(10).map(record => record.id), [4, 2, 3, 1, 5]);
+
+    const added = await store.add('late', 10, 1);
+    assert.strictEqual(added.id, 6);
+});
+
+test('discards a torn final line and appends cleanly after it', async t => {
+    t.mock.method(console, 'warn', () => {});
+    const dir = tempDir(t);
+    const logPath = path.join(dir, 'leaderboard.log');
+    const good = ndjson([score(1, 100), score(2, 200)]);
+    const torn = '{"id":3,"player_name":"p3","sco';
+    fs.writeFileSync(logPath, good + torn);
+
+    let { store, recovery } = reopen(dir);
+    assert.deepStrictEqual(recovery, { scores: 2, fromSnapshot: 0, replayed: 2, truncatedBytes: torn.length });
+    assert.strictEqual(fs.readFileSync(logPath, 'utf8'), good);
+
+    const added = await store.add('next', 150, 3);
+    assert.strictEqual(added.id, 3);
+    await store.close();
+
+    ({ store, recovery } = reopen(dir));
+    t.after(() => store.close());
+    assert.deepStrictEqual(recovery, { scores: 3, fromSnapshot: 0, replayed: 3, truncatedBytes: 0 });
+    assert.deepStrictEqual(store.top(10).map(record => record.id), [2, 3, 1]);
+});
+
+test('compaction renames a complete snapshot into place before truncating the log', async t => {
+    const dir = tempDir(t);
+    const snapshotPath = path.join(dir, 'leaderboard.json');
+    const logPath = path.join(dir, 'leaderboard.log');
+
+    const rename = fs.promises.rename;
+    const renames = [];
+    t.mock.method(fs.promises, 'rename', async (from, to) => {
+        // The temp file is already complete and the log still holds every record
+        renames.push({
+            from,
+            to,
+            snapshot: JSON.parse(fs.readFileSync(from, 'utf8')),
+            logLines: fs.readFileSync(logPath, 'utf8').split('\n').length - 1
+        });
+        return rename(from, to);
+    });
+
+    let { store } = reopen(dir, { compactEvery: 3 });
+    await Promise.all([store.add('a', 100, 2), store.add('b', 300, 4), store.add('c', 200, 3)]);
+    await store.close();
+
+    assert.strictEqual(renames.length, 1);
+    assert.strictEqual(renames[0].from, `${snapshotPath}.tmp`);
+    assert.strictEqual(renames[0].to, snapshotPath);
+    assert.strictEqual(renames[0].logLines, 3);
+    assert.deepStrictEqual(renames[0].snapshot.scores.map(record => record.id), [1, 2, 3]);
+    assert.strictEqual(renames[0].snapshot.nextId, 4);
+    assert.strictEqual(fs.statSync(logPath).size, 0);
+    assert.ok(!fs.existsSync(`${snapshotPath}.tmp`));
+
+    // Appends after compaction start the log afresh and survive a restart
+    let recovery;
+    ({ store, recovery } = reopen(dir, { compactEvery: 3 }));
+    assert.deepStrictEqual(recovery, { scores: 3, fromSnapshot: 3, replayed: 0, truncatedBytes: 0 });
+    await store.add('d', 250, 3);
+    await store.close();
+    assert.strictEqual(fs.readFileSync(logPath, 'utf8').split('\n').length - 1, 1);
+
+    ({ store, recovery } = reopen(dir));
+    t.after(() => store.close());
+    assert.deepStrictEqual(recovery, { scores: 4, fromSnapshot: 3, replayed: 1, truncatedBytes: 0 });
+    assert.deepStrictEqual(store.top(10).map(record => record.id), [2, 4, 3, 1]);
+});
+
+test('rank and countBefore give the same answers after a reload', async t => {
+    const dir = tempDir(t);
+    let { store } = reopen(dir, { compactEvery: 7 });
+    // Plenty of ties on score and waves, and a compaction part way through
+    const pending = [];
+    for (let i = 0; i < 20; i++) {
+        pending.push(store.add(`p${i}`, (i * 7) % 5 * 100, i % 3, i % 2 ? 'easy' : 'hard'));
+    }
+    const records = await Promise.all(pending);
+
+    const expected = [...records].sort(compareScores);
+    const ranks = records.map(record => store.rank(record.id));
+    assert.deepStrictEqual(ranks, records.map(record => expected.indexOf(record) + 1));
+    await store.close();
+
+    ({ store } = reopen(dir));
+    t.after(() => store.close());
+    assert.deepStrictEqual(records.map(record => store.rank(record.id)), ranks);
+
+    const list = store.getView('all', 'alltime').list;
+    for (const record of expected) {
+        const key = { score: record.score, waves_survived: record.waves_survived, id: record.id };
+        assert.strictEqual(list.countBefore(key), expected.indexOf(record));
+        assert.strictEqual(list.countBefore(key, true), expected.indexOf(record) + 1);
+    }
+
+    // Paging a difficulty view by cursor walks it in order with nothing skipped or repeated
+    const easy = expected.filter(record => record.difficulty === 'easy').map(record => record.id);
+    const seen = [];
+    let after = null;
+    for (;;) {
+        const { scores, hasMore } = store.page({ difficulty: 'easy', after, limit: 3 });
+        seen.push(...scores.map(record => record.id));
+        if (!hasMore) break;
+        after = scores[scores.length - 1];
+    }
+    assert.deepStrictEqual(seen, easy);
+});
+
+test('a score committed after its day ended stays out of the new daily view', async t => {
+    const dir = tempDir(t);
+    const { store } = reopen(dir);
+    t.after(() => store.close());
+    const today = await store.add('today', 100, 2, 'easy');
+    const daily = store.getView('easy', 'daily');
+
+    // Submitted just before midnight, its batch only becomes durable after it
+    const yesterday = { ...score(today.id + 1, 500), difficulty: 'easy' };
+    yesterday.created_at = new Date(Date.parse(daily.period) - 1).toISOString();
+    store.apply([yesterday]);
+
+    assert.strictEqual(store.getView('easy', 'daily'), daily);
+    assert.deepStrictEqual(store.page({ difficulty: 'easy', window: 'daily' }).scores, [today]);
+    assert.deepStrictEqual(store.page({ difficulty: 'easy' }).scores, [yesterday, today]);
+});
@@ -0,0 +1,109 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const http = require('http');
+const { Registry, ServerTiming, requestMetrics, requireMetricsToken } = require('../backend/metrics');
+
+test('histograms render cumulative buckets, +Inf, _sum and _count per series', () => {
+    const registry = new Registry();
+    const histogram = registry.histogram('op_seconds', 'Operation time', ['op'], [0.1, 0.5, 1]);
+    for (const seconds of [0.05, 0.1, 0.3, 0.7, 2]) histogram.observe({ op: 'read' }, seconds);
+    histogram.observe({ op: 'write' }, 0.2);
+
+    assert.strictEqual(registry.render(), [
+        '# HELP op_seconds Operation time',
+        '# TYPE op_seconds histogram',
+        // Bounds are inclusive: 0.1 lands in le="0.1"; 2 is past every bound and only in +Inf
+        'op_seconds_bucket{op="read",le="0.1"} 2',
+        'op_seconds_bucket{op="read",le="0.5"} 3',
+        'op_seconds_bucket{op="read",le="1"} 4',
+        'op_seconds_bucket{op="read",le="+Inf"} 5',
+        'op_seconds_sum{op="read"} 3.15',
+        'op_seconds_count{op="read"} 5',
+        'op_seconds_bucket{op="write",le="0.1"} 0',
+        'op_seconds_bucket{op="write",le="0.5"} 1',
+        'op_seconds_bucket{op="write",le="1"} 1',
+        'op_seconds_bucket{op="write",le="+Inf"} 1',
+        'op_seconds_sum{op="write"} 0.2',
+        'op_seconds_count{op="write"} 1',
+        ''
+    ].join('\n'));
+});
+
+test('label values are escaped and collected gauges are read at render time', () => {
+    const registry = new Registry();
+    const counter = registry.counter('requests_total', 'Requests', ['path']);
+    counter.inc({ path: 'C:\\games\\"td"\nnext' });
+    counter.inc({ path: 'C:\\games\\"td"\nnext' }, 2);
+    counter.inc({});
+    let depth = 3;
+    registry.gauge('queue_depth', 'Queued', ['queue'], () => [[{ queue: 'a"b' }, depth], [{ queue: 'c' }, Infinity]]);
+    registry.gauge('up', 'Up', [], () => 1);
+    depth = 4;
+
+    const lines = registry.render().split('\n');
+    assert.ok(lines.includes('requests_total{path="C:\\\\games\\\\\\"td\\"\\nnext"} 3'), lines.join('\n'));
+    assert.ok(lines.includes('requests_total{path=""} 1'));
+    assert.ok(lines.includes('queue_depth{queue="a\\"b"} 4'));
+    assert.ok(lines.includes('queue_depth{queue="c"} +Inf'));
+    assert.ok(lines.includes('up 1'));
+    assert.ok(lines.includes('# TYPE queue_depth gauge'));
+});
+
+test('Server-Timing lists each entry with its duration and ends with the total', async () => {
+    const timing = new ServerTiming();
+    timing.add('cache', 0.5, 'page "hit"');
+    timing.time('db', () => {});
+    await timing.time('verify', () => new Promise(resolve => setTimeout(resolve, 5)));
+
+    const entries = timing.header().split(', ');
+    assert.deepStrictEqual(entries.map(entry => entry.split(';')[0]), ['cache', 'db', 'verify', 'total']);
+    assert.strictEqual(entries[0], 'cache;dur=0.50;desc="page \\"hit\\""');
+    for (const entry of entries.slice(1)) {
+        assert.match(entry, /^[a-z]+;dur=\d+\.\d{2}$/);
+    }
+    const durations = entries.map(entry => parseFloat(entry.split('dur=')[1]));
+    assert.ok(durations[2] >= 4, entries[2]);
+    assert.ok(durations[3] >= durations[2], timing.header());
+});
+
+// A plain http server running the middleware in front of a handler
+async function serve(t, ...middleware) {
+    const server = http.createServer((req, res) => {
+        const run = i => (i < middleware.length ? middleware[i](req, res, () => run(i + 1)) : null);
+        run(0);
+    });
+    await new Promise(resolve => server.listen(0, '127.0.0.1', resolve));
+    t.after(() => server.close());
+    const url = `http://127.0.0.1:${server.address().port}/`;
+    return headers => fetch(url, { headers });
+}
+
+test('every response carries a Server-Timing header', async t => {
+    const request = await serve(t, requestMetrics(), (req, res) => {
+        res.serverTiming.add('db', 1.5);
+        res.end('ok');
+    });
+
+    const response = await request();
+    assert.match(response.headers.get('server-timing'), /^db;dur=1\.50, total;dur=\d+\.\d{2}$/);
+});
+
+test('operational endpoints need the metrics token once one is set', async t => {
+    const request = await serve(t, requireMetricsToken(), (req, res) => res.end('stats'));
+    const previous = process.env.METRICS_TOKEN;
+    t.after(() => {
+        if (previous === undefined) delete process.env.METRICS_TOKEN;
+        else process.env.METRICS_TOKEN = previous;
+    });
+
+    delete process.env.METRICS_TOKEN;
+    assert.strictEqual((await request()).status, 200);
+
+    process.env.METRICS_TOKEN = 's3cret';
+    assert.strictEqual((await request()).status, 401);
+    assert.strictEqual((await request({ Authorization: 'Bearer wrong' })).status, 401);
+    assert.strictEqual((await request({ Authorization: 's3cret' })).status, 401);
+    const allowed = await request({ Authorization: 'Bearer s3cret' });
+    assert.strictEqual(allowed.status, 200);
+    assert.strictEqual(await allowed.text(), 'stats');
+});
@@ -0,0 +1,267 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const vm = require('vm');
+const { minifyJs } = require('../backend/assets/minify');
+const { buildAssets } = require('../backend/assets/build');
+const { loadEngine, compileEngine } = require('../backend/engine');
+const { verifyReplay } = require('../backend/replay/verify');
+const { recordReplays } = require('../bench/record-replays');
+
+const FRONTEND_DIR = path.join(__dirname, '../frontend');
+const FRAME_MS = 1000 / 60;
+const TOWERS = [
+    [180, 260, 'splash'], [260, 300, 'electric'], [340, 340, 'basic'], [460, 180, 'rapid'],
+    [540, 260, 'freeze'], [660, 420, 'poison'], [300, 140, 'sniper'], [520, 460, 'laser']
+];
+
+const { createRng } = loadEngine();
+const readSource = file => fs.readFileSync(path.join(FRONTEND_DIR, file), 'utf8');
+
+// Each body must return the same value minified as it does as written
+const SNIPPETS = [
+    // A '/' after the parentheses of if/while/for starts a regular expression
+    "const s = 'ab'; let hit = 0; if (s) / b/.test(s) && hit++; return hit;",
+    "let i = 0, n = 0; while (i++ < 3) / +a/.test(' a') && n++; return n;",
+    "let n = 0; for (const c of ['b', ' b']) / b/.test(c) && n++; return n;",
+    "let n = 0; { n = 1 }\n/ b/.test('ab') || n++; return n;",
+    "if (true) { } else / a/.test('a'); return typeof /[/]'/;",
+    // ...anywhere else after ')', '}', '++', '--' or a property it divides
+    'const h = (8) / 2 /* half */ / 2\nreturn h;',
+    'const n = { valueOf() { return 8 } } / 2\nreturn n;',
+    'let a = 4; const b = a++ / 2\nreturn [a, b];',
+    'let a = 4; const b = a-- / 2\nreturn [a, b];',
+    'const range = { in: 8, of: 2 }; const h = range.in / range.of\nreturn h;',
+    'const f = x => { return x }\nconst t = `${ { a: 6 }.a / 2 }/ x /`\nreturn [f(1), t];'
+];
+
+test('tells regular expressions from division by what precedes them', () => {
+    for (const body of SNIPPETS) {
+        assert.deepStrictEqual(new Function(minifyJs(body))(), new Function(body)(), body);
+    }
+});
+
+test('the engine built from minified scripts plays and verifies the same games', () => {
+    const engine = compileEngine()();
+    const minified = compileEngine(minifyJs)();
+    const games = recordReplays(engine, 4);
+    assert.deepStrictEqual(recordReplays(minified, 4), games);
+    for (const game of games) {
+        assert.deepStrictEqual(verifyReplay(minified, game.replay), verifyReplay(engine, game.replay));
+    }
+});
+
+// Digest of every operation a run performed, with a count so a mismatch shows its size
+class OperationLog {
+    constructor() {
+        this.hash = crypto.createHash('sha256');
+        this.count = 0;
+    }
+
+    record(...entry) {
+        this.hash.update(JSON.stringify(entry));
+        this.hash.update('\n');
+        this.count++;
+    }
+
+    digest() {
+        return { count: this.count, sha256: this.hash.digest('hex') };
+    }
+}
+
+const NAME = Symbol('name');
+
+function describe(value) {
+    if (value === null || (typeof value !== 'object' && typeof value !== 'function')) return value;
+    return value[NAME] || typeof value;
+}
+
+// Just enough of a browser for the page and worker scripts: elements, 2D
+// contexts and the console log every call and property write; time only
+// moves when the test advances the clock, timers only fire when it runs
+// them, and Math.random is seeded.
+function createBrowser(log, search = '') {
+    const clock = { now: 0 };
+    const timers = [];
+    const elements = new Map();
+    let created = 0;
+
+    // Members never written are methods: calls are logged and return results[key](...args)
+    function recorder(name, fields = {}, results = {}) {
+        return new Proxy({ [NAME]: name, ...fields }, {
+            get(target, key) {
+                if (key in target || typeof key === 'symbol') return target[key];
+                if (key === 'parentElement') return (target[key] = element(`${name}.parent`));
+                return (...args) => {
+                    log.record(name, key, args.map(describe));
+                    return results[key] ? results[key](...args) : undefined;
+                };
+            },
+            set(target, key, value) {
+                log.record(name, key, describe(value));
+                target[key] = value;
+                return true;
+            }
+        });
+    }
+
+    function context2d(name) {
+        const image = (width, height) => ({ data: new Uint8ClampedArray(width * height * 4), width, height });
+        return recorder(name, {}, {
+            measureText: text => ({ width: String(text).length * 7 }),
+            createLinearGradient: () => recorder(`${name} gradient`),
+            createRadialGradient: () => recorder(`${name} gradient`),
+            createPattern: () => recorder(`${name} pattern`),
+            getImageData: (x, y, width, height) => image(width, height),
+            createImageData: (width, height) => image(width, height)
+        });
+    }
+
+    function element(name) {
+        return recorder(name, {
+            style: recorder(`${name}.style`),
+            classList: recorder(`${name}.classList`),
+            dataset: {},
+            children: [],
+            width: 800,
+            height: 600,
+            clientWidth: 800,
+            clientHeight: 600
+        }, {
+            getContext: () => context2d(`${name} 2d`),
+            querySelector: selector => element(`${name} ${selector}`),
+            querySelectorAll: () => [],
+            getBoundingClientRect: () => ({ left: 0, top: 0, width: 800, height: 600 })
+        });
+    }
+
+    const document = recorder('document', { body: element('body'), head: element('head') }, {
+        getElementById: id => {
+            if (!elements.has(id)) elements.set(id, element(`#${id}`));
+            return elements.get(id);
+        },
+        createElement: tag => element(`<${tag}> ${created++}`),
+        querySelector: selector => element(selector),
+        querySelectorAll: () => []
+    });
+
+    const math = Object.create(Math);
+    math.random = createRng(1);
+
+    const context = vm.createContext({
+        document,
+        console: recorder('console'),
+        Math: math,
+        performance: { now: () => clock.now },
+        setTimeout: callback => timers.push(callback),
+        clearTimeout() {},
+        setInterval: () => 0,
+        clearInterval() {},
+        requestAnimationFrame: () => 0,
+        cancelAnimationFrame() {},
+        // Requests never complete, so no response lands at a different point in either run
+        fetch: () => new Promise(() => {}),
+        location: { search },
+        navigator: {},
+        alert() {},
+        URLSearchParams,
+        structuredClone
+    });
+    context.window = context;
+    context.self = context;
+    context.addEventListener = () => {};
+
+    return {
+        context,
+        clock,
+        timers,
+        load: (file, source) => vm.runInContext(source, context, { filename: file }),
+        run: code => vm.runInContext(code, context)
+    };
+}
+
+// Plays a game through the page scripts, with the HUD and profiler overlays open
+function runPage(sources) {
+    const log = new OperationLog();
+    const browser = createBrowser(log, '?hud&profile');
+    for (const [file, source] of sources) browser.load(file, source);
+
+    browser.run(`
+        initGame('hard');
+        for (const [x, y, type] of ${JSON.stringify(TOWERS)}) {
+            gameState.money = 1e6;
+            handleCanvasInteraction(x, y);
+            placeTowerFromPopup(type);
+        }
+        handleCanvasInteraction(${TOWERS[0][0]}, ${TOWERS[0][1]});
+    `);
+    const gameLoop = browser.run('gameLoop');
+    for (let frame = 0; frame < 2400 && !browser.run('gameState.gameOver'); frame++) {
+        browser.clock.now += FRAME_MS;
+        gameLoop(browser.clock.now);
+    }
+    const summary = browser.run(`({
+        wave: gameState.wave, score: gameState.score, health: gameState.health, money: gameState.money,
+        towers: gameState.towers.length, enemies: gameState.enemies.length
+    })`);
+    return { summary: { ...summary }, operations: log.digest() };
+}
+
+// Drives the simulation worker through its messages and records every snapshot it posts
+function runWorker(source) {
+    const log = new OperationLog();
+    const browser = createBrowser(log);
+    browser.context.importScripts = (...files) => {
+        for (const file of files) browser.load(file, readSource(`js/${file}`));
+    };
+    browser.context.postMessage = message => {
+        const buffer = crypto.createHash('sha256').update(new Uint8Array(message.buffer)).digest('hex');
+        log.record('postMessage', { ...message, buffer });
+    };
+    browser.load('simulation-worker.js', source);
+
+    const send = data => browser.context.onmessage({ data });
+    send({ type: 'reset', session: 1, difficulty: 'normal', seed: 7 });
+    send({ type: 'profile', enabled: true, tracing: true });
+    send({ type: 'start' });
+    send({ type: 'control', paused: false, speed: 3 });
+    // Every few seconds: the next tower (once it is affordable), an upgrade,
+    // the abilities and an early wave
+    const commands = [
+        ...TOWERS.map(([x, y, type]) => ['place', type, x, y]),
+        ['upgrade', 0, null], ['airstrike', 400, 300], ['timeslow'], ['towerboost'], ['startwave']
+    ];
+    for (let i = 0; i < 4800 && browser.timers.length > 0; i++) {
+        if (i % 120 === 0) {
+            send({ type: 'command', command: commands[(i / 120) % commands.length] });
+        }
+        browser.clock.now += FRAME_MS;
+        browser.timers.shift()();
+    }
+    return log.digest();
+}
+
+test('the built page and worker behave exactly like the original scripts', async t => {
+    const outDir = fs.mkdtempSync(path.join(os.tmpdir(), 'minify-test-'));
+    t.after(() => fs.rmSync(outDir, { recursive: true, force: true }));
+    const { manifest, scripts } = buildAssets({ outDir });
+    const readBuilt = file => fs.readFileSync(path.join(outDir, manifest[file]), 'utf8');
+
+    await t.test('page', () => {
+        const original = runPage(scripts.map(file => [file, readSource(file)]));
+        const built = runPage([['js/app.js', readBuilt('js/app.js')]]);
+        assert.ok(original.summary.wave > 1 && original.summary.towers > 0, JSON.stringify(original.summary));
+        assert.deepStrictEqual(built.summary, original.summary);
+        assert.deepStrictEqual(built.operations, original.operations);
+    });
+
+    await t.test('worker', () => {
+        const original = runWorker(readSource('js/simulation-worker.js'));
+        const built = runWorker(readBuilt('js/simulation-worker.js'));
+        assert.ok(original.count > 100, `${original.count} messages`);
+        assert.deepStrictEqual(built, original);
+    });
+});
@@ -0,0 +1,89 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { PathModel, gamePath, gamePathModel, createRng, GRID_SIZE, COLS, ROWS } = require('../backend/engine').loadEngine();
+
+const EPSILON = 1e-9;
+const enemyAt = distance => {
+    const enemy = { pathIndex: 0 };
+    gamePathModel.moveTo(enemy, distance);
+    return enemy;
+};
+
+test('moveTo and the arc length of the position it gives round-trip', () => {
+    const rng = createRng(3);
+    const enemy = { pathIndex: 0 };
+    for (let i = 0; i < 500; i++) {
+        // In random order, so the segment search often has to start over from the first segment
+        const distance = rng() * gamePathModel.totalLength;
+        gamePathModel.moveTo(enemy, distance);
+
+        const start = gamePath[enemy.pathIndex];
+        const along = Math.hypot(enemy.x - start.x, enemy.y - start.y);
+        assert.ok(along <= gamePathModel.segmentLength[enemy.pathIndex] + EPSILON);
+        assert.ok(Math.abs(gamePathModel.startDistance[enemy.pathIndex] + along - distance) < EPSILON);
+        assert.strictEqual(enemy.distance, distance);
+    }
+});
+
+test('each waypoint is the start of its segment', () => {
+    assert.strictEqual(gamePathModel.totalLength, 1700);
+    for (let i = 0; i < gamePath.length - 1; i++) {
+        const distance = gamePathModel.startDistance[i];
+        const at = enemyAt(distance);
+        assert.deepStrictEqual([at.pathIndex, at.x, at.y], [i, gamePath[i].x, gamePath[i].y]);
+
+        if (i > 0) {
+            const before = enemyAt(distance - 0.5);
+            assert.strictEqual(before.pathIndex, i - 1);
+            assert.ok(Math.hypot(before.x - gamePath[i].x, before.y - gamePath[i].y) - 0.5 < EPSILON);
+        }
+    }
+
+    // The last waypoint stays on the last segment, as does anything beyond it
+    const last = gamePath.length - 1;
+    const end = enemyAt(gamePathModel.totalLength);
+    assert.deepStrictEqual([end.pathIndex, end.x, end.y], [last - 1, gamePath[last].x, gamePath[last].y]);
+    assert.deepStrictEqual([enemyAt(1710).pathIndex, enemyAt(1710).x], [last - 1, 810]);
+});
+
+test('moveTo finds the segment again after moving backwards', () => {
+    const enemy = { pathIndex: 0 };
+    gamePathModel.moveTo(enemy, 1400);
+    assert.strictEqual(enemy.pathIndex, 5);
+    gamePathModel.moveTo(enemy, 250);
+    assert.deepStrictEqual([enemy.pathIndex, enemy.x, enemy.y], [1, 200, 250]);
+});
+
+test('isNear measures strictly less than the buffer, perpendicular to a segment', () => {
+    // 30px below the middle of the first segment
+    for (const [buffer, near] of [[25, false], [30, false], [30.001, true], [35, true]]) {
+        assert.strictEqual(gamePathModel.isNear(100, 230, buffer), near, `buffer ${buffer}`);
+    }
+    // Past the end of a segment only the next one counts: the outside of a corner is not near
+    assert.strictEqual(gamePathModel.isNear(180, 180, 35), true);
+    assert.strictEqual(gamePathModel.isNear(220, 180, 35), false);
+    assert.strictEqual(gamePathModel.isNear(220, 220, 35), true);
+});
+
+test('isBlocked looks up the cell centre at the width the model was built with', () => {
+    for (const buffer of [0, 20, 35, 60]) {
+        const model = new PathModel(gamePath, { cellSize: GRID_SIZE, cols: COLS, rows: ROWS, buffer });
+        for (let row = 0; row < ROWS; row++) {
+            for (let col = 0; col < COLS; col++) {
+                const x = col * GRID_SIZE + GRID_SIZE / 2;
+                const y = row * GRID_SIZE + GRID_SIZE / 2;
+                const near = model.isNear(x, y, buffer);
+                // Any point in the cell answers for its centre
+                assert.strictEqual(model.isBlocked(x - GRID_SIZE / 2, y + GRID_SIZE / 2 - 0.01), near);
+            }
+        }
+        // The y = 100 segment runs through a row of cell centres, which even a zero buffer does not block
+        assert.strictEqual(model.blocked.some(Boolean), buffer > 0, `buffer ${buffer}`);
+    }
+
+    assert.strictEqual(gamePathModel.isBlocked(100, 210), true);
+    assert.strictEqual(gamePathModel.isBlocked(100, 260), false);
+    for (const [x, y] of [[-1, 300], [800, 300], [300, -1], [300, 600]]) {
+        assert.strictEqual(gamePathModel.isBlocked(x, y), true, `${x}, ${y}`);
+    }
+});
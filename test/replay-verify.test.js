@@ -0,0 +1,64 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { loadEngine } = require('../backend/engine');
+const { verifyReplay, validateReplay } = require('../backend/replay/verify');
+const { recordReplays } = require('../bench/record-replays');
+
+const engine = loadEngine();
+const [game] = recordReplays(engine, 1);
+
+const withCommands = commands => ({ ...game.replay, commands });
+
+test('a recorded game verifies to its own score', () => {
+    const result = verifyReplay(engine, game.replay);
+    assert.deepStrictEqual(result, { valid: true, score: game.score, wave: game.wave, ticks: game.replay.ticks });
+});
+
+// An inherited tower type used to leave money as NaN, after which every purchase succeeded
+test('rejects tower types that are not own keys of the tower table', () => {
+    const replay = withCommands([[1, 'place', 'constructor', 60, 60], [2, 'place', 'sniper', 60, 140]]);
+    assert.strictEqual(verifyReplay(engine, replay).valid, false);
+    for (const type of ['toString', '__proto__', 'hasOwnProperty', 42, null]) {
+        assert.match(validateReplay(withCommands([[1, 'place', type, 60, 60]]), engine), /Invalid place/);
+    }
+});
+
+test('rejects placements off the grid-cell centres', () => {
+    for (const [x, y] of [[61, 60], [-20, 60], [60, 620], [820, 60], [NaN, 60], ['60', 60], [null, 60]]) {
+        assert.match(validateReplay(withCommands([[1, 'place', 'basic', x, y]]), engine), /Invalid place/, `${x},${y}`);
+    }
+    assert.strictEqual(validateReplay(withCommands([[1, 'place', 'basic', 780, 580]]), engine), null);
+});
+
+test('rejects malformed tower ids, upgrade paths and airstrike targets', () => {
+    const invalid = [
+        [1, 'upgrade', -1, null],
+        [1, 'upgrade', 1.5, null],
+        [1, 'upgrade', '1', null],
+        [1, 'upgrade', 1, 'constructor'],
+        [1, 'upgrade', 1, 42],
+        [1, 'sell', -1],
+        [1, 'sell', null],
+        [1, 'airstrike', NaN, 100],
+        [1, 'airstrike', 100, Infinity],
+        [1, 'airstrike', 900, 100],
+        [1, 'constructor'],
+        [1, '__proto__']
+    ];
+    for (const command of invalid) {
+        assert.notStrictEqual(validateReplay(withCommands([command]), engine), null, JSON.stringify(command));
+    }
+    assert.strictEqual(validateReplay(withCommands([[1, 'upgrade', 0, 'fortress'], [2, 'sell', 0]]), engine), null);
+});
+
+test('the simulation itself refuses inherited tower types', () => {
+    const state = engine.createSimulationState('normal', 1);
+    const simulation = new engine.Simulation(state);
+    simulation.start();
+    for (const type of ['constructor', 'toString', '__proto__', 'hasOwnProperty']) {
+        assert.strictEqual(simulation.placeTower(type, 60, 60), null, type);
+        assert.strictEqual(engine.TOWER_PROTOTYPES[type], undefined, type);
+    }
+    assert.strictEqual(Number.isFinite(state.money), true);
+    assert.strictEqual(new engine.Tower(60, 60, 'basic').getUpgradePaths().length, 3);
+});
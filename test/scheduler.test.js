@@ -0,0 +1,85 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { FixedStepScheduler, TICK_MS, TICK_RATE } = require('../backend/engine').loadEngine();
+
+// Counts steps; budgetMs is out of reach so only time and maxSteps limit a frame
+function scheduler(options = {}) {
+    const instance = new FixedStepScheduler({ stepMs: 10, budgetMs: Infinity, ...options });
+    instance.steps = 0;
+    instance.run = (elapsedMs, speed = 1, canStep) => instance.advance(elapsedMs, speed, () => instance.steps++, canStep);
+    return instance;
+}
+
+test('time short of a whole step carries over to the next frame', () => {
+    const s = scheduler();
+    assert.strictEqual(s.run(25), 2);
+    assert.strictEqual(s.accumulator, 5);
+    assert.strictEqual(s.alpha, 0.5);
+    assert.strictEqual(s.run(4), 0);
+    assert.strictEqual(s.run(1), 1);
+    assert.strictEqual(s.accumulator, 0);
+    assert.strictEqual(s.steps, 3);
+
+    // A second of 60 Hz or 144 Hz frames is a second of ticks either way
+    for (const hz of [60, 144]) {
+        const display = new FixedStepScheduler({ budgetMs: Infinity });
+        let ticks = 0;
+        for (let frame = 0; frame < hz; frame++) ticks += display.advance(1000 / hz, 1, () => {});
+        assert.ok(Math.abs(ticks - TICK_RATE) <= 1, `${hz} Hz: ${ticks} ticks`);
+        assert.ok(display.accumulator < TICK_MS + 1e-9);
+    }
+});
+
+test('past maxSteps a frame keeps one frame of backlog and drops the rest', () => {
+    const s = scheduler({ maxSteps: 4 });
+    assert.strictEqual(s.run(100), 4);
+    assert.strictEqual(s.accumulator, 40);
+    assert.strictEqual(s.droppedMs, 20);
+    assert.strictEqual(s.lastSteps, 4);
+
+    // The backlog is worked off next frame and nothing more is dropped
+    assert.strictEqual(s.run(5), 4);
+    assert.strictEqual(s.accumulator, 5);
+    assert.strictEqual(s.droppedMs, 20);
+});
+
+test('a gap longer than maxFrameMs counts as maxFrameMs', () => {
+    const s = scheduler({ maxSteps: 100, maxFrameMs: 250 });
+    assert.strictEqual(s.run(5000), 25);
+    assert.strictEqual(s.droppedMs, 0);
+});
+
+test('speed scales the time each frame adds', () => {
+    const fast = scheduler();
+    assert.strictEqual(fast.run(10, 3), 3);
+    assert.strictEqual(fast.run(7, 3), 2);
+    assert.strictEqual(fast.accumulator, 1);
+
+    const slow = scheduler();
+    assert.strictEqual(slow.run(10, 0.5), 0);
+    assert.strictEqual(slow.run(10, 0.5), 1);
+    assert.strictEqual(slow.run(10, 0), 0);
+    assert.strictEqual(slow.accumulator, 0);
+
+    // maxFrameMs caps the wall-clock gap before speed applies
+    const capped = scheduler({ maxSteps: 1000, maxFrameMs: 100 });
+    assert.strictEqual(capped.run(1000, 3), 30);
+});
+
+test('canStep stops a frame early without losing its time', () => {
+    const s = scheduler();
+    assert.strictEqual(s.run(30, 1, () => s.steps < 1), 1);
+    assert.strictEqual(s.accumulator, 20);
+    s.reset();
+    assert.strictEqual(s.accumulator, 0);
+    assert.strictEqual(s.run(10), 1);
+});
+
+test('a frame stops stepping once it has used its time budget', t => {
+    let now = 0;
+    t.mock.method(performance, 'now', () => now);
+    const s = new FixedStepScheduler({ stepMs: 10, budgetMs: 12 });
+    // Each step takes 5ms, so the third one takes the frame over budget
+    assert.strictEqual(s.advance(100, 1, () => { now += 5; }), 3);
+    assert.strictEqual(s.accumulator, 70);
+});
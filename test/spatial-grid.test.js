@@ -0,0 +1,64 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { SpatialGrid, createRng } = require('../backend/engine').loadEngine();
+
+const sorted = entities => entities.map(entity => entity.id).sort((a, b) => a - b);
+
+test('queryRadius is inclusive and reaches into neighbouring cells at cell boundaries', () => {
+    const grid = new SpatialGrid(800, 600, 40);
+    const entities = [
+        { id: 0, x: 0, y: 0 },
+        { id: 1, x: 80, y: 0 },        // Exactly radius away, first column of cell 2
+        { id: 2, x: 80.001, y: 0 },    // Just outside
+        { id: 3, x: 40, y: 40 },       // Corner shared by four cells
+        { id: 4, x: 39.999, y: 39.999 },
+        { id: 5, x: 40, y: 80 }        // Exactly radius away straight down
+    ];
+    grid.rebuild(entities);
+
+    assert.deepStrictEqual(sorted(grid.queryRadius(40, 40, 40)), [3, 4, 5]);
+    assert.deepStrictEqual(sorted(grid.queryRadius(40, 0, 40)), [0, 1, 3, 4]);
+    assert.deepStrictEqual(sorted(grid.queryRadius(40, 40, 0)), [3]);
+});
+
+test('queryRadius finds exactly what a linear scan finds', () => {
+    const rng = createRng(5);
+    const grid = new SpatialGrid(800, 600, 40);
+    const entities = [];
+    for (let i = 0; i < 500; i++) {
+        // Some slightly off the canvas, as enemies at spawn are
+        entities.push({ id: i, x: rng() * 840 - 20, y: rng() * 640 - 20 });
+    }
+    grid.rebuild(entities);
+
+    const out = [];
+    for (let q = 0; q < 200; q++) {
+        const x = rng() * 800;
+        const y = rng() * 600;
+        const radius = rng() * 200;
+        const expected = entities.filter(e => (e.x - x) ** 2 + (e.y - y) ** 2 <= radius * radius);
+        assert.deepStrictEqual(sorted(grid.queryRadius(x, y, radius, out)), sorted(expected));
+    }
+});
+
+test('a rebuild follows moved entities and forgets removed ones', () => {
+    const grid = new SpatialGrid(800, 600, 40);
+    const a = { id: 0, x: 100, y: 100 };
+    const b = { id: 1, x: 110, y: 100 };
+    const c = { id: 2, x: 700, y: 500 };
+    grid.rebuild([a, b, c]);
+    assert.deepStrictEqual(sorted(grid.queryRadius(100, 100, 20)), [0, 1]);
+
+    a.x = 690;
+    a.y = 510;
+    grid.rebuild([a, b, c]);
+    assert.deepStrictEqual(sorted(grid.queryRadius(100, 100, 20)), [1]);
+    assert.deepStrictEqual(sorted(grid.queryRadius(700, 500, 20)), [0, 2]);
+
+    grid.rebuild([c]);
+    assert.deepStrictEqual(sorted(grid.queryRadius(700, 500, 20)), [2]);
+    assert.deepStrictEqual(sorted(grid.queryRadius(100, 100, 800)), [2]);
+    // No references to removed entities are kept alive
+    assert.strictEqual(grid.count, 1);
+    assert.deepStrictEqual(grid.items.slice(1), [null, null]);
+});